@@ -88,7 +88,11 @@ export const useAuth = defineStore('auth', {
             }
             try {
                 const response = await apiClient.get('/api/result/');
-                return { result: response.data };
+                // 202：评估报告仍在后台生成
+                if (response.status === 202) {
+                    return { result: null, pending: true };
+                }
+                return { result: response.data, pending: false };
             } catch (error: any) {
                 const message = error.response?.data?.error || error.message || 'Failed to fetch interview result';
                 throw new Error(message);
@@ -10,16 +10,19 @@ load_dotenv()
 
 # 复用项目级共享 MongoClient（连接池）
 from interview.tools.db import close_mongo_client, get_mongo_db
+from interview.transport import get_sync_client
 
 COLLECTION_NAME = "problem"
 
 # Path to the data file
 DATA_FILE_PATH = "data/data.jsonl"
 
-# Initialize OpenAI client (using DashScope)
+# Initialize OpenAI client (using DashScope, on the shared keep-alive connection pool)
+EMBEDDING_BASE_URL = "https://dashscope.aliyuncs.com/compatible-mode/v1"
 embedding_client = OpenAI(
     api_key=os.getenv("ALIYUN_API_KEY"),
-    base_url="https://dashscope.aliyuncs.com/compatible-mode/v1"
+    base_url=EMBEDDING_BASE_URL,
+    http_client=get_sync_client(EMBEDDING_BASE_URL),
 )
 
 # Vector dimension settings
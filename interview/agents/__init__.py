@@ -5,6 +5,7 @@
 from .base_agent import BaseAgent, InterviewState
 from .memory import MemoryStore, MemoryRetriever
 from .session import InterviewSession
+from .session_store import InMemorySessionStore, RedisSessionStore, SessionStore
 from interview.tools.rag_tools import RetrievalSystem
 from .question_generator import QuestionGeneratorAgent
 from .scoring_agent import ScoringAgent
@@ -12,6 +13,7 @@ from .security_agent import SecurityAgent
 from .summary_agent import SummaryAgent
 from .resume_parser import ResumeParser
 from .coordinator import MultiAgentCoordinator
+from .registry import get_shared_coordinator, reset_shared_coordinators
 
 __all__ = [
     'BaseAgent',
@@ -19,6 +21,9 @@ __all__ = [
     'MemoryStore',
     'MemoryRetriever',
     'InterviewSession',
+    'SessionStore',
+    'InMemorySessionStore',
+    'RedisSessionStore',
     'RetrievalSystem',
     'QuestionGeneratorAgent',
     'ScoringAgent',
@@ -26,4 +31,6 @@ __all__ = [
     'SummaryAgent',
     'ResumeParser',
     'MultiAgentCoordinator',
+    'get_shared_coordinator',
+    'reset_shared_coordinators',
 ]
@@ -13,13 +13,20 @@ from __future__ import annotations
 import logging
 import re
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Type, TypeVar
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, TypeVar
 
 from langchain_core.messages import BaseMessage, HumanMessage
+from langchain_core.utils.json import parse_partial_json
 from langchain_openai import ChatOpenAI
 from pydantic import BaseModel, ValidationError
 
+from interview.metrics import llm_call
+
+from .breaker import call_with_failover, model_label
 from .cache import cached_system_message
+from .hedging import HedgePolicy
+from .portal import run_sync
+from .response_cache import ResponseCache, cache_key, get_or_compute, get_response_cache
 from .prompts import PromptTemplate, load_prompt
 
 
@@ -60,6 +67,17 @@ def fix_common_json_issues(response: str) -> str:
 T = TypeVar("T", bound=BaseModel)
 
 
+def _json_fragment(chunk: Any) -> str:
+    """从流式 AIMessageChunk 中取出结构化输出的 JSON 片段（json_schema → content，function_calling → tool args）"""
+    if chunk is None:
+        return ""
+    tool_chunks = getattr(chunk, "tool_call_chunks", None)
+    if tool_chunks:
+        return "".join(tc.get("args") or "" for tc in tool_chunks)
+    content = getattr(chunk, "content", "")
+    return content if isinstance(content, str) else ""
+
+
 class BaseAgent(ABC):
     """
     Agent 抽象基类 — async + structured output 模板。
@@ -67,16 +85,27 @@ class BaseAgent(ABC):
     子类约定：
     - 类属性 `prompt_name` 指定 YAML 文件名（不含扩展名），自动加载 system prompt
     - 类属性 `output_schema` 指定 Pydantic 输出模型，自动启用 structured output
-    - 子类 process(input_data) 仍保留同步签名（默认走 asyncio.run），推荐覆盖 aprocess(input_data)
+    - 子类 process(input_data) 仍保留同步签名（默认提交到 portal 常驻 loop），推荐覆盖 aprocess(input_data)
+    - 实例属性 `hedge_policy`（HedgePolicy，可空）：设置后非流式 ainvoke_structured 超过 p90 时对冲到备用模型
+    - 类属性 `response_cache_ttl`（秒，可空）：非空时非流式 structured 调用按内容寻址缓存（见 response_cache.py）
+    - 实例属性 `failover_models`：主模型熔断 / 调用失败时依次尝试的备用模型（见 breaker.py）
     """
 
     prompt_name: str = ""              # YAML 文件名（如 "scoring_agent"）
     output_schema: Optional[Type[BaseModel]] = None  # Pydantic 输出契约
+    response_cache_ttl: Optional[float] = None        # LLM 响应缓存 TTL（None = 不缓存）
 
     def __init__(self, model: ChatOpenAI, name: str):
         self.model = model
         self.name = name
         self.logger = logging.getLogger(f"interview.agents.{name}")
+        self.hedge_policy: Optional[HedgePolicy] = None
+        # 故障转移链（由 coordinator 按角色注入 models["failover"]）
+        self.failover_models: List[ChatOpenAI] = []
+        self._structured_cache: Dict[Tuple[int, Type[BaseModel]], Any] = {}
+        self.response_cache: Optional[ResponseCache] = (
+            get_response_cache() if self.response_cache_ttl else None
+        )
 
         # 加载 prompt 模板
         if self.prompt_name:
@@ -104,19 +133,13 @@ class BaseAgent(ABC):
         """异步主入口（async-first）— 子类必须实现"""
 
     def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """同步 wrapper — 仅供旧调用方使用，新代码走 aprocess"""
-        import asyncio
+        """同步 wrapper — 仅供旧调用方使用，新代码走 aprocess（在常驻后台 loop 上执行）"""
+        return run_sync(self.aprocess(input_data))
 
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # 已经在事件循环中：交给 to_thread 启动新 loop 跑（避免嵌套阻塞）
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
-                    return pool.submit(asyncio.run, self.aprocess(input_data)).result()
-        except RuntimeError:
-            pass
-        return asyncio.run(self.aprocess(input_data))
+    @property
+    def model_name(self) -> str:
+        """指标标签用的模型名"""
+        return getattr(self.model, "model_name", None) or "unknown"
 
     def get_system_prompt(self) -> str:
         """从 YAML 模板取 system prompt"""
@@ -132,6 +155,7 @@ class BaseAgent(ABC):
         *,
         schema: Optional[Type[T]] = None,
         extra_messages: Optional[List[BaseMessage]] = None,
+        on_partial: Optional[Callable[[Dict[str, Any]], None]] = None,
     ) -> T | BaseModel | Dict[str, Any]:
         """
         async + structured output 一站式方法：
@@ -140,6 +164,10 @@ class BaseAgent(ABC):
         2. 用 with_structured_output(schema).ainvoke(...) 强约束 JSON
         3. 返回 Pydantic 实例（schema=None 时返回 model 原始 AIMessage）
 
+        on_partial: 可选回调；提供时改走流式调用，每收到一段 JSON 片段就以
+                    「目前已解析出的部分字段 dict」回调一次（最终返回值不变）
+                    流式调用不对冲（两路增量回调无法合并），也不读写响应缓存
+
         失败时记录日志并抛出，由调用方决定 fallback。
         """
         target_schema = schema or self.output_schema
@@ -149,15 +177,26 @@ class BaseAgent(ABC):
             messages.extend(extra_messages)
 
         if target_schema is not None:
-            structured = (
-                self._structured_model
-                if schema is None
-                else self.model.with_structured_output(target_schema, include_raw=False)
-            )
             try:
                 self.logger.debug(f"{self.name} ainvoke_structured (schema={target_schema.__name__})")
-                result = await structured.ainvoke(messages)
-                return result
+                if on_partial is not None:
+                    return await call_with_failover(
+                        self.model_chain,
+                        lambda m: self._astream_measured(self._structured_for(m, target_schema), m, messages, on_partial),
+                    )
+                if self.hedge_policy is not None:
+                    policy = self.hedge_policy
+                    return await self._acached(target_schema, messages, lambda: policy.run(
+                        f"{self.name}:{self.model_name}",
+                        lambda: self._ainvoke_chain(target_schema, messages),
+                        lambda: call_with_failover(
+                            [policy.alternate_model],
+                            lambda m: self._ainvoke_measured(policy.structured(target_schema), m, messages),
+                        ),
+                    ))
+                return await self._acached(
+                    target_schema, messages, lambda: self._ainvoke_chain(target_schema, messages)
+                )
             except ValidationError as e:
                 self.logger.error(f"{self.name} structured output 校验失败: {e}")
                 raise
@@ -167,14 +206,81 @@ class BaseAgent(ABC):
 
         # 无 schema 时回退到普通文本调用
         self.logger.debug(f"{self.name} ainvoke (raw text)")
-        ai_msg = await self.model.ainvoke(messages)
-        return ai_msg
+        return await call_with_failover(self.model_chain, lambda m: self._ainvoke_measured(m, m, messages))
+
+    async def _acached(self, schema: Type[T], messages: List[BaseMessage], compute) -> T:
+        """按 (模型, prompt 版本, 消息, schema) 读写响应缓存；未 opt-in 时直接调用"""
+        if self.response_cache is None:
+            return await compute()
+        key = cache_key(self.model_name, self.prompt.name, self.prompt.version, schema, messages)
+        return await get_or_compute(
+            self.response_cache, key, schema, self.response_cache_ttl, compute, agent=self.name
+        )
+
+    # ------------------------------------------------------------
+    # 熔断 / 故障转移
+    # ------------------------------------------------------------
+
+    @property
+    def model_chain(self) -> List[ChatOpenAI]:
+        """主模型 + 故障转移链（熔断打开的模型由 call_with_failover 跳过）"""
+        return [self.model, *self.failover_models]
+
+    def _structured_for(self, model: ChatOpenAI, schema: Type[BaseModel]):
+        """model 按 schema 绑定的 structured output runnable（主模型 + 默认 schema 复用预绑定实例）"""
+        if model is self.model and schema is self.output_schema and self._structured_model is not None:
+            return self._structured_model
+        key = (id(model), schema)
+        runnable = self._structured_cache.get(key)
+        if runnable is None:
+            runnable = model.with_structured_output(schema, include_raw=False)
+            self._structured_cache[key] = runnable
+        return runnable
+
+    async def _ainvoke_chain(self, schema: Type[BaseModel], messages: List[BaseMessage]) -> Any:
+        return await call_with_failover(
+            self.model_chain,
+            lambda m: self._ainvoke_measured(self._structured_for(m, schema), m, messages),
+        )
+
+    async def _ainvoke_measured(self, runnable, model: Any, messages: List[BaseMessage]) -> Any:
+        with llm_call(self.name, model_label(model), runnable) as bound:
+            return await bound.ainvoke(messages)
+
+    async def _astream_measured(self, runnable, model: Any, messages: List[BaseMessage], on_partial) -> Any:
+        with llm_call(self.name, model_label(model), runnable) as bound:
+            return await self._astream_structured(bound, messages, on_partial)
+
+    async def _astream_structured(
+        self,
+        structured,
+        messages: List[BaseMessage],
+        on_partial: Callable[[Dict[str, Any]], None],
+    ) -> BaseModel:
+        """流式执行 structured runnable：增量解析模型输出的 JSON 片段并回调，返回最终解析结果"""
+        buffer = ""
+        result = None
+        async for event in structured.astream_events(messages, version="v2"):
+            kind = event["event"]
+            if kind == "on_chat_model_stream":
+                fragment = _json_fragment(event["data"].get("chunk"))
+                if not fragment:
+                    continue
+                buffer += fragment
+                partial = parse_partial_json(buffer)
+                if isinstance(partial, dict):
+                    on_partial(partial)
+            elif kind == "on_chain_end" and not event.get("parent_ids"):
+                result = event["data"].get("output")
+        if result is None:
+            raise ValueError(f"{self.name} 流式 structured output 未产出结果")
+        return result
 
     async def ainvoke_text(self, messages: List[BaseMessage]) -> str:
         """无结构化的 raw 文本调用（用于工具调用循环等场景）"""
         try:
             self.logger.debug(f"{self.name} ainvoke (text)")
-            ai_msg = await self.model.ainvoke(messages)
+            ai_msg = await call_with_failover(self.model_chain, lambda m: m.ainvoke(messages))
             return ai_msg.content if hasattr(ai_msg, "content") else str(ai_msg)
         except Exception as e:
             self.logger.error(f"{self.name} ainvoke_text 异常: {e}")
@@ -0,0 +1,203 @@
+"""
+熔断器 + 按角色的模型故障转移链
+
+上游宕机时，每一轮仍要在该模型上等满 30s 超时才进入 _fallback_scoring / _fallback_question，
+SecurityAgent / SummaryAgent 同理。现在每个模型实例一个 CircuitBreaker：
+
+- closed   ：正常放行；连续失败 consecutive_failures 次，或滑动窗口（最近 window 次、至少 min_calls 次）
+             内失败 + 慢调用（耗时 ≥ slow_call_seconds）占比 ≥ failure_rate 时 → open
+- open     ：直接拒绝（BreakerOpen，微秒级），open_seconds 后 → half_open
+- half_open：只放行 1 个探测请求；成功 → closed（清空窗口），失败 → 再次 open
+
+call_with_failover(chain, call) 按顺序尝试链上的模型：熔断打开的模型直接跳过，调用失败则转下一个；
+全部不可用时抛出最后一个调用异常（全部熔断时为 BreakerOpen），由 agent 既有的 fallback 兜底。
+故障转移链由 MultiAgentCoordinator 的 models["failover"] 按角色配置，例如
+  {"security_model": [doubao_model], "scoring_models": [qwen_model]}
+
+状态变化记录 warning 日志与指标：interview_breaker_state{model}（0=closed 1=half_open 2=open）、
+interview_breaker_transitions_total{model,state}。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Sequence, Tuple, TypeVar
+
+from interview import metrics
+
+logger = logging.getLogger("interview.agents.breaker")
+
+T = TypeVar("T")
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class BreakerOpen(Exception):
+    """熔断器打开，调用被直接拒绝"""
+
+
+def model_label(model: Any) -> str:
+    """指标 / 日志用的模型名"""
+    return getattr(model, "model_name", None) or "unknown"
+
+
+class CircuitBreaker:
+    """单个模型的熔断器（线程安全；时间源可注入便于测试）"""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        consecutive_failures: int = 3,
+        failure_rate: float = 0.5,
+        window: int = 20,
+        min_calls: int = 10,
+        slow_call_seconds: float = 20.0,
+        open_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.consecutive_failures = consecutive_failures
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._outcomes: Deque[bool] = deque(maxlen=window)  # True = 失败或慢调用
+        self._streak = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.state = STATE_CLOSED
+
+    # ---------------- 状态迁移（持锁调用） ----------------
+
+    def _transition_locked(self, state: str, reason: str = "") -> None:
+        if state == self.state:
+            return
+        previous, self.state = self.state, state
+        if state == STATE_OPEN:
+            self._opened_at = self._clock()
+        if state == STATE_CLOSED:
+            self._outcomes.clear()
+            self._streak = 0
+        self._probing = False
+        log = logger.info if state == STATE_CLOSED else logger.warning
+        log(f"熔断器 {self.name}: {previous} → {state}{'（' + reason + '）' if reason else ''}")
+        metrics.breaker_state_changed(self.name, state)
+
+    # ---------------- 放行 / 结果记录 ----------------
+
+    def allow(self) -> bool:
+        """是否放行本次调用；half_open 时只放行一个探测请求"""
+        with self._lock:
+            if self.state == STATE_OPEN:
+                if self._clock() - self._opened_at < self.open_seconds:
+                    return False
+                self._transition_locked(STATE_HALF_OPEN)
+            if self.state == STATE_HALF_OPEN:
+                if self._probing:
+                    return False
+                self._probing = True
+            return True
+
+    def record_success(self, seconds: float) -> None:
+        with self._lock:
+            if self.state == STATE_HALF_OPEN:
+                self._transition_locked(STATE_CLOSED, f"探测成功 {seconds:.1f}s")
+                return
+            self._streak = 0
+            self._outcomes.append(seconds >= self.slow_call_seconds)
+            self._maybe_trip_locked()
+
+    def record_failure(self, error: BaseException) -> None:
+        with self._lock:
+            if self.state == STATE_HALF_OPEN:
+                self._transition_locked(STATE_OPEN, f"探测失败: {str(error)[:80]}")
+                return
+            self._streak += 1
+            self._outcomes.append(True)
+            if self._streak >= self.consecutive_failures:
+                self._transition_locked(STATE_OPEN, f"连续失败 {self._streak} 次: {str(error)[:80]}")
+            else:
+                self._maybe_trip_locked()
+
+    def release(self) -> None:
+        """调用被取消（既非成功也非失败）：归还 half_open 的探测名额"""
+        with self._lock:
+            self._probing = False
+
+    def _maybe_trip_locked(self) -> None:
+        total = len(self._outcomes)
+        if self.state != STATE_CLOSED or total < self.min_calls:
+            return
+        bad = sum(self._outcomes)
+        if bad / total >= self.failure_rate:
+            self._transition_locked(STATE_OPEN, f"失败 / 慢调用占比 {bad}/{total}")
+
+
+# ============================================================
+# 注册表：每个模型实例一个熔断器（模型对象是进程级单例，按 id 区分同名的不同实例）
+# ============================================================
+
+_lock = threading.Lock()
+_breakers: Dict[int, Tuple[Any, CircuitBreaker]] = {}
+
+
+def get_breaker(model: Any) -> CircuitBreaker:
+    entry = _breakers.get(id(model))
+    if entry is None:
+        with _lock:
+            entry = _breakers.get(id(model))
+            if entry is None:
+                entry = (model, CircuitBreaker(model_label(model)))
+                _breakers[id(model)] = entry
+    return entry[1]
+
+
+def breaker_states() -> Dict[str, str]:
+    return {breaker.name: breaker.state for _, breaker in list(_breakers.values())}
+
+
+def reset_breakers() -> None:
+    """丢弃全部熔断器（测试用）"""
+    with _lock:
+        _breakers.clear()
+
+
+# ============================================================
+# 故障转移
+# ============================================================
+
+async def call_with_failover(
+    chain: Sequence[Any],
+    call: Callable[[Any], Awaitable[T]],
+) -> T:
+    """按顺序在链上的模型执行 call(model)：跳过熔断打开的模型，失败转下一个，全部不可用时抛出最后一个调用异常"""
+    last_error: Optional[BaseException] = None
+    for position, model in enumerate(chain):
+        breaker = get_breaker(model)
+        if not breaker.allow():
+            last_error = last_error or BreakerOpen(f"{breaker.name} 熔断中")
+            continue
+        started = time.perf_counter()
+        try:
+            result = await call(model)
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception as e:
+            breaker.record_failure(e)
+            last_error = e
+            if position + 1 < len(chain):
+                logger.warning(f"{breaker.name} 调用失败，转移到故障转移链的下一个模型: {str(e)[:80]}")
+            continue
+        breaker.record_success(time.perf_counter() - started)
+        return result
+    raise last_error or BreakerOpen("故障转移链为空")
@@ -9,17 +9,31 @@ Prompt Cache Helper (S3) — 显式标记长 system prompt 走 prompt caching
 由于本项目所有模型都通过 langchain_openai.ChatOpenAI 走 OpenAI 兼容协议，
 prompt caching 在服务端自动处理，无需手动 cache_control 字段。
 本模块保留接口为将来切换 Anthropic 直连预留。
+
+稳定前缀布局（PromptLayout）：
+服务端缓存按「前缀」命中 — 只有从第一个 token 起逐字节一致的部分才能复用。
+human message 若把每轮变化的内容（相似案例、verifier 反馈）放在 profile / rubric 之前，
+稳定内容也跟着失效。PromptLayout 按稳定性从高到低排列段落：
+  system（SystemMessage）→ rubric → parsed profile → 历史问答 → 本轮易变数据
+同一层内保持添加顺序。命中情况见 metrics 的 interview_llm_tokens_total{kind="cached_input"}
+与 prompt_cache_report()。
 """
 
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
 
 from langchain_core.messages import SystemMessage
 
 logger = logging.getLogger("interview.agents.cache")
 
+# 段落稳定性层级（数值越小越靠前）；system 单独作为 SystemMessage，始终在最前
+SEGMENT_RUBRIC = 1
+SEGMENT_PROFILE = 2
+SEGMENT_HISTORY = 3
+SEGMENT_VOLATILE = 4
+
 
 def cached_system_message(content: str, *, provider: str = "openai") -> SystemMessage:
     """
@@ -52,3 +66,22 @@ def annotate_cache_metadata(invoke_kwargs: Dict[str, Any], cache_eligible: bool
         meta = invoke_kwargs.setdefault("metadata", {})
         meta["prompt_cache_eligible"] = True
     return invoke_kwargs
+
+
+class PromptLayout:
+    """按稳定性层级组装 human message：层级升序、同层按添加顺序，空段落忽略"""
+
+    def __init__(self, separator: str = "\n\n"):
+        self.separator = separator
+        self._segments: List[Tuple[int, int, str]] = []
+
+    def add(self, tier: int, text: str) -> "PromptLayout":
+        if text:
+            self._segments.append((tier, len(self._segments), text))
+        return self
+
+    def __bool__(self) -> bool:
+        return bool(self._segments)
+
+    def render(self) -> str:
+        return self.separator.join(text for _, _, text in sorted(self._segments))
@@ -0,0 +1,160 @@
+"""
+LangGraph checkpoint 瘦身 — 紧凑序列化 + 字节计量
+
+背景：MongoDBSaver 在每个节点边界把整份 channel_values 重新序列化写入。
+旧的 initial_state 携带 qa_history / parsed_profile / current_question，finalize 还会把
+final_summary 写进 state，单轮 6+ 次大 BSON 写入，且随面试轮次二次增长。
+
+checkpoint_mode="slim"（build_interview_graph / coordinator graph_options）：
+- state 只保留 session 标识 + 各节点产出的增量（节点本就通过 interview_session_provider 读 session）
+- finalize 节点不再把 final_summary 写入 state（结果已落库 result 集合，前端只需要 output）
+- saver 使用 CompressedCheckpointSerializer：JsonPlus(msgpack) 之上再做 zstd 压缩
+
+MeteredSerializer 统计每轮写入 checkpoint 的字节数（通过 ContextVar 归属到当前轮次），
+配合 CheckpointStats 给出 bytes/turn 与单轮耗时分位数。
+"""
+
+from __future__ import annotations
+
+import contextvars
+import threading
+import zlib
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from .utils import percentile
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard 缺失时退化为 zlib
+    zstandard = None
+
+CHECKPOINT_MODE_FULL = "full"
+CHECKPOINT_MODE_SLIM = "slim"
+CHECKPOINT_MODES = (CHECKPOINT_MODE_FULL, CHECKPOINT_MODE_SLIM)
+
+# 小于该阈值的 payload 不压缩（压缩头开销反而更大）
+_COMPRESS_MIN_BYTES = 256
+
+
+class CompressedCheckpointSerializer(SerializerProtocol):
+    """msgpack（JsonPlusSerializer）+ zstd 压缩；type 标记追加 "+zstd" / "+zlib" 后缀。
+
+    loads_typed 对无后缀的数据直接交给内层反序列化，旧 checkpoint 仍可读取。
+    """
+
+    def __init__(self, inner: Optional[SerializerProtocol] = None, level: int = 3):
+        self.inner = inner or JsonPlusSerializer()
+        self.level = level
+        # saver 在 executor 线程中并发调用，使用无状态的模块级压缩函数
+        self._codec = "zstd" if zstandard is not None else "zlib"
+
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        type_, data = self.inner.dumps_typed(obj)
+        if len(data) < _COMPRESS_MIN_BYTES:
+            return type_, data
+        if self._codec == "zstd":
+            return f"{type_}+zstd", zstandard.compress(data, self.level)
+        return f"{type_}+zlib", zlib.compress(data, 6)
+
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_.endswith("+zstd"):
+            if zstandard is None:
+                raise RuntimeError("checkpoint 使用 zstd 压缩，但当前环境未安装 zstandard")
+            return self.inner.loads_typed((type_[:-5], zstandard.decompress(payload)))
+        if type_.endswith("+zlib"):
+            return self.inner.loads_typed((type_[:-5], zlib.decompress(payload)))
+        return self.inner.loads_typed(data)
+
+
+# ============================================================
+# 字节计量
+# ============================================================
+
+# 当前轮次的计数器（coordinator 在一轮开始时设置；graph 内的任务 / executor 会继承上下文）
+_turn_meter: contextvars.ContextVar[Optional[List[int]]] = contextvars.ContextVar(
+    "checkpoint_turn_meter", default=None
+)
+
+
+class MeteredSerializer(SerializerProtocol):
+    """透明包装 saver 的 serde：统计写入字节数（总量 + 当前轮次）"""
+
+    def __init__(self, inner: SerializerProtocol):
+        self.inner = inner
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.total_writes = 0
+
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        type_, data = self.inner.dumps_typed(obj)
+        size = len(data)
+        with self._lock:
+            self.total_bytes += size
+            self.total_writes += 1
+        meter = _turn_meter.get()
+        if meter is not None:
+            meter[0] += size
+            meter[1] += 1
+        return type_, data
+
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        return self.inner.loads_typed(data)
+
+
+@contextmanager
+def checkpoint_turn_meter() -> Iterator[List[int]]:
+    """在 with 块内统计 checkpoint 写入：返回 [bytes, writes]"""
+    meter = [0, 0]
+    token = _turn_meter.set(meter)
+    try:
+        yield meter
+    finally:
+        _turn_meter.reset(token)
+
+
+def create_checkpoint_serializer(checkpoint_mode: str = CHECKPOINT_MODE_FULL) -> MeteredSerializer:
+    """按 checkpoint_mode 构造（带计量的）saver serde"""
+    if checkpoint_mode == CHECKPOINT_MODE_SLIM:
+        return MeteredSerializer(CompressedCheckpointSerializer())
+    return MeteredSerializer(JsonPlusSerializer())
+
+
+class CheckpointStats:
+    """每轮 checkpoint 写入字节数 / 次数 / 单轮耗时（线程安全，滑动窗口）"""
+
+    def __init__(self, window: int = 512):
+        self._lock = threading.Lock()
+        self._bytes: Deque[int] = deque(maxlen=window)
+        self._writes: Deque[int] = deque(maxlen=window)
+        self._turn_ms: Deque[float] = deque(maxlen=window)
+
+    def record_turn(self, bytes_written: int, writes: int, elapsed_ms: float) -> None:
+        with self._lock:
+            self._bytes.append(int(bytes_written))
+            self._writes.append(int(writes))
+            self._turn_ms.append(float(elapsed_ms))
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            bytes_ = list(self._bytes)
+            writes = list(self._writes)
+            turn_ms = list(self._turn_ms)
+        return {
+            "turns": len(bytes_),
+            "bytes_per_turn": {
+                "mean": round(sum(bytes_) / len(bytes_), 1) if bytes_ else 0.0,
+                "p50": percentile(bytes_, 50),
+                "p95": percentile(bytes_, 95),
+            },
+            "writes_per_turn": round(sum(writes) / len(writes), 2) if writes else 0.0,
+            "turn_ms": {
+                "p50": round(percentile(turn_ms, 50), 1),
+                "p95": round(percentile(turn_ms, 95), 1),
+            },
+        }
@@ -0,0 +1,286 @@
+"""
+ContextBuilder — 按 token 预算组装 prompt 上下文
+
+旧实现靠字符截断控制 prompt 大小：SummaryAgent 的报告里放 json.dumps(resume_data, indent=2)[:2000]
+外加每题完整回答，turn_history 又以另一种格式重复同样的轮次；ResumeParser 发送缩进 JSON；
+QuestionVerifier._safe_json 在 1500 字符处截断，可能把 JSON 切在 token 中间。
+
+ContextBuilder 按 agent 的 token 预算组装各段落：
+1. 本地 tokenizer 计数（tiktoken 可用且能加载编码时用 o200k_base，否则按 CJK 1 字 ≈ 1 token、
+   其余 4 字符 ≈ 1 token 估算；INTERVIEW_TOKENIZER_ENCODING="" 强制使用估算）
+2. JSON 紧凑序列化；超出上限时按结构收缩（截短长字符串 / 列表），始终是合法 JSON
+3. 跨段落去重：按优先级依次处理，某行的内容（去掉「标签:」前缀）已出现在先前保留的文本中则删去
+4. 超出预算时从优先级最低（priority 数值最大）的段落开始收缩，不够再整段丢弃
+
+每次 build 记录实际发送与节省的 token（相对缩进 JSON + 未去重的原始文本）：
+interview_context_tokens_total{agent,kind=sent|saved}。
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import logging
+import math
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from interview import metrics
+
+logger = logging.getLogger("interview.agents.context_budget")
+
+TOKENIZER_ENV = "INTERVIEW_TOKENIZER_ENCODING"
+DEFAULT_ENCODING = "o200k_base"
+
+_CJK_RE = re.compile(r"[\u2e80-\u9fff\u3000-\u303f\uac00-\ud7af\uff00-\uffef]")
+_LABEL_RE = re.compile(r"^\s*(?:[-*]\s*)?[^:：\n]{1,24}[:：]\s*")
+_SPACE_RE = re.compile(r"\s+")
+
+# 短于该长度的行不参与去重（如「得分: 7/10」这类碰巧重复的短值）
+_DEDUPE_MIN_CHARS = 12
+# 收缩后不足该 token 数的段落直接丢弃
+_MIN_SECTION_TOKENS = 16
+# fit_json 逐级收缩：(字符串上限, 列表上限)
+_JSON_SHRINK_STEPS = ((400, 20), (200, 10), (100, 6), (60, 4), (30, 2), (12, 1))
+
+
+# ============================================================
+# token 计数 / 截断
+# ============================================================
+
+@functools.lru_cache(maxsize=1)
+def _encoding():
+    name = os.getenv(TOKENIZER_ENV, DEFAULT_ENCODING).strip()
+    if not name:
+        return None
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        logger.info(f"tiktoken 编码 {name} 不可用，使用估算计数: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """截断到 max_tokens 以内（在 token / 字符边界上截断，不产生半个字符）"""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    encoding = _encoding()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens]).rstrip("\ufffd")
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if count_tokens(text[:mid]) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo]
+
+
+# ============================================================
+# JSON
+# ============================================================
+
+def compact_json(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _shrink(obj: Any, max_chars: int, max_items: int) -> Any:
+    if isinstance(obj, str):
+        return obj if len(obj) <= max_chars else obj[:max_chars] + "…"
+    if isinstance(obj, dict):
+        return {k: _shrink(v, max_chars, max_items) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        head = [_shrink(v, max_chars, max_items) for v in obj[:max_items]]
+        if len(obj) > max_items:
+            head.append(f"…(+{len(obj) - max_items})")
+        return head
+    return obj
+
+
+def fit_json(obj: Any, max_tokens: int) -> str:
+    """紧凑 JSON；超出 max_tokens 时逐级截短长字符串与列表（结果始终是合法 JSON，最后一级仍超出时原样返回）"""
+    text = compact_json(obj)
+    if count_tokens(text) <= max_tokens:
+        return text
+    for max_chars, max_items in _JSON_SHRINK_STEPS:
+        text = compact_json(_shrink(obj, max_chars, max_items))
+        if count_tokens(text) <= max_tokens:
+            break
+    return text
+
+
+# ============================================================
+# ContextBuilder
+# ============================================================
+
+@dataclass
+class _Section:
+    name: str
+    lines: List[str]
+    priority: int
+    order: int
+    max_tokens: Optional[int] = None
+    json_obj: Any = None
+    baseline_tokens: int = 0
+    dedupe: bool = True
+    text: str = ""
+
+
+@dataclass
+class BuiltContext:
+    """build() 的结果：各段落文本（被丢弃的段落为空串）+ token 统计"""
+
+    sections: Dict[str, str]
+    tokens: int
+    baseline_tokens: int
+    truncated: List[str] = field(default_factory=list)
+    dropped: List[str] = field(default_factory=list)
+
+    @property
+    def saved_tokens(self) -> int:
+        return max(0, self.baseline_tokens - self.tokens)
+
+    def get(self, name: str, default: str = "") -> str:
+        return self.sections.get(name) or default
+
+
+class ContextBuilder:
+    """按优先级 + token 预算组装上下文段落（priority 越小越重要）"""
+
+    def __init__(self, agent: str, budget_tokens: int):
+        self.agent = agent
+        self.budget_tokens = budget_tokens
+        self._sections: List[_Section] = []
+
+    def add(
+        self,
+        name: str,
+        content: Union[str, Sequence[str]],
+        *,
+        priority: int,
+        max_tokens: Optional[int] = None,
+        dedupe: bool = True,
+    ) -> "ContextBuilder":
+        """文本段落；content 为字符串或行列表"""
+        text = content if isinstance(content, str) else "\n".join(content)
+        self._sections.append(_Section(
+            name=name, lines=text.split("\n") if text else [], priority=priority,
+            order=len(self._sections), max_tokens=max_tokens,
+            baseline_tokens=count_tokens(text), dedupe=dedupe,
+        ))
+        return self
+
+    def add_json(
+        self, name: str, obj: Any, *, priority: int, max_tokens: Optional[int] = None
+    ) -> "ContextBuilder":
+        """JSON 段落：紧凑序列化，按结构收缩；基线按旧的 indent=2 序列化计"""
+        try:
+            baseline = json.dumps(obj, ensure_ascii=False, indent=2, default=str)
+        except Exception:
+            baseline = str(obj)
+        self._sections.append(_Section(
+            name=name, lines=[], priority=priority, order=len(self._sections), max_tokens=max_tokens,
+            json_obj=obj, baseline_tokens=count_tokens(baseline), dedupe=False,
+        ))
+        return self
+
+    # ------------------------------------------------------------
+    # 组装
+    # ------------------------------------------------------------
+
+    def build(self) -> BuiltContext:
+        truncated: List[str] = []
+        dropped: List[str] = []
+        kept: List[str] = []
+        by_importance = sorted(self._sections, key=lambda s: (s.priority, s.order))
+
+        # 1. 去重 + 单段上限（按重要性依次处理，先保留的段落优先占有重复内容）
+        for section in by_importance:
+            if section.json_obj is not None:
+                section.text = compact_json(section.json_obj)
+            else:
+                lines = [line for line in section.lines if not (section.dedupe and _is_duplicate(line, kept))]
+                section.text = "\n".join(lines).strip("\n")
+            if section.max_tokens is not None and count_tokens(section.text) > section.max_tokens:
+                self._shrink_section(section, section.max_tokens)
+                truncated.append(section.name)
+            kept.append(_normalize(section.text))
+
+        # 2. 预算：从最不重要的段落开始收缩 / 丢弃
+        tokens = {s.name: count_tokens(s.text) for s in self._sections}
+        for section in reversed(by_importance):
+            over = sum(tokens.values()) - self.budget_tokens
+            if over <= 0:
+                break
+            if not section.text:
+                continue
+            target = tokens[section.name] - over
+            if target < _MIN_SECTION_TOKENS:
+                section.text = ""
+                dropped.append(section.name)
+            else:
+                self._shrink_section(section, target)
+                if section.name not in truncated:
+                    truncated.append(section.name)
+            tokens[section.name] = count_tokens(section.text)
+
+        built = BuiltContext(
+            sections={s.name: s.text for s in self._sections},
+            tokens=sum(tokens.values()),
+            baseline_tokens=sum(s.baseline_tokens for s in self._sections),
+            truncated=truncated,
+            dropped=dropped,
+        )
+        metrics.context_tokens(self.agent, sent=built.tokens, saved=built.saved_tokens)
+        logger.debug(
+            f"{self.agent} 上下文 {built.tokens}/{self.budget_tokens} tokens，节省 {built.saved_tokens}"
+            + (f"，截断 {truncated}" if truncated else "") + (f"，丢弃 {dropped}" if dropped else "")
+        )
+        return built
+
+    @staticmethod
+    def _shrink_section(section: _Section, max_tokens: int) -> None:
+        if section.json_obj is not None:
+            text = fit_json(section.json_obj, max_tokens)
+            section.text = text if count_tokens(text) <= max_tokens else ""
+            return
+        # 按行保留前缀；第一行就超出时在 token 边界截断
+        lines: List[str] = []
+        used = 0
+        for line in section.text.split("\n"):
+            cost = count_tokens(line) + (1 if lines else 0)
+            if used + cost > max_tokens:
+                if not lines:
+                    lines.append(truncate_to_tokens(line, max_tokens))
+                break
+            lines.append(line)
+            used += cost
+        section.text = "\n".join(lines)
+
+
+def _normalize(text: str) -> str:
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def _is_duplicate(line: str, kept: List[str]) -> bool:
+    value = _normalize(_LABEL_RE.sub("", line, count=1))
+    if len(value) < _DEDUPE_MIN_CHARS:
+        return False
+    return any(value in text for text in kept)
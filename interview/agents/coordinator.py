@@ -3,8 +3,14 @@ Multi-Agent Coordinator (S6 升级版)
 
 变更要点：
 - 提供 async 主入口 astart_interview / aprocess_answer
-- aprocess_answer 委托给 LangGraph 状态机执行（process_turn → 并行 security/scoring → 路由）
-- 保留同步 start_interview / process_answer 兼容旧调用
+- aprocess_answer 委托给 LangGraph 状态机执行（security → scoring → 路由）；
+  graph_options={"parallel_security": True} 时 security/scoring 并行，block 时取消在途评分
+  graph_options={"turn_budget": TurnBudget()} 时每轮带截止时间，预算不足按固定顺序降级
+- models["failover"] 按角色配置故障转移链，模型熔断打开时直接跳到备用模型或 fallback（见 breaker.py）
+- models 中提供 hedge_model 时启用对冲请求：评分 / 出题调用超过观测 p90 后向该模型发出副本（见 hedging.py）
+- 评分 ensemble 在线统计各分数区域的多模型 agreement；INTERVIEW_SCORING_EARLY_EXIT=1 时
+  首个候选落在一致区域即提前结束（见 early_exit.py，统计见 self.early_exit.snapshot()）
+- 保留同步 start_interview / process_answer 兼容旧调用（提交到常驻后台 loop，见 portal.py）
 - MongoDB checkpointer 自动恢复跨进程状态
 """
 
@@ -12,37 +18,88 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 from interview.tools.rag_tools import RetrievalSystem
 
-from .graph import build_interview_graph, create_mongo_checkpointer
-from .memory import MemoryRetriever, MemoryStore
+from .checkpoint import CheckpointStats, checkpoint_turn_meter, create_checkpoint_serializer
+from .early_exit import EarlyExitPolicy, create_early_exit_policy
+from .finalize_jobs import FinalizeJobQueue
+from .graph import build_interview_graph, create_mongo_checkpointer, initial_graph_state
+from .hedging import HedgePolicy
+from .prescoring import AnswerScoreCache
+from .memory import MemoryRetriever, MemoryStore, get_turn_write_behind
+from .portal import run_sync
+from .profile_cache import ParsedProfileStore
 from .qa_models import QATurn, get_question_type, get_score
 from .question_generator import QuestionGeneratorAgent
 from .question_verifier import QuestionVerifier
+from .response_cache import InMemoryResponseCache, get_response_cache
 from .resume_parser import ResumeParser
 from .scoring_agent import ScoringAgent
 from .security_agent import SecurityAgent
 from .session import InterviewSession
+from .session_store import (
+    SessionStore,
+    SessionVersionConflict,
+    create_session_store,
+    decode_state,
+    encode_state,
+)
+from .speculation import SpeculationStats
 from .summary_agent import SummaryAgent
 
 
+# 环境变量：断线宽限期（秒），期间同一 chat_id 重连可接回会话；0 表示断线即释放
+RESUME_GRACE_ENV = "INTERVIEW_RESUME_GRACE_SECONDS"
+DEFAULT_RESUME_GRACE_SECONDS = 120.0
+# 进程重启后允许从快照恢复的最大快照年龄（与 RedisSessionStore 默认 TTL 一致）
+SNAPSHOT_MAX_AGE = timedelta(hours=6)
+
+
 class MultiAgentCoordinator:
     """Multi-Agent Coordinator — LangGraph 编排版"""
 
-    def __init__(self, models: Dict[str, Any]):
+    def __init__(
+        self,
+        models: Dict[str, Any],
+        graph_options: Optional[Dict[str, Any]] = None,
+        session_store: Optional[SessionStore] = None,
+    ):
+        """
+        Args:
+            models: 角色 → ChatOpenAI 映射（question_model / scoring_models / ...）；
+                    可选 hedge_model 作为评分 / 出题的对冲备用模型；
+                    可选 failover：角色 → 备用模型列表，如 {"security_model": [doubao_model]}
+            graph_options: 透传给 build_interview_graph 的拓扑开关，如 {"speculative": True}
+            session_store: 会话存储；默认按 INTERVIEW_SESSION_STORE_URL 选择 Redis / 进程内
+        """
         self.logger = logging.getLogger("interview.agents.coordinator")
+        self.graph_options: Dict[str, Any] = dict(graph_options or {})
+        # speculative 出题统计（胜率 / 单轮 p50/p95），顺序模式下也记录耗时作为对照
+        self.speculation_stats = SpeculationStats()
+        # checkpoint 写入统计（bytes/turn、单轮耗时）；checkpoint_mode 见 graph_options
+        self.checkpoint_mode: str = self.graph_options.get("checkpoint_mode", "full")
+        self.checkpoint_stats = CheckpointStats()
 
         # 组件
         self.retrieval_system = RetrievalSystem()
         self.memory_store = MemoryStore(self.retrieval_system)
         self.memory_retriever = MemoryRetriever(self.retrieval_system)
+        # turn write-behind（设置 INTERVIEW_TURN_JOURNAL 时启用；首次创建时回放 journal）
+        self.turn_writer = get_turn_write_behind(self.memory_store)
+
+        # 对冲请求（opt-in）：评分与出题共用一个策略，额外开销按总调用数统一封顶
+        hedge_model = models.get("hedge_model")
+        self.hedge_policy: Optional[HedgePolicy] = HedgePolicy(hedge_model) if hedge_model else None
 
         # Agent 实例
         self.question_generator = QuestionGeneratorAgent(
-            models.get("question_model"), self.retrieval_system
+            models.get("question_model"), self.retrieval_system, hedge_policy=self.hedge_policy
         )
         # ScoringAgent v3：支持多模型 ensemble + RAG anchors（W2.1）
         # 优先 scoring_models（List），向后兼容 scoring_model（single）
@@ -54,10 +111,21 @@ class MultiAgentCoordinator:
             raise ValueError(
                 "MultiAgentCoordinator: 必须提供 scoring_models (List) 或 scoring_model (single)"
             )
-        self.scoring_agent = ScoringAgent(scoring_models, memory_retriever=self.memory_retriever)
+        # 评分提前结束：默认观察模式，只统计 agreement 与假设提前结束的损失
+        self.early_exit: EarlyExitPolicy = create_early_exit_policy()
+        self.scoring_agent = ScoringAgent(
+            scoring_models,
+            memory_retriever=self.memory_retriever,
+            hedge_policy=self.hedge_policy,
+            early_exit=self.early_exit,
+            # 回答级评分缓存：后端沿用 LLM 响应缓存，未配置时为进程内 LRU
+            answer_cache=AnswerScoreCache(get_response_cache() or InMemoryResponseCache(max_entries=4096)),
+        )
         self.security_agent = SecurityAgent(models.get("security_model"))
         self.summary_agent = SummaryAgent(models.get("summary_model"))
         self.resume_parser = ResumeParser(models.get("question_model"))
+        # 简历未变时复用持久化的解析结果（update_user_resume 保存简历时已预先解析）
+        self.resume_parser.profile_store = ParsedProfileStore()
         # W3.2 CoVe verifier：默认用 question_model（与出题模型一致，避免增加 API 来源）
         # 若提供 verifier_model 则用专用模型；若显式禁用 (verifier_model=False) 则跳过
         verifier_model = models.get("verifier_model", models.get("question_model"))
@@ -67,12 +135,39 @@ class MultiAgentCoordinator:
             self.question_verifier = None
             self.logger.info("CoVe verifier 已禁用（verifier_model=None）")
 
-        # 会话管理
+        # 故障转移链：verifier 未单独配置时沿用出题角色的链
+        failover: Dict[str, List[Any]] = models.get("failover") or {}
+        for role, agents in (
+            ("question_model", (self.question_generator, self.resume_parser)),
+            ("scoring_models", (self.scoring_agent,)),
+            ("security_model", (self.security_agent,)),
+            ("summary_model", (self.summary_agent,)),
+            ("verifier_model" if "verifier_model" in failover else "question_model", (self.question_verifier,)),
+        ):
+            for agent in agents:
+                if agent is not None:
+                    agent.failover_models = list(failover.get(role, ()))
+
+        # 正常结束的 finalize（summary + 结果落库）作为持久化后台任务执行，候选人无需等待
+        # （graph_options={"finalize_queue": None} 可退回同步 finalize）
+        self.finalize_queue = FinalizeJobQueue(
+            self.summary_agent, self.retrieval_system, self.memory_store
+        )
+
+        # 会话管理：session_store 是权威状态；active_sessions 是本进程正在处理的工作副本
+        # （graph 的 interview_session_provider 从这里读取并 mutate）
+        self.session_store: SessionStore = session_store or create_session_store()
         self.active_sessions: Dict[str, InterviewSession] = {}
+        # 断线宽限期：期间会话保留在 store 中，同一 chat_id 重连直接接回（见 reattach_session）
+        self.resume_grace_seconds = float(os.getenv(RESUME_GRACE_ENV, DEFAULT_RESUME_GRACE_SECONDS))
+        self._detach_timers: Dict[str, threading.Timer] = {}
+        self._detach_lock = threading.Lock()
 
         # LangGraph 编译（懒加载 checkpointer，连接失败时降级为无 checkpoint）
         self._graph = None
         self._checkpointer = None
+        # coordinator 可被多个连接共享（见 registry.py），图构建需防并发重复编译
+        self._graph_lock = threading.Lock()
 
     # ------------------------------------------------------------
     # 内部：图构建
@@ -82,15 +177,22 @@ class MultiAgentCoordinator:
         """懒加载 LangGraph，避免在 import 时就连 MongoDB"""
         if self._graph is not None:
             return self._graph
+        with self._graph_lock:
+            if self._graph is None:
+                self._graph = self._build_graph()
+        return self._graph
 
+    def _build_graph(self):
         try:
-            self._checkpointer = create_mongo_checkpointer()
+            self._checkpointer = create_mongo_checkpointer(
+                serde=create_checkpoint_serializer(self.checkpoint_mode)
+            )
             self.logger.info("LangGraph MongoDB checkpointer 已初始化")
         except Exception as e:
             self.logger.warning(f"MongoDB checkpointer 初始化失败，降级为无 checkpoint: {e}")
             self._checkpointer = None
 
-        self._graph = build_interview_graph(
+        return build_interview_graph(
             security_agent=self.security_agent,
             scoring_agent=self.scoring_agent,
             question_generator=self.question_generator,
@@ -101,8 +203,9 @@ class MultiAgentCoordinator:
             interview_session_provider=lambda sid: self.active_sessions.get(sid),
             question_verifier=getattr(self, "question_verifier", None),  # W3.2 注入点
             checkpointer=self._checkpointer,
+            speculation_stats=self.speculation_stats,
+            **{"turn_writer": self.turn_writer, "finalize_queue": self.finalize_queue, **self.graph_options},
         )
-        return self._graph
 
     # ------------------------------------------------------------
     # async 主入口
@@ -132,7 +235,7 @@ class MultiAgentCoordinator:
             )
             self.active_sessions[session_id] = session
 
-            # 简历解析（async）
+            # 简历解析（async；命中 parsed_profiles 缓存时不调用 LLM）
             parsed_profile = await self.resume_parser.aparse(resume_data)
             session.parsed_profile = parsed_profile
             self.logger.debug(
@@ -156,6 +259,10 @@ class MultiAgentCoordinator:
             session.current_question = first_question
             session.question_data = first_question
 
+            await asyncio.to_thread(self.session_store.save, session, include_static=True)
+            await asyncio.to_thread(self._save_snapshot, session)
+            self._release_local(session_id)
+
             question_text = (
                 first_question.get("question", str(first_question))
                 if isinstance(first_question, dict) else str(first_question)
@@ -181,10 +288,41 @@ class MultiAgentCoordinator:
                 "message": "启动面试时发生系统错误",
             }
 
-    async def aprocess_answer(self, session_id: str, user_answer: str) -> Dict[str, Any]:
-        """异步处理回答 — 通过 LangGraph 执行"""
+    async def aprocess_answer(
+        self,
+        session_id: str,
+        user_answer: str,
+        on_event: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+    ) -> Dict[str, Any]:
+        """异步处理回答 — 通过 LangGraph 执行
+
+        on_event: 可选 async 回调；提供时以流式 API 驱动 graph，依次推送
+                  {"type": "progress", "stage": ...} 节点进度与 question_delta 题目增量。
+                  返回的最终 output 与非流式调用一致。
+
+        整轮持有 session 锁：任何 worker 都可以处理该会话的下一轮，但同一时刻只有一个。
+        """
+        lock = self.session_store.lock(session_id)
+        if not await asyncio.to_thread(lock.acquire):
+            return {
+                "success": False,
+                "error": "Session busy",
+                "message": "该面试会话正在处理上一条回答，请稍后重试",
+            }
+        try:
+            return await self._aprocess_answer_locked(session_id, user_answer, on_event)
+        finally:
+            await asyncio.to_thread(lock.release)
+            self._release_local(session_id)
+
+    async def _aprocess_answer_locked(
+        self,
+        session_id: str,
+        user_answer: str,
+        on_event: Optional[Callable[[Dict[str, Any]], Awaitable[None]]],
+    ) -> Dict[str, Any]:
         try:
-            session = self.active_sessions.get(session_id)
+            session = await asyncio.to_thread(self._checkout_session, session_id)
             if not session:
                 return {
                     "success": False,
@@ -196,21 +334,25 @@ class MultiAgentCoordinator:
 
             # graph 配置：thread_id 用于 checkpoint 路由（每个 session 一个 thread）
             config = {"configurable": {"thread_id": session_id}}
-            initial_state = {
-                "session_id": session_id,
-                "candidate_name": session.candidate_name,
-                "user_answer": user_answer,
-                "qa_history": session.qa_history,
-                "current_question": session.current_question,
-                "parsed_profile": session.parsed_profile,
-            }
-
-            final_state = await graph.ainvoke(initial_state, config=config)
+            initial_state = initial_graph_state(session, user_answer, self.checkpoint_mode)
+
+            started = time.perf_counter()
+            with checkpoint_turn_meter() as meter:
+                if on_event is None:
+                    final_state = await graph.ainvoke(initial_state, config=config)
+                else:
+                    final_state = await self._astream_graph(graph, initial_state, config, on_event)
+            if self._checkpointer is not None:
+                self.checkpoint_stats.record_turn(
+                    meter[0], meter[1], (time.perf_counter() - started) * 1000
+                )
             output = final_state.get("output") or {}
 
-            # 终止状态时清理内存 session
+            # 终止状态时清理 session；否则写回 store 供下一轮（可能在其他 worker）使用
             if final_state.get("interview_complete"):
-                self.cleanup_session(session_id)
+                await asyncio.to_thread(self.cleanup_session, session_id)
+            else:
+                await asyncio.to_thread(self._commit_session, session)
 
             return output if output else {
                 "success": False,
@@ -226,6 +368,28 @@ class MultiAgentCoordinator:
                 "message": "处理回答时发生系统错误",
             }
 
+    async def _astream_graph(
+        self,
+        graph,
+        initial_state: Dict[str, Any],
+        config: Dict[str, Any],
+        on_event: Callable[[Dict[str, Any]], Awaitable[None]],
+    ) -> Dict[str, Any]:
+        """以 updates + custom 流驱动 graph：转发进度 / 题目增量，并合并出最终 state"""
+        final_state = dict(initial_state, stream_question=True)
+        async for mode, chunk in graph.astream(
+            final_state, config=config, stream_mode=["updates", "custom"]
+        ):
+            if mode == "custom":
+                await on_event(chunk)
+                continue
+            for node, update in chunk.items():
+                update = update or {}
+                final_state.update(update)
+                for stage in _progress_stages(node, update):
+                    await on_event({"type": "progress", "stage": stage})
+        return final_state
+
     # ------------------------------------------------------------
     # 同步兼容入口（旧调用方）
     # ------------------------------------------------------------
@@ -241,7 +405,7 @@ class MultiAgentCoordinator:
     # ------------------------------------------------------------
 
     def get_session_status(self, session_id: str) -> Dict[str, Any]:
-        session = self.active_sessions.get(session_id)
+        session = self.active_sessions.get(session_id) or self.session_store.load(session_id, self)
         if not session:
             return {"exists": False}
         return {
@@ -254,13 +418,155 @@ class MultiAgentCoordinator:
         }
 
     def cleanup_session(self, session_id: str):
+        """面试结束：从本地工作副本与 session_store 中删除，并清除恢复快照"""
+        self._cancel_detach_timer(session_id)
         if session_id in self.active_sessions:
             del self.active_sessions[session_id]
+        self.session_store.delete(session_id)
+        self.memory_store.clear_session_snapshot(session_id)
         self.logger.info(f"已清理会话: {session_id}")
 
+    def detach_session(self, session_id: str, grace_seconds: Optional[float] = None):
+        """连接断开：共享 store 下只释放本地副本（重连 / 其他 worker 可继续面试）；
+        进程内 store 下会话保留 grace_seconds（默认 resume_grace_seconds）供重连接回，
+        宽限期内未重连再 cleanup_session"""
+        if self.session_store.shared:
+            self.active_sessions.pop(session_id, None)
+            return
+        grace = self.resume_grace_seconds if grace_seconds is None else grace_seconds
+        if grace <= 0:
+            self.cleanup_session(session_id)
+            return
+        timer = threading.Timer(grace, self._expire_detached, args=(session_id,))
+        timer.daemon = True
+        with self._detach_lock:
+            previous = self._detach_timers.pop(session_id, None)
+            self._detach_timers[session_id] = timer
+        if previous is not None:
+            previous.cancel()
+        timer.start()
+
+    def reattach_session(self, session_id: str, candidate_name: str) -> Dict[str, Any]:
+        """同一 chat_id 重连：接回宽限期内的存活会话；进程重启过则从 session_meta 快照一次读取恢复。
+
+        返回 {"success": True, "resumed_from": "live" | "snapshot", "current_question": ...}；
+        没有可接回的会话（或候选人不匹配）时 success=False，调用方按新面试处理。
+        """
+        self._cancel_detach_timer(session_id)
+        resumed_from = "live"
+        session = self.active_sessions.get(session_id) or self.session_store.load(session_id, self)
+        if session is None:
+            session = self._load_snapshot(session_id)
+            if session is not None:
+                self.session_store.save(session, include_static=True)
+                self._release_local(session_id)
+                resumed_from = "snapshot"
+
+        if (
+            session is None
+            or session.candidate_name != candidate_name
+            or not isinstance(session.current_question, dict)
+        ):
+            return {"success": False, "message": "没有可恢复的面试会话"}
+
+        self.logger.info(f"会话已接回（{resumed_from}）: {session_id}，已答 {len(session.qa_history)} 题")
+        return {
+            "success": True,
+            "session_id": session_id,
+            "resumed_from": resumed_from,
+            "current_question": session.current_question.get("question", ""),
+            "question_type": session.current_question.get("type", "general"),
+            "total_questions": len(session.qa_history),
+            "message": f"已恢复面试会话，共完成 {len(session.qa_history)} 题",
+        }
+
     def cleanup_all_sessions(self):
-        for sid in list(self.active_sessions.keys()):
-            self.cleanup_session(sid)
+        with self._detach_lock:
+            pending = list(self._detach_timers)
+        for sid in set(self.active_sessions) | set(pending):
+            self.detach_session(sid, grace_seconds=0)
+
+    def _expire_detached(self, session_id: str) -> None:
+        with self._detach_lock:
+            if self._detach_timers.pop(session_id, None) is None:
+                return  # 已重连
+        self.logger.info(f"断线宽限期已过，释放会话: {session_id}")
+        self.cleanup_session(session_id)
+
+    def _cancel_detach_timer(self, session_id: str) -> None:
+        with self._detach_lock:
+            timer = self._detach_timers.pop(session_id, None)
+        if timer is not None:
+            timer.cancel()
+
+    # ------------------------------------------------------------
+    # 内部：session_store 工作副本
+    # ------------------------------------------------------------
+
+    def _checkout_session(self, session_id: str) -> Optional[InterviewSession]:
+        """从 store 取出会话放入本地工作副本（共享 store 每轮重新加载，保证读到最新版本）"""
+        session = self.active_sessions.get(session_id)
+        if session is None or self.session_store.shared:
+            session = self.session_store.load(session_id, self)
+            if session is not None:
+                self.active_sessions[session_id] = session
+        return session
+
+    def _commit_session(self, session: InterviewSession) -> None:
+        try:
+            self.session_store.save(session)
+        except SessionVersionConflict as e:
+            # 仅在锁过期后仍继续写入时发生：保留 store 中的新版本，丢弃本 worker 的迟到写入
+            self.logger.error(f"会话写回冲突，已放弃本轮写入: {e}")
+            return
+        self._save_snapshot(session)
+
+    # ------------------------------------------------------------
+    # 内部：恢复快照（session_meta.snapshot）
+    # ------------------------------------------------------------
+
+    def _save_snapshot(self, session: InterviewSession) -> None:
+        """每轮写回后把紧凑快照（msgpack + zlib）写入 session_meta；简历本体已在 meta.context 中。
+        快照只用于加速恢复，失败不影响本轮结果"""
+        try:
+            static = session.static_state()
+            static.pop("resume_data", None)
+            snapshot = encode_state({"static": static, "dynamic": session.dynamic_state()})
+            saved = self.memory_store.save_session_snapshot(
+                session.session_id, snapshot, len(session.qa_history)
+            )
+        except Exception as e:
+            self.logger.warning(f"会话快照写入失败: {session.session_id}: {e}")
+            return
+        if not saved:
+            self.logger.warning(f"会话快照写入失败: {session.session_id}")
+
+    def _load_snapshot(
+        self, session_id: str, session_meta: Optional[Dict[str, Any]] = None
+    ) -> Optional[InterviewSession]:
+        """由 session_meta 快照重建会话（单次读取）。
+
+        快照缺失 / 过期 / 落后于已落库的 turn（快照写入前崩溃）时返回 None。
+        """
+        meta = session_meta if session_meta is not None else self.memory_store.get_session_meta(session_id)
+        if not meta or meta.get("status") != "active" or not meta.get("snapshot"):
+            return None
+        snapshot_at = meta.get("snapshot_at")
+        if snapshot_at is not None and datetime.now() - snapshot_at > SNAPSHOT_MAX_AGE:
+            return None
+        if meta.get("snapshot_turns", 0) < (meta.get("stats") or {}).get("total_turns", 0):
+            return None
+        try:
+            state = decode_state(meta["snapshot"])
+        except Exception as e:
+            self.logger.warning(f"会话快照解码失败，忽略: {e}")
+            return None
+        static = {**state["static"], "resume_data": (meta.get("context") or {}).get("resume_data", {})}
+        return InterviewSession.from_state(static, state["dynamic"], coordinator=self)
+
+    def _release_local(self, session_id: str) -> None:
+        if self.session_store.shared:
+            self.active_sessions.pop(session_id, None)
 
     def resume_interview(self, session_id: str) -> Dict[str, Any]:
         try:
@@ -271,6 +577,9 @@ class MultiAgentCoordinator:
                     "error": "Memory not found",
                     "message": "未找到该面试会话的记忆数据",
                 }
+            session = self._load_snapshot(session_id, session_meta)
+            if session is not None:
+                return self._resume_from_snapshot(session)
             return self._resume_from_conversation_memories(session_id, session_meta)
         except Exception as e:
             self.logger.error(f"恢复面试会话时发生错误: {e}")
@@ -280,6 +589,20 @@ class MultiAgentCoordinator:
                 "message": "恢复面试会话时发生系统错误",
             }
 
+    def _resume_from_snapshot(self, session: InterviewSession) -> Dict[str, Any]:
+        self.session_store.save(session, include_static=True)
+        self._release_local(session.session_id)
+        total = len(session.qa_history)
+        return {
+            "success": True,
+            "session_id": session.session_id,
+            "candidate_name": session.candidate_name,
+            "total_questions": total,
+            "average_score": session.get_average_score(),
+            "last_question": session.qa_history[-1]["question"] if session.qa_history else None,
+            "message": f"已恢复面试会话: {session.candidate_name}，共{total}个问题",
+        }
+
     def _resume_from_conversation_memories(
         self, session_id: str, session_meta: Dict[str, Any]
     ) -> Dict[str, Any]:
@@ -302,7 +625,10 @@ class MultiAgentCoordinator:
         )
         session.parsed_profile = context.get("parsed_profile")
 
-        turns = self.memory_store.get_session_turns(session_id)
+        # write-behind 模式下先排空队列，保证读到的 turn 完整
+        if self.turn_writer is not None and not self.turn_writer.flush(timeout=5.0):
+            self.logger.warning(f"write-behind 仍有 {self.turn_writer.pending_count} 条 turn 未落库，会话 {session_id} 的 turn 可能不完整")
+        turns = self.memory_store.get_session_turns(session_id, projection={"embedding": 0})
         for turn in turns:
             action = turn.get("action", {})
             reward = turn.get("reward", {}) or {}
@@ -334,6 +660,9 @@ class MultiAgentCoordinator:
             }
             session.question_data = session.current_question
 
+        self.session_store.save(session, include_static=True)
+        self._release_local(session_id)
+
         avg_score = session_meta.get("stats", {}).get("average_score", 0.0)
         return {
             "success": True,
@@ -376,6 +705,9 @@ class MultiAgentCoordinator:
                     "message": "未找到该面试会话的记忆数据",
                 }
 
+            if self.turn_writer is not None and not self.turn_writer.flush(timeout=5.0):
+                self.logger.warning(f"write-behind 仍有 {self.turn_writer.pending_count} 条 turn 未落库，导出可能不完整")
+            meta.pop("snapshot", None)  # 二进制快照不导出
             turns = self.memory_store.get_session_turns(session_id)
             export_data = {
                 "session_id": session_id,
@@ -415,18 +747,40 @@ class MultiAgentCoordinator:
             pass
 
 
+# ============================================================
+# 流式进度事件
+# ============================================================
+
+PROGRESS_SECURITY_CHECKED = "security_checked"
+PROGRESS_SCORED = "scored"
+PROGRESS_GENERATING_NEXT_QUESTION = "generating_next_question"
+PROGRESS_FINALIZING = "finalizing"
+
+
+def _progress_stages(node: str, update: Dict[str, Any]) -> List[str]:
+    """节点完成 → 推送给前端的进度阶段（security block 路径不推送评分进度）"""
+    if update.get("finalize_reason") == "error":
+        return []
+    if update.get("should_block"):
+        return [PROGRESS_SECURITY_CHECKED]
+    if node == "security":
+        return [PROGRESS_SECURITY_CHECKED]
+    if node == "scoring":
+        return [PROGRESS_SCORED]
+    if node == "guarded_scoring":
+        return [PROGRESS_SECURITY_CHECKED, PROGRESS_SCORED]
+    if node == "readiness":
+        if update.get("finalize_reason") == "continue":
+            return [PROGRESS_GENERATING_NEXT_QUESTION]
+        if update.get("finalize_reason") == "normal":
+            return [PROGRESS_FINALIZING]
+    return []
+
+
 # ============================================================
 # 同步 ↔ async 桥接工具
 # ============================================================
 
 def _run_async(coro):
-    """在已运行 / 未运行 event loop 下都能跑 coroutine 到结果"""
-    try:
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
-                return pool.submit(asyncio.run, coro).result()
-    except RuntimeError:
-        pass
-    return asyncio.run(coro)
+    """同步入口统一提交到常驻后台 loop（见 portal.py），复用 loop 绑定的连接池"""
+    return run_sync(coro)
@@ -0,0 +1,71 @@
+"""
+单轮延迟预算 — deadline 随 graph state 传递，各节点按剩余预算确定性降级
+
+旧实现中每次 LLM 调用只有 ChatOpenAI(timeout=30) 约束，一轮串行的
+security LLM → 2 个评分调用 → 出题工具循环（最多 3 次）→ CoVe 3 次校验 → revise
+在 provider 变慢时可以超过一分钟。
+
+build_interview_graph(turn_budget=TurnBudget(...)) 后：
+- 入口节点（security / guarded_scoring）写入 state.turn_deadline（time.time() 绝对时间；
+  initial state 中已给出时沿用）
+- 每个步骤开始前检查剩余预算，低于阈值时按固定顺序降级（同一剩余预算必然得到同一降级组合）：
+    security  : 跳过 LLM 深度分析，只用快检 + Moderation
+    scoring   : 跳过 RAG anchors → 只用第一个评分模型 → 超时回退 fallback 评分（标记人工复核）
+    retrieval : 跳过 Memento 相似案例检索（超时同样按空上下文继续）
+    question  : 跳过出题 RAG 工具循环 → 跳过 CoVe verifier / revise → 超时或预算耗尽用兜底题
+- 每个步骤以剩余预算为上限 asyncio.wait_for（不低于 min_step_seconds），超时走该步骤的兜底结果
+- 每次降级记录到 state.degradations（并行节点通过 reducer 合并），最终写入
+  output["degradations"] 与 output["budget_remaining_ms"]，用于调整预算与阈值
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional
+
+# 降级标记（output["degradations"] 中的取值）
+SECURITY_LLM_SKIPPED = "security_llm_skipped"
+SECURITY_TIMEOUT = "security_timeout"
+SCORING_RAG_SKIPPED = "scoring_rag_skipped"
+SCORING_SINGLE_MODEL = "scoring_single_model"
+SCORING_TIMEOUT = "scoring_timeout"
+RETRIEVAL_SKIPPED = "retrieval_skipped"
+RETRIEVAL_TIMEOUT = "retrieval_timeout"
+QUESTION_TOOL_SKIPPED = "question_tool_skipped"
+VERIFIER_SKIPPED = "verifier_skipped"
+VERIFIER_TIMEOUT = "verifier_timeout"
+REVISE_SKIPPED = "revise_skipped"
+REVISE_TIMEOUT = "revise_timeout"
+QUESTION_FALLBACK = "question_fallback"
+QUESTION_TIMEOUT = "question_timeout"
+
+
+@dataclass(frozen=True)
+class TurnBudget:
+    """单轮预算与各步骤的最低剩余预算阈值（秒）。
+
+    阈值按「该步骤之后还要完成的关键路径」设定：剩余预算不足以覆盖后续必需步骤时，
+    先舍弃对结果影响最小的可选步骤。
+    """
+
+    total_seconds: float = 25.0
+    security_llm_min: float = 15.0
+    scoring_rag_min: float = 14.0
+    scoring_ensemble_min: float = 12.0
+    retrieval_min: float = 10.0
+    question_tool_min: float = 10.0
+    verifier_min: float = 6.0
+    revise_min: float = 6.0
+    question_min: float = 3.0
+    # 单步等待下限：预算已耗尽时仍给快检 / 兜底路径留出的时间
+    min_step_seconds: float = 1.0
+
+    def step_timeout(self, remaining: float) -> float:
+        return max(remaining, self.min_step_seconds)
+
+
+def merge_degradations(left: Optional[List[str]], right: Optional[List[str]]) -> List[str]:
+    """state.degradations 的 reducer：并行节点的降级合并；新一轮输入 None 时重置"""
+    if right is None:
+        return []
+    return [*(left or []), *right]
@@ -0,0 +1,185 @@
+"""
+评分 ensemble 自适应提前结束（early exit）
+
+ScoringAgent.aprocess 原本总是等待全部评分模型再聚合；整轮耗时由最慢的模型决定。
+但在部分分数区间（如明显空答的 0-2 分、完整正确的 9-10 分）多模型几乎总是一致，等第二个模型只是在花时间。
+
+策略：
+1. 每轮完整 ensemble（≥2 个候选）结束后，按 (question_type, 单模型分数) 在线记录该轮 ScoringOutput.agreement
+2. 最先返回的候选满足以下条件时接受它并取消其余调用：
+   - confidence=high（_score_with_model 已对 evidence_quote 做 fuzzy 校验，不通过会降为 low）
+   - 该 (question_type, score) 区域样本数 ≥ min_samples，平均 agreement ≥ min_agreement，
+     且 agreement 低于 review 阈值的比例 ≤ max_review_rate
+3. 否则照常等待其余模型
+
+度量：
+- 提前结束时省下的时间按完整 ensemble 的「首个候选 → 全部返回」尾部耗时的中位数估算
+- 启用时按 audit_rate 抽样：满足条件但仍等全部模型，记录提前结束会带来的分差 / review 漏判（agreement 损失）
+- 未启用（观察模式）时每个满足条件的轮次都按 audit 记账，先量化收益与损失再决定是否开启
+
+INTERVIEW_SCORING_EARLY_EXIT=1 启用；未设置时为观察模式（只统计，不取消调用）。
+只有完整 ensemble 的结果进入 agreement 统计，提前结束的轮次不反哺自身。
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from interview import metrics
+
+from .schemas import SingleScoreCandidate
+from .utils import percentile
+
+EARLY_EXIT_ENV = "INTERVIEW_SCORING_EARLY_EXIT"
+
+# decide() 的结果
+EXIT_ACCEPTED = "accepted"   # 接受首个候选，取消其余调用
+EXIT_AUDITED = "audited"     # 满足条件但抽样等待全部模型，用于度量 agreement 损失
+EXIT_SHADOW = "shadow"       # 观察模式：满足条件，照常等待全部模型
+
+DEFAULT_MIN_SAMPLES = 20
+DEFAULT_MIN_AGREEMENT = 0.9
+DEFAULT_MAX_REVIEW_RATE = 0.05
+DEFAULT_AUDIT_RATE = 0.1
+# 与 scoring_agent._AGREEMENT_THRESHOLD 一致：低于此 agreement 的轮次会触发人工复核
+_REVIEW_AGREEMENT = 0.7
+
+
+class EarlyExitPolicy:
+    """按 (question_type, score) 区域在线统计多模型 agreement，决定是否接受首个候选（线程安全）"""
+
+    def __init__(
+        self,
+        *,
+        enabled: bool = False,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+        min_agreement: float = DEFAULT_MIN_AGREEMENT,
+        max_review_rate: float = DEFAULT_MAX_REVIEW_RATE,
+        audit_rate: float = DEFAULT_AUDIT_RATE,
+        window: int = 256,
+        rng: Optional[Callable[[], float]] = None,
+    ):
+        self.enabled = enabled
+        self.min_samples = min_samples
+        self.min_agreement = min_agreement
+        self.max_review_rate = max_review_rate
+        self.audit_rate = audit_rate
+        self._window = window
+        self._rng = rng or random.random
+        self._lock = threading.Lock()
+        self._agreement: Dict[Tuple[str, int], Deque[float]] = {}
+        self._tail_ms: Deque[float] = deque(maxlen=window)
+        self._outcomes: Dict[str, int] = {EXIT_ACCEPTED: 0, EXIT_AUDITED: 0, EXIT_SHADOW: 0}
+        self._saved_ms: Deque[float] = deque(maxlen=window)
+        self._audit_deltas: Deque[int] = deque(maxlen=window)
+        self._audit_reviews: Deque[bool] = deque(maxlen=window)
+        self.ensembles = 0
+
+    # ------------------------------------------------------------
+    # 决策
+    # ------------------------------------------------------------
+
+    def region_stats(self, question_type: str, score: int) -> Dict[str, float]:
+        with self._lock:
+            samples = list(self._agreement.get((question_type, score), ()))
+        if not samples:
+            return {"count": 0, "mean_agreement": 0.0, "review_rate": 0.0}
+        return {
+            "count": len(samples),
+            "mean_agreement": sum(samples) / len(samples),
+            "review_rate": sum(1 for a in samples if a < _REVIEW_AGREEMENT) / len(samples),
+        }
+
+    def decide(self, question_type: str, candidate: SingleScoreCandidate) -> Optional[str]:
+        """首个候选是否可以提前结束；不满足条件返回 None"""
+        if candidate.confidence != "high":
+            return None
+        stats = self.region_stats(question_type, candidate.score)
+        if (
+            stats["count"] < self.min_samples
+            or stats["mean_agreement"] < self.min_agreement
+            or stats["review_rate"] > self.max_review_rate
+        ):
+            return None
+        if not self.enabled:
+            return EXIT_SHADOW
+        return EXIT_AUDITED if self._rng() < self.audit_rate else EXIT_ACCEPTED
+
+    # ------------------------------------------------------------
+    # 记账
+    # ------------------------------------------------------------
+
+    def record_ensemble(self, question_type: str, scores, agreement: float, tail_ms: float) -> None:
+        """记录一轮完整 ensemble：各候选分数所在区域追加本轮 agreement；tail_ms 为首个候选之后的等待时间"""
+        with self._lock:
+            self.ensembles += 1
+            self._tail_ms.append(max(0.0, float(tail_ms)))
+            for score in set(scores):
+                self._agreement.setdefault(
+                    (question_type, score), deque(maxlen=self._window)
+                ).append(float(agreement))
+
+    def record_outcome(
+        self,
+        question_type: str,
+        outcome: str,
+        *,
+        early_score: Optional[int] = None,
+        final_score: Optional[int] = None,
+        final_review: bool = False,
+    ) -> None:
+        """记录一次满足条件的轮次；audited / shadow 附带完整 ensemble 的结果用于计算 agreement 损失"""
+        with self._lock:
+            self._outcomes[outcome] = self._outcomes.get(outcome, 0) + 1
+            if outcome == EXIT_ACCEPTED:
+                self._saved_ms.append(percentile(self._tail_ms, 50))
+            elif early_score is not None and final_score is not None:
+                self._audit_deltas.append(abs(final_score - early_score))
+                self._audit_reviews.append(bool(final_review))
+        metrics.scoring_early_exit(question_type, outcome)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            outcomes = dict(self._outcomes)
+            saved_ms = list(self._saved_ms)
+            tail_ms = list(self._tail_ms)
+            deltas = list(self._audit_deltas)
+            reviews = list(self._audit_reviews)
+            regions = {
+                f"{qt}:{score}": list(v) for (qt, score), v in sorted(self._agreement.items())
+            }
+            ensembles = self.ensembles
+
+        eligible = sum(outcomes.values())
+        return {
+            "enabled": self.enabled,
+            "ensembles": ensembles,
+            "outcomes": outcomes,
+            "exit_rate": round(outcomes[EXIT_ACCEPTED] / (ensembles + outcomes[EXIT_ACCEPTED]), 4)
+            if ensembles + outcomes[EXIT_ACCEPTED] else 0.0,
+            "eligible": eligible,
+            "tail_ms": {"count": len(tail_ms), "p50": round(percentile(tail_ms, 50), 1)},
+            "saved_ms": {"count": len(saved_ms), "total": round(sum(saved_ms), 1)},
+            # 抽样 / 观察轮次：若当时提前结束，与完整 ensemble 的差异
+            "agreement_lost": {
+                "count": len(deltas),
+                "mean_abs_delta": round(sum(deltas) / len(deltas), 3) if deltas else 0.0,
+                "changed_rate": round(sum(1 for d in deltas if d) / len(deltas), 4) if deltas else 0.0,
+                "missed_review_rate": round(sum(reviews) / len(reviews), 4) if reviews else 0.0,
+            },
+            "regions": {
+                k: {"count": len(v), "mean_agreement": round(sum(v) / len(v), 3)}
+                for k, v in regions.items()
+            },
+        }
+
+
+def create_early_exit_policy(enabled: Optional[bool] = None) -> EarlyExitPolicy:
+    """按 INTERVIEW_SCORING_EARLY_EXIT 创建策略（未设置时为观察模式）"""
+    if enabled is None:
+        enabled = os.getenv(EARLY_EXIT_ENV, "").strip().lower() in ("1", "true", "yes")
+    return EarlyExitPolicy(enabled=enabled)
@@ -0,0 +1,327 @@
+"""
+FinalizeJobQueue — 面试正常结束后的后台 finalize 任务（持久化 + 重试）
+
+旧流程中 finalize_normal_node 在返回「面试已完成」之前依次等待：
+SummaryAgent.aprocess（系统内最大的 prompt）→ save_interview_result → update_session_status。
+启用后台 finalize 后：
+1. finalize_normal_node 只做本地计算（均分 / 安全汇总），把会话快照写入 finalize_jobs 集合
+   （status=pending），随即向候选人确认面试完成
+2. 后台 worker 在进程共享的 LoopPortal 常驻 loop 上认领任务（与同步入口复用同一 loop 及其 LLM 连接池，
+   不另起私有 loop），分步执行并逐步落库：
+   summary_result → result_saved → done；重试时跳过已完成的步骤（不会重复调用 LLM）
+3. 失败按指数退避重试，超过 max_retries 标记 failed；上游请求按后台优先级排队（见 ratelimit.py）
+4. 进程重启后 start() 重新认领 pending / 租约过期的 running 任务
+
+get_interview_result 在任务未完成时返回 pending（见 users.py）。
+
+任务文档（_id = session_id）：
+  {candidate_name, status, attempts, payload, summary_result, result_saved,
+   lease_until, last_error, created_at, updated_at}
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from pymongo import ReturnDocument
+
+from interview.ratelimit import BACKGROUND, priority
+
+from .portal import LoopPortal, get_portal
+from .qa_models import get_score
+
+logger = logging.getLogger("interview.agents.finalize_jobs")
+
+JOBS_COLLECTION = "finalize_jobs"
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+# ============================================================
+# finalize 数据构造（同步 finalize 与后台任务共用）
+# ============================================================
+
+def build_finalize_payload(session, security_summary: Dict[str, Any]) -> Dict[str, Any]:
+    """会话快照：后台任务只依赖该快照，不再访问 InterviewSession（会话随后即被清理）"""
+    return {
+        "session_id": session.session_id,
+        "candidate_name": session.candidate_name,
+        "resume_data": session.resume_data,
+        "qa_history": list(session.qa_history),
+        "average_score": session.get_average_score(),
+        "security_summary": security_summary,
+        "start_time": session.start_time,
+    }
+
+
+def summary_input(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "candidate_name": payload["candidate_name"],
+        "resume_data": payload["resume_data"],
+        "qa_history": payload["qa_history"],
+        "average_score": payload["average_score"],
+        "security_summary": payload["security_summary"],
+    }
+
+
+def build_interview_record(payload: Dict[str, Any], summary_result: Dict[str, Any]) -> Dict[str, Any]:
+    """save_interview_result 的输入（comprehensive_result）"""
+    avg_score = payload["average_score"]
+    security_summary = payload["security_summary"]
+    timestamp = datetime.now()
+    return {
+        "candidate_name": payload["candidate_name"],
+        "session_id": payload["session_id"],
+        "timestamp": timestamp,
+        "final_decision": summary_result.get("final_decision", "conditional"),
+        "final_grade": summary_result.get("final_grade", "C"),
+        "overall_score": summary_result.get("overall_score", avg_score),
+        "summary": summary_result.get("summary", ""),
+        "scores": [get_score(qa) for qa in payload["qa_history"]],
+        "average_score": avg_score,
+        "total_questions": len(payload["qa_history"]),
+        "qa_history": payload["qa_history"],
+        "detailed_summary": summary_result,
+        "security_summary": security_summary,
+        "security_alerts": security_summary.get("security_alerts", []),
+        "session_duration": (timestamp - payload["start_time"]).total_seconds(),
+        "termination_reason": "normal_completion",
+    }
+
+
+def build_completion_status(
+    payload: Dict[str, Any], summary_result: Dict[str, Any], record: Dict[str, Any]
+) -> Dict[str, Any]:
+    """update_session_status(..., "completed", final_data) 的 final_data"""
+    return {
+        "final_summary": summary_result,
+        "security_summary": payload["security_summary"],
+        "final_decision": summary_result.get("final_decision", "conditional"),
+        "final_grade": summary_result.get("final_grade", "C"),
+        "overall_score": summary_result.get("overall_score", payload["average_score"]),
+        "session_duration": record["session_duration"],
+        "termination_reason": "normal_completion",
+    }
+
+
+# ============================================================
+# 后台任务队列
+# ============================================================
+
+class FinalizeJobQueue:
+    """finalize 任务：finalize_jobs 集合持久化 + LoopPortal 常驻 loop 上执行"""
+
+    def __init__(
+        self,
+        summary_agent,
+        retrieval_system,
+        memory_store,
+        *,
+        collection=None,
+        max_retries: int = 5,
+        retry_backoff: float = 1.0,
+        lease_seconds: float = 300.0,
+        portal: Optional[LoopPortal] = None,
+    ):
+        self.summary_agent = summary_agent
+        self.retrieval_system = retrieval_system
+        self.memory_store = memory_store
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.lease_seconds = lease_seconds
+
+        self._collection = collection
+        self._portal = portal or get_portal()
+        self._lock = threading.Lock()
+        self._started = False
+        self._futures: Dict[str, Future] = {}
+
+    @property
+    def collection(self):
+        """懒加载 finalize_jobs 集合（构造 coordinator 时不连接 MongoDB）"""
+        if self._collection is None:
+            from interview.tools.db import get_mongo_db
+
+            self._collection = get_mongo_db()[JOBS_COLLECTION]
+        return self._collection
+
+    # ------------------------------------------------------------
+    # 生命周期
+    # ------------------------------------------------------------
+
+    def start(self) -> int:
+        """开始接收任务并重新调度未完成的任务；返回重新调度的任务数"""
+        with self._lock:
+            if self._started:
+                return 0
+            self._started = True
+
+        try:
+            stale = list(self.collection.find(
+                {"$or": [
+                    {"status": JOB_PENDING},
+                    {"status": JOB_RUNNING, "lease_until": {"$lt": datetime.now()}},
+                ]},
+                {"_id": 1},
+            ))
+        except Exception as e:
+            logger.error(f"扫描未完成的 finalize 任务失败: {e}")
+            return 0
+        for job in stale:
+            self._schedule(job["_id"])
+        if stale:
+            logger.info(f"重新调度 {len(stale)} 个未完成的 finalize 任务")
+        return len(stale)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """等待在途任务（最多 timeout 秒）后停止调度；未完成的任务下次 start() 继续。portal loop 由进程共享，不关闭"""
+        self.wait_all(timeout)
+        with self._lock:
+            self._started = False
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[str]:
+        """阻塞等待本进程调度的任务结束，返回最终状态（超时 / 未结束返回 None）"""
+        future = self._futures.get(job_id)
+        if future is None:
+            # 已结束（future 已移除）或不由本进程调度：以落库状态为准
+            status = self.get_status(job_id)
+            return status if status in (JOB_DONE, JOB_FAILED) else None
+        try:
+            return future.result(timeout)
+        except Exception:
+            return None
+
+    def wait_all(self, timeout: Optional[float] = None) -> None:
+        for job_id in list(self._futures):
+            self.wait(job_id, timeout)
+
+    # ------------------------------------------------------------
+    # 提交 / 查询
+    # ------------------------------------------------------------
+
+    def submit(self, payload: Dict[str, Any]) -> str:
+        """持久化任务并调度执行；返回任务 id（session_id）。写库失败时抛出，由调用方降级"""
+        job_id = payload["session_id"]
+        self.start()
+        now = datetime.now()
+        self.collection.replace_one(
+            {"_id": job_id},
+            {
+                "candidate_name": payload["candidate_name"],
+                "status": JOB_PENDING,
+                "attempts": 0,
+                "payload": payload,
+                "summary_result": None,
+                "result_saved": False,
+                "lease_until": None,
+                "last_error": None,
+                "created_at": now,
+                "updated_at": now,
+            },
+            upsert=True,
+        )
+        self._schedule(job_id)
+        return job_id
+
+    def get_status(self, job_id: str) -> Optional[str]:
+        job = self.collection.find_one({"_id": job_id}, {"status": 1})
+        return job.get("status") if job else None
+
+    # ------------------------------------------------------------
+    # 执行
+    # ------------------------------------------------------------
+
+    def _schedule(self, job_id: str) -> None:
+        with self._lock:
+            if not self._started or job_id in self._futures:
+                return
+            future = self._portal.submit(self._run(job_id))
+            self._futures[job_id] = future
+        future.add_done_callback(lambda _f: self._futures.pop(job_id, None))
+
+    def _claim(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """原子认领：pending 或租约过期的 running → running（多 worker 下只有一个执行者）"""
+        now = datetime.now()
+        return self.collection.find_one_and_update(
+            {"_id": job_id, "$or": [
+                {"status": JOB_PENDING},
+                {"status": JOB_RUNNING, "lease_until": {"$lt": now}},
+            ]},
+            {"$set": {
+                "status": JOB_RUNNING,
+                "lease_until": now + timedelta(seconds=self.lease_seconds),
+                "updated_at": now,
+            }},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def _update(self, job_id: str, fields: Dict[str, Any], inc: Optional[Dict[str, int]] = None) -> None:
+        update: Dict[str, Any] = {"$set": {**fields, "updated_at": datetime.now()}}
+        if inc:
+            update["$inc"] = inc
+        self.collection.update_one({"_id": job_id}, update)
+
+    async def _run(self, job_id: str) -> str:
+        job = await asyncio.to_thread(self._claim, job_id)
+        if job is None:
+            # 已完成 / 正由其他 worker 执行
+            return await asyncio.to_thread(self.get_status, job_id)
+
+        attempts = int(job.get("attempts", 0))
+        while True:
+            try:
+                with priority(BACKGROUND):
+                    await self._execute(job)
+                await asyncio.to_thread(self._update, job_id, {"status": JOB_DONE, "lease_until": None})
+                logger.info(f"finalize 任务完成: {job_id}")
+                return JOB_DONE
+            except Exception as e:
+                attempts += 1
+                failed = attempts >= self.max_retries
+                logger.warning(f"finalize 任务 {job_id} 第 {attempts} 次执行失败: {e}")
+                await asyncio.to_thread(
+                    self._update, job_id,
+                    {"last_error": str(e), **({"status": JOB_FAILED, "lease_until": None} if failed else {})},
+                    {"attempts": 1},
+                )
+                if failed:
+                    logger.error(f"finalize 任务 {job_id} 超过最大重试次数，已标记 failed")
+                    return JOB_FAILED
+                await asyncio.sleep(self.retry_backoff * (2 ** (attempts - 1)))
+
+    async def _execute(self, job: Dict[str, Any]) -> None:
+        """分步执行；每步完成即落库，重试从第一个未完成的步骤继续"""
+        job_id = job["_id"]
+        payload = job["payload"]
+
+        summary_result = job.get("summary_result")
+        if summary_result is None:
+            summary_result = await self.summary_agent.aprocess(summary_input(payload))
+            await asyncio.to_thread(self._update, job_id, {"summary_result": summary_result})
+            job["summary_result"] = summary_result
+
+        record = build_interview_record(payload, summary_result)
+        if not job.get("result_saved"):
+            saved = await asyncio.to_thread(
+                self.retrieval_system.save_interview_result, payload["candidate_name"], record
+            )
+            if not saved:
+                raise RuntimeError("save_interview_result 失败")
+            await asyncio.to_thread(self._update, job_id, {"result_saved": True})
+            job["result_saved"] = True
+
+        updated = await asyncio.to_thread(
+            self.memory_store.update_session_status,
+            payload["session_id"], "completed", build_completion_status(payload, summary_result, record),
+        )
+        if not updated:
+            raise RuntimeError("update_session_status 失败")
+
@@ -19,14 +19,46 @@ LangGraph 状态机 v3 — 6 节点 pure-function 拓扑（W3.1 重构）
                                                                 ├─→ finalize_normal_node → END
                                                                 └─→ retrieval_node → next_question_node → END
 
+speculative=True 时（评分 ∥ 下题草稿重叠执行）：
+  security_node ──┬─→ scoring_node ───┬─→ persist_node → readiness_node
+                  └─→ speculate_node ─┘                      ├─→ finalize_normal_node → END
+                                                             └─→ next_question_node → END
+  speculate_node 在 security 放行后立即检索 + 生成下题草稿（不 mutate session）；
+  next_question_node 在难度档位与草稿一致时直接提交草稿，否则丢弃重生成。
+
+parallel_security=True 时（security ∥ scoring fan-out）：
+  START → guarded_scoring_node ──┬─→ finalize_security_node → END
+                                 └─→ persist_node → readiness_node → ...（同上）
+  guarded_scoring_node 同时启动 SecurityAgent 与 ScoringAgent；security 判定 block 时
+  取消在途的 ensemble 调用并走与顺序拓扑完全相同的安全终止路径。
+
+checkpoint_mode="slim" 时（瘦身 checkpoint，见 checkpoint.py）：
+  initial_graph_state 只携带 session 标识 + user_answer，finalize 节点不把 final_summary 写入 state；
+  每个 checkpoint 只包含节点产出的小体积增量，不再随面试轮次增长。
+
+流式输出（state.stream_question=True，coordinator 以 stream_mode=["updates", "custom"] 驱动）：
+  next_question_node 通过 LangGraph stream writer 推送 {"type": "question_delta", "delta": ...}；
+  CoVe 触发 revise 时先推送 {"type": "question_reset"} 再流式推送修订后的题目。
+  最终 output 与非流式调用完全一致。
+
+turn_budget=TurnBudget(...) 时（单轮延迟预算，见 deadline.py）：
+  入口节点写入 state.turn_deadline；各步骤按剩余预算确定性降级（跳过 security LLM / RAG anchors /
+  评分 ensemble / 检索 / 出题工具 / CoVe，超时走兜底），降级记录汇总到 output["degradations"]。
+
+单轮共享向量（见 memory/embedding.py）：
+  security 放行后即在后台计算本轮 question + answer 的 embedding；评分 RAG anchors、
+  retrieval / speculate 检索与 persist 落库共用同一向量，每轮只调用一次 embedding 服务。
+
 每个节点的契约：
   security_node    : 输入 user_answer + current_question，输出 security_check + finalize_reason
   scoring_node     : 输入 question/answer/session_id，输出 scoring_result（ScoringOutput dict）
   persist_node     : 唯一允许 mutate session.qa_history + 写 MongoDB；输出 persisted=True
   readiness_node   : 输入 session 状态，输出 is_ready + finalize_reason
   retrieval_node   : 输入 question+answer，输出 similar_cases_context（Memento）
+  speculate_node   : （可选）输出 similar_cases_context + speculative_draft（下题草稿）
+  guarded_scoring  : （可选）security + scoring 融合，输出两者的合并 update
   next_question_node: 调用 question_generator + (W3.2) CoVe verifier，mutate session.current_question
-  finalize_normal  : 生成总结 + 持久化结果，输出 final_summary
+  finalize_normal  : 生成总结 + 持久化结果，输出 final_summary（注入 finalize_queue 时改为提交后台任务）
   finalize_security: 安全终止专用 finalize
 """
 
@@ -34,19 +66,59 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
 from datetime import datetime
-from typing import Any, Dict, List, Literal, Optional, TypedDict
+from typing import Annotated, Any, Awaitable, Callable, Dict, List, Literal, Optional, TypedDict
 
 from langgraph.checkpoint.mongodb import MongoDBSaver
+from langgraph.config import get_stream_writer
 from langgraph.graph import END, START, StateGraph
 from pymongo import MongoClient
 
+from interview.metrics import instrument_node
 from interview.tools.db import get_mongo_client
 
+from .checkpoint import CHECKPOINT_MODE_FULL, CHECKPOINT_MODE_SLIM
+from .deadline import (
+    QUESTION_FALLBACK,
+    QUESTION_TIMEOUT,
+    QUESTION_TOOL_SKIPPED,
+    RETRIEVAL_SKIPPED,
+    RETRIEVAL_TIMEOUT,
+    REVISE_SKIPPED,
+    REVISE_TIMEOUT,
+    SCORING_RAG_SKIPPED,
+    SCORING_SINGLE_MODEL,
+    SCORING_TIMEOUT,
+    SECURITY_LLM_SKIPPED,
+    SECURITY_TIMEOUT,
+    VERIFIER_SKIPPED,
+    VERIFIER_TIMEOUT,
+    TurnBudget,
+    merge_degradations,
+)
+from .finalize_jobs import (
+    build_completion_status,
+    build_finalize_payload,
+    build_interview_record,
+    summary_input,
+)
+from .memory.embedding import TurnEmbeddings
 from .qa_models import QATurn, get_question_type, get_score
+from .question_generator import difficulty_hint_for
+from .speculation import (
+    OUTCOME_BAND_MISMATCH,
+    OUTCOME_COMMITTED,
+    OUTCOME_FAILED,
+    OUTCOME_FINALIZED,
+    SpeculationStats,
+)
 
 logger = logging.getLogger("interview.agents.graph")
 
+# 强制终止题数：readiness_node 在 qa_history 达到该数时直接 finalize（该轮不需要下题草稿）
+MAX_QUESTIONS = 6
+
 
 # ============================================================
 # State 定义
@@ -63,13 +135,15 @@ class InterviewGraphState(TypedDict, total=False):
     qa_history: List[Dict[str, Any]]
     current_question: Optional[Dict[str, Any]]
     user_answer: str
+    stream_question: bool  # True 时 next_question_node 通过 stream writer 推送题目增量
 
     # 节点产出（按拓扑顺序）
     security_check: Optional[Dict[str, Any]]      # security_node
     scoring_result: Optional[Dict[str, Any]]      # scoring_node — ScoringOutput dict (含 evidence_quote)
     persisted: bool                                # persist_node
     is_ready: bool                                 # readiness_node
-    similar_cases_context: str                     # retrieval_node
+    similar_cases_context: str                     # retrieval_node / speculate_node
+    speculative_draft: Optional[Dict[str, Any]]    # speculate_node（question + difficulty_hint + elapsed_ms）
     next_question: Optional[Dict[str, Any]]        # next_question_node
     final_summary: Optional[Dict[str, Any]]        # finalize_*
 
@@ -79,6 +153,9 @@ class InterviewGraphState(TypedDict, total=False):
     finalize_reason: str  # "security" | "normal" | "continue" | "error"
     average_score: float
     total_questions: int
+    turn_started_at: float  # security_node 记录的 perf_counter，用于统计单轮耗时
+    turn_deadline: Optional[float]  # turn_budget 模式：本轮截止时间（time.time() 绝对值）
+    degradations: Annotated[List[str], merge_degradations]  # turn_budget 模式：本轮降级记录
 
     # 出口数据（提供给 coordinator 返回前端）
     output: Dict[str, Any]
@@ -100,40 +177,112 @@ def build_interview_graph(
     interview_session_provider,
     question_verifier=None,        # W3.2 可选注入
     checkpointer=None,
+    speculative: bool = False,
+    speculation_stats: Optional[SpeculationStats] = None,
+    parallel_security: bool = False,
+    turn_writer=None,
+    checkpoint_mode: str = CHECKPOINT_MODE_FULL,
+    finalize_queue=None,
+    turn_budget: Optional[TurnBudget] = None,
 ):
     """
     构造 process_answer 的状态图（6 节点拓扑）。
 
     interview_session_provider: 给定 session_id 返回 InterviewSession（供 persist/next_q 节点 mutate）
+    speculative: True 时 security 放行后 retrieval + 下题草稿与 scoring 并行执行
+    speculation_stats: 可选 SpeculationStats，记录草稿胜率与单轮耗时分位数
+    parallel_security: True 时 security 与 scoring 融合为 guarded_scoring 节点并行执行，
+                       security 判定 block 时取消在途评分
+    checkpoint_mode: "slim" 时 finalize 节点不把 final_summary 写入 state（配合 initial_graph_state
+                     只携带 session 标识），checkpoint 仅包含各节点的小体积增量
+    turn_writer: 可选 TurnWriteBehindQueue；注入后 persist_node 只写本地 journal 并入队，
+                 由后台 worker 批量落库 conversation_memories（不再阻塞下题生成）
+    finalize_queue: 可选 FinalizeJobQueue；注入后 finalize_normal_node 只提交后台任务并立即确认完成，
+                    summary 生成与结果落库异步执行（output.result_status="pending"）
+    turn_budget: 可选 TurnBudget；注入后每轮带截止时间，各步骤按剩余预算降级，
+                 output 附带 degradations / budget_remaining_ms
 
     persist_node 与 next_question_node 是仅有的两个允许 mutate session 的节点；
     其他节点只读访问 session（用于读取 qa_history / parsed_profile 等）。
     """
 
     # ============================================================
-    # 节点 1：security_node — 安全检测
+    # 单轮预算（turn_budget 未注入时 deadline 恒为 None，以下步骤行为与旧实现一致）
     # ============================================================
-    async def security_node(state: InterviewGraphState) -> Dict[str, Any]:
-        session_id = state["session_id"]
-        user_answer = state.get("user_answer", "")
-        session = interview_session_provider(session_id)
-        if not session:
-            return {
-                "should_block": False,
-                "interview_complete": True,
-                "finalize_reason": "error",
-                "output": {"success": False, "error": "Session not found"},
-            }
+    def _turn_deadline(state: InterviewGraphState) -> Optional[float]:
+        if turn_budget is None:
+            return None
+        return state.get("turn_deadline") or time.time() + turn_budget.total_seconds
+
+    def _short_of(deadline: Optional[float], minimum: str, mark: str, degradations: List[str]) -> bool:
+        """剩余预算低于 turn_budget.<minimum> 时记录降级 mark 并返回 True"""
+        if deadline is None or deadline - time.time() >= getattr(turn_budget, minimum):
+            return False
+        degradations.append(mark)
+        return True
+
+    async def _within_budget(awaitable, deadline: Optional[float], mark: str, degradations: List[str]):
+        """在剩余预算内等待；超时记录 mark 并返回 None（由调用方走兜底）"""
+        if deadline is None:
+            return await awaitable
+        try:
+            return await asyncio.wait_for(awaitable, turn_budget.step_timeout(deadline - time.time()))
+        except asyncio.TimeoutError:
+            degradations.append(mark)
+            return None
+
+    def _budget_report(state: InterviewGraphState, degradations: List[str]) -> Dict[str, Any]:
+        """output 附带的预算字段：本轮全部降级 + 剩余预算"""
+        if turn_budget is None:
+            return {}
+        deadline = state.get("turn_deadline")
+        report = {
+            "degradations": [*(state.get("degradations") or []), *degradations],
+            "budget_remaining_ms": round((deadline - time.time()) * 1000) if deadline else None,
+        }
+        if report["degradations"]:
+            logger.info(
+                "[turn_budget] session=%s degradations=%s remaining_ms=%s",
+                state.get("session_id"), report["degradations"], report["budget_remaining_ms"],
+            )
+        return report
+
+    # ============================================================
+    # 单轮共享向量（anchors / 检索 / 持久化复用同一次 embedding 调用）
+    # ============================================================
+    turn_embeddings = TurnEmbeddings(retrieval_system)
+
+    def _turn_embedding(session_id: str, session, user_answer: str):
+        current_question = session.current_question or {}
+        return turn_embeddings.for_turn(session_id, current_question.get("question", ""), user_answer)
 
+    # ============================================================
+    # 共享步骤：安全检测 / 评分（顺序拓扑与 parallel_security 融合节点复用）
+    # ============================================================
+    async def _check_security(
+        session_id: str,
+        session,
+        user_answer: str,
+        deadline: Optional[float] = None,
+        degradations: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
         current_question = session.current_question or {}
-        security_check = await security_agent.aprocess({
+        security_input = {
             "user_input": user_answer,
             "context": {
                 "session_id": session_id,
                 "candidate_name": session.candidate_name,
                 "current_question": current_question,
             },
-        })
+        }
+        if _short_of(deadline, "security_llm_min", SECURITY_LLM_SKIPPED, degradations):
+            security_input["skip_llm"] = True
+        security_check = await _within_budget(
+            security_agent.aprocess(security_input), deadline, SECURITY_TIMEOUT, degradations
+        )
+        if security_check is None:
+            # 超时：仅凭正则快检判定（不放过快检即可识别的高风险输入）
+            security_check = security_agent.quick_check(user_answer)
 
         should_block = (
             security_check.get("suggested_action") == "block"
@@ -173,23 +322,35 @@ def build_interview_graph(
             "finalize_reason": "continue",
         }
 
-    # ============================================================
-    # 节点 2：scoring_node — 单题整体评分（v4 + ensemble + RAG anchors）
-    # ============================================================
-    async def scoring_node(state: InterviewGraphState) -> Dict[str, Any]:
-        session_id = state["session_id"]
-        session = interview_session_provider(session_id)
-        if not session:
-            return {"finalize_reason": "error", "output": {"success": False, "error": "Session not found"}}
-
+    async def _score_answer(
+        session_id: str,
+        session,
+        user_answer: str,
+        deadline: Optional[float] = None,
+        degradations: Optional[List[str]] = None,
+        deferred_side_effects: Optional[List[Callable[[], Awaitable[None]]]] = None,
+    ) -> Dict[str, Any]:
         current_question = session.current_question or {}
-        scoring_result = await scoring_agent.aprocess({
+        scoring_input = {
             "question": current_question.get("question", "") if current_question else "",
-            "answer": state.get("user_answer", ""),
+            "answer": user_answer,
             "question_type": get_question_type(current_question),
             "difficulty": (current_question or {}).get("difficulty", "medium"),
             "session_id": session_id,  # 用于 RAG anchors exclude_session_id（避免 self-leak）
-        })
+            "previous_qa": session.qa_history,  # 前置分流判定重复粘贴的回答
+            "turn_embedding": _turn_embedding(session_id, session, user_answer),  # anchors 复用本轮向量
+        }
+        if deferred_side_effects is not None:
+            scoring_input["deferred_side_effects"] = deferred_side_effects
+        if _short_of(deadline, "scoring_rag_min", SCORING_RAG_SKIPPED, degradations):
+            scoring_input["skip_rag_anchors"] = True
+        if _short_of(deadline, "scoring_ensemble_min", SCORING_SINGLE_MODEL, degradations):
+            scoring_input["max_models"] = 1
+        scoring_result = await _within_budget(
+            scoring_agent.aprocess(scoring_input), deadline, SCORING_TIMEOUT, degradations
+        )
+        if scoring_result is None:
+            scoring_result = scoring_agent.fallback_scoring()
         logger.debug(
             "[scoring_node] score=%s agreement=%s conf=%s review=%s",
             scoring_result.get("score"),
@@ -197,7 +358,112 @@ def build_interview_graph(
             scoring_result.get("confidence_level"),
             scoring_result.get("requires_human_review"),
         )
-        return {"scoring_result": scoring_result}
+        return scoring_result
+
+    def _session_not_found() -> Dict[str, Any]:
+        return {
+            "should_block": False,
+            "interview_complete": True,
+            "finalize_reason": "error",
+            "output": {"success": False, "error": "Session not found"},
+        }
+
+    # ============================================================
+    # 节点 1：security_node — 安全检测
+    # ============================================================
+    async def security_node(state: InterviewGraphState) -> Dict[str, Any]:
+        turn_started_at = time.perf_counter()
+        session_id = state["session_id"]
+        session = interview_session_provider(session_id)
+        if not session:
+            return _session_not_found()
+
+        deadline = _turn_deadline(state)
+        degradations: List[str] = []
+        update = await _check_security(
+            session_id, session, state.get("user_answer", ""), deadline, degradations
+        )
+        if not update["should_block"]:
+            update["turn_started_at"] = turn_started_at
+            _turn_embedding(session_id, session, state.get("user_answer", "")).start()
+        if deadline is not None:
+            update.update(turn_deadline=deadline, degradations=degradations)
+        return update
+
+    # ============================================================
+    # 节点 2：scoring_node — 单题整体评分（v4 + ensemble + RAG anchors）
+    # ============================================================
+    async def scoring_node(state: InterviewGraphState) -> Dict[str, Any]:
+        session_id = state["session_id"]
+        session = interview_session_provider(session_id)
+        if not session:
+            return {"finalize_reason": "error", "output": {"success": False, "error": "Session not found"}}
+
+        degradations: List[str] = []
+        scoring_result = await _score_answer(
+            session_id, session, state.get("user_answer", ""), _turn_deadline(state), degradations
+        )
+        return {"scoring_result": scoring_result, "degradations": degradations}
+
+    # ============================================================
+    # 节点 1+2：guarded_scoring_node — security ∥ scoring 融合（parallel_security 模式）
+    # ============================================================
+    async def guarded_scoring_node(state: InterviewGraphState) -> Dict[str, Any]:
+        """security 与 scoring 同时启动；security 判定 block 时取消在途的评分 ensemble。
+
+        block 路径的 session mutation 与 security_node 完全一致；评分结果在 block 时被丢弃，
+        因此候选人可见输出与顺序拓扑相同。评分的副作用（early_exit 统计、回答缓存写入）延后到
+        security 放行后执行，被拦截的回答不会写入缓存或统计。speculative 同时开启时，草稿在 security 放行后启动，
+        与剩余的评分并行。
+        """
+        turn_started_at = time.perf_counter()
+        session_id = state["session_id"]
+        session = interview_session_provider(session_id)
+        if not session:
+            return _session_not_found()
+
+        user_answer = state.get("user_answer", "")
+        deadline = _turn_deadline(state)
+        degradations: List[str] = []
+        # 评分的降级单独记录：block 时评分被放弃，其降级不计入本轮
+        scoring_degradations: List[str] = []
+        scoring_side_effects: List[Callable[[], Awaitable[None]]] = []
+        scoring_task = asyncio.create_task(
+            _score_answer(session_id, session, user_answer, deadline, scoring_degradations, scoring_side_effects)
+        )
+        try:
+            update = await _check_security(session_id, session, user_answer, deadline, degradations)
+        except BaseException:
+            scoring_task.cancel()
+            await asyncio.gather(scoring_task, return_exceptions=True)
+            raise
+
+        if update["should_block"]:
+            scoring_task.cancel()
+            await asyncio.gather(scoring_task, return_exceptions=True)
+            logger.debug("[guarded_scoring_node] security block，已取消在途评分")
+            if deadline is not None:
+                update.update(turn_deadline=deadline, degradations=degradations)
+            return update
+
+        update["turn_started_at"] = turn_started_at
+        _turn_embedding(session_id, session, user_answer).start()
+        if speculative:
+            scoring_result, speculation = await asyncio.gather(
+                scoring_task, _speculate(session_id, session, user_answer, deadline, degradations)
+            )
+            update.update(speculation)
+        else:
+            scoring_result = await scoring_task
+        for commit in scoring_side_effects:
+            try:
+                await commit()
+            except Exception as e:
+                logger.warning(f"[guarded_scoring_node] 评分副作用写入失败: {e}")
+        update["scoring_result"] = scoring_result
+        if deadline is not None:
+            update.update(turn_deadline=deadline, degradations=[*degradations, *scoring_degradations])
+        return update
 
     # ============================================================
     # 节点 3：persist_node — 唯一允许 mutate session + 写 MongoDB
@@ -247,12 +513,23 @@ def build_interview_graph(
         # 3. PER importance（W3.3）：传入 baseline_score = 候选人当前历史均分
         # 首次（无历史）默认 5.0；之后用 session.get_average_score()
         baseline = session.get_average_score() if turn_index > 0 else 5.0
-        await asyncio.to_thread(
-            memory_store.save_turn,
+        # write-behind 模式下只付出一次 journal fsync（不等待向量，就绪后补到未落库的 turn 上）；
+        # 否则 await 本轮向量后同步落库
+        turn_embedding = turn_embeddings.for_turn(session_id, current_turn.question, user_answer)
+        persist_args = (
             session_id, session.candidate_name, turn_index,
             state_snapshot, action_data, scoring_result, security_check,
             baseline,
         )
+        if turn_writer is not None:
+            ready = turn_embedding.done()
+            embedding = await turn_embedding.aget() if ready else None
+            entry_id = await asyncio.to_thread(turn_writer.submit, *persist_args, embedding=embedding)
+            if not ready:
+                turn_embedding.when_ready(lambda vector: turn_writer.attach_embedding(entry_id, vector))
+        else:
+            embedding = await turn_embedding.aget()
+            await asyncio.to_thread(memory_store.save_turn, *persist_args, embedding=embedding)
         logger.debug(
             "[persist_node] turn=%d total=%d avg=%.2f baseline=%.2f",
             turn_index + 1,
@@ -274,8 +551,8 @@ def build_interview_graph(
                     "output": {"success": False, "error": "Session not found"}}
 
         total = len(session.qa_history)
-        # 强制终止：≥ 6 题
-        if total >= 6:
+        # 强制终止：≥ MAX_QUESTIONS 题
+        if total >= MAX_QUESTIONS:
             return {
                 "is_ready": True,
                 "finalize_reason": "normal",
@@ -293,54 +570,87 @@ def build_interview_graph(
         }
 
     # ============================================================
-    # 节点 5：retrieval_node — Memento 检索相似案例供下题
+    # 共享步骤：Memento 检索 / 出题 + CoVe（retrieval / speculate / next_question 复用）
     # ============================================================
-    async def retrieval_node(state: InterviewGraphState) -> Dict[str, Any]:
-        session_id = state["session_id"]
-        session = interview_session_provider(session_id)
-        if not session or not session.qa_history:
-            return {"similar_cases_context": ""}
-
-        last_qa = session.qa_history[-1]
-        retrieval_query = f"{last_qa.get('question', '')} {last_qa.get('answer', '')}"
-        try:
-            similar_cases = await asyncio.to_thread(
+    async def _retrieve_cases_context(
+        session_id: str,
+        question: str,
+        answer: str,
+        deadline: Optional[float] = None,
+        degradations: Optional[List[str]] = None,
+    ) -> str:
+        if _short_of(deadline, "retrieval_min", RETRIEVAL_SKIPPED, degradations):
+            return ""
+        retrieval_query = f"{question} {answer}"
+
+        async def _retrieve():
+            query_embedding = await turn_embeddings.for_turn(session_id, question, answer).aget()
+            return await asyncio.to_thread(
                 memory_retriever.retrieve_similar_cases,
                 retrieval_query, 4, session_id, None, 0.3,
+                query_embedding=query_embedding,
             )
-            cases_context = memory_retriever.format_cases_for_question_generation(similar_cases)
+
+        try:
+            similar_cases = await _within_budget(_retrieve(), deadline, RETRIEVAL_TIMEOUT, degradations)
+            if similar_cases is None:
+                return ""
+            return memory_retriever.format_cases_for_question_generation(similar_cases)
         except Exception as e:
             logger.warning(f"[retrieval_node] 检索失败（不阻塞下题）: {e}")
-            cases_context = ""
-        return {"similar_cases_context": cases_context}
+            return ""
+
+    async def _generate_question(
+        gen_input: Dict[str, Any],
+        qa_history: List[Dict[str, Any]],
+        parsed_profile: Optional[Dict[str, Any]],
+        stream_writer=None,
+        deadline: Optional[float] = None,
+        degradations: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        async def _generate(generator_input: Dict[str, Any]) -> Dict[str, Any]:
+            if stream_writer is None:
+                return await question_generator.aprocess(generator_input)
+            return await question_generator.aprocess(
+                generator_input,
+                on_question_delta=lambda delta: stream_writer({"type": "question_delta", "delta": delta}),
+            )
 
-    # ============================================================
-    # 节点 6：next_question_node — 生成下一题（含 CoVe verifier W3.2）
-    # ============================================================
-    async def next_question_node(state: InterviewGraphState) -> Dict[str, Any]:
-        session_id = state["session_id"]
-        session = interview_session_provider(session_id)
-        if not session:
-            return {"output": {"success": False, "error": "Session not found"}}
+        def _replace_streamed(question: Dict[str, Any], reset: bool = True) -> Dict[str, Any]:
+            # 已推送的增量作废，一次性推送替换后的全文
+            if stream_writer is not None:
+                if reset:
+                    stream_writer({"type": "question_reset"})
+                stream_writer({"type": "question_delta", "delta": question.get("question", "")})
+            return question
 
-        gen_input = {
-            "interview_stage": "technical",
-            "previous_qa": session.qa_history,
-            "current_score": session.get_average_score(),
-            "similar_cases_context": state.get("similar_cases_context", ""),
-            "parsed_profile": session.parsed_profile,
-        }
-        next_q = await question_generator.aprocess(gen_input)
+        if _short_of(deadline, "question_min", QUESTION_FALLBACK, degradations):
+            return _replace_streamed(question_generator.fallback_question(), reset=False)
+        if _short_of(deadline, "question_tool_min", QUESTION_TOOL_SKIPPED, degradations):
+            gen_input = {**gen_input, "allow_rag_tool": False}
+
+        next_q = await _within_budget(_generate(gen_input), deadline, QUESTION_TIMEOUT, degradations)
+        if next_q is None:
+            return _replace_streamed(question_generator.fallback_question())
 
         # CoVe verifier (W3.2)：可选，失败/未注入时直接放行
-        if question_verifier is not None:
+        if question_verifier is not None and not _short_of(
+            deadline, "verifier_min", VERIFIER_SKIPPED, degradations
+        ):
             try:
-                verification = await question_verifier.averify(
-                    candidate_question=next_q,
-                    parsed_profile=session.parsed_profile,
-                    qa_history=session.qa_history,
+                verification = await _within_budget(
+                    question_verifier.averify(
+                        candidate_question=next_q,
+                        parsed_profile=parsed_profile,
+                        qa_history=qa_history,
+                    ),
+                    deadline, VERIFIER_TIMEOUT, degradations,
                 )
-                if not verification.is_valid:
+                if (
+                    verification is not None
+                    and not verification.is_valid
+                    and not _short_of(deadline, "revise_min", REVISE_SKIPPED, degradations)
+                ):
                     logger.info(
                         "[next_question_node] CoVe 不通过，触发 revise: %s",
                         verification.violations,
@@ -349,10 +659,156 @@ def build_interview_graph(
                         **gen_input,
                         "verifier_feedback": verification.violations,
                     }
-                    revised = await question_generator.aprocess(revise_input)
-                    next_q = revised
+                    if stream_writer is not None:
+                        stream_writer({"type": "question_reset"})
+                    revised = await _within_budget(
+                        _generate(revise_input), deadline, REVISE_TIMEOUT, degradations
+                    )
+                    # revise 超时：沿用原题（重新推送原题全文）
+                    next_q = revised if revised is not None else _replace_streamed(next_q)
             except Exception as e:
                 logger.warning(f"[next_question_node] CoVe verifier 异常（沿用原题）: {e}")
+        return next_q
+
+    # ============================================================
+    # 节点 5：retrieval_node — Memento 检索相似案例供下题
+    # ============================================================
+    async def retrieval_node(state: InterviewGraphState) -> Dict[str, Any]:
+        session_id = state["session_id"]
+        session = interview_session_provider(session_id)
+        if not session or not session.qa_history:
+            return {"similar_cases_context": ""}
+
+        last_qa = session.qa_history[-1]
+        degradations: List[str] = []
+        cases_context = await _retrieve_cases_context(
+            session_id, last_qa.get("question", ""), last_qa.get("answer", ""),
+            _turn_deadline(state), degradations,
+        )
+        return {"similar_cases_context": cases_context, "degradations": degradations}
+
+    # ============================================================
+    # 节点 5'：speculate_node — 与 scoring 并行的检索 + 下题草稿（speculative 模式）
+    # ============================================================
+    async def speculate_node(state: InterviewGraphState) -> Dict[str, Any]:
+        session_id = state["session_id"]
+        session = interview_session_provider(session_id)
+        if not session:
+            return {}
+        degradations: List[str] = []
+        update = await _speculate(
+            session_id, session, state.get("user_answer", ""), _turn_deadline(state), degradations
+        )
+        return {**update, "degradations": degradations}
+
+    async def _speculate(
+        session_id: str,
+        session,
+        user_answer: str,
+        deadline: Optional[float] = None,
+        degradations: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """只读 session：基于「本轮问答已追加、分数未知」的预期历史生成草稿。
+
+        草稿使用的难度提示取本轮之前的均分；next_question_node 在评分落盘后
+        重新计算难度提示，一致才提交。本轮追加后达到 MAX_QUESTIONS 时必然 finalize，
+        不检索也不生成草稿。
+        """
+        if len(session.qa_history) + 1 >= MAX_QUESTIONS:
+            return {"similar_cases_context": "", "speculative_draft": None}
+        started = time.perf_counter()
+        current_question = session.current_question or {}
+        pending_turn = QATurn(
+            question=current_question.get("question", "") if current_question else "",
+            answer=user_answer,
+            question_type=get_question_type(current_question),
+            difficulty=(current_question or {}).get("difficulty", "medium"),
+            question_data=session.question_data,
+        ).to_dict()
+        projected_history = [*session.qa_history, pending_turn]
+
+        cases_context = await _retrieve_cases_context(
+            session_id, pending_turn["question"], user_answer, deadline, degradations
+        )
+        predicted_score = session.get_average_score()
+        try:
+            draft = await _generate_question(
+                {
+                    "interview_stage": "technical",
+                    "previous_qa": projected_history,
+                    "current_score": predicted_score,
+                    "similar_cases_context": cases_context,
+                    "parsed_profile": session.parsed_profile,
+                },
+                projected_history,
+                session.parsed_profile,
+                deadline=deadline,
+                degradations=degradations,
+            )
+        except Exception as e:
+            logger.warning(f"[speculate_node] 草稿生成失败（回退顺序出题）: {e}")
+            if speculation_stats is not None:
+                speculation_stats.record_outcome(OUTCOME_FAILED)
+            return {"similar_cases_context": cases_context, "speculative_draft": None}
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.debug(
+            "[speculate_node] draft ready in %.0fms hint=%s",
+            elapsed_ms, difficulty_hint_for(predicted_score),
+        )
+        return {
+            "similar_cases_context": cases_context,
+            "speculative_draft": {
+                "question": draft,
+                "difficulty_hint": difficulty_hint_for(predicted_score),
+                "elapsed_ms": round(elapsed_ms, 1),
+            },
+        }
+
+    # ============================================================
+    # 节点 6：next_question_node — 生成下一题（含 CoVe verifier W3.2）
+    # ============================================================
+    async def next_question_node(state: InterviewGraphState) -> Dict[str, Any]:
+        session_id = state["session_id"]
+        session = interview_session_provider(session_id)
+        if not session:
+            return {"output": {"success": False, "error": "Session not found"}}
+
+        stream_writer = get_stream_writer() if state.get("stream_question") else None
+        degradations: List[str] = []
+        next_q = None
+        draft = state.get("speculative_draft")
+        if draft:
+            # 评分已落盘：难度提示只影响 math_logic 出题，该类型草稿须与真实均分重算的提示一致才提交
+            draft_question = draft.get("question")
+            draft_type = get_question_type(draft_question) if isinstance(draft_question, dict) else None
+            if draft_type != "math_logic" or draft.get(
+                "difficulty_hint"
+            ) == difficulty_hint_for(session.get_average_score()):
+                next_q = draft.get("question")
+                outcome = OUTCOME_COMMITTED
+            else:
+                outcome = OUTCOME_BAND_MISMATCH
+            logger.debug("[next_question_node] speculative draft %s", outcome)
+            if speculation_stats is not None:
+                speculation_stats.record_outcome(outcome, draft.get("elapsed_ms", 0.0))
+
+        if next_q is None:
+            gen_input = {
+                "interview_stage": "technical",
+                "previous_qa": session.qa_history,
+                "current_score": session.get_average_score(),
+                "similar_cases_context": state.get("similar_cases_context", ""),
+                "parsed_profile": session.parsed_profile,
+            }
+            next_q = await _generate_question(
+                gen_input, session.qa_history, session.parsed_profile, stream_writer,
+                _turn_deadline(state), degradations,
+            )
+        elif stream_writer is not None:
+            # 草稿已完整生成：一次性推送全文
+            draft_text = next_q.get("question", "") if isinstance(next_q, dict) else str(next_q)
+            stream_writer({"type": "question_delta", "delta": draft_text})
 
         # mutate session（next_q 是合法 mutation 点）
         session.current_question = next_q
@@ -379,48 +835,54 @@ def build_interview_graph(
             "scoring_confidence": scoring_result.get("confidence_level", "medium"),
             "scoring_agreement": scoring_result.get("agreement", 1.0),
             "requires_human_review": scoring_result.get("requires_human_review", False),
+            **_budget_report(state, degradations),
         }
-        return {"next_question": next_q, "output": output}
+        if speculation_stats is not None and state.get("turn_started_at"):
+            speculation_stats.record_turn(
+                (time.perf_counter() - state["turn_started_at"]) * 1000,
+                speculative=speculative,
+            )
+        return {"next_question": next_q, "output": output, "degradations": degradations}
 
     # ============================================================
     # 节点 7：finalize_normal_node — 正常结束
     # ============================================================
     async def finalize_normal_node(state: InterviewGraphState) -> Dict[str, Any]:
         session_id = state["session_id"]
+        turn_embeddings.discard(session_id)
         session = interview_session_provider(session_id)
         if not session:
             return {"output": {"success": False, "error": "Session not found"}}
 
+        if state.get("speculative_draft") and speculation_stats is not None:
+            speculation_stats.record_outcome(OUTCOME_FINALIZED)
+
         avg_score = session.get_average_score()
         security_summary = security_agent.analyze_session_security(session.qa_history)
+        payload = build_finalize_payload(session, security_summary)
 
-        summary_result = await summary_agent.aprocess({
-            "candidate_name": session.candidate_name,
-            "resume_data": session.resume_data,
-            "qa_history": session.qa_history,
-            "average_score": avg_score,
-            "security_summary": security_summary,
-        })
+        if finalize_queue is not None:
+            try:
+                await asyncio.to_thread(finalize_queue.submit, payload)
+                output = {
+                    "success": True,
+                    "interview_complete": True,
+                    "result_status": "pending",
+                    "final_decision": "pending",
+                    "final_grade": None,
+                    "overall_score": avg_score,
+                    "summary": "",
+                    "total_questions": len(session.qa_history),
+                    "average_score": avg_score,
+                    "message": "面试已完成，感谢您的参与！评估报告正在生成，稍后可在结果页查看。",
+                    **_budget_report(state, []),
+                }
+                return _finalize_update(None, output)
+            except Exception as e:
+                logger.error(f"提交后台 finalize 任务失败，改为同步生成总结: {e}")
 
-        timestamp = datetime.now()
-        comprehensive_result = {
-            "candidate_name": session.candidate_name,
-            "session_id": session_id,
-            "timestamp": timestamp,
-            "final_decision": summary_result.get("final_decision", "conditional"),
-            "final_grade": summary_result.get("final_grade", "C"),
-            "overall_score": summary_result.get("overall_score", avg_score),
-            "summary": summary_result.get("summary", ""),
-            "scores": [get_score(qa) for qa in session.qa_history],
-            "average_score": avg_score,
-            "total_questions": len(session.qa_history),
-            "qa_history": session.qa_history,
-            "detailed_summary": summary_result,
-            "security_summary": security_summary,
-            "security_alerts": security_summary.get("security_alerts", []),
-            "session_duration": (timestamp - session.start_time).total_seconds(),
-            "termination_reason": "normal_completion",
-        }
+        summary_result = await summary_agent.aprocess(summary_input(payload))
+        comprehensive_result = build_interview_record(payload, summary_result)
 
         save_success = await asyncio.to_thread(
             retrieval_system.save_interview_result,
@@ -428,15 +890,8 @@ def build_interview_graph(
         )
         await asyncio.to_thread(
             memory_store.update_session_status,
-            session_id, "completed", {
-                "final_summary": summary_result,
-                "security_summary": security_summary,
-                "final_decision": summary_result.get("final_decision", "conditional"),
-                "final_grade": summary_result.get("final_grade", "C"),
-                "overall_score": summary_result.get("overall_score", avg_score),
-                "session_duration": comprehensive_result["session_duration"],
-                "termination_reason": "normal_completion",
-            },
+            session_id, "completed",
+            build_completion_status(payload, summary_result, comprehensive_result),
         )
 
         output = {
@@ -449,6 +904,7 @@ def build_interview_graph(
             "total_questions": len(session.qa_history),
             "average_score": avg_score,
             "save_success": save_success,
+            "result_status": "completed",
             # v3：决策置信度信号
             "decision_confidence": summary_result.get("decision_confidence", "medium"),
             "boundary_case": summary_result.get("boundary_case", False),
@@ -456,14 +912,16 @@ def build_interview_graph(
             "abstain_reason": summary_result.get("abstain_reason"),
             "decision_evidence": summary_result.get("decision_evidence", []),
             "message": "面试已完成，感谢您的参与！",
+            **_budget_report(state, []),
         }
-        return {"final_summary": summary_result, "output": output}
+        return _finalize_update(summary_result, output)
 
     # ============================================================
     # 节点 8：finalize_security_node — 安全终止
     # ============================================================
     async def finalize_security_node(state: InterviewGraphState) -> Dict[str, Any]:
         session_id = state["session_id"]
+        turn_embeddings.discard(session_id)
         session = interview_session_provider(session_id)
         if not session:
             return {"output": {"success": False, "error": "Session not found"}}
@@ -556,57 +1014,97 @@ def build_interview_graph(
             "total_questions": len(session.qa_history),
             "average_score": 0,
             "save_success": save_success,
+            "result_status": "completed",
             "termination_reason": "security_violation",
             "violation_details": termination_summary["violation_details"],
             "message": (
                 f"面试已因安全违规终止。检测到：{', '.join(security_check.get('detected_issues', []))}。"
                 f"所有数据已保存。"
             ),
+            **_budget_report(state, []),
         }
+        return _finalize_update(final_summary, output)
+
+    def _finalize_update(final_summary: Dict[str, Any], output: Dict[str, Any]) -> Dict[str, Any]:
+        if checkpoint_mode == CHECKPOINT_MODE_SLIM:
+            return {"output": output}
         return {"final_summary": final_summary, "output": output}
 
     # ============================================================
     # 路由函数
     # ============================================================
-    def route_after_security(state: InterviewGraphState) -> str:
+    def route_after_security(state: InterviewGraphState):
         if state.get("finalize_reason") == "security":
             return "finalize_security"
         if state.get("finalize_reason") == "error":
             return END
+        if speculative:
+            return ["scoring", "speculate"]
         return "scoring"
 
+    def route_after_guarded_scoring(state: InterviewGraphState) -> str:
+        if state.get("finalize_reason") == "security":
+            return "finalize_security"
+        if state.get("finalize_reason") == "error":
+            return END
+        return "persist"
+
     def route_after_readiness(state: InterviewGraphState) -> str:
         reason = state.get("finalize_reason", "continue")
         if reason == "normal":
             return "finalize_normal"
         if reason == "error":
             return END
+        if speculative:
+            # speculate_node 已完成检索（草稿失败时也已填好 similar_cases_context）
+            return "next_question"
         return "retrieval"
 
     # ============================================================
-    # 图构建
+    # 图构建（INTERVIEW_METRICS 启用时每个节点包装耗时直方图）
     # ============================================================
     builder = StateGraph(InterviewGraphState)
-    builder.add_node("security", security_node)
-    builder.add_node("scoring", scoring_node)
-    builder.add_node("persist", persist_node)
-    builder.add_node("readiness", readiness_node)
-    builder.add_node("retrieval", retrieval_node)
-    builder.add_node("next_question", next_question_node)
-    builder.add_node("finalize_normal", finalize_normal_node)
-    builder.add_node("finalize_security", finalize_security_node)
-
-    builder.add_edge(START, "security")
-    builder.add_conditional_edges(
-        "security",
-        route_after_security,
-        {
+    if parallel_security:
+        builder.add_node("guarded_scoring", instrument_node("guarded_scoring", guarded_scoring_node))
+    else:
+        builder.add_node("security", instrument_node("security", security_node))
+        builder.add_node("scoring", instrument_node("scoring", scoring_node))
+        if speculative:
+            builder.add_node("speculate", instrument_node("speculate", speculate_node))
+    builder.add_node("persist", instrument_node("persist", persist_node))
+    builder.add_node("readiness", instrument_node("readiness", readiness_node))
+    builder.add_node("retrieval", instrument_node("retrieval", retrieval_node))
+    builder.add_node("next_question", instrument_node("next_question", next_question_node))
+    builder.add_node("finalize_normal", instrument_node("finalize_normal", finalize_normal_node))
+    builder.add_node("finalize_security", instrument_node("finalize_security", finalize_security_node))
+
+    if parallel_security:
+        builder.add_edge(START, "guarded_scoring")
+        builder.add_conditional_edges(
+            "guarded_scoring",
+            route_after_guarded_scoring,
+            {
+                "finalize_security": "finalize_security",
+                "persist": "persist",
+                END: END,
+            },
+        )
+    else:
+        security_targets = {
             "finalize_security": "finalize_security",
             "scoring": "scoring",
             END: END,
-        },
-    )
-    builder.add_edge("scoring", "persist")
+        }
+        if speculative:
+            security_targets["speculate"] = "speculate"
+
+        builder.add_edge(START, "security")
+        builder.add_conditional_edges("security", route_after_security, security_targets)
+        if speculative:
+            # join：scoring 与 speculate 都完成后才进入 persist
+            builder.add_edge(["scoring", "speculate"], "persist")
+        else:
+            builder.add_edge("scoring", "persist")
     builder.add_edge("persist", "readiness")
     builder.add_conditional_edges(
         "readiness",
@@ -614,6 +1112,7 @@ def build_interview_graph(
         {
             "finalize_normal": "finalize_normal",
             "retrieval": "retrieval",
+            "next_question": "next_question",
             END: END,
         },
     )
@@ -625,6 +1124,41 @@ def build_interview_graph(
     return builder.compile(checkpointer=checkpointer)
 
 
+# ============================================================
+# 初始 state
+# ============================================================
+
+def initial_graph_state(
+    session,
+    user_answer: str,
+    checkpoint_mode: str = CHECKPOINT_MODE_FULL,
+) -> Dict[str, Any]:
+    """构造单轮 graph 输入。
+
+    slim 模式只携带 session 标识与本轮回答：qa_history / current_question / parsed_profile
+    节点均通过 interview_session_provider 读取，不再随每个 checkpoint 重复序列化。
+    单轮字段显式重置：checkpointer 下 state 会沿用同一 thread 的上一轮取值
+    （上一轮的 speculative_draft 若残留，草稿生成失败时会被 next_question_node 重复提交）。
+    """
+    state: Dict[str, Any] = {
+        "session_id": session.session_id,
+        "candidate_name": session.candidate_name,
+        "user_answer": user_answer,
+        "turn_deadline": None,
+        "degradations": None,
+        "speculative_draft": None,
+        "stream_question": None,
+        "turn_started_at": None,
+    }
+    if checkpoint_mode != CHECKPOINT_MODE_SLIM:
+        state.update(
+            qa_history=session.qa_history,
+            current_question=session.current_question,
+            parsed_profile=session.parsed_profile,
+        )
+    return state
+
+
 # ============================================================
 # Checkpointer 工厂
 # ============================================================
@@ -632,12 +1166,17 @@ def build_interview_graph(
 def create_mongo_checkpointer(
     db_name: str = "interview",
     collection: str = "langgraph_checkpoints_v4",  # v4 单分制重构后启用，旧 v3 自然过期
+    serde=None,
 ) -> MongoDBSaver:
-    """构造基于现有 MongoDB 共享连接的 LangGraph checkpointer"""
+    """构造基于现有 MongoDB 共享连接的 LangGraph checkpointer
+
+    serde: 可选序列化器（见 checkpoint.create_checkpoint_serializer）；None 使用 saver 默认的 JsonPlus
+    """
     client: MongoClient = get_mongo_client()
     return MongoDBSaver(
         client=client,
         db_name=db_name,
         checkpoint_collection_name=collection,
         writes_collection_name=f"{collection}_writes",
+        serde=serde,
     )
@@ -23,6 +23,8 @@ from typing import Any, Dict
 
 from openai import AsyncOpenAI
 
+from interview.transport import get_async_client
+
 logger = logging.getLogger("interview.agents.guardrails")
 
 _MODERATION_MODEL = "omni-moderation-latest"
@@ -32,12 +34,14 @@ _async_client: AsyncOpenAI | None = None
 
 
 def _get_async_client() -> AsyncOpenAI:
-    """懒加载 AsyncOpenAI 客户端，复用 GPT_API_KEY/GPT_BASE_URL"""
+    """懒加载 AsyncOpenAI 客户端，复用 GPT_API_KEY/GPT_BASE_URL 与 GPT 通道的共享连接池"""
     global _async_client
     if _async_client is None:
+        base_url = os.getenv("GPT_BASE_URL")
         _async_client = AsyncOpenAI(
             api_key=os.getenv("GPT_API_KEY"),
-            base_url=os.getenv("GPT_BASE_URL"),
+            base_url=base_url,
+            http_client=get_async_client(base_url),
         )
     return _async_client
 
@@ -0,0 +1,168 @@
+"""
+对冲请求（hedged requests）— 压低单个上游的长尾延迟
+
+ScoringAgent.aprocess 用 asyncio.gather 等待全部评分模型，单个 provider 的长尾直接决定整轮耗时；
+出题同理。启用对冲后（models={"hedge_model": qwen_model, ...}）：
+
+1. 正常发出主请求，并按 key（agent:model）记录主请求耗时的滑动窗口
+2. 主请求超过该 key 观测到的 p90 仍未返回 → 向备用模型发出一份相同请求
+3. 先成功返回的一方胜出，另一方被取消；两者都失败时抛出主请求的异常
+
+额外开销上限：累计对冲次数不超过主请求次数 × max_extra_ratio；样本数不足 min_samples 时不对冲
+（没有可靠的 p90 之前宁可不花钱）。被取消的主请求按取消时已耗时间记入窗口（长尾的下界），
+避免窗口只剩快请求导致阈值越调越低。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Type, TypeVar
+
+from .utils import percentile
+
+logger = logging.getLogger("interview.agents.hedging")
+
+T = TypeVar("T")
+
+DEFAULT_PERCENTILE = 90.0
+DEFAULT_MIN_SAMPLES = 20
+DEFAULT_MAX_EXTRA_RATIO = 0.1
+# 阈值下限：避免快模型的 p90 过低时几乎每次都对冲
+DEFAULT_MIN_DELAY = 0.2
+
+
+class HedgePolicy:
+    """按 key 统计主请求延迟分位数，超时后向备用模型发出对冲请求（线程安全）"""
+
+    def __init__(
+        self,
+        alternate_model,
+        *,
+        percentile_q: float = DEFAULT_PERCENTILE,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+        max_extra_ratio: float = DEFAULT_MAX_EXTRA_RATIO,
+        min_delay: float = DEFAULT_MIN_DELAY,
+        window: int = 256,
+    ):
+        self.alternate_model = alternate_model
+        self.alternate_name = getattr(alternate_model, "model_name", None) or "hedge"
+        self.percentile_q = percentile_q
+        self.min_samples = min_samples
+        self.max_extra_ratio = max_extra_ratio
+        self.min_delay = min_delay
+        self._window = window
+        self._lock = threading.Lock()
+        self._latency: Dict[str, Deque[float]] = {}
+        self._structured: Dict[Type, Any] = {}
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def structured(self, schema: Type) -> Any:
+        """备用模型按 schema 绑定的 structured output runnable（缓存复用）"""
+        runnable = self._structured.get(schema)
+        if runnable is None:
+            runnable = self.alternate_model.with_structured_output(schema, include_raw=False)
+            self._structured[schema] = runnable
+        return runnable
+
+    # ------------------------------------------------------------
+    # 统计
+    # ------------------------------------------------------------
+
+    def _record(self, key: str, seconds: float) -> None:
+        with self._lock:
+            self._latency.setdefault(key, deque(maxlen=self._window)).append(seconds)
+
+    def hedge_delay(self, key: str) -> Optional[float]:
+        """该 key 的对冲阈值（秒）；样本不足返回 None"""
+        with self._lock:
+            samples = list(self._latency.get(key, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return max(self.min_delay, percentile(samples, self.percentile_q))
+
+    def _claim_hedge(self) -> bool:
+        with self._lock:
+            if self.hedged >= self.max_extra_ratio * self.calls:
+                return False
+            self.hedged += 1
+            return True
+
+    def _refund_hedge(self) -> None:
+        with self._lock:
+            self.hedged -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            calls, hedged, wins = self.calls, self.hedged, self.hedge_wins
+            latency = {k: list(v) for k, v in self._latency.items()}
+        return {
+            "calls": calls,
+            "hedged": hedged,
+            "hedge_wins": wins,
+            "extra_ratio": round(hedged / calls, 4) if calls else 0.0,
+            "threshold_ms": {
+                k: round(percentile(v, self.percentile_q) * 1000, 1) for k, v in latency.items()
+            },
+        }
+
+    # ------------------------------------------------------------
+    # 执行
+    # ------------------------------------------------------------
+
+    async def run(
+        self,
+        key: str,
+        primary: Callable[[], Awaitable[T]],
+        alternate: Callable[[], Optional[Awaitable[T]]],
+    ) -> T:
+        """
+        执行主请求；超过 p90 未返回时调用 alternate() 发出对冲请求，返回先成功的结果。
+
+        alternate() 可返回 None 表示本次放弃对冲（如同一轮已有候选改走备用模型）。
+        """
+        with self._lock:
+            self.calls += 1
+        delay = self.hedge_delay(key)
+        started = time.perf_counter()
+        primary_task = asyncio.ensure_future(primary())
+        tasks = {primary_task}
+        try:
+            if delay is not None:
+                await asyncio.wait(tasks, timeout=delay)
+            hedge_coro = None
+            if not primary_task.done() and delay is not None and self._claim_hedge():
+                hedge_coro = alternate()
+                if hedge_coro is None:
+                    self._refund_hedge()
+            if hedge_coro is None:
+                result = await primary_task
+                self._record(key, time.perf_counter() - started)
+                return result
+
+            logger.debug(f"{key} 超过 p{self.percentile_q:g}={delay * 1000:.0f}ms，对冲到 {self.alternate_name}")
+            hedge_task = asyncio.ensure_future(hedge_coro)
+            tasks.add(hedge_task)
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.cancelled() or task.exception() is not None:
+                        continue
+                    self._record(key, time.perf_counter() - started)
+                    if task is hedge_task:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return task.result()
+            # 两者都失败：以主请求的异常为准
+            self._record(key, time.perf_counter() - started)
+            return primary_task.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
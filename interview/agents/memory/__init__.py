@@ -2,10 +2,17 @@
 Memory management system — 包初始化
 """
 
+from .embedding import TurnEmbedding, TurnEmbeddings, turn_embedding_text
 from .store import MemoryStore
 from .retriever import MemoryRetriever
+from .write_behind import TurnWriteBehindQueue, get_turn_write_behind
 
 __all__ = [
     "MemoryStore",
     "MemoryRetriever",
+    "TurnWriteBehindQueue",
+    "get_turn_write_behind",
+    "TurnEmbedding",
+    "TurnEmbeddings",
+    "turn_embedding_text",
 ]
@@ -0,0 +1,99 @@
+"""
+TurnEmbedding — 单轮共享的 question + answer 向量
+
+原先一轮里同一段问答被向量化三次（每次都是阻塞的远程调用）：
+- ScoringAgent._fetch_rag_anchors：question + answer → 评分 anchors 检索
+- retrieval_node：question + answer → retrieve_similar_cases（下题参考案例）
+- MemoryStore.save_turn：combined_text（question + answer + 评分理由）→ turn 文档的 embedding
+
+现在每轮只生成一个向量（文本 = turn_embedding_text(question, answer)），三处共用：
+security 放行后即在后台开始计算，anchors / 检索按需 await 同一结果；同步落库时 persist_node 也 await，
+write-behind 模式下 persist_node 不等待，向量就绪后再补到尚未落库的 turn 上（when_ready）。
+turn 文档的 embedding 因此不再包含评分理由（查询与文档使用同一种文本，向量对称）；
+对检索质量的影响见 benchmarks/retrieval_quality.py。
+
+TurnEmbeddings 按 session_id 保存当前轮的 TurnEmbedding（问答文本变化即视为新一轮），
+容量有界，异常中断的会话由 LRU 淘汰。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+logger = logging.getLogger("interview.agents.memory.embedding")
+
+
+def turn_embedding_text(question: str, answer: str) -> str:
+    """单轮向量的源文本（与 MemoryStore._build_combined_text 的标签一致，不含评分理由）"""
+    parts = []
+    if question:
+        parts.append(f"问题: {question}")
+    if answer:
+        parts.append(f"回答: {answer}")
+    return "\n".join(parts)
+
+
+class TurnEmbedding:
+    """一轮问答的共享向量：首次 start() / aget() 时在线程中调用 get_embedding，之后复用同一结果"""
+
+    def __init__(self, retrieval_system, question: str, answer: str):
+        self.rs = retrieval_system
+        self.text = turn_embedding_text(question, answer)
+        self._future: Optional[asyncio.Future] = None
+
+    def start(self) -> None:
+        """开始计算（不等待结果）；已开始时为 no-op"""
+        if self._future is None:
+            self._future = asyncio.ensure_future(asyncio.to_thread(self.rs.get_embedding, self.text))
+
+    def done(self) -> bool:
+        return self._future is not None and self._future.done()
+
+    def when_ready(self, callback: Callable[[List[float]], None]) -> None:
+        """向量生成成功后在事件循环上回调（已完成时尽快回调）；失败时不回调"""
+        self.start()
+
+        def _done(future: asyncio.Future) -> None:
+            if not future.cancelled() and future.exception() is None and future.result() is not None:
+                callback(future.result())
+
+        self._future.add_done_callback(_done)
+
+    async def aget(self) -> Optional[List[float]]:
+        """等待向量；生成失败返回 None（调用方按无向量处理）。取消调用方不会取消共享的计算"""
+        self.start()
+        try:
+            return await asyncio.shield(self._future)
+        except Exception as e:
+            logger.warning(f"turn embedding 生成失败: {e}")
+            return None
+
+
+class TurnEmbeddings:
+    """session_id → 当前轮 TurnEmbedding（线程安全，有界 LRU）"""
+
+    def __init__(self, retrieval_system, max_sessions: int = 1024):
+        self.rs = retrieval_system
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, TurnEmbedding]" = OrderedDict()
+
+    def for_turn(self, session_id: str, question: str, answer: str) -> TurnEmbedding:
+        text = turn_embedding_text(question, answer)
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None or entry.text != text:
+                entry = TurnEmbedding(self.rs, question, answer)
+                self._entries[session_id] = entry
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+            return entry
+
+    def discard(self, session_id: str) -> None:
+        with self._lock:
+            self._entries.pop(session_id, None)
@@ -29,6 +29,7 @@ class MemoryRetriever:
         exclude_session_id: Optional[str] = None,
         filters: Optional[Dict[str, Any]] = None,
         min_importance: float = 0.0,
+        query_embedding: Optional[List[float]] = None,
     ) -> List[Dict[str, Any]]:
         """
         跨会话向量检索 + importance 重排。
@@ -39,13 +40,15 @@ class MemoryRetriever:
             exclude_session_id: 排除当前会话
             filters: 额外的 MongoDB 过滤条件
             min_importance: 最低 importance 阈值
+            query_embedding: 预先计算的查询向量（本轮共享的 TurnEmbedding）；为空时由 query_text 生成
 
         Returns:
             按 combined_score 降序排列的 turn 文档列表
         """
         try:
-            # 生成查询向量
-            query_embedding = self.rs.get_embedding(query_text)
+            # 生成查询向量（已有本轮共享向量时直接使用）
+            if query_embedding is None:
+                query_embedding = self.rs.get_embedding(query_text)
             if not query_embedding:
                 self.logger.warning("检索查询向量生成失败，返回空结果")
                 return []
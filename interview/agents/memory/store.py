@@ -7,6 +7,10 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 import logging
 
+from interview.ratelimit import BACKGROUND, priority
+
+from .embedding import turn_embedding_text
+
 
 class MemoryStore:
     """MongoDB 增量持久化层 — 每轮实时写入 conversation_memories 集合"""
@@ -76,6 +80,22 @@ class MemoryStore:
         """查询 session_meta"""
         return self.rs.find_session_meta(session_id)
 
+    # -------------------- 会话快照（断线 / 崩溃恢复） --------------------
+
+    def save_session_snapshot(self, session_id: str, snapshot: bytes, turn_count: int) -> bool:
+        """把紧凑编码的会话快照写入 session_meta（恢复时随 meta 一次读出，无需回放 turn）"""
+        return self.rs.update_session_meta(session_id, {"$set": {
+            "snapshot": snapshot,
+            "snapshot_turns": turn_count,
+            "snapshot_at": datetime.now(),
+        }})
+
+    def clear_session_snapshot(self, session_id: str) -> bool:
+        """面试结束 / 宽限期过期后删除快照，避免已结束的会话被重连恢复"""
+        return self.rs.update_session_meta(session_id, {"$unset": {
+            "snapshot": "", "snapshot_turns": "", "snapshot_at": "",
+        }})
+
     # -------------------- 逐轮持久化（核心方法） --------------------
 
     def save_turn(
@@ -88,50 +108,26 @@ class MemoryStore:
         reward: Dict[str, Any],
         security_check: Dict[str, Any] = None,
         baseline_score: float = 5.0,
+        embedding: Optional[List[float]] = None,
     ) -> bool:
         """
         保存一轮 Memento 三元组 (state, action, reward) 到 MongoDB，
         同时增量更新 session_meta 的统计信息。
 
         W3.3：新增 baseline_score 参数（PER importance 计算用）。默认 5.0 兼容旧调用。
+        embedding：本轮共享的 question + answer 向量（见 embedding.py）；为空时在此生成。
         """
         try:
-            # 构建 combined_text 用于向量检索
-            question_text = action.get("question_text", "")
-            answer_text = action.get("answer_text", "")
-            reasoning = reward.get("reasoning", "")
-            combined_text = self._build_combined_text(question_text, answer_text, reasoning)
-
-            # 生成 embedding
-            embedding = self.rs.get_embedding(combined_text)
-
-            # 计算 importance（W3.3 改为 PER 风格）
-            score = reward.get("score", 5)
-            difficulty = action.get("question_data", {}).get("difficulty", "medium") if isinstance(action.get("question_data"), dict) else "medium"
-            is_security_event = (
-                security_check is not None
-                and security_check.get("risk_level") in ("medium", "high")
-            )
-            importance = self._compute_importance(
-                score, difficulty, is_security_event, baseline_score=baseline_score
+            turn_doc = self._build_turn_document(
+                session_id, candidate_name, turn_index, state, action, reward,
+                security_check, baseline_score,
             )
 
-            # 构建 turn 文档
-            now = datetime.now()
-            turn_doc = {
-                "doc_type": "turn",
-                "session_id": session_id,
-                "turn_index": turn_index,
-                "candidate_name": candidate_name,
-                "timestamp": now,
-                "state": state,
-                "action": action,
-                "reward": reward,
-                "importance": importance,
-                "combined_text": combined_text,
-            }
-
-            # embedding 可能因 API 异常为 None，允许写入但不带向量
+            # 未传入共享向量时生成 embedding（可能因 API 异常为 None，允许写入但不带向量）；
+            # 持久化 embedding 按后台优先级排队，让位于轮次关键路径上的模型调用
+            if embedding is None:
+                with priority(BACKGROUND):
+                    embedding = self.rs.get_embedding(self._embedding_text(action))
             if embedding:
                 turn_doc["embedding"] = embedding
 
@@ -142,11 +138,13 @@ class MemoryStore:
                 return False
 
             # 增量更新 session_meta 统计
-            question_type = action.get("question_data", {}).get("type", "general") if isinstance(action.get("question_data"), dict) else "general"
-            security_alert_inc = 1 if is_security_event else 0
+            question_data = action.get("question_data")
+            question_type = question_data.get("type", "general") if isinstance(question_data, dict) else "general"
+            security_alert_inc = 1 if self._is_security_event(security_check) else 0
+            score = reward.get("score", 5)
 
             update_ops = {
-                "$set": {"updated_at": now},
+                "$set": {"updated_at": turn_doc["timestamp"]},
                 "$inc": {
                     "stats.total_turns": 1,
                     "stats.security_alert_count": security_alert_inc,
@@ -164,18 +162,72 @@ class MemoryStore:
                     avg = sum(score_list) / len(score_list)
                     self.rs.update_session_meta(session_id, {"$set": {"stats.average_score": round(avg, 2)}})
 
-            self.logger.debug(f"Turn 已持久化: session={session_id}, turn={turn_index}, importance={importance:.2f}")
+            self.logger.debug(
+                f"Turn 已持久化: session={session_id}, turn={turn_index}, importance={turn_doc['importance']:.2f}"
+            )
             return True
 
         except Exception as e:
             self.logger.error(f"save_turn 异常: {e}")
             return False
 
+    def save_turns_batch(self, turns: List[Dict[str, Any]]) -> bool:
+        """
+        批量保存多轮 turn（write-behind worker 使用），可安全重试。
+
+        turns: 每项为 save_turn 的关键字参数 dict
+        - 已带共享向量（embedding）的 turn 直接使用，其余 embedding 一次批量请求
+        - turn 文档按 (session_id, turn_index) upsert，重试不会重复写入
+        - session_meta.stats 由该会话已落库的全部 turn 重新汇总后 $set（幂等，替代 $inc/$push）
+        """
+        if not turns:
+            return True
+        try:
+            turn_docs = [
+                self._build_turn_document(
+                    t["session_id"], t["candidate_name"], t["turn_index"],
+                    t.get("state") or {}, t.get("action") or {}, t.get("reward") or {},
+                    t.get("security_check"), t.get("baseline_score", 5.0),
+                )
+                for t in turns
+            ]
+            embeddings = [t.get("embedding") for t in turns]
+            missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+            if missing:
+                with priority(BACKGROUND):
+                    computed = self.rs.get_embeddings(
+                        [self._embedding_text(turns[i].get("action") or {}) for i in missing]
+                    )
+                for i, embedding in zip(missing, computed):
+                    embeddings[i] = embedding
+            for doc, embedding in zip(turn_docs, embeddings):
+                if embedding:
+                    doc["embedding"] = embedding
+
+            if not self.rs.upsert_turn_documents(turn_docs):
+                self.logger.error(f"批量保存 turn 文档失败: {len(turn_docs)} 条")
+                return False
+
+            for session_id in dict.fromkeys(d["session_id"] for d in turn_docs):
+                self._refresh_session_stats(session_id)
+
+            self.logger.debug(f"批量持久化 {len(turn_docs)} 轮 turn")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"save_turns_batch 异常: {e}")
+            return False
+
     # -------------------- 会话内读取 --------------------
 
-    def get_session_turns(self, session_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-        """获取某会话的所有 turn 文档（按 turn_index 升序）"""
-        return self.rs.find_turns_by_session(session_id, limit)
+    def get_session_turns(
+        self,
+        session_id: str,
+        limit: Optional[int] = None,
+        projection: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """获取某会话的所有 turn 文档（按 turn_index 升序；projection 可排除 embedding）"""
+        return self.rs.find_turns_by_session(session_id, limit, projection)
 
     def get_recent_turns(self, session_id: str, count: int = 5) -> List[Dict[str, Any]]:
         """获取最近 N 轮 turn"""
@@ -214,6 +266,78 @@ class MemoryStore:
 
     # -------------------- 私有方法 --------------------
 
+    def _build_turn_document(
+        self,
+        session_id: str,
+        candidate_name: str,
+        turn_index: int,
+        state: Dict[str, Any],
+        action: Dict[str, Any],
+        reward: Dict[str, Any],
+        security_check: Optional[Dict[str, Any]],
+        baseline_score: float,
+    ) -> Dict[str, Any]:
+        """构建不含 embedding 的 turn 文档（combined_text + PER importance）"""
+        # 构建 combined_text 用于向量检索
+        question_text = action.get("question_text", "")
+        answer_text = action.get("answer_text", "")
+        reasoning = reward.get("reasoning", "")
+        combined_text = self._build_combined_text(question_text, answer_text, reasoning)
+
+        # 计算 importance（W3.3 改为 PER 风格）
+        score = reward.get("score", 5)
+        question_data = action.get("question_data")
+        difficulty = question_data.get("difficulty", "medium") if isinstance(question_data, dict) else "medium"
+        importance = self._compute_importance(
+            score, difficulty, self._is_security_event(security_check), baseline_score=baseline_score
+        )
+
+        return {
+            "doc_type": "turn",
+            "session_id": session_id,
+            "turn_index": turn_index,
+            "candidate_name": candidate_name,
+            "timestamp": datetime.now(),
+            "state": state,
+            "action": action,
+            "reward": reward,
+            "importance": importance,
+            "combined_text": combined_text,
+        }
+
+    @staticmethod
+    def _is_security_event(security_check: Optional[Dict[str, Any]]) -> bool:
+        return (
+            security_check is not None
+            and security_check.get("risk_level") in ("medium", "high")
+        )
+
+    def _refresh_session_stats(self, session_id: str) -> None:
+        """由已落库的 turn 文档重新汇总 session_meta.stats（幂等）"""
+        turns = self.rs.find_turns_by_session(
+            session_id,
+            projection={"action.question_data": 1, "reward.score": 1, "action.security_check": 1},
+        )
+        score_list = [(t.get("reward") or {}).get("score", 5) for t in turns]
+        type_counts: Dict[str, int] = {}
+        security_alerts = 0
+        for t in turns:
+            action = t.get("action") or {}
+            question_data = action.get("question_data")
+            qtype = question_data.get("type", "general") if isinstance(question_data, dict) else "general"
+            type_counts[qtype] = type_counts.get(qtype, 0) + 1
+            if self._is_security_event(action.get("security_check")):
+                security_alerts += 1
+
+        self.rs.update_session_meta(session_id, {"$set": {
+            "updated_at": datetime.now(),
+            "stats.total_turns": len(turns),
+            "stats.score_list": score_list,
+            "stats.average_score": round(sum(score_list) / len(score_list), 2) if score_list else 0.0,
+            "stats.question_type_counts": type_counts,
+            "stats.security_alert_count": security_alerts,
+        }})
+
     def _compute_importance(
         self,
         score: int,
@@ -249,6 +373,11 @@ class MemoryStore:
         importance = base_priority + difficulty_bonus + security_bonus
         return round(min(importance, 1.0), 4)
 
+    @staticmethod
+    def _embedding_text(action: Dict[str, Any]) -> str:
+        """turn 文档向量的源文本：question + answer（与检索查询同一文本，不含评分理由）"""
+        return turn_embedding_text(action.get("question_text", ""), action.get("answer_text", ""))
+
     def _build_combined_text(self, question: str, answer: str, reasoning: str) -> str:
         """拼接 question + answer + reasoning 作为向量检索的源文本"""
         parts = []
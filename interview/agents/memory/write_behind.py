@@ -0,0 +1,377 @@
+"""
+TurnWriteBehindQueue — turn 持久化的 write-behind 队列 + 本地追加式 journal
+
+persist_node 不再在关键路径上等待 embedding + 多次 MongoDB 往返：
+1. submit() 先把 turn 追加写入本地 journal（flush + fsync，崩溃安全），再入内存队列
+2. 后台 worker 线程按批（batch_size / flush_interval）调用 MemoryStore.save_turns_batch 落库，
+   失败按指数退避重试；重试耗尽的批次暂存后按封顶退避（max_requeue_backoff）重新入队，
+   不必等到下次 start() 才回放
+3. 落库成功后向 journal 追加 ack 记录；队列清空且无未确认条目时截断 journal
+4. 启动时 start() 回放 journal 中未 ack 的条目，worker 崩溃 / 进程重启都不会丢 turn
+
+在线面试的当前轮次以内存 InterviewSession 为准（source of truth），
+conversation_memories 只是最终一致的副本。
+
+多 worker（同一 INTERVIEW_TURN_JOURNAL）：
+- 每个进程写自己的 journal（<path>.<pid>），启动后对其持有 fcntl.flock 排他锁直到 stop()；
+  截断 / ack 只作用于本进程文件，不会抹掉其他 worker 未 ack 的 turn
+- start() 扫描同目录的兄弟 journal（<path>.* 与旧版的 <path>）：能拿到锁的即为已退出进程遗留的孤儿，
+  其未 ack 条目先追加进本进程 journal 再删除原文件；仍被持锁的（存活 worker）跳过，不会重复回放
+- 没有 fcntl 的平台（Windows）不加锁、不接管兄弟 journal，只回放本进程文件
+
+journal 格式：每行一条 bson.json_util 序列化的 JSON（保留 datetime 等类型）
+  {"op": "turn", "id": "<uuid>", "turn": {save_turn kwargs}}
+  {"op": "ack", "ids": ["<uuid>", ...]}
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from bson import json_util
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows 无 flock，不接管兄弟 journal
+    fcntl = None
+
+logger = logging.getLogger("interview.agents.memory.write_behind")
+
+# 环境变量：设置 journal 路径即启用 write-behind（未设置时 persist_node 同步落库）
+JOURNAL_ENV = "INTERVIEW_TURN_JOURNAL"
+
+
+class TurnWriteBehindQueue:
+    """进程内 write-behind 队列，后台线程批量把 turn 写入 conversation_memories"""
+
+    def __init__(
+        self,
+        memory_store,
+        journal_path: str | os.PathLike,
+        *,
+        worker_id: Optional[str] = None,
+        batch_size: int = 16,
+        flush_interval: float = 0.5,
+        max_retries: int = 5,
+        retry_backoff: float = 0.5,
+        max_requeue_backoff: float = 60.0,
+    ):
+        self.memory_store = memory_store
+        # worker_id 非空时 journal_path 为多 worker 共享的基础路径，本进程写 <journal_path>.<worker_id>
+        self.base_path = Path(journal_path)
+        self.journal_path = self.base_path.with_name(f"{self.base_path.name}.{worker_id}") if worker_id else self.base_path
+        self._adopt_siblings = worker_id is not None
+        self._lock_file = None
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_requeue_backoff = max_requeue_backoff
+
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._journal_lock = threading.Lock()
+        self._unacked: Dict[str, Dict[str, Any]] = {}
+        self._idle = threading.Condition()
+        self._inflight = 0
+        # 重试耗尽的批次：[(到期时间, entries)]，到期后由 worker 重新入队（不计入 _inflight）
+        self._parked: List[tuple] = []
+        self._parked_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------
+    # 生命周期
+    # ------------------------------------------------------------
+
+    def start(self) -> int:
+        """回放 journal 中未确认的 turn 并启动 worker；返回回放条数"""
+        if self._worker is not None and self._worker.is_alive():
+            return 0
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock_journal()
+        pending = self._read_unacked()
+        if self._adopt_siblings:
+            pending.update(self._adopt_orphans())
+        for entry_id, turn in pending.items():
+            self._unacked[entry_id] = turn
+            self._enqueue({"id": entry_id, "turn": turn})
+        if pending:
+            logger.info(f"turn journal 回放 {len(pending)} 条未落库记录")
+
+        self._stop.clear()
+        self._worker = threading.Thread(
+            target=self._run, name="turn-write-behind", daemon=True
+        )
+        self._worker.start()
+        return len(pending)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """尽量排空队列后停止 worker（未落库条目保留在 journal 中，下次启动回放）"""
+        self.flush(timeout)
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+            self._worker = None
+        if self._lock_file is not None:
+            self._lock_file.close()  # 释放 flock：未 ack 条目可由其他 worker 接管
+            self._lock_file = None
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """阻塞直到队列与在途批次全部处理完毕；超时或仍有未确认落库的 turn（等待重新入队）时返回 False"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            while self._inflight > 0:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return self.pending_count == 0
+
+    @property
+    def pending_count(self) -> int:
+        """已提交但尚未确认落库的 turn 数"""
+        with self._journal_lock:
+            return len(self._unacked)
+
+    # ------------------------------------------------------------
+    # 提交（persist_node 调用）
+    # ------------------------------------------------------------
+
+    def submit(
+        self,
+        session_id: str,
+        candidate_name: str,
+        turn_index: int,
+        state: Dict[str, Any],
+        action: Dict[str, Any],
+        reward: Dict[str, Any],
+        security_check: Optional[Dict[str, Any]] = None,
+        baseline_score: float = 5.0,
+        embedding: Optional[List[float]] = None,
+    ) -> str:
+        """与 MemoryStore.save_turn 同签名；写 journal 后立即返回 entry id"""
+        turn = {
+            "session_id": session_id,
+            "candidate_name": candidate_name,
+            "turn_index": turn_index,
+            "state": state,
+            "action": action,
+            "reward": reward,
+            "security_check": security_check,
+            "baseline_score": baseline_score,
+        }
+        if embedding is not None:
+            turn["embedding"] = embedding
+        entry_id = uuid.uuid4().hex
+        with self._journal_lock:
+            self._append_journal({"op": "turn", "id": entry_id, "turn": turn})
+            self._unacked[entry_id] = turn
+        self._enqueue({"id": entry_id, "turn": turn})
+        return entry_id
+
+    def attach_embedding(self, entry_id: str, embedding: List[float]) -> bool:
+        """为尚未落库的 turn 补上向量（只改内存；批次落库前未补上的由 save_turns_batch 自行生成）"""
+        with self._journal_lock:
+            turn = self._unacked.get(entry_id)
+            if turn is None or turn.get("embedding") is not None:
+                return False
+            turn["embedding"] = embedding
+            return True
+
+    # ------------------------------------------------------------
+    # worker
+    # ------------------------------------------------------------
+
+    def _enqueue(self, entry: Dict[str, Any]) -> None:
+        with self._idle:
+            self._inflight += 1
+        self._queue.put(entry)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._requeue_due()
+            try:
+                first = self._queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                if not self._write_batch(batch):
+                    self._park(batch)
+            except Exception as e:  # pragma: no cover - 防御：worker 不能因单批异常退出
+                logger.exception(f"write-behind 批次处理异常: {e}")
+            finally:
+                with self._idle:
+                    self._inflight -= len(batch)
+                    self._idle.notify_all()
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> bool:
+        turns = [entry["turn"] for entry in batch]
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                ok = self.memory_store.save_turns_batch(turns)
+            except Exception as e:
+                logger.warning(f"write-behind 批量落库异常（第 {attempt} 次）: {e}")
+                ok = False
+            if ok:
+                self._ack([entry["id"] for entry in batch])
+                return True
+            if attempt < self.max_retries and not self._stop.is_set():
+                time.sleep(self.retry_backoff * (2 ** (attempt - 1)))
+
+        logger.error(f"write-behind 批量落库失败 {self.max_retries} 次，{len(batch)} 条 turn 稍后重新入队")
+        return False
+
+    def _park(self, batch: List[Dict[str, Any]]) -> None:
+        """重试耗尽的批次按封顶指数退避暂存（条目仍在 journal 中未 ack，进程重启时同样回放）"""
+        requeues = max(entry.get("requeues", 0) for entry in batch)
+        delay = min(self.retry_backoff * (2 ** (self.max_retries + requeues)), self.max_requeue_backoff)
+        entries = [{**entry, "requeues": entry.get("requeues", 0) + 1} for entry in batch]
+        with self._parked_lock:
+            self._parked.append((time.monotonic() + delay, entries))
+
+    def _requeue_due(self) -> None:
+        now = time.monotonic()
+        with self._parked_lock:
+            due = [entries for due_at, entries in self._parked if due_at <= now]
+            self._parked = [item for item in self._parked if item[0] > now]
+        for entries in due:
+            for entry in entries:
+                self._enqueue(entry)
+
+    # ------------------------------------------------------------
+    # journal
+    # ------------------------------------------------------------
+
+    def _ack(self, ids: List[str]) -> None:
+        with self._journal_lock:
+            for entry_id in ids:
+                self._unacked.pop(entry_id, None)
+            if not self._unacked:
+                # 全部确认 → 截断 journal，避免无限增长
+                self._truncate_journal()
+            else:
+                self._append_journal({"op": "ack", "ids": ids})
+
+    def _append_journal(self, record: Dict[str, Any]) -> None:
+        line = json_util.dumps(record, ensure_ascii=False) + "\n"
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _truncate_journal(self) -> None:
+        with open(self.journal_path, "w", encoding="utf-8") as f:
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _lock_journal(self) -> None:
+        if fcntl is None or self._lock_file is not None:
+            return
+        self._lock_file = open(self.journal_path, "a", encoding="utf-8")
+        try:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            # 另一个存活进程在用同一文件（未设置 worker_id 的多 worker 部署）：截断可能抹掉对方的 turn
+            logger.error(f"turn journal {self.journal_path} 已被其他进程锁定，多 worker 部署请使用 get_turn_write_behind")
+
+    def _sibling_journals(self) -> List[Path]:
+        siblings = [self.base_path] + sorted(self.base_path.parent.glob(f"{self.base_path.name}.*"))
+        return [p for p in siblings if p != self.journal_path and p.is_file()]
+
+    def _adopt_orphans(self) -> Dict[str, Dict[str, Any]]:
+        """接管已退出 worker 遗留的 journal：未 ack 条目转写进本进程 journal 后删除原文件"""
+        if fcntl is None:
+            return {}
+        adopted: Dict[str, Dict[str, Any]] = {}
+        for path in self._sibling_journals():
+            pending: Dict[str, Dict[str, Any]] = {}
+            try:
+                with open(path, "a+", encoding="utf-8") as f:
+                    try:
+                        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        continue  # 存活 worker 持有锁
+                    # 拿到锁时文件可能已被另一个 worker 接管并删除
+                    if not path.exists() or os.stat(path).st_ino != os.fstat(f.fileno()).st_ino:
+                        continue
+                    pending = self._read_unacked(path)
+                    with self._journal_lock:
+                        for entry_id, turn in pending.items():
+                            self._append_journal({"op": "turn", "id": entry_id, "turn": turn})
+                    path.unlink()
+            except OSError as e:
+                logger.warning(f"接管 turn journal {path} 失败: {e}")
+                continue
+            if pending:
+                logger.info(f"接管已退出 worker 的 turn journal {path.name}：{len(pending)} 条")
+            adopted.update(pending)
+        return adopted
+
+    def _read_unacked(self, path: Optional[Path] = None) -> Dict[str, Dict[str, Any]]:
+        """读取 journal，返回未 ack 的 turn（保持提交顺序）；损坏的尾行直接跳过"""
+        path = path or self.journal_path
+        if not path.exists():
+            return {}
+        pending: Dict[str, Dict[str, Any]] = {}
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json_util.loads(line)
+                except Exception:
+                    logger.warning("turn journal 存在无法解析的行（可能是崩溃时的半行），已跳过")
+                    continue
+                if record.get("op") == "turn":
+                    pending[record["id"]] = record["turn"]
+                elif record.get("op") == "ack":
+                    for entry_id in record.get("ids", []):
+                        pending.pop(entry_id, None)
+        return pending
+
+
+# ============================================================
+# 进程级单例
+# ============================================================
+
+_instance_lock = threading.Lock()
+_instance: Optional[TurnWriteBehindQueue] = None
+
+
+def get_turn_write_behind(memory_store) -> Optional[TurnWriteBehindQueue]:
+    """返回进程共享的 write-behind 队列（首次调用时回放 journal 并启动 worker）。
+
+    未设置 INTERVIEW_TURN_JOURNAL 时返回 None，persist_node 退回同步 save_turn。
+    每个进程写 <INTERVIEW_TURN_JOURNAL>.<pid>，并接管已退出进程遗留的 journal（见模块说明）。
+    """
+    global _instance
+    journal_path = os.getenv(JOURNAL_ENV)
+    if not journal_path:
+        return None
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                writer = TurnWriteBehindQueue(memory_store, journal_path, worker_id=str(os.getpid()))
+                writer.start()
+                _instance = writer
+    return _instance
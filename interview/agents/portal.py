@@ -0,0 +1,102 @@
+"""
+LoopPortal — 同步入口共用的常驻后台 event loop
+
+旧实现中 coordinator._run_async / BaseAgent.process / ResumeParser.parse 每次调用都
+asyncio.run 一个新 loop（在运行中的 loop 里还要再起一个 ThreadPoolExecutor）：
+loop 绑定的客户端（AsyncOpenAI / httpx 连接池）随 loop 关闭被丢弃，下一次调用重新握手。
+
+现在所有同步入口把 coroutine 提交给同一个后台线程上的常驻 loop（run_sync），
+连接池在调用之间保持温热；调用方线程阻塞等待结果，语义与旧实现一致。
+
+注意：不能在 portal 自身的 loop 中调用 run_sync（会自锁），此时直接抛出 RuntimeError。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, Optional, TypeVar
+
+logger = logging.getLogger("interview.agents.portal")
+
+T = TypeVar("T")
+
+
+class LoopPortal:
+    """后台线程 + 常驻 event loop；首次提交时懒启动"""
+
+    def __init__(self, name: str = "interview-loop-portal"):
+        self.name = name
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    self._start()
+        return self._loop
+
+    def _start(self) -> None:
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def _run() -> None:
+            asyncio.set_event_loop(loop)
+            loop.call_soon(ready.set)
+            loop.run_forever()
+
+        thread = threading.Thread(target=_run, name=self.name, daemon=True)
+        thread.start()
+        ready.wait()
+        self._loop, self._thread = loop, thread
+        logger.info(f"LoopPortal 已启动: {self.name}")
+
+    def in_portal_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def call(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """在常驻 loop 上执行 coroutine 并阻塞等待结果；超时取消任务并抛出 TimeoutError"""
+        if self.in_portal_thread():
+            coro.close()
+            raise RuntimeError("不能在 LoopPortal 自身的 event loop 中同步等待，请直接 await")
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> "Future[T]":
+        """把 coroutine 提交到常驻 loop 上后台执行，不等待结果（调用方自行处理返回的 Future）"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout)
+        if not loop.is_running():
+            loop.close()
+
+
+_portal = LoopPortal()
+atexit.register(_portal.stop)
+
+
+def get_portal() -> LoopPortal:
+    return _portal
+
+
+def run_sync(coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+    """同步调用方统一入口：在进程共享的常驻 loop 上运行 coroutine"""
+    return _portal.call(coro, timeout)
@@ -0,0 +1,243 @@
+"""
+评分前置分流（pre-scoring）— 退化回答的确定性评分 + 回答级评分缓存
+
+新生面试的真实回答里有相当比例是空答、「不知道 / 不会」，或把上一题的回答原样粘贴过来。
+这些回答原本同样要走 RAG anchors + N 模型 ensemble。ScoringAgent.aprocess 现在先经过两道分流：
+
+1. detect_degenerate_answer：规则 + 字符 3-gram 判定退化回答，直接产出合法的 ScoringOutput（不调用 LLM）
+   - empty     ：归一化后为空                        → 0 分
+   - refusal   ：每个分句都只是拒答（拒答短语位于分句末尾，前面只有语气 / 客套用字）→ 0 分
+                 「不会相交」「不会死锁」这类以拒答字样开头的结论不算拒答；不带宾语的「不会」只在
+                 主语为「我 / 题」时算拒答（「不会」「也不会」可能是是非题的正确回答）
+   - duplicate ：与本场此前某题（不同题目）的回答 3-gram 覆盖率 ≥ 0.9 → 0 分
+   短回答（「2」「x=2」「不存在」「120种」）在数理面试里常常就是正确答案，一律交给 ensemble 评分。
+   evidence_quote 使用 _NO_SOLUTION_MARKERS 约定（「无有效解答…」），quote 校验恒通过
+2. AnswerScoreCache：键 = (归一化题目, 归一化回答, 评分 prompt 版本)，值为此前完整 ensemble 的 ScoringOutput；
+   只缓存多模型聚合、无需人工复核、非降级的结果。后端复用 response_cache（INTERVIEW_LLM_CACHE_URL），
+   未配置时为进程内 LRU。
+
+PrescoreStats 记录分流结果（empty / refusal / duplicate / cache_hit / miss），
+指标：interview_scoring_prescore_total{result}；离线命中率见 benchmarks/prescoring.py。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional
+
+from interview import metrics
+
+from .response_cache import ResponseCache, run_cache_op
+from .schemas import ScoringOutput
+from .utils import normalize_text
+
+logger = logging.getLogger("interview.agents.prescoring")
+
+# 分流结果
+PRESCORE_EMPTY = "empty"
+PRESCORE_REFUSAL = "refusal"
+PRESCORE_DUPLICATE = "duplicate"
+PRESCORE_CACHE_HIT = "cache_hit"
+PRESCORE_MISS = "miss"
+
+_RESULTS = (
+    PRESCORE_EMPTY, PRESCORE_REFUSAL, PRESCORE_DUPLICATE, PRESCORE_CACHE_HIT, PRESCORE_MISS,
+)
+
+# 拒答短语（归一化后匹配：去标点 / 空白、小写）
+_REFUSAL_PHRASES = (
+    "不知道", "不清楚", "不了解", "不太会做", "不会做", "不会写", "不会这题", "不会这道题", "不懂",
+    "没学过", "没有学过", "没思路", "没有思路", "想不出", "想不到", "答不上", "做不出", "不记得", "忘了",
+    "跳过", "放弃", "idontknow", "dontknow", "idk", "noidea", "notsure", "skip",
+)
+# 不带宾语的「不会」同时是是非题（「…会相交吗？」）的正确回答：只有前面出现主语「我」或「题」时才算拒答
+# （「这道题我真的不会」「我也不会」算；「不会」「不会的」「也不会」「根本不会」交给 ensemble）
+_BARE_REFUSAL_PHRASES = ("不太会", "不会")
+_BARE_REFUSAL_SUBJECTS = set("我题")
+# 拒答分句中常见的语气 / 客套用字：分句末尾的拒答短语之前删去这些字后，剩余不超过 _REFUSAL_REMAINDER 才判拒答
+_REFUSAL_FILLER = set("我这个问题的了啊呢吧嘛嗯额呃哦唉哎呀真实在确还是也太完全根本都就暂时目前抱歉对不起好意思老师怎么做")
+_REFUSAL_REMAINDER = 1
+# 分句边界（在原文上切分；normalize_text 会去掉标点）
+_CLAUSE_SPLIT = re.compile(r"[，。,.;；:：!！?？、…~\n]+")
+_DUPLICATE_MIN_CHARS = 8
+_DUPLICATE_RECALL = 0.9
+
+DEFAULT_CACHE_TTL = 7 * 24 * 3600.0
+
+
+# ============================================================
+# 退化回答判定
+# ============================================================
+
+@dataclass(frozen=True)
+class DegenerateAnswer:
+    kind: str
+    score: int
+    evidence_quote: str
+    reasoning: str
+    confidence_level: str = "high"
+
+    def to_scoring_output(self) -> Dict[str, Any]:
+        return ScoringOutput(
+            score=self.score,
+            evidence_quote=self.evidence_quote,
+            question_focus="退化回答",
+            agreement=1.0,
+            confidence_level=self.confidence_level,
+            requires_human_review=False,
+            fallback_used=False,
+            reasoning=self.reasoning,
+            model_name=f"rules:{self.kind}",
+        ).model_dump(mode="json")
+
+
+def _trigrams(text: str) -> set:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _is_refusal_clause(clause: str) -> bool:
+    """分句以拒答短语结尾（可带语气尾字），且短语之前只有语气 / 客套用字"""
+    while clause:
+        for phrase in _REFUSAL_PHRASES + _BARE_REFUSAL_PHRASES:
+            if clause.endswith(phrase):
+                prefix = clause[: -len(phrase)]
+                if phrase in _BARE_REFUSAL_PHRASES and not _BARE_REFUSAL_SUBJECTS & set(prefix):
+                    return False
+                return len([c for c in prefix if c not in _REFUSAL_FILLER]) <= _REFUSAL_REMAINDER
+        if clause[-1] not in _REFUSAL_FILLER:
+            return False
+        clause = clause[:-1]
+    return False
+
+
+def _is_refusal(answer: str) -> bool:
+    """每个分句要么是拒答、要么只有语气 / 客套用字，且至少有一个拒答分句"""
+    found = False
+    for raw in _CLAUSE_SPLIT.split(answer):
+        clause = normalize_text(raw)
+        if not clause or all(c in _REFUSAL_FILLER for c in clause):
+            continue
+        if not _is_refusal_clause(clause):
+            return False
+        found = True
+    return found
+
+
+def _duplicate_of(normalized: str, question: str, previous_qa: Iterable[Dict[str, Any]]) -> Optional[int]:
+    """当前回答与此前某题（不同题目）的回答几乎相同时返回该题序号（从 1 开始）"""
+    if len(normalized) < _DUPLICATE_MIN_CHARS:
+        return None
+    current = _trigrams(normalized)
+    nq = normalize_text(question)
+    for index, qa in enumerate(previous_qa, start=1):
+        if not isinstance(qa, dict) or normalize_text(qa.get("question", "")) == nq:
+            continue
+        previous = normalize_text(qa.get("answer", ""))
+        if len(previous) < _DUPLICATE_MIN_CHARS:
+            continue
+        if len(current & _trigrams(previous)) / len(current) >= _DUPLICATE_RECALL:
+            return index
+    return None
+
+
+def detect_degenerate_answer(
+    question: str, answer: str, previous_qa: Iterable[Dict[str, Any]] = ()
+) -> Optional[DegenerateAnswer]:
+    """规则判定退化回答；不是退化回答返回 None（交给 LLM ensemble）"""
+    normalized = normalize_text(answer)
+    if not normalized:
+        return DegenerateAnswer(
+            PRESCORE_EMPTY, 0, "(empty)", "回答为空，没有给出任何解答。"
+        )
+    if _is_refusal(answer):
+        return DegenerateAnswer(
+            PRESCORE_REFUSAL, 0, "无有效解答（候选人表示不会）", "候选人明确表示不会或不知道，没有给出解答。"
+        )
+    duplicate = _duplicate_of(normalized, question, previous_qa)
+    if duplicate is not None:
+        return DegenerateAnswer(
+            PRESCORE_DUPLICATE, 0, f"无有效解答（与第 {duplicate} 题回答重复）",
+            f"回答与第 {duplicate} 题的回答几乎相同，没有针对本题作答。",
+        )
+    return None
+
+
+# ============================================================
+# 回答级评分缓存
+# ============================================================
+
+class AnswerScoreCache:
+    """(归一化题目, 归一化回答) → 完整 ensemble 的 ScoringOutput dict；读写异常只记日志"""
+
+    def __init__(self, backend: ResponseCache, ttl: float = DEFAULT_CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+
+    @staticmethod
+    def key(question: str, answer: str, prompt_version: str) -> str:
+        body = "\x00".join(("answer_score", prompt_version, normalize_text(question), normalize_text(answer)))
+        return hashlib.sha256(body.encode()).hexdigest()
+
+    @staticmethod
+    def cacheable(output: Dict[str, Any]) -> bool:
+        """只复用多模型聚合、无需复核、非降级的结果（单模型 / 提前结束的结果不写入）"""
+        return (
+            not output.get("fallback_used")
+            and not output.get("requires_human_review")
+            and str(output.get("model_name") or "").startswith("ensemble(")
+        )
+
+    async def aget(self, question: str, answer: str, prompt_version: str) -> Optional[Dict[str, Any]]:
+        try:
+            raw = await run_cache_op(self.backend, self.backend.get, self.key(question, answer, prompt_version))
+            if raw is None:
+                return None
+            return ScoringOutput.model_validate_json(raw).model_dump(mode="json")
+        except Exception as e:
+            logger.warning(f"回答级评分缓存读取失败: {e}")
+            return None
+
+    async def aput(self, question: str, answer: str, prompt_version: str, output: Dict[str, Any]) -> None:
+        if not self.cacheable(output):
+            return
+        try:
+            raw = ScoringOutput.model_validate(output).model_dump_json()
+            key = self.key(question, answer, prompt_version)
+            await run_cache_op(self.backend, self.backend.set, key, raw, self.ttl)
+        except Exception as e:
+            logger.warning(f"回答级评分缓存写入失败: {e}")
+
+
+# ============================================================
+# 统计
+# ============================================================
+
+class PrescoreStats:
+    """分流结果计数（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {k: 0 for k in _RESULTS}
+
+    def record(self, result: str) -> None:
+        with self._lock:
+            self._counts[result] = self._counts.get(result, 0) + 1
+        metrics.scoring_prescore(result)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+        total = sum(counts.values())
+        degenerate = total - counts[PRESCORE_CACHE_HIT] - counts[PRESCORE_MISS]
+        return {
+            "total": total,
+            "counts": counts,
+            "degenerate_rate": round(degenerate / total, 4) if total else 0.0,
+            "cache_hit_rate": round(counts[PRESCORE_CACHE_HIT] / total, 4) if total else 0.0,
+            # 不调用 LLM 的轮次占比
+            "hit_rate": round((total - counts[PRESCORE_MISS]) / total, 4) if total else 0.0,
+        }
@@ -0,0 +1,104 @@
+"""
+ParsedProfileStore — 按简历内容哈希持久化 ResumeParser 的解析结果
+
+每次 astart_interview（以及崩溃会话的重新开始）都会调用 ResumeParser.aparse：
+对整份简历 JSON + 完整 rubric 做一次大的 structured output 调用，即使候选人自上次面试以来简历未变。
+
+现在解析结果存入 parsed_profiles 集合，_id = sha256(简历内容) + 解析器版本
+（resume_parser prompt name@version + 解析模型名 + 渲染后 rubric 文本的摘要，见 parser_version）：
+- update_user_resume 保存简历后立即在后台解析并写入（候选人开始面试前通常已就绪）
+- astart_interview 先查该集合，命中时跳过 LLM 调用；未命中则解析后写入
+- prompt 版本升级、更换解析模型或修改 rubrics.py 后键随之变化，旧结果自然失效；降级 profile（LLM 失败）不写入
+
+简历文档的 _id 不参与哈希（get_resume_by_name 返回的文档与 update_user_resume 保存的内容一致即命中）。
+
+文档：{_id, profile, parser_version, created_at}
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from interview.ratelimit import BACKGROUND, priority
+
+from .portal import get_portal
+
+logger = logging.getLogger("interview.agents.profile_cache")
+
+PROFILES_COLLECTION = "parsed_profiles"
+
+
+def resume_fingerprint(resume_data: Dict[str, Any]) -> str:
+    """简历内容哈希（忽略文档 _id，键顺序无关）"""
+    content = {k: v for k, v in resume_data.items() if k != "_id"}
+    body = json.dumps(content, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def parser_version(prompt_version: str, model_name: str, rubric_text: str) -> str:
+    """解析结果依赖的全部输入（简历除外）：prompt 版本 + 模型名 + rubric 文本摘要"""
+    rubric_digest = hashlib.sha256(rubric_text.encode()).hexdigest()[:16]
+    return f"{prompt_version}:{model_name}:{rubric_digest}"
+
+
+def profile_key(resume_data: Dict[str, Any], version: str) -> str:
+    return f"{resume_fingerprint(resume_data)}:{version}"
+
+
+class ParsedProfileStore:
+    """parsed_profiles 集合的读写（同步 pymongo；读写异常只记日志，调用方退回 LLM 解析）"""
+
+    def __init__(self, collection=None):
+        self._collection = collection
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            from interview.tools.db import get_mongo_db
+
+            self._collection = get_mongo_db()[PROFILES_COLLECTION]
+        return self._collection
+
+    def get(self, resume_data: Dict[str, Any], version: str) -> Optional[Dict[str, Any]]:
+        try:
+            doc = self.collection.find_one({"_id": profile_key(resume_data, version)}, {"profile": 1})
+        except Exception as e:
+            logger.warning(f"读取简历解析缓存失败: {e}")
+            return None
+        return doc.get("profile") if doc else None
+
+    def put(self, resume_data: Dict[str, Any], version: str, profile: Dict[str, Any]) -> None:
+        try:
+            self.collection.replace_one(
+                {"_id": profile_key(resume_data, version)},
+                {"profile": profile, "parser_version": version, "created_at": datetime.now()},
+                upsert=True,
+            )
+        except Exception as e:
+            logger.warning(f"写入简历解析缓存失败: {e}")
+
+
+# ============================================================
+# 预解析（update_user_resume 保存简历后调用）
+# ============================================================
+
+async def _prefetch(parser, resume_data: Dict[str, Any]) -> None:
+    with priority(BACKGROUND):
+        await parser.aparse(resume_data)
+
+
+def prefetch_profile(parser, resume_data: Dict[str, Any]) -> "Future[None]":
+    """在常驻 loop 上后台解析简历并写入 parser.profile_store（已缓存时不调用 LLM）；不阻塞调用方"""
+    future = get_portal().submit(_prefetch(parser, resume_data))
+    future.add_done_callback(_log_prefetch_error)
+    return future
+
+
+def _log_prefetch_error(future: "Future[None]") -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logger.error(f"简历预解析失败: {future.exception()}")
@@ -10,7 +10,7 @@ from __future__ import annotations
 
 import json
 import logging
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional
 
 from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
 
@@ -18,43 +18,85 @@ from interview.rubrics import RUBRIC_DIMENSIONS
 from interview.tools.rag_tools import RetrievalSystem, rag_search as rag_search_tool
 
 from .base_agent import BaseAgent
+from .breaker import call_with_failover
+from .cache import SEGMENT_HISTORY, SEGMENT_PROFILE, SEGMENT_VOLATILE, PromptLayout
+from .context_budget import ContextBuilder
+from .hedging import HedgePolicy
 from .qa_models import get_question_type
 from .schemas import QuestionOutput
 
 
+# 难度提示分界：当前均分 < 6 出 easy~medium，否则 medium~hard
+_DIFFICULTY_HINT_CUTOFF = 6
+
+
+def difficulty_hint_for(current_score: float) -> str:
+    """根据当前均分给出出题难度提示（speculative 出题据此判断草稿能否提交）"""
+    return "easy to medium" if current_score < _DIFFICULTY_HINT_CUTOFF else "medium to hard"
+
+
+def _question_delta_forwarder(on_question_delta: Callable[[str], None]) -> Callable[[Dict[str, Any]], None]:
+    """把部分解析的 QuestionOutput dict 转为 question 字段的增量文本回调"""
+    emitted = ""
+
+    def _forward(partial: Dict[str, Any]) -> None:
+        nonlocal emitted
+        text = partial.get("question")
+        if not isinstance(text, str) or len(text) <= len(emitted) or not text.startswith(emitted):
+            return
+        delta, emitted = text[len(emitted):], text
+        on_question_delta(delta)
+
+    return _forward
+
+
 class QuestionGeneratorAgent(BaseAgent):
     """问题生成智能体 - 结构化输出 + RAG 工具调用"""
 
     prompt_name = "question_generator"
     output_schema = QuestionOutput
+    # human message token 预算（不含 system 与 RAG 工具补充）
+    context_budget_tokens = 3000
 
-    def __init__(self, model, retrieval_system: RetrievalSystem):
+    def __init__(self, model, retrieval_system: RetrievalSystem, hedge_policy: Optional[HedgePolicy] = None):
         super().__init__(model, "QuestionGenerator")
         self.retrieval_system = retrieval_system
+        # 非流式出题（structured output 阶段）超过 p90 时对冲到备用模型；工具调用循环不对冲
+        self.hedge_policy = hedge_policy
         self.logger = logging.getLogger("interview.agents.question_generator")
 
     # ------------------------------------------------------------
     # 主入口
     # ------------------------------------------------------------
 
-    async def aprocess(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def aprocess(
+        self,
+        input_data: Dict[str, Any],
+        on_question_delta: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, Any]:
         """
         异步出题。
         input_data: {
             interview_stage, previous_qa, current_score, target_type,
-            parsed_profile, similar_cases_context
+            parsed_profile, similar_cases_context, [allow_rag_tool]
         }
+        allow_rag_tool=False 时跳过出题 RAG 工具循环（turn 预算不足时由 graph 传入）
+        on_question_delta: 可选回调；提供时 structured output 阶段走流式，
+                           QuestionOutput.question 每增长一段就回调新增文本
         """
         try:
             human_text = self._build_human_prompt(input_data)
         except Exception as e:
             self.logger.error(f"构造 prompt 失败: {e}")
-            return self._fallback_question()
+            return self.fallback_question()
 
         # 出题工具调用循环（如需要 RAG），最后一步用 structured output
         try:
             # 第一步：让 LLM 决定是否需要 rag_search
-            tool_results = await self._maybe_call_rag(human_text)
+            tool_results = (
+                await self._maybe_call_rag(human_text)
+                if input_data.get("allow_rag_tool", True) else ""
+            )
             if tool_results:
                 augmented_text = (
                     human_text + "\n\n=== 知识库检索补充 ===\n" + tool_results
@@ -63,19 +105,29 @@ class QuestionGeneratorAgent(BaseAgent):
                 augmented_text = human_text
 
             # 第二步：用 structured output 生成最终题目
-            result: QuestionOutput = await self.ainvoke_structured(augmented_text)
+            if on_question_delta is None:
+                result: QuestionOutput = await self.ainvoke_structured(augmented_text)
+            else:
+                result = await self.ainvoke_structured(
+                    augmented_text, on_partial=_question_delta_forwarder(on_question_delta)
+                )
             return result.model_dump(mode="json")
 
         except Exception as e:
             self.logger.error(f"QuestionGenerator 异常: {e}")
-            return self._fallback_question()
+            return self.fallback_question()
 
     # ------------------------------------------------------------
     # Prompt 构造
     # ------------------------------------------------------------
 
     def _build_human_prompt(self, input_data: Dict[str, Any]) -> str:
-        """组装 human message 内容（不含 system，由 BaseAgent 统一加 cached system）"""
+        """组装 human message 内容（不含 system，由 BaseAgent 统一加 cached system）
+
+        按稳定性排列（见 cache.PromptLayout）：profile（整场不变）→ 历史问答 → 本轮易变内容
+        （阶段引导 / 得分 / 题型统计 / 相似案例 / verifier 反馈），使同一场面试的相邻轮次共享最长前缀。
+        总长受 context_budget_tokens 约束（见 context_budget.py），超出时先裁相似案例，再裁历史与 profile。
+        """
         interview_stage = input_data.get("interview_stage", "technical")
         previous_qa = input_data.get("previous_qa", [])
         current_score = input_data.get("current_score", 0)
@@ -85,23 +137,22 @@ class QuestionGeneratorAgent(BaseAgent):
         # W3.2 CoVe revise：上一次生成的题目被 verifier 拒绝时的反馈
         verifier_feedback = input_data.get("verifier_feedback")
 
+        profile: List[str] = []
+        history = ""
         parts: List[str] = []
-
-        # Memento 历史案例
-        if similar_cases:
-            parts.append(f"以下是来自其他类似面试的历史参考案例：\n{similar_cases}")
-            parts.append("这些案例仅供参考，请勿直接复制题目，需根据当前候选人情况调整。")
+        cases: List[str] = []
+        feedback = ""
 
         # 简历结构化 profile
         if parsed_profile and parsed_profile.get("items"):
-            parts.append(self._format_profile_for_prompt(parsed_profile))
+            profile.append(self._format_profile_for_prompt(parsed_profile))
             weak_dims = parsed_profile.get("weakest_dimensions", [])
             if weak_dims:
                 dim_names = [
                     RUBRIC_DIMENSIONS[d]["name"] for d in weak_dims if d in RUBRIC_DIMENSIONS
                 ]
                 if dim_names:
-                    parts.append(
+                    profile.append(
                         f"The candidate shows weaker signals in: {', '.join(dim_names)}. "
                         f"Prioritize questions that can elicit evidence for these dimensions."
                     )
@@ -110,7 +161,7 @@ class QuestionGeneratorAgent(BaseAgent):
                 item = items_map.get(pid)
                 if item:
                     gaps = ", ".join(item.get("knowledge_gaps", [])[:3]) or "none identified"
-                    parts.append(f"Suggested probe: '{item['summary']}' (gaps: {gaps})")
+                    profile.append(f"Suggested probe: '{item['summary']}' (gaps: {gaps})")
 
         # 阶段相关引导
         if interview_stage == "opening":
@@ -124,7 +175,7 @@ class QuestionGeneratorAgent(BaseAgent):
             desired_type = target_type or "math_logic"
 
             if desired_type == "math_logic":
-                difficulty_hint = "easy to medium" if current_score < 6 else "medium to hard"
+                difficulty_hint = difficulty_hint_for(current_score)
                 parts.append(
                     "Please generate a math_logic type question, emphasizing the chain of reasoning and "
                     "verifiability."
@@ -179,7 +230,7 @@ class QuestionGeneratorAgent(BaseAgent):
                     for qa in previous_qa[-3:]
                 ]
             )
-            parts.append(f"Previous Q&A record:\n{qa_history}")
+            history = f"Previous Q&A record:\n{qa_history}"
             parts.append(f"Current average score: {current_score}/10")
             parts.append(
                 f"This is round {len(previous_qa)+1} (out of 5-6 total). Generate efficient targeted "
@@ -203,13 +254,18 @@ class QuestionGeneratorAgent(BaseAgent):
                 "entire process."
             )
 
+        # Memento 历史案例（每轮检索结果不同，放在易变段）
+        if similar_cases:
+            cases.append(f"以下是来自其他类似面试的历史参考案例：\n{similar_cases}")
+            cases.append("这些案例仅供参考，请勿直接复制题目，需根据当前候选人情况调整。")
+
         # W3.2 CoVe revise：把 verifier 反馈加到 prompt 末尾，强制本次出题修正
         if verifier_feedback:
             if isinstance(verifier_feedback, list):
                 feedback_text = "; ".join(str(v) for v in verifier_feedback)
             else:
                 feedback_text = str(verifier_feedback)
-            parts.append(
+            feedback = (
                 "=== REVISION REQUIRED (CoVe verifier feedback from previous attempt) ===\n"
                 f"The previous candidate question failed the following checks:\n{feedback_text}\n"
                 "You MUST address all of these issues in this new attempt:\n"
@@ -219,7 +275,22 @@ class QuestionGeneratorAgent(BaseAgent):
                 "- If difficulty_match failed, adjust difficulty up or down accordingly."
             )
 
-        return "\n\n".join(parts) if parts else "Please generate the next interview question."
+        # 阶段引导与 verifier 反馈必须保留；相似案例最先被裁掉
+        built = (
+            ContextBuilder(self.name, self.context_budget_tokens)
+            .add("feedback", feedback, priority=0)
+            .add("guidance", "\n\n".join(parts), priority=0)
+            .add("profile", "\n\n".join(profile), priority=1)
+            .add("history", history, priority=2)
+            .add("cases", "\n\n".join(cases), priority=3)
+            .build()
+        )
+        layout = PromptLayout()
+        layout.add(SEGMENT_PROFILE, built.get("profile"))
+        layout.add(SEGMENT_HISTORY, built.get("history"))
+        for name in ("guidance", "cases", "feedback"):
+            layout.add(SEGMENT_VOLATILE, built.get(name))
+        return layout.render() if layout else "Please generate the next interview question."
 
     # ------------------------------------------------------------
     # 工具调用层（async）
@@ -232,7 +303,6 @@ class QuestionGeneratorAgent(BaseAgent):
         """
         try:
             tools = [rag_search_tool]
-            model_with_tools = self.model.bind_tools(tools)
 
             from langchain_core.messages import SystemMessage
             from .cache import cached_system_message
@@ -244,7 +314,9 @@ class QuestionGeneratorAgent(BaseAgent):
 
             collected_results: List[str] = []
             for _ in range(2):
-                ai_msg = await model_with_tools.ainvoke(history)
+                ai_msg = await call_with_failover(
+                    self.model_chain, lambda m: self._ainvoke_measured(m.bind_tools(tools), m, history)
+                )
                 tool_calls = getattr(ai_msg, "tool_calls", None)
                 if not tool_calls:
                     return "\n\n".join(collected_results)
@@ -283,7 +355,8 @@ class QuestionGeneratorAgent(BaseAgent):
     # 工具方法
     # ------------------------------------------------------------
 
-    def _fallback_question(self) -> Dict[str, Any]:
+    def fallback_question(self) -> Dict[str, Any]:
+        """出题失败（或出题步骤超出 turn 预算）时的兜底题"""
         return {
             "question": "请简单介绍你最近接触过的一个数学或逻辑问题，及你的思考过程。",
             "type": "general",
@@ -20,7 +20,6 @@ QuestionVerifier — CoVe (Chain-of-Verification) factor+revise 变种 (W3.2)
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 from typing import Any, Dict, List, Optional
 
@@ -29,6 +28,7 @@ from langchain_openai import ChatOpenAI
 
 from .base_agent import BaseAgent
 from .cache import cached_system_message
+from .context_budget import ContextBuilder
 from .qa_models import get_question_type
 from .schemas import QuestionVerificationOutput, VerificationCheck
 
@@ -39,12 +39,17 @@ _TYPE_QUOTA = 2
 # 题目长度上限（与 prompt 中 60 字一致）
 _QUESTION_MAX_LEN = 80  # 给 LLM 一些余量，但超过 80 就 fail
 
+# 候选题 / profile JSON 的单段 token 上限（替代旧的 1500 字符截断，收缩后仍是合法 JSON）
+_JSON_MAX_TOKENS = 500
+
 
 class QuestionVerifier(BaseAgent):
     """CoVe verifier — Plan & Execute 风格的题目校验"""
 
     prompt_name = "question_verifier"
     output_schema = VerificationCheck  # 单轴 schema
+    response_cache_ttl = 3600.0        # 同一候选题 + 上下文的单轴校验结果可复用
+    context_budget_tokens = 1500       # 候选题 + profile + 近期问答
 
     def __init__(self, model: ChatOpenAI):
         super().__init__(model, "QuestionVerifier")
@@ -92,8 +97,16 @@ class QuestionVerifier(BaseAgent):
         recent_qa_text = self._format_recent_qa(qa_history, n=3)
         avg_score = self._compute_avg_score(qa_history)
 
-        candidate_q_json = self._safe_json(candidate_question)
-        parsed_profile_json = self._safe_json(parsed_profile or {})
+        built = (
+            ContextBuilder(self.name, self.context_budget_tokens)
+            .add_json("candidate_question", candidate_question, priority=0, max_tokens=_JSON_MAX_TOKENS)
+            .add_json("parsed_profile", parsed_profile or {}, priority=1, max_tokens=_JSON_MAX_TOKENS)
+            .add("recent_qa", recent_qa_text, priority=2)
+            .build()
+        )
+        candidate_q_json = built.get("candidate_question", "{}")
+        parsed_profile_json = built.get("parsed_profile", "{}")
+        recent_qa_text = built.get("recent_qa", "(无历史)")
 
         llm_tasks = [
             self._verify_with_llm(
@@ -200,8 +213,11 @@ class QuestionVerifier(BaseAgent):
             cached_system_message(self.get_system_prompt()),
             HumanMessage(content=human_text),
         ]
-        # 用 BaseAgent 预绑定的 _structured_model
-        result: VerificationCheck = await self._structured_model.ainvoke(messages)
+        # 主模型用 BaseAgent 预绑定的 _structured_model；熔断 / 失败时走故障转移链；
+        # 同一候选题 / profile / 历史的同一轴校验直接命中响应缓存
+        result: VerificationCheck = await self._acached(
+            VerificationCheck, messages, lambda: self._ainvoke_chain(VerificationCheck, messages)
+        )
         # 强制 name 与请求一致
         if result.name != axis:
             result = result.model_copy(update={"name": axis})
@@ -233,13 +249,6 @@ class QuestionVerifier(BaseAgent):
                 scores.append(float(s))
         return sum(scores) / len(scores) if scores else 0.0
 
-    @staticmethod
-    def _safe_json(obj: Any) -> str:
-        try:
-            return json.dumps(obj, ensure_ascii=False)[:1500]
-        except Exception:
-            return str(obj)[:1500]
-
     @staticmethod
     def _build_revision_hint(checks: List[VerificationCheck]) -> str:
         violations = [c for c in checks if not c.passed]
@@ -0,0 +1,77 @@
+"""
+进程级 coordinator 注册表
+
+MultiAgentCoordinator 持有的组件全部是无会话状态、可并发共享的：
+- RetrievalSystem（共享 MongoClient 连接池 + OpenAI embedding 客户端）
+- 各 agent 的 with_structured_output 绑定
+- 编译后的 LangGraph + MongoDBSaver（按 thread_id=session_id 隔离 checkpoint）
+
+会话级状态只存在于 coordinator.active_sessions[chat_id]。因此每个 WebSocket 连接
+无需各自构造一套，按 (models, graph_options) 在进程内复用同一实例即可。
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from interview.metrics import track_active_sessions
+
+from .coordinator import MultiAgentCoordinator
+
+logger = logging.getLogger("interview.agents.registry")
+
+_registry_lock = threading.Lock()
+_coordinators: Dict[Hashable, MultiAgentCoordinator] = {}
+
+track_active_sessions(lambda: sum(len(c.active_sessions) for c in list(_coordinators.values())))
+
+
+def _registry_key(models: Dict[str, Any], graph_options: Optional[Dict[str, Any]]) -> Tuple:
+    """按模型实例身份 + 拓扑开关生成注册表键（模型对象不可哈希，使用 id）"""
+    model_part = []
+    for role in sorted(models):
+        value = models[role]
+        if isinstance(value, (list, tuple)):
+            model_part.append((role, tuple(id(m) for m in value)))
+        else:
+            model_part.append((role, id(value)))
+
+    option_part = []
+    for name, value in sorted((graph_options or {}).items()):
+        if not isinstance(value, (bool, int, float, str, type(None))):
+            value = id(value)
+        option_part.append((name, value))
+    return tuple(model_part), tuple(option_part)
+
+
+def get_shared_coordinator(
+    models: Dict[str, Any],
+    graph_options: Optional[Dict[str, Any]] = None,
+) -> MultiAgentCoordinator:
+    """返回进程共享的 coordinator（线程安全的双检锁懒加载）。
+
+    首次构造时同时编译 LangGraph，把 checkpointer 初始化从首个回答的关键路径上移走；
+    并启动后台 finalize 队列，接管进程重启前未完成的任务。
+    """
+    key = _registry_key(models, graph_options)
+    coordinator = _coordinators.get(key)
+    if coordinator is None:
+        with _registry_lock:
+            coordinator = _coordinators.get(key)
+            if coordinator is None:
+                coordinator = MultiAgentCoordinator(models, graph_options=graph_options)
+                coordinator._ensure_graph()
+                coordinator.finalize_queue.start()
+                _coordinators[key] = coordinator
+                logger.info("共享 MultiAgentCoordinator 已初始化")
+    return coordinator
+
+
+def reset_shared_coordinators() -> None:
+    """清空注册表（测试 / 进程内热重载用）"""
+    with _registry_lock:
+        for coordinator in _coordinators.values():
+            coordinator.cleanup_all_sessions()
+        _coordinators.clear()
@@ -0,0 +1,319 @@
+"""
+LLM 响应缓存 — 按内容寻址复用确定性的 structured output 调用
+
+不少调用是输入的纯函数且会重复发生：简历未变时的 ResumeParser.aparse、
+候选题 / profile / 历史完全相同的 QuestionVerifier 单轴校验、重试 / 重复提交时 SecurityAgent 的同一输入。
+
+缓存键 = sha256(模型名, prompt 模板 name + version, 渲染后消息, 输出 schema 指纹)，
+值为校验通过的 Pydantic 输出（JSON），命中时重新 model_validate。
+
+按 agent opt-in：类属性 response_cache_ttl（秒）非空时启用，BaseAgent.ainvoke_structured 与
+各 structured-model 调用点经 get_or_compute 读写缓存。缓存读写异常只记日志，不影响调用本身。
+
+后端（INTERVIEW_LLM_CACHE_URL，未设置时关闭缓存）：
+  memory://?max_entries=2048   进程内 LRU
+  sqlite:///var/lib/interview/llm_cache.db?max_entries=100000   LRU + TTL，定期清理过期行
+  redis://host:6379/2
+
+指标：interview_llm_cache_total{agent,result=hit|miss}
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional, Sequence, Tuple, Type, TypeVar
+from urllib.parse import parse_qs, urlsplit
+
+from langchain_core.messages import BaseMessage
+from pydantic import BaseModel
+
+from interview import metrics
+
+logger = logging.getLogger("interview.agents.response_cache")
+
+CACHE_URL_ENV = "INTERVIEW_LLM_CACHE_URL"
+
+T = TypeVar("T", bound=BaseModel)
+
+
+# ============================================================
+# 缓存键
+# ============================================================
+
+@functools.lru_cache(maxsize=None)
+def schema_fingerprint(schema: Type[BaseModel]) -> str:
+    """schema 名 + JSON Schema 摘要（字段变化后旧缓存自然失效）"""
+    body = json.dumps(schema.model_json_schema(), sort_keys=True, ensure_ascii=False)
+    return f"{schema.__name__}:{hashlib.sha256(body.encode()).hexdigest()[:16]}"
+
+
+def cache_key(
+    model_name: str,
+    prompt_name: str,
+    prompt_version: str,
+    schema: Type[BaseModel],
+    messages: Sequence[BaseMessage],
+) -> str:
+    payload = json.dumps(
+        {
+            "model": model_name,
+            "prompt": f"{prompt_name}@{prompt_version}",
+            "schema": schema_fingerprint(schema),
+            "messages": [[m.type, m.content] for m in messages],
+        },
+        sort_keys=True, ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+# ============================================================
+# 后端
+# ============================================================
+
+class ResponseCache(ABC):
+    """缓存后端接口（同步）；blocking=True 的后端由调用方放到线程里执行"""
+
+    blocking: bool = True
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """返回缓存的 JSON；不存在或已过期返回 None"""
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: float) -> None:
+        """写入 JSON，ttl 秒后过期"""
+
+
+class InMemoryResponseCache(ResponseCache):
+    """进程内 LRU + TTL"""
+
+    blocking = False
+
+    def __init__(self, max_entries: int = 2048, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteResponseCache(ResponseCache):
+    """SQLite 文件缓存（单机多 worker 共享；WAL 模式）
+
+    LRU + TTL：命中时刷新 accessed_at；每 maintenance_interval 次 set() 删除过期行，
+    并按 accessed_at 淘汰最久未用的行直到不超过 max_entries（两次维护之间最多多出 maintenance_interval 行）。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        max_entries: int = 100_000,
+        maintenance_interval: int = 64,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.maintenance_interval = max(1, maintenance_interval)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._sets_since_maintenance = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_response_cache "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, "
+            "accessed_at REAL NOT NULL DEFAULT 0)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(llm_response_cache)")}
+        if "accessed_at" not in columns:  # 旧版本建的表
+            self._conn.execute("ALTER TABLE llm_response_cache ADD COLUMN accessed_at REAL NOT NULL DEFAULT 0")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS llm_response_cache_accessed_at ON llm_response_cache (accessed_at)"
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        now = self._clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM llm_response_cache WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE llm_response_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        now = self._clock()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_response_cache (key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now + ttl, now),
+            )
+            self._sets_since_maintenance += 1
+            if self._sets_since_maintenance < self.maintenance_interval:
+                return
+            self._sets_since_maintenance = 0
+        self.purge_expired()
+        self.evict_lru()
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "DELETE FROM llm_response_cache WHERE expires_at <= ?", (self._clock(),)
+            ).rowcount
+
+    def evict_lru(self) -> int:
+        """淘汰最久未用的行直到不超过 max_entries；返回删除行数"""
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM llm_response_cache").fetchone()[0]
+            excess = count - self.max_entries
+            if excess <= 0:
+                return 0
+            return self._conn.execute(
+                "DELETE FROM llm_response_cache WHERE key IN "
+                "(SELECT key FROM llm_response_cache ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            ).rowcount
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_response_cache").fetchone()[0]
+
+
+class RedisResponseCache(ResponseCache):
+    """Redis 缓存（多机共享；过期交给 Redis TTL）"""
+
+    def __init__(self, client, *, key_prefix: str = "interview:llm_cache:"):
+        self._client = client
+        self.key_prefix = key_prefix
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisResponseCache":
+        import redis
+
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def get(self, key: str) -> Optional[str]:
+        raw = self._client.get(f"{self.key_prefix}{key}")
+        return raw.decode() if isinstance(raw, bytes) else raw
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self._client.set(f"{self.key_prefix}{key}", value, px=max(1, int(ttl * 1000)))
+
+
+def create_response_cache(url: Optional[str] = None) -> Optional[ResponseCache]:
+    """按 URL（默认读 INTERVIEW_LLM_CACHE_URL）构造缓存后端；未配置返回 None"""
+    url = (url if url is not None else os.getenv(CACHE_URL_ENV, "")).strip()
+    if not url:
+        return None
+    parts = urlsplit(url)
+    if parts.scheme == "memory":
+        max_entries = int(parse_qs(parts.query).get("max_entries", ["2048"])[0])
+        return InMemoryResponseCache(max_entries=max_entries)
+    if parts.scheme == "sqlite":
+        query = parse_qs(parts.query)
+        return SQLiteResponseCache(
+            parts.path or ":memory:",
+            max_entries=int(query.get("max_entries", ["100000"])[0]),
+            maintenance_interval=int(query.get("maintenance_interval", ["64"])[0]),
+        )
+    if parts.scheme in ("redis", "rediss"):
+        return RedisResponseCache.from_url(url)
+    raise ValueError(f"不支持的 {CACHE_URL_ENV}: {url}")
+
+
+_cache: Optional[ResponseCache] = None
+_cache_loaded = False
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """进程共享的缓存后端（首次调用时按环境变量创建；创建失败时关闭缓存）"""
+    global _cache, _cache_loaded
+    if not _cache_loaded:
+        with _cache_lock:
+            if not _cache_loaded:
+                try:
+                    _cache = create_response_cache()
+                except Exception as e:
+                    logger.error(f"LLM 响应缓存初始化失败，已关闭: {e}")
+                    _cache = None
+                _cache_loaded = True
+    return _cache
+
+
+# ============================================================
+# 读写
+# ============================================================
+
+async def run_cache_op(cache: ResponseCache, fn, *args):
+    """执行后端读写；blocking 后端放到线程里"""
+    if cache.blocking:
+        return await asyncio.to_thread(fn, *args)
+    return fn(*args)
+
+
+async def get_or_compute(
+    cache: Optional[ResponseCache],
+    key: str,
+    schema: Type[T],
+    ttl: float,
+    compute: Callable[[], Awaitable[T]],
+    *,
+    agent: str,
+) -> T:
+    """命中则返回缓存的 schema 实例，否则执行 compute() 并写入缓存（只缓存校验通过的输出）"""
+    if cache is None:
+        return await compute()
+    try:
+        raw = await run_cache_op(cache, cache.get, key)
+        if raw is not None:
+            result = schema.model_validate_json(raw)
+            metrics.llm_cache_result(agent, hit=True)
+            return result
+    except Exception as e:
+        logger.warning(f"{agent} 响应缓存读取失败: {e}")
+    metrics.llm_cache_result(agent, hit=False)
+
+    result = await compute()
+    if isinstance(result, schema):
+        try:
+            await run_cache_op(cache, cache.set, key, result.model_dump_json(), ttl)
+        except Exception as e:
+            logger.warning(f"{agent} 响应缓存写入失败: {e}")
+    return result
@@ -2,26 +2,39 @@
 ResumeParser — async + structured output (S1 + S2)
 
 不继承 BaseAgent（保持原有独立接口），但使用同样的 prompt loader + structured output。
+注入 profile_store 后按简历内容哈希复用持久化的解析结果（见 profile_cache.py）。
 """
 
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 
 from langchain_core.messages import HumanMessage
 
+from interview import metrics
 from interview.rubrics import RUBRIC_DIMENSIONS, format_rubric_for_prompt
 
+from .breaker import call_with_failover, model_label
 from .cache import cached_system_message
+from .context_budget import ContextBuilder
+from .portal import run_sync
+from .profile_cache import ParsedProfileStore, parser_version
 from .prompts import load_prompt
+from .response_cache import ResponseCache, cache_key, get_or_compute, get_response_cache
 from .schemas import ResumeProfile
 
 logger = logging.getLogger("interview.agents.resume_parser")
 
 _ALL_DIMENSIONS = list(RUBRIC_DIMENSIONS.keys())
 
+# 简历未变时解析结果可长期复用（prompt 版本变化会改变缓存键）
+_RESPONSE_CACHE_TTL = 7 * 24 * 3600.0
+
+# 简历 JSON 的 token 预算（紧凑序列化；超出时按结构截短长字段）
+_CONTEXT_BUDGET_TOKENS = 8000
+
 
 class ResumeParser:
     """简历结构化解析器 — async + structured output"""
@@ -36,6 +49,25 @@ class ResumeParser:
             self.prompt = PromptTemplate(name="resume_parser", version="0", system="")
 
         self._structured_model = self.model.with_structured_output(ResumeProfile, include_raw=False)
+        # 故障转移链（由 coordinator 按 question_model 角色注入）
+        self.failover_models: List[Any] = []
+        self._failover_structured: Dict[int, Any] = {}
+        self.response_cache: Optional[ResponseCache] = get_response_cache()
+        # 持久化的解析结果（由 coordinator / update_user_resume 注入；None 时每次都调用 LLM）
+        self.profile_store: Optional[ParsedProfileStore] = None
+
+    @property
+    def prompt_version(self) -> str:
+        return f"{self.prompt.name}@{self.prompt.version}"
+
+    @property
+    def profile_version(self) -> str:
+        """parsed_profiles 键中的解析器版本：prompt 版本 + 模型名 + 渲染后 rubric 摘要"""
+        return parser_version(
+            self.prompt_version,
+            getattr(self.model, "model_name", None) or "unknown",
+            format_rubric_for_prompt(),
+        )
 
     # ------------------------------------------------------------
     # 主入口
@@ -47,8 +79,20 @@ class ResumeParser:
             logger.warning("简历数据为空或格式异常，使用降级 profile")
             return self._generate_fallback_profile()
 
+        if self.profile_store is not None:
+            cached = await asyncio.to_thread(self.profile_store.get, resume_data, self.profile_version)
+            metrics.llm_cache_result("ResumeParser", hit=cached is not None)
+            if cached is not None:
+                logger.debug("命中简历解析缓存，跳过 LLM 调用")
+                return cached
+
         try:
-            resume_json = json.dumps(resume_data, ensure_ascii=False, indent=2)
+            resume_json = (
+                ContextBuilder("ResumeParser", _CONTEXT_BUDGET_TOKENS)
+                .add_json("resume", resume_data, priority=0)
+                .build()
+                .get("resume", "{}")
+            )
             human_text = self.prompt.format_human(
                 rubric_text=format_rubric_for_prompt(),
                 resume_json=resume_json,
@@ -63,27 +107,43 @@ class ResumeParser:
                 HumanMessage(content=human_text),
             ]
 
+            async def invoke(model) -> ResumeProfile:
+                with metrics.llm_call("ResumeParser", model_label(model), self._structured_for(model)) as bound:
+                    return await bound.ainvoke(messages)
+
             logger.debug("ResumeParser 调用 LLM (structured)")
-            result: ResumeProfile = await self._structured_model.ainvoke(messages)
-            return result.model_dump(mode="json")
+            result: ResumeProfile = await get_or_compute(
+                self.response_cache,
+                cache_key(
+                    getattr(self.model, "model_name", None) or "unknown",
+                    self.prompt.name, self.prompt.version, ResumeProfile, messages,
+                ),
+                ResumeProfile,
+                _RESPONSE_CACHE_TTL,
+                lambda: call_with_failover([self.model, *self.failover_models], invoke),
+                agent="ResumeParser",
+            )
+            profile = result.model_dump(mode="json")
+            if self.profile_store is not None:
+                await asyncio.to_thread(self.profile_store.put, resume_data, self.profile_version, profile)
+            return profile
 
         except Exception as e:
             logger.error(f"ResumeParser 解析失败，使用降级 profile: {e}")
             return self._generate_fallback_profile()
 
-    def parse(self, resume_data: Dict[str, Any]) -> Dict[str, Any]:
-        """同步 wrapper（旧调用方使用）"""
-        import asyncio
+    def _structured_for(self, model):
+        if model is self.model:
+            return self._structured_model
+        runnable = self._failover_structured.get(id(model))
+        if runnable is None:
+            runnable = model.with_structured_output(ResumeProfile, include_raw=False)
+            self._failover_structured[id(model)] = runnable
+        return runnable
 
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
-                    return pool.submit(asyncio.run, self.aparse(resume_data)).result()
-        except RuntimeError:
-            pass
-        return asyncio.run(self.aparse(resume_data))
+    def parse(self, resume_data: Dict[str, Any]) -> Dict[str, Any]:
+        """同步 wrapper（旧调用方使用，在常驻后台 loop 上执行）"""
+        return run_sync(self.aparse(resume_data))
 
     # ------------------------------------------------------------
     # 降级
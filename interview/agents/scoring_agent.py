@@ -6,6 +6,9 @@ ScoringAgent — 单题整体评分 + 多模型 ensemble + RAG anchors (v4 重
 - N 模型并行 → CISC confidence-weighted 聚合为单题最终分
 - agreement = 1 - (max - min) / 10，反映多模型分差
 - requires_human_review 触发条件：fallback / agreement<0.7 / 多数 confidence=low
+- 评分前置分流：退化回答（空答 / 拒答 / 重复粘贴）规则评分，回答级缓存复用此前 ensemble 结果
+  （见 prescoring.py），两者都不调用 LLM
+- 可选 early_exit：首个候选落在历史上多模型一致的分数区域时接受它并取消其余调用（见 early_exit.py）
 
 论文锚点：
 - RULERS (Hong 2026, arXiv:2601.08654): evidence-anchored，必须给 quote
@@ -17,13 +20,26 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
 
 from langchain_core.messages import HumanMessage
 from langchain_openai import ChatOpenAI
 
+from interview.metrics import llm_call
+
 from .base_agent import BaseAgent
+from .breaker import call_with_failover, model_label
 from .cache import cached_system_message
+from .early_exit import EXIT_ACCEPTED, EarlyExitPolicy
+from .hedging import HedgePolicy
+from .prescoring import (
+    PRESCORE_CACHE_HIT,
+    PRESCORE_MISS,
+    AnswerScoreCache,
+    PrescoreStats,
+    detect_degenerate_answer,
+)
 from .qa_models import get_score
 from .schemas import ScoringOutput, SingleScoreCandidate
 from .utils import validate_quote_in_answer as _validate_quote_in_answer_impl
@@ -47,12 +63,24 @@ class ScoringAgent(BaseAgent):
     prompt_name = "scoring_holistic"
     output_schema = SingleScoreCandidate  # 每模型一次调用产出此 schema
 
-    def __init__(self, models, memory_retriever=None):
+    def __init__(
+        self,
+        models,
+        memory_retriever=None,
+        hedge_policy: Optional[HedgePolicy] = None,
+        early_exit: Optional[EarlyExitPolicy] = None,
+        answer_cache: Optional[AnswerScoreCache] = None,
+    ):
         """
         Args:
             models: ChatOpenAI 单个或 List[ChatOpenAI]。建议传入 2 个不同 API 来源的模型
                     (如 [doubao_model, gemini_model]) 启用 ensemble。
             memory_retriever: MemoryRetriever 实例，用于注入 RAG anchors。可空（跳过 RAG）。
+            hedge_policy: 可选 HedgePolicy；评分调用超过 p90 时对冲到备用模型（每轮至多替换 1 个候选，
+                          避免 ensemble 退化为同一模型）。
+            early_exit: 可选 EarlyExitPolicy；按完成顺序收集候选，首个候选落在历史一致区域时提前结束
+                        （未启用时只统计 agreement 与假设提前结束的损失）。
+            answer_cache: 可选 AnswerScoreCache；(归一化题目, 归一化回答) 相同时复用此前的 ensemble 结果。
         """
         if not isinstance(models, list):
             models = [models]
@@ -62,6 +90,10 @@ class ScoringAgent(BaseAgent):
         super().__init__(models[0], "ScoringAgent")
         self.models: List[ChatOpenAI] = list(models)
         self.memory_retriever = memory_retriever
+        self.hedge_policy = hedge_policy
+        self.early_exit = early_exit
+        self.answer_cache = answer_cache
+        self.prescore_stats = PrescoreStats()
         # 为每个模型预编译 structured output（避免每次调用重新绑定）
         self._structured_models = [
             m.with_structured_output(SingleScoreCandidate, include_raw=False)
@@ -88,6 +120,12 @@ class ScoringAgent(BaseAgent):
             question_type: str (default "general")
             difficulty: str (default "medium")
             session_id: Optional[str] (用于 RAG anchors 排除当前会话)
+            skip_rag_anchors: bool (turn 预算不足时跳过 RAG anchors 检索)
+            max_models: Optional[int] (turn 预算不足时只调用前 N 个评分模型)
+            previous_qa: List[dict] (本场此前的问答，用于判定重复粘贴的回答)
+            deferred_side_effects: Optional[list] (传入时 early_exit 统计与回答缓存写入不立即执行，
+                而是以无参 async 回调追加到该列表，由调用方在 security 放行后执行；
+                parallel_security 模式下避免被拦截的回答污染缓存与统计)
 
         Returns: ScoringOutput 的 dict 形式
         """
@@ -97,17 +135,36 @@ class ScoringAgent(BaseAgent):
         difficulty = input_data.get("difficulty", "medium")
         session_id = input_data.get("session_id")
 
+        # 0. 前置分流：退化回答规则评分 / 回答级缓存（命中时不调用 LLM）
+        prescored = await self._aprescore(question, answer, input_data.get("previous_qa") or ())
+        if prescored is not None:
+            return prescored
+
         # 1. RAG anchors（k=2，跨会话相似案例）
-        anchors = await self._fetch_rag_anchors(question, answer, session_id)
+        if input_data.get("skip_rag_anchors"):
+            anchors = ""
+        else:
+            anchors = await self._fetch_rag_anchors(
+                question, answer, session_id, input_data.get("turn_embedding")
+            )
 
         # 2. N 模型并行调用（每模型 1 次）
+        max_models = input_data.get("max_models") or len(self.models)
+        hedge_slots = [1]  # 本轮允许改由备用模型产出的候选数
         tasks = [
             self._score_with_model(
-                question, answer, question_type, difficulty, anchors, model_idx
+                question, answer, question_type, difficulty, anchors, model_idx, hedge_slots
             )
-            for model_idx in range(len(self.models))
+            for model_idx in range(min(max_models, len(self.models)))
         ]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        early_exit = self.early_exit if len(tasks) >= 2 else None
+        first: Optional[SingleScoreCandidate] = None
+        decision: Optional[str] = None
+        tail_ms = 0.0
+        if early_exit is None:
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        else:
+            results, first, decision, tail_ms = await self._gather_adaptive(tasks, question_type)
 
         # 3. 收集成功的 candidates
         candidates: List[SingleScoreCandidate] = []
@@ -152,11 +209,88 @@ class ScoringAgent(BaseAgent):
                 reasoning=aggregated["reasoning"],
                 model_name=aggregated["model_name"],
             )
-            return output.model_dump(mode="json")
         except Exception as e:
             self.logger.error(f"ScoringOutput 校验失败，全降级: {e}")
             return self._fallback_scoring()
 
+        result = output.model_dump(mode="json")
+
+        async def commit_side_effects() -> None:
+            if early_exit is not None:
+                if decision == EXIT_ACCEPTED:
+                    early_exit.record_outcome(question_type, decision)
+                elif len(candidates) >= 2:
+                    early_exit.record_ensemble(question_type, [c.score for c in candidates], agreement, tail_ms)
+                    if decision is not None:
+                        early_exit.record_outcome(
+                            question_type, decision, early_score=first.score,
+                            final_score=output.score, final_review=output.requires_human_review,
+                        )
+            if self.answer_cache is not None:
+                await self.answer_cache.aput(question, answer, self.prompt_version, result)
+
+        deferred = input_data.get("deferred_side_effects")
+        if deferred is not None:
+            deferred.append(commit_side_effects)
+        else:
+            await commit_side_effects()
+        return result
+
+    # ------------------------------------------------------------
+    # 前置分流
+    # ------------------------------------------------------------
+
+    @property
+    def prompt_version(self) -> str:
+        return f"{self.prompt.name}@{self.prompt.version}"
+
+    async def _aprescore(
+        self, question: str, answer: str, previous_qa
+    ) -> Optional[Dict[str, Any]]:
+        """退化回答 → 规则评分；回答级缓存命中 → 复用；否则返回 None 交给 ensemble"""
+        degenerate = detect_degenerate_answer(question, answer, previous_qa)
+        if degenerate is not None:
+            self.prescore_stats.record(degenerate.kind)
+            self.logger.debug("退化回答（%s），规则评分 %d", degenerate.kind, degenerate.score)
+            return degenerate.to_scoring_output()
+        if self.answer_cache is not None:
+            cached = await self.answer_cache.aget(question, answer, self.prompt_version)
+            if cached is not None:
+                self.prescore_stats.record(PRESCORE_CACHE_HIT)
+                return cached
+        self.prescore_stats.record(PRESCORE_MISS)
+        return None
+
+    async def _gather_adaptive(
+        self, coros: List[Awaitable[SingleScoreCandidate]], question_type: str
+    ) -> Tuple[List[Any], Optional[SingleScoreCandidate], Optional[str], float]:
+        """按完成顺序收集候选：首个候选满足 early_exit 条件时接受它并取消其余调用。
+
+        Returns: (results, 首个候选, early_exit 决策, 首个候选之后等待其余模型的毫秒数)
+        """
+        tasks = [asyncio.ensure_future(c) for c in coros]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            first_at = time.perf_counter()
+            first = next(
+                (t.result() for t in tasks if t in done and t.exception() is None), None
+            )
+            decision = self.early_exit.decide(question_type, first) if first is not None else None
+            if decision == EXIT_ACCEPTED:
+                self.logger.debug(
+                    "ScoringAgent early exit: type=%s score=%d model=%s",
+                    question_type, first.score, first.model_name,
+                )
+                return [first], first, decision, 0.0
+            await asyncio.wait(tasks)
+            tail_ms = (time.perf_counter() - first_at) * 1000
+            results = [t.exception() or t.result() for t in tasks]
+            return results, first, decision, tail_ms
+        finally:
+            for t in tasks:
+                if not t.done():
+                    t.cancel()
+
     # ------------------------------------------------------------
     # 单模型调用
     # ------------------------------------------------------------
@@ -169,8 +303,9 @@ class ScoringAgent(BaseAgent):
         difficulty: str,
         anchors: str,
         model_idx: int,
+        hedge_slots: Optional[List[int]] = None,
     ) -> SingleScoreCandidate:
-        """单模型一次评分调用"""
+        """单模型一次评分调用（启用 hedge_policy 时可能由备用模型作答，model_name 记录实际来源）"""
         human_text = self.prompt.format_human(
             question_type=question_type,
             difficulty=difficulty,
@@ -183,7 +318,37 @@ class ScoringAgent(BaseAgent):
             HumanMessage(content=human_text),
         ]
 
-        result: SingleScoreCandidate = await self._structured_models[model_idx].ainvoke(messages)
+        primary = self.models[model_idx]
+        model_name = getattr(primary, "model_name", None) or f"model_{model_idx}"
+
+        async def invoke(runnable, name: str) -> SingleScoreCandidate:
+            with llm_call(self.name, name, runnable) as structured:
+                candidate: SingleScoreCandidate = await structured.ainvoke(messages)
+            return candidate.model_copy(update={"model_name": name})
+
+        # 主模型 → 故障转移链（熔断打开的模型直接跳过）
+        def score_on(model):
+            if model is primary:
+                return invoke(self._structured_models[model_idx], model_name)
+            return invoke(self._structured_for(model, SingleScoreCandidate), model_label(model))
+
+        def call_chain():
+            return call_with_failover([primary, *self.failover_models], score_on)
+
+        def hedge():
+            if hedge_slots is None or hedge_slots[0] <= 0:
+                return None
+            hedge_slots[0] -= 1
+            policy = self.hedge_policy
+            return call_with_failover(
+                [policy.alternate_model],
+                lambda m: invoke(policy.structured(SingleScoreCandidate), policy.alternate_name),
+            )
+
+        if self.hedge_policy is None:
+            result = await call_chain()
+        else:
+            result = await self.hedge_policy.run(f"{self.name}:{model_name}", call_chain, hedge)
 
         # ------------------------------------------------------------
         # quote fuzzy match：不在 answer 中 → 降 confidence (RULERS soft fallback)
@@ -204,14 +369,6 @@ class ScoringAgent(BaseAgent):
                 "score=%d 越界，clamp 到 %d", result.score, clamped
             )
             result = result.model_copy(update={"score": clamped})
-
-        # 记录模型来源
-        try:
-            result = result.model_copy(
-                update={"model_name": getattr(self.models[model_idx], "model_name", f"model_{model_idx}")}
-            )
-        except Exception:
-            result = result.model_copy(update={"model_name": f"model_{model_idx}"})
         return result
 
     # ------------------------------------------------------------
@@ -298,13 +455,17 @@ class ScoringAgent(BaseAgent):
     # ------------------------------------------------------------
 
     async def _fetch_rag_anchors(
-        self, question: str, answer: str, session_id: Optional[str]
+        self, question: str, answer: str, session_id: Optional[str], turn_embedding=None
     ) -> str:
-        """从 MemoryRetriever 取 k=2 跨会话相似案例（论文 arXiv:2603.06424）"""
+        """从 MemoryRetriever 取 k=2 跨会话相似案例（论文 arXiv:2603.06424）
+
+        turn_embedding: 图内本轮共享的 TurnEmbedding；传入时复用其向量，不再单独调用 embedding
+        """
         if not self.memory_retriever:
             return ""
         try:
             query = f"{question}\n{answer}"[:1000]
+            query_embedding = await turn_embedding.aget() if turn_embedding is not None else None
             similar = await asyncio.to_thread(
                 self.memory_retriever.retrieve_similar_cases,
                 query,
@@ -312,6 +473,7 @@ class ScoringAgent(BaseAgent):
                 session_id,  # exclude_session_id 避免 self-leak
                 None,
                 0.0,
+                query_embedding=query_embedding,
             )
             return self.memory_retriever.format_cases_for_scoring(similar)
         except Exception as e:
@@ -323,7 +485,11 @@ class ScoringAgent(BaseAgent):
     # ------------------------------------------------------------
 
     def _fallback_scoring(self) -> Dict[str, Any]:
-        """所有模型调用失败时的全降级：score=5（中位数）+ requires_human_review=True"""
+        return self.fallback_scoring()
+
+    def fallback_scoring(self) -> Dict[str, Any]:
+        """所有模型调用失败（或评分步骤超出 turn 预算）时的全降级：
+        score=5（中位数）+ requires_human_review=True"""
         try:
             output = ScoringOutput(
                 score=5,
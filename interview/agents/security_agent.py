@@ -49,6 +49,8 @@ class SecurityAgent(BaseAgent):
 
     prompt_name = "security_agent"
     output_schema = SecurityOutput
+    # 重试 / 重复提交的同一输入复用 LLM 判定
+    response_cache_ttl = 600.0
 
     def __init__(self, model):
         super().__init__(model, "SecurityAgent")
@@ -100,7 +102,8 @@ class SecurityAgent(BaseAgent):
     async def aprocess(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         异步安全检测（双层 + 短路）。
-        input_data: { user_input, context }
+        input_data: { user_input, context, [skip_llm] }
+        skip_llm=True 时不调用第 2 层 LLM（turn 预算不足时由 graph 传入）
         """
         user_input = input_data.get("user_input", "")
         context = input_data.get("context", {})
@@ -130,32 +133,25 @@ class SecurityAgent(BaseAgent):
             }
 
         # 第 2 层：SecurityAgent LLM 深度分析（仅在前两层有疑点时）
-        try:
-            human_text = self.prompt.format_human(
-                user_input=user_input,
-                context=json.dumps(context, ensure_ascii=False) if context else "无",
-            )
-            llm_result: SecurityOutput = await self.ainvoke_structured(human_text)
-            result = llm_result.model_dump(mode="json")
-            # SuggestedAction enum value "continue" 在 Python 中是关键字别名，但序列化为字符串没问题
-            # 标准化字符串
-            result["risk_level"] = result.get("risk_level", "low")
-            result["suggested_action"] = result.get("suggested_action", "continue")
-        except Exception as e:
-            self.logger.error(f"SecurityAgent LLM 调用异常: {e}")
-            # LLM 失败时降级到快检 + Moderation 结果
-            result = {
-                "is_safe": quick_check.get("is_safe", True),
-                "risk_level": _max_risk(
-                    quick_check.get("risk_level", "low"),
-                    moderation_result.get("risk_level", "low"),
-                ),
-                "detected_issues": list(set(
-                    quick_check.get("detected_issues", []) + moderation_result.get("detected_issues", [])
-                )),
-                "reasoning": f"LLM 异常降级；快检+Moderation 合并：{e}",
-                "suggested_action": quick_check.get("suggested_action", "continue"),
-            }
+        if input_data.get("skip_llm"):
+            # 单轮预算不足：直接按快检 + Moderation 结果判定
+            result = self._layered_fallback(quick_check, moderation_result, "预算不足跳过 LLM 分析")
+        else:
+            try:
+                human_text = self.prompt.format_human(
+                    user_input=user_input,
+                    context=json.dumps(context, ensure_ascii=False) if context else "无",
+                )
+                llm_result: SecurityOutput = await self.ainvoke_structured(human_text)
+                result = llm_result.model_dump(mode="json")
+                # SuggestedAction enum value "continue" 在 Python 中是关键字别名，但序列化为字符串没问题
+                # 标准化字符串
+                result["risk_level"] = result.get("risk_level", "low")
+                result["suggested_action"] = result.get("suggested_action", "continue")
+            except Exception as e:
+                self.logger.error(f"SecurityAgent LLM 调用异常: {e}")
+                # LLM 失败时降级到快检 + Moderation 结果
+                result = self._layered_fallback(quick_check, moderation_result, f"LLM 异常降级：{e}")
 
         # 合并三层结果（取最高风险）
         if quick_check["detected_issues"]:
@@ -178,10 +174,32 @@ class SecurityAgent(BaseAgent):
 
         return result
 
+    @staticmethod
+    def _layered_fallback(
+        quick_check: Dict[str, Any], moderation_result: Dict[str, Any], reason: str
+    ) -> Dict[str, Any]:
+        """不经 LLM 的判定：合并快检 + Moderation 结果"""
+        return {
+            "is_safe": quick_check.get("is_safe", True),
+            "risk_level": _max_risk(
+                quick_check.get("risk_level", "low"),
+                moderation_result.get("risk_level", "low"),
+            ),
+            "detected_issues": list(set(
+                quick_check.get("detected_issues", []) + moderation_result.get("detected_issues", [])
+            )),
+            "reasoning": f"{reason}；快检+Moderation 合并",
+            "suggested_action": quick_check.get("suggested_action", "continue"),
+        }
+
     # ------------------------------------------------------------
     # 快检层
     # ------------------------------------------------------------
 
+    def quick_check(self, user_input: str) -> Dict[str, Any]:
+        """仅正则快检（不访问网络）；security 步骤超时时 graph 用它兜底"""
+        return self._quick_security_check(user_input)
+
     def _quick_security_check(self, user_input: str) -> Dict[str, Any]:
         """正则快速检测（1ms 级）"""
         user_input_lower = user_input.lower()
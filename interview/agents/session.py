@@ -27,6 +27,9 @@ class InterviewSession:
         # 评分追踪（替代旧 InterviewMemory 的 score_history）
         self._score_list: List[int] = []
 
+        # SessionStore 乐观并发版本号（None = 尚未持久化，见 session_store.py）
+        self.store_version: Optional[int] = None
+
     def add_score(self, score: int) -> None:
         """记录一轮评分"""
         self._score_list.append(score)
@@ -54,3 +57,62 @@ class InterviewSession:
             "average_score": self.get_average_score(),
             "parsed_profile": self.parsed_profile,
         }
+
+    # ------------------------------------------------------------
+    # SessionStore 序列化（完整保真，区分静态 / 每轮变化部分）
+    # ------------------------------------------------------------
+
+    def static_state(self) -> Dict[str, Any]:
+        """会话开始后基本不变的部分（简历 + 解析结果），仅首次 / 变更时写入"""
+        return {
+            "session_id": self.session_id,
+            "candidate_name": self.candidate_name,
+            "resume_data": self.resume_data,
+            "parsed_profile": self.parsed_profile,
+            "start_time": self.start_time,
+        }
+
+    def dynamic_state(self) -> Dict[str, Any]:
+        """每轮都会变化的部分"""
+        return {
+            "qa_history": self.qa_history,
+            "current_question": self.current_question,
+            "question_data": self.question_data,
+            "is_active": self.is_active,
+            "score_list": self._score_list,
+        }
+
+    @classmethod
+    def from_state(
+        cls,
+        static: Dict[str, Any],
+        dynamic: Dict[str, Any],
+        coordinator=None,
+    ) -> "InterviewSession":
+        """由 static_state / dynamic_state 重建会话（时间字段允许为 ISO 字符串）"""
+        session = cls(
+            session_id=static["session_id"],
+            candidate_name=static["candidate_name"],
+            resume_data=static.get("resume_data") or {},
+            coordinator=coordinator,
+        )
+        session.parsed_profile = static.get("parsed_profile")
+        session.start_time = _as_datetime(static.get("start_time")) or session.start_time
+        session.qa_history = [
+            {**qa, "timestamp": _as_datetime(qa.get("timestamp"))} if "timestamp" in qa else qa
+            for qa in dynamic.get("qa_history") or []
+        ]
+        session.current_question = dynamic.get("current_question")
+        session.question_data = dynamic.get("question_data")
+        session.is_active = dynamic.get("is_active", True)
+        session._score_list = list(dynamic.get("score_list") or [])
+        return session
+
+
+def _as_datetime(value: Any) -> Optional[datetime]:
+    if isinstance(value, datetime) or value is None:
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
@@ -0,0 +1,298 @@
+"""
+SessionStore — 可插拔的面试会话存储
+
+coordinator.active_sessions 只是当前进程正在处理的工作副本；会话的权威状态存放在 SessionStore：
+- InMemorySessionStore（默认）：进程内字典，保存活对象本身，零序列化开销，行为与旧实现一致
+- RedisSessionStore：多个 daphne worker 共享，任何 worker 都可以接手下一轮；worker 重启不丢会话
+
+并发控制：
+- lock(session_id)：每个 session 一把锁，coordinator 处理一轮回答期间持有
+- store_version：乐观并发版本号，save() 时 compare-and-set，锁过期后的迟到写入会被拒绝
+
+Redis 编码（hash 键 interview:session:{session_id}）：
+  version : 整数
+  static  : zlib(msgpack(InterviewSession.static_state()))   仅首次 / 显式要求时写入
+  dynamic : zlib(msgpack(InterviewSession.dynamic_state()))  每轮写入
+
+启用方式：设置 INTERVIEW_SESSION_STORE_URL=redis://host:6379/0（未设置时使用进程内存储）。
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+import uuid
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Protocol
+
+import ormsgpack
+
+from .session import InterviewSession
+
+logger = logging.getLogger("interview.agents.session_store")
+
+# 环境变量：Redis 连接串；设置即启用 RedisSessionStore
+SESSION_STORE_URL_ENV = "INTERVIEW_SESSION_STORE_URL"
+
+
+class SessionVersionConflict(RuntimeError):
+    """save() 时发现 store 中的版本已被其他 worker 推进"""
+
+
+class SessionLock(Protocol):
+    def acquire(self) -> bool: ...
+
+    def release(self) -> None: ...
+
+
+# ============================================================
+# 抽象接口
+# ============================================================
+
+class SessionStore(ABC):
+    """会话存储抽象 — 所有方法同步，async 调用方通过 asyncio.to_thread 使用"""
+
+    # True：多进程共享，coordinator 每轮从 store 重新加载会话，轮次结束后释放本地副本
+    shared: bool = False
+
+    @abstractmethod
+    def load(self, session_id: str, coordinator=None) -> Optional[InterviewSession]:
+        """读取会话；不存在时返回 None"""
+
+    @abstractmethod
+    def save(self, session: InterviewSession, *, include_static: bool = False) -> int:
+        """写入会话并返回新版本号。
+
+        session.store_version 为 None 时无条件写入（新建 / 覆盖），否则 compare-and-set，
+        版本不一致抛 SessionVersionConflict。
+        """
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        """删除会话（面试结束）"""
+
+    @abstractmethod
+    def lock(self, session_id: str) -> SessionLock:
+        """返回该会话的互斥锁（未 acquire）"""
+
+    @abstractmethod
+    def session_ids(self) -> List[str]:
+        """当前存储中的全部 session_id"""
+
+
+# ============================================================
+# 进程内实现（默认）
+# ============================================================
+
+class _ThreadSessionLock:
+    """带超时的进程内会话锁（可由不同线程 acquire / release）"""
+
+    def __init__(self, lock: threading.Lock, timeout: float):
+        self._lock = lock
+        self._timeout = timeout
+
+    def acquire(self) -> bool:
+        return self._lock.acquire(timeout=self._timeout)
+
+    def release(self) -> None:
+        try:
+            self._lock.release()
+        except RuntimeError:
+            pass
+
+
+class InMemorySessionStore(SessionStore):
+    """进程内会话存储：保存活对象本身（无序列化），单 worker 部署使用"""
+
+    shared = False
+
+    def __init__(self, lock_timeout: float = 30.0):
+        self.lock_timeout = lock_timeout
+        self._sessions: Dict[str, InterviewSession] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def load(self, session_id: str, coordinator=None) -> Optional[InterviewSession]:
+        return self._sessions.get(session_id)
+
+    def save(self, session: InterviewSession, *, include_static: bool = False) -> int:
+        with self._guard:
+            current = self._sessions.get(session.session_id)
+            current_version = current.store_version if current is not None else None
+            if (
+                session.store_version is not None
+                and current is not None
+                and current is not session
+                and current_version != session.store_version
+            ):
+                raise SessionVersionConflict(
+                    f"session {session.session_id}: expected v{session.store_version}, found v{current_version}"
+                )
+            session.store_version = (session.store_version or 0) + 1
+            self._sessions[session.session_id] = session
+            return session.store_version
+
+    def delete(self, session_id: str) -> None:
+        with self._guard:
+            self._sessions.pop(session_id, None)
+            self._locks.pop(session_id, None)
+
+    def lock(self, session_id: str) -> SessionLock:
+        with self._guard:
+            lock = self._locks.setdefault(session_id, threading.Lock())
+        return _ThreadSessionLock(lock, self.lock_timeout)
+
+    def session_ids(self) -> List[str]:
+        return list(self._sessions)
+
+
+# ============================================================
+# Redis 实现
+# ============================================================
+
+def encode_state(state: Dict[str, Any]) -> bytes:
+    """msgpack + zlib 紧凑编码（datetime 编为 RFC 3339 字符串）"""
+    return zlib.compress(ormsgpack.packb(state, default=str), 6)
+
+
+def decode_state(payload: bytes) -> Dict[str, Any]:
+    return ormsgpack.unpackb(zlib.decompress(payload))
+
+
+class _RedisSessionLock:
+    """SET NX PX 令牌锁；释放时用 WATCH 事务校验令牌，避免误删他人在锁过期后获得的锁"""
+
+    def __init__(self, client, key: str, ttl_ms: int, wait_timeout: float, poll_interval: float = 0.05):
+        self._client = client
+        self._key = key
+        self._ttl_ms = ttl_ms
+        self._wait_timeout = wait_timeout
+        self._poll_interval = poll_interval
+        self._token = uuid.uuid4().hex
+
+    def acquire(self) -> bool:
+        deadline = time.monotonic() + self._wait_timeout
+        while True:
+            if self._client.set(self._key, self._token, nx=True, px=self._ttl_ms):
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(self._poll_interval)
+
+    def release(self) -> None:
+        from redis.exceptions import WatchError
+
+        with self._client.pipeline() as pipe:
+            try:
+                pipe.watch(self._key)
+                if pipe.get(self._key) != self._token.encode():
+                    pipe.unwatch()
+                    return
+                pipe.multi()
+                pipe.delete(self._key)
+                pipe.execute()
+            except WatchError:
+                # 令牌在 WATCH 后被改写 → 锁已不属于本 worker
+                pass
+
+
+class RedisSessionStore(SessionStore):
+    """Redis 会话存储：多 worker 共享，按 version 做 compare-and-set"""
+
+    shared = True
+
+    def __init__(
+        self,
+        client,
+        *,
+        key_prefix: str = "interview:session:",
+        ttl_seconds: int = 6 * 3600,
+        lock_ttl_ms: int = 180_000,
+        lock_wait_timeout: float = 30.0,
+    ):
+        self._client = client
+        self.key_prefix = key_prefix
+        self.ttl_seconds = ttl_seconds
+        self.lock_ttl_ms = lock_ttl_ms
+        self.lock_wait_timeout = lock_wait_timeout
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisSessionStore":
+        import redis
+
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.key_prefix}{session_id}"
+
+    def load(self, session_id: str, coordinator=None) -> Optional[InterviewSession]:
+        version, static, dynamic = self._client.hmget(
+            self._key(session_id), "version", "static", "dynamic"
+        )
+        if static is None or dynamic is None:
+            return None
+        session = InterviewSession.from_state(
+            decode_state(static), decode_state(dynamic), coordinator=coordinator
+        )
+        session.store_version = int(version)
+        return session
+
+    def save(self, session: InterviewSession, *, include_static: bool = False) -> int:
+        from redis.exceptions import WatchError
+
+        key = self._key(session.session_id)
+        # 首次写入（store_version 为 None）必须带上静态部分
+        write_static = include_static or session.store_version is None
+        fields = {"dynamic": encode_state(session.dynamic_state())}
+        if write_static:
+            fields["static"] = encode_state(session.static_state())
+
+        with self._client.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                current = pipe.hget(key, "version")
+                current_version = int(current) if current is not None else None
+                if session.store_version is not None and current_version != session.store_version:
+                    pipe.unwatch()
+                    raise SessionVersionConflict(
+                        f"session {session.session_id}: expected v{session.store_version}, found v{current_version}"
+                    )
+                new_version = (current_version or 0) + 1
+                pipe.multi()
+                pipe.hset(key, mapping={**fields, "version": new_version})
+                pipe.expire(key, self.ttl_seconds)
+                pipe.execute()
+            except WatchError:
+                raise SessionVersionConflict(f"session {session.session_id}: concurrent write") from None
+
+        session.store_version = new_version
+        return new_version
+
+    def delete(self, session_id: str) -> None:
+        self._client.delete(self._key(session_id))
+
+    def lock(self, session_id: str) -> SessionLock:
+        return _RedisSessionLock(
+            self._client, f"{self._key(session_id)}:lock", self.lock_ttl_ms, self.lock_wait_timeout
+        )
+
+    def session_ids(self) -> List[str]:
+        prefix_len = len(self.key_prefix)
+        ids = []
+        for raw in self._client.scan_iter(match=f"{self.key_prefix}*"):
+            key = raw.decode() if isinstance(raw, bytes) else raw
+            if not key.endswith(":lock"):
+                ids.append(key[prefix_len:])
+        return ids
+
+
+def create_session_store() -> SessionStore:
+    """按环境变量构造会话存储：INTERVIEW_SESSION_STORE_URL 设置时用 Redis，否则进程内"""
+    url = os.getenv(SESSION_STORE_URL_ENV)
+    if url:
+        logger.info("使用 RedisSessionStore（多 worker 共享会话）")
+        return RedisSessionStore.from_url(url)
+    return InMemorySessionStore()
@@ -0,0 +1,114 @@
+"""
+Speculative 出题统计 — 衡量「评分 ∥ 下题草稿」重叠执行的收益
+
+build_interview_graph(speculative=True) 时，retrieval + 下题草稿与 scoring 并行启动；
+readiness 判定 continue 且评分后难度档位与草稿所用档位一致时提交草稿，否则丢弃重生成。
+
+本模块只负责记账：
+- 草稿结局计数（committed / band_mismatch / finalized / failed）→ 胜率
+- 每轮端到端耗时（按 sequential / speculative 分桶）→ p50 / p95
+- 提交草稿时省下的下题生成耗时 → p50 / p95
+
+指标：interview_speculation_outcome_total{outcome}；抓取时合并本进程全部 SpeculationStats 的窗口，
+导出 interview_speculation_win_rate / interview_speculation_turn_ms{mode,quantile} /
+interview_speculation_saved_ms{quantile}（见 metrics.py）
+"""
+
+from __future__ import annotations
+
+import threading
+import weakref
+from collections import deque
+from typing import Any, Deque, Dict, List
+
+from interview import metrics
+
+from .utils import percentile
+
+# 草稿结局
+OUTCOME_COMMITTED = "committed"          # 草稿被提交为下一题
+OUTCOME_BAND_MISMATCH = "band_mismatch"  # 评分后难度档位变化 → 丢弃并重生成
+OUTCOME_FINALIZED = "finalized"          # readiness 判定结束面试 → 草稿作废
+OUTCOME_FAILED = "failed"                # 草稿生成异常 → 回退顺序路径
+
+_OUTCOMES = (OUTCOME_COMMITTED, OUTCOME_BAND_MISMATCH, OUTCOME_FINALIZED, OUTCOME_FAILED)
+
+# 本进程存活的 SpeculationStats（每个 coordinator 一个），供指标抓取时合并
+_instances: "weakref.WeakSet[SpeculationStats]" = weakref.WeakSet()
+
+
+class SpeculationStats:
+    """speculative 出题的进程内统计（线程安全，滑动窗口）"""
+
+    def __init__(self, window: int = 512):
+        self._lock = threading.Lock()
+        self._outcomes: Dict[str, int] = {k: 0 for k in _OUTCOMES}
+        self._turn_ms: Dict[str, Deque[float]] = {
+            "sequential": deque(maxlen=window),
+            "speculative": deque(maxlen=window),
+        }
+        self._saved_ms: Deque[float] = deque(maxlen=window)
+        _instances.add(self)
+
+    def record_outcome(self, outcome: str, saved_ms: float = 0.0) -> None:
+        """记录一次草稿结局；committed 时 saved_ms 为被重叠掉的下题生成耗时"""
+        with self._lock:
+            self._outcomes[outcome] = self._outcomes.get(outcome, 0) + 1
+            if outcome == OUTCOME_COMMITTED:
+                self._saved_ms.append(max(0.0, float(saved_ms)))
+        metrics.speculation_outcome(outcome)
+
+    def record_turn(self, elapsed_ms: float, *, speculative: bool) -> None:
+        """记录一轮（continue 路径）从 security 开始到下题产出的耗时"""
+        key = "speculative" if speculative else "sequential"
+        with self._lock:
+            self._turn_ms[key].append(float(elapsed_ms))
+
+    def _raw(self):
+        with self._lock:
+            return dict(self._outcomes), {k: list(v) for k, v in self._turn_ms.items()}, list(self._saved_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return _summarize(*self._raw())
+
+
+def speculation_report() -> Dict[str, Any]:
+    """合并本进程全部 SpeculationStats 的窗口（指标抓取时调用）"""
+    outcomes: Dict[str, int] = {k: 0 for k in _OUTCOMES}
+    turn_ms: Dict[str, List[float]] = {"sequential": [], "speculative": []}
+    saved_ms: List[float] = []
+    for stats in list(_instances):
+        o, t, saved = stats._raw()
+        for k, v in o.items():
+            outcomes[k] = outcomes.get(k, 0) + v
+        for k, v in t.items():
+            turn_ms.setdefault(k, []).extend(v)
+        saved_ms.extend(saved)
+    return _summarize(outcomes, turn_ms, saved_ms)
+
+
+def _summarize(outcomes: Dict[str, int], turn_ms: Dict[str, List[float]], saved_ms: List[float]) -> Dict[str, Any]:
+    attempts = sum(outcomes.values())
+    # finalized 轮次不需要下题，不计入胜率分母
+    contested = attempts - outcomes.get(OUTCOME_FINALIZED, 0)
+    return {
+        "attempts": attempts,
+        "outcomes": outcomes,
+        "win_rate": round(outcomes[OUTCOME_COMMITTED] / contested, 4) if contested else 0.0,
+        "turn_ms": {
+            k: {
+                "count": len(v),
+                "p50": round(percentile(v, 50), 1),
+                "p95": round(percentile(v, 95), 1),
+            }
+            for k, v in turn_ms.items()
+        },
+        "saved_ms": {
+            "count": len(saved_ms),
+            "p50": round(percentile(saved_ms, 50), 1),
+            "p95": round(percentile(saved_ms, 95), 1),
+        },
+    }
+
+
+metrics.track_speculation(speculation_report)
@@ -13,9 +13,10 @@ from __future__ import annotations
 import json
 import logging
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from .base_agent import BaseAgent
+from .context_budget import ContextBuilder, count_tokens
 from .schemas import DecisionEvidence, SummaryOutput
 from .utils import validate_quote_in_answer
 
@@ -26,6 +27,9 @@ _BOUNDARY_BANDS = [(4.5, 5.5), (6.5, 7.5), (8.0, 9.0)]
 # overall_score 与 qa_history mean 的容忍偏差（P0-2）
 _OVERALL_SCORE_TOLERANCE = 0.5
 
+# 报告中简历（紧凑 JSON）的 token 上限，替代旧的 indent=2 JSON 前 2000 字符
+_RESUME_MAX_TOKENS = 800
+
 
 def _is_boundary_score(score: float) -> bool:
     return any(lo <= score <= hi for lo, hi in _BOUNDARY_BANDS)
@@ -107,6 +111,8 @@ class SummaryAgent(BaseAgent):
 
     prompt_name = "summary_agent"
     output_schema = SummaryOutput
+    # human message 总 token 预算（含模板固定文本）
+    context_budget_tokens = 6000
 
     def __init__(self, model):
         super().__init__(model, "SummaryAgent")
@@ -136,11 +142,10 @@ class SummaryAgent(BaseAgent):
                 candidate_name, input_data.get("termination_reason", ""), qa_history
             )
 
-        # 构建详细面试报告（注入 human_template）
-        interview_report = self._build_interview_report(
+        # 构建面试报告 + 逐轮历史（按 token 预算，注入 human_template）
+        interview_report, turn_history = self._build_interview_report(
             candidate_name, resume_data, qa_history, average_score, security_summary
         )
-        turn_history = _extract_turn_history_text(qa_history)
         avg_agreement = _avg_agreement(qa_history)
         any_fallback = _any_fallback(qa_history)
         pre_detected_boundary = _is_boundary_score(float(average_score))
@@ -177,64 +182,46 @@ class SummaryAgent(BaseAgent):
         qa_history: List[Dict[str, Any]],
         average_score: float,
         security_summary: Dict[str, Any],
-    ) -> str:
-        """构建详细的面试报告（v4 单分制版）"""
-        report_parts: List[str] = []
-
-        report_parts.append(f"候选人: {candidate_name}")
-        report_parts.append(f"面试时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        report_parts.append(f"总题目数: {len(qa_history)}")
-        report_parts.append(f"平均分: {average_score:.2f}/10")
+    ) -> Tuple[str, str]:
+        """按 token 预算构建 (interview_report, turn_history)
 
+        turn_history 是 decision_evidence 的引用来源，优先级仅次于概览；报告中的逐题记录
+        与 turn_history 重复的行（问题 / 回答 / 考察方向 / 证据）由 ContextBuilder 去重，
+        只保留题型、难度、选题 / 评分理由以及超出 turn_history 截断长度的完整回答。
+        超出预算时依次收缩：简历 → 逐题记录 → 安全摘要。
+        """
+        fixed_tokens = count_tokens(self.prompt.format_human(
+            interview_report="", turn_history="", avg_agreement="1.00",
+            any_fallback="False", pre_detected_boundary="False",
+        ))
+        builder = ContextBuilder(self.name, self.context_budget_tokens - fixed_tokens)
+        builder.add("overview", self._overview_lines(candidate_name, qa_history, average_score), priority=0)
+        builder.add("turn_history", _extract_turn_history_text(qa_history), priority=1)
+        builder.add("security", self._security_lines(security_summary), priority=2)
+        builder.add("turns", self._turn_record_lines(qa_history), priority=3)
         if resume_data:
-            report_parts.append("\n=== 候选人背景 ===")
-            try:
-                resume_text = json.dumps(resume_data, ensure_ascii=False, indent=2)[:2000]
-            except Exception:
-                resume_text = str(resume_data)[:2000]
-            report_parts.append(f"简历信息: {resume_text}")
-
-        report_parts.append("\n=== 面试问答记录 ===")
-        for i, qa in enumerate(qa_history):
-            report_parts.append(f"\n--- 第{i + 1}题 (turn_index={i}) ---")
-            report_parts.append(f"问题: {qa.get('question', '未记录')}")
-
-            qd = qa.get("question_data")
-            if qd:
-                if isinstance(qd, dict):
-                    report_parts.append(f"问题类型: {qd.get('type', 'N/A')}")
-                    report_parts.append(f"难度等级: {qd.get('difficulty', 'N/A')}")
-                    if "reasoning" in qd:
-                        report_parts.append(f"选题原因: {qd['reasoning']}")
-
-            report_parts.append(f"回答: {qa.get('answer', '未记录')}")
-
-            sd = qa.get("score_details") or {}
-            score = sd.get("score", 0)
-            report_parts.append(f"得分: {score}/10")
-
-            evidence_quote = sd.get("evidence_quote", "")
-            question_focus = sd.get("question_focus", "")
-            if question_focus:
-                report_parts.append(f"考察方向: {question_focus}")
-            if evidence_quote:
-                report_parts.append(f"证据片段: {evidence_quote}")
-
-            if "reasoning" in sd:
-                report_parts.append(f"评分理由: {sd['reasoning']}")
-
-        if security_summary:
-            report_parts.append("\n=== 安全检测摘要 ===")
-            report_parts.append(f"总体风险等级: {security_summary.get('overall_risk', 'unknown')}")
-            report_parts.append(f"安全警报数量: {security_summary.get('total_alerts', 0)}")
-            if security_summary.get("security_alerts"):
-                report_parts.append("安全问题详情:")
-                for alert in security_summary["security_alerts"]:
-                    report_parts.append(
-                        f"  - 问题{alert.get('question_id', '?')}: {alert.get('issues', [])}"
-                    )
-
-        # 分数统计
+            builder.add_json("resume", resume_data, priority=4, max_tokens=_RESUME_MAX_TOKENS)
+        built = builder.build()
+
+        report_parts = [built.get("overview")]
+        if built.get("resume"):
+            report_parts.append(f"\n=== 候选人背景 ===\n简历信息: {built.get('resume')}")
+        if built.get("turns"):
+            report_parts.append(f"\n=== 面试问答记录（补充 turn_history）===\n{built.get('turns')}")
+        if built.get("security"):
+            report_parts.append(f"\n=== 安全检测摘要 ===\n{built.get('security')}")
+        return "\n".join(report_parts), built.get("turn_history", "(no turns recorded)")
+
+    @staticmethod
+    def _overview_lines(
+        candidate_name: str, qa_history: List[Dict[str, Any]], average_score: float
+    ) -> List[str]:
+        lines = [
+            f"候选人: {candidate_name}",
+            f"面试时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            f"总题目数: {len(qa_history)}",
+            f"平均分: {average_score:.2f}/10",
+        ]
         scores = []
         for qa in qa_history:
             sd = qa.get("score_details") or {}
@@ -242,18 +229,52 @@ class SummaryAgent(BaseAgent):
             if isinstance(s, (int, float)) and s > 0:
                 scores.append(int(s))
         if scores:
-            report_parts.append("\n=== 分数统计 ===")
-            report_parts.append(f"最高分: {max(scores)}/10")
-            report_parts.append(f"最低分: {min(scores)}/10")
-            report_parts.append(f"平均分: {sum(scores)/len(scores):.2f}/10")
             high_scores = sum(1 for s in scores if s >= 7)
             medium_scores = sum(1 for s in scores if 4 <= s < 7)
             low_scores = sum(1 for s in scores if s < 4)
-            report_parts.append(f"高分题目(≥7分): {high_scores}题")
-            report_parts.append(f"中等题目(4-6分): {medium_scores}题")
-            report_parts.append(f"低分题目(<4分): {low_scores}题")
+            lines.append(
+                f"分数统计: 最高 {max(scores)}/10, 最低 {min(scores)}/10, 均分 {sum(scores)/len(scores):.2f}/10; "
+                f"高分(≥7) {high_scores} 题, 中等(4-6) {medium_scores} 题, 低分(<4) {low_scores} 题"
+            )
+        return lines
+
+    @staticmethod
+    def _turn_record_lines(qa_history: List[Dict[str, Any]]) -> List[str]:
+        lines: List[str] = []
+        for i, qa in enumerate(qa_history):
+            lines.append(f"--- 第{i + 1}题 (turn_index={i}) ---")
+            lines.append(f"问题: {qa.get('question', '未记录')}")
 
-        return "\n".join(report_parts)
+            qd = qa.get("question_data")
+            if isinstance(qd, dict):
+                lines.append(f"问题类型: {qd.get('type', 'N/A')} / 难度等级: {qd.get('difficulty', 'N/A')}")
+                if "reasoning" in qd:
+                    lines.append(f"选题原因: {qd['reasoning']}")
+
+            lines.append(f"回答: {qa.get('answer', '未记录')}")
+
+            sd = qa.get("score_details") or {}
+            if sd.get("question_focus"):
+                lines.append(f"考察方向: {sd['question_focus']}")
+            if sd.get("evidence_quote"):
+                lines.append(f"证据片段: {sd['evidence_quote']}")
+            if "reasoning" in sd:
+                lines.append(f"评分理由: {sd['reasoning']}")
+        return lines
+
+    @staticmethod
+    def _security_lines(security_summary: Dict[str, Any]) -> List[str]:
+        if not security_summary:
+            return []
+        lines = [
+            f"总体风险等级: {security_summary.get('overall_risk', 'unknown')}",
+            f"安全警报数量: {security_summary.get('total_alerts', 0)}",
+        ]
+        if security_summary.get("security_alerts"):
+            lines.append("安全问题详情:")
+            for alert in security_summary["security_alerts"]:
+                lines.append(f"  - 问题{alert.get('question_id', '?')}: {alert.get('issues', [])}")
+        return lines
 
     # ------------------------------------------------------------
     # Post-validation：强制 boundary / review 一致性
@@ -4,6 +4,7 @@ Agent 共享工具函数
 模块级函数，供多个 agent 复用：
 - validate_quote_in_answer：fuzzy match 验证 evidence quote 是否出现在 answer 中
 - normalize_text：归一化文本（去标点、空白、转小写）
+- percentile：nearest-rank 分位数（延迟统计：speculation / hedging / early_exit / checkpoint / benchmarks）
 
 提取自 ScoringAgent，目的是让 SummaryAgent 也能用同一套校验逻辑（保持 quote 校验
 策略一致），避免「ScoringAgent quote 严格但 SummaryAgent answer_snippet 宽松」的
@@ -12,7 +13,9 @@ Agent 共享工具函数
 
 from __future__ import annotations
 
+import math
 import re
+from typing import Iterable, List
 
 # --- 常量（与 ScoringAgent 中的保持一致） ---
 
@@ -95,3 +98,13 @@ def validate_quote_in_answer(quote: str, answer: str) -> bool:
         return False
     recall = len(ngrams_q & ngrams_a) / len(ngrams_q)
     return recall >= _QUOTE_RECALL_MIN
+
+
+def percentile(values: Iterable[float], q: float) -> float:
+    """nearest-rank 分位数；空序列返回 0.0"""
+    data: List[float] = sorted(values)
+    if not data:
+        return 0.0
+    q = min(max(q, 0.0), 100.0)
+    rank = max(1, math.ceil(q / 100.0 * len(data)))
+    return data[min(rank, len(data)) - 1]
@@ -0,0 +1,3 @@
+"""
+离线性能基准脚本（python -m interview.benchmarks.<name> 运行，不参与单测）
+"""
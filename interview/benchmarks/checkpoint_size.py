@@ -0,0 +1,166 @@
+"""
+LangGraph checkpoint 体积基准：full（旧 state + JsonPlus） vs slim（瘦身 state + msgpack/zstd）
+
+用真实 InterviewSession 与 graph 拓扑跑一场多轮面试（agent 均为固定返回的 mock，
+简历画像 / 回答文本按真实量级填充），每轮统计：
+- 写入 checkpoint 的字节数与写入次数（MeteredSerializer 计量）
+- 单轮 graph 耗时（含序列化；MemorySaver 无网络往返，Mongo 下字节差异还会放大为 I/O 差异）
+
+最后一轮走 finalize_normal 路径（summary 写入 state 的 full 模式会额外多一份大对象）。
+
+运行：
+  uv run python -m interview.benchmarks.checkpoint_size --turns 6
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from typing import Any, Dict, List
+from unittest.mock import AsyncMock, MagicMock
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from interview.agents.checkpoint import (
+    CHECKPOINT_MODES,
+    checkpoint_turn_meter,
+    create_checkpoint_serializer,
+)
+from interview.agents.graph import build_interview_graph, initial_graph_state
+from interview.agents.session import InterviewSession
+from interview.agents.utils import percentile
+
+_ANSWER = "我先用归纳法证明命题对 n=1 成立，再假设对 n=k 成立推出 n=k+1 的情形。" * 8
+
+
+def _profile() -> Dict[str, Any]:
+    items = [
+        {
+            "id": f"p{i}",
+            "category": "competition" if i % 2 else "project",
+            "summary": f"第 {i} 段经历：负责数据管道与模型评估，使用 Python / SQL，带领 4 人小组完成交付。" * 2,
+            "evidence": [f"证据 {j}：量化指标提升 {j * 3}%" for j in range(4)],
+        }
+        for i in range(12)
+    ]
+    return {"items": items, "overall_level": "intermediate"}
+
+
+def _agents(turns: int) -> Dict[str, Any]:
+    security_agent = MagicMock()
+    security_agent.aprocess = AsyncMock(return_value={
+        "is_safe": True, "risk_level": "low", "suggested_action": "continue",
+        "detected_issues": [], "reasoning": "正常作答",
+    })
+
+    scoring_agent = MagicMock()
+    scoring_agent.aprocess = AsyncMock(return_value={
+        "score": 7, "evidence_quote": _ANSWER[:60], "question_focus": "数学归纳",
+        "agreement": 0.9, "confidence_level": "high", "requires_human_review": False,
+        "fallback_used": False, "reasoning": "论证完整，步骤清晰。" * 10,
+    })
+    # 最后一轮判定 ready → finalize_normal
+    scoring_agent.evaluate_interview_readiness = MagicMock(
+        side_effect=lambda history, min_questions=4: {
+            "ready": len(history) >= turns, "reason": "...", "recommendation": "continue",
+        }
+    )
+
+    question_generator = MagicMock()
+    question_generator.aprocess = AsyncMock(return_value={
+        "question": "请证明任意大于 1 的整数都可以分解为质数的乘积，并讨论唯一性。",
+        "type": "math_logic", "difficulty": "medium", "reasoning": "考察严谨性。" * 10,
+    })
+
+    summary_agent = MagicMock()
+    summary_agent.aprocess = AsyncMock(return_value={
+        "final_grade": "B", "final_decision": "accept", "overall_score": 7.0,
+        "summary": "候选人论证清晰。" * 40, "overall_analysis": "整体表现稳定。" * 60,
+        "decision_evidence": [f"第 {i} 轮证据" * 5 for i in range(turns)],
+        "boundary_case": False, "decision_confidence": "high", "requires_human_review": False,
+    })
+
+    memory_store = MagicMock()
+    memory_store.save_turn = MagicMock(return_value=True)
+    memory_store.update_session_status = MagicMock(return_value=True)
+
+    retrieval_system = MagicMock()
+    retrieval_system.save_interview_result = MagicMock(return_value=True)
+
+    memory_retriever = MagicMock()
+    memory_retriever.retrieve_similar_cases = MagicMock(return_value=[])
+    memory_retriever.format_cases_for_question_generation = MagicMock(return_value="")
+
+    return {
+        "security_agent": security_agent,
+        "scoring_agent": scoring_agent,
+        "question_generator": question_generator,
+        "summary_agent": summary_agent,
+        "memory_store": memory_store,
+        "memory_retriever": memory_retriever,
+        "retrieval_system": retrieval_system,
+    }
+
+
+async def _run_mode(mode: str, turns: int) -> Dict[str, Any]:
+    session = InterviewSession("bench", "alice", {"name": "alice"}, coordinator=None)
+    session.parsed_profile = _profile()
+    session.current_question = {"question": "请证明根号 2 是无理数。", "type": "math_logic", "difficulty": "medium"}
+    session.question_data = session.current_question
+
+    serde = create_checkpoint_serializer(mode)
+    graph = build_interview_graph(
+        **_agents(turns),
+        interview_session_provider=lambda sid: session,
+        question_verifier=None,
+        checkpointer=MemorySaver(serde=serde),
+        checkpoint_mode=mode,
+    )
+    config = {"configurable": {"thread_id": "bench"}}
+
+    bytes_per_turn: List[int] = []
+    writes_per_turn: List[int] = []
+    turn_ms: List[float] = []
+    for _ in range(turns):
+        start = time.perf_counter()
+        with checkpoint_turn_meter() as meter:
+            await graph.ainvoke(initial_graph_state(session, _ANSWER, mode), config=config)
+        turn_ms.append((time.perf_counter() - start) * 1000)
+        bytes_per_turn.append(meter[0])
+        writes_per_turn.append(meter[1])
+
+    return {
+        "mode": mode,
+        "bytes_per_turn": bytes_per_turn,
+        "mean_bytes": sum(bytes_per_turn) / len(bytes_per_turn),
+        "writes_per_turn": sum(writes_per_turn) / len(writes_per_turn),
+        "turn_ms_p50": percentile(turn_ms, 50),
+        "turn_ms_p95": percentile(turn_ms, 95),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--turns", type=int, default=6)
+    args = parser.parse_args(argv)
+
+    results = [asyncio.run(_run_mode(mode, args.turns)) for mode in CHECKPOINT_MODES]
+
+    header = f"{'mode':<8}{'mean B/turn':>13}{'writes/turn':>13}{'p50 ms':>9}{'p95 ms':>9}  bytes per turn"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['mode']:<8}{r['mean_bytes']:>13.0f}{r['writes_per_turn']:>13.1f}"
+            f"{r['turn_ms_p50']:>9.2f}{r['turn_ms_p95']:>9.2f}  {r['bytes_per_turn']}"
+        )
+    full, slim = results
+    print(f"\nslim / full bytes: {slim['mean_bytes'] / full['mean_bytes']:.1%}；"
+          f"p50 delta: {slim['turn_ms_p50'] - full['turn_ms_p50']:+.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+WebSocket connect 开销基准：每连接独立 coordinator（before） vs 进程共享 coordinator（after）
+
+模拟 N 个并发连接依次建立并保持存活，每次 connect 取得 coordinator：
+- per_connection：MultiAgentCoordinator(...) + 首答时的 LangGraph 编译（旧 consumer 行为）
+- shared：registry.get_shared_coordinator(...)（新 consumer 行为）
+
+输出每种模式的 connect 延迟 p50/p95/max 与每 100 连接的 RSS 增量。
+每种模式在独立子进程中运行，保证 RSS 互不干扰。
+
+默认用 LangGraph MemorySaver 代替 MongoDBSaver（无需可达的 MongoDB；
+MongoDBSaver 构造还会额外付出建索引往返，真实 before 数字只会更差）。
+--checkpointer mongo 时使用真实 MONGODB_URI。
+
+运行：
+  uv run python -m interview.benchmarks.connect_latency --connections 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+# 模型 / MongoClient 构造均为惰性连接，占位配置即可完成 connect 路径
+_BENCH_ENV = {
+    "MONGODB_URI": "mongodb://127.0.0.1:27017",
+    "MONGODB_DB": "interview_bench",
+    "GPT_API_KEY": "bench",
+    "ALIYUN_API_KEY": "bench",
+    "DOUBAO_API_KEY": "bench",
+    "KIMI_API_KEY": "bench",
+}
+
+MODES = ("per_connection", "shared")
+
+
+def _rss_kb() -> int:
+    """当前进程常驻内存（KB）；非 Linux 退化为峰值 RSS"""
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _run_mode(mode: str, connections: int, checkpointer: str) -> Dict[str, Any]:
+    for key, value in _BENCH_ENV.items():
+        os.environ.setdefault(key, value)
+
+    from interview.agents import coordinator as coordinator_module
+    from interview.agents.coordinator import MultiAgentCoordinator
+    from interview.agents.registry import get_shared_coordinator
+    from interview.agents.utils import percentile
+    from interview.consumers import COORDINATOR_GRAPH_OPTIONS
+    from interview.llm import COORDINATOR_MODELS
+
+    if checkpointer == "memory":
+        from langgraph.checkpoint.memory import MemorySaver
+        coordinator_module.create_mongo_checkpointer = MemorySaver
+
+    def connect():
+        if mode == "shared":
+            return get_shared_coordinator(COORDINATOR_MODELS, COORDINATOR_GRAPH_OPTIONS)
+        coordinator = MultiAgentCoordinator(COORDINATOR_MODELS, graph_options=COORDINATOR_GRAPH_OPTIONS)
+        coordinator._ensure_graph()
+        return coordinator
+
+    rss_before = _rss_kb()
+    alive: List[Any] = []
+    latencies_ms: List[float] = []
+    for _ in range(connections):
+        start = time.perf_counter()
+        alive.append(connect())
+        latencies_ms.append((time.perf_counter() - start) * 1000)
+    rss_after = _rss_kb()
+
+    steady = latencies_ms[1:] or latencies_ms
+    return {
+        "mode": mode,
+        "connections": connections,
+        "distinct_coordinators": len({id(c) for c in alive}),
+        "first_connect_ms": round(latencies_ms[0], 2),
+        "connect_ms": {
+            "p50": round(percentile(steady, 50), 3),
+            "p95": round(percentile(steady, 95), 3),
+            "max": round(max(steady), 3),
+        },
+        "rss_delta_mb": round((rss_after - rss_before) / 1024, 1),
+        "rss_delta_mb_per_100": round((rss_after - rss_before) / 1024 * 100 / connections, 1),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--connections", type=int, default=100)
+    parser.add_argument("--checkpointer", choices=("memory", "mongo"), default="memory")
+    parser.add_argument("--mode", choices=MODES, help="仅运行单一模式（子进程内部使用）")
+    args = parser.parse_args(argv)
+
+    if args.mode:
+        print(json.dumps(_run_mode(args.mode, args.connections, args.checkpointer)))
+        return 0
+
+    results = []
+    for mode in MODES:
+        proc = subprocess.run(
+            [sys.executable, "-m", "interview.benchmarks.connect_latency",
+             "--mode", mode, "--connections", str(args.connections),
+             "--checkpointer", args.checkpointer],
+            capture_output=True, text=True, check=True,
+        )
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    header = f"{'mode':<16}{'coordinators':>13}{'first ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'RSS MB/100':>12}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['mode']:<16}{r['distinct_coordinators']:>13}{r['first_connect_ms']:>10.1f}"
+            f"{r['connect_ms']['p50']:>10.3f}{r['connect_ms']['p95']:>10.3f}{r['rss_delta_mb_per_100']:>12.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
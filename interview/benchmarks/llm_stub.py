@@ -0,0 +1,406 @@
+"""
+OpenAI 兼容的本地 LLM 桩服务（压测 / 回放基准用）
+
+覆盖面试链路实际调用的三个端点（base_url 指向 http://HOST:PORT/v1）：
+- POST /v1/chat/completions：
+    response_format=json_schema（with_structured_output）→ 按 schema 生成合法 JSON
+    tool_choice 指定函数 → 返回该函数的 tool_call；否则返回短文本（不触发出题工具循环）
+    stream=true → SSE 分块输出（支持 stream_options.include_usage）
+    usage.prompt_tokens_details.cached_tokens 模拟 provider 前缀缓存：≥1024 token 的 prompt
+    按 128 token 块比对同一模型见过的前缀（与 OpenAI 自动缓存的粒度一致）
+- POST /v1/embeddings：随机单位向量（dimensions 取请求值，默认 1024）
+- POST /v1/moderations：flagged=false
+- GET  /stats：按端点统计请求数 / 注入错误数，以及累计 TCP 连接数（体现连接复用）
+
+延迟分布（--latency / --embedding-latency）：
+  fixed:MS | uniform:MIN_MS,MAX_MS | lognormal:MEDIAN_MS,SIGMA
+--error-rate 按比例返回 500（OpenAI SDK 自带重试，与真实 provider 抖动一致）。
+
+运行：
+  uv run python -m interview.benchmarks.llm_stub --port 18080 --latency lognormal:900,0.4 --error-rate 0.01
+启动后第一行输出实际监听的 base_url。
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+LatencySampler = Callable[[random.Random], float]
+
+# 粗略按 3 字符 / token 估算；前缀缓存的最小长度与块大小
+_CHARS_PER_TOKEN = 3
+_CACHE_MIN_TOKENS = 1024
+_CACHE_BLOCK_TOKENS = 128
+
+_TEXT_BY_FIELD = {
+    "question": "请证明：任意 n 个整数中必有若干个数之和能被 n 整除，并说明你的思路。",
+    "reasoning": "回答给出了关键步骤，论证基本完整，个别细节缺少说明。",
+    "summary": "候选人基础扎实，推理清晰，表达有条理。",
+    "evidence_quote": "归纳",
+}
+
+
+def parse_latency(spec: str) -> LatencySampler:
+    """解析延迟分布描述，返回「rng → 秒」的采样函数"""
+    kind, _, args = spec.partition(":")
+    try:
+        values = [float(v) for v in args.split(",") if v.strip()]
+    except ValueError:
+        values = []
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0] / 1000
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == "lognormal" and len(values) == 2 and values[0] > 0:
+        mu, sigma = math.log(values[0] / 1000), values[1]
+        return lambda rng: rng.lognormvariate(mu, sigma)
+    raise ValueError(f"无法解析的延迟分布: {spec!r}（fixed:MS / uniform:MIN,MAX / lognormal:MEDIAN,SIGMA）")
+
+
+# ============================================================
+# JSON schema → 示例实例
+# ============================================================
+
+def sample_from_schema(schema: Dict[str, Any], rng: random.Random, defs: Optional[Dict[str, Any]] = None,
+                       field: str = "") -> Any:
+    """按 JSON schema 生成一个满足约束的实例（覆盖 pydantic 导出的常见结构）"""
+    defs = defs if defs is not None else schema.get("$defs", {})
+    if "$ref" in schema:
+        return sample_from_schema(defs[schema["$ref"].rsplit("/", 1)[-1]], rng, defs, field)
+    for key in ("anyOf", "oneOf"):
+        if key in schema:
+            options = [s for s in schema[key] if s.get("type") != "null"] or schema[key]
+            return sample_from_schema(options[0], rng, defs, field)
+    if "allOf" in schema:
+        return sample_from_schema(schema["allOf"][0], rng, defs, field)
+    if "const" in schema:
+        return schema["const"]
+    if "enum" in schema:
+        return schema["enum"][0]
+    if schema.get("default") is not None:
+        return schema["default"]
+
+    kind = schema.get("type", "string")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+    if kind == "object":
+        return {
+            name: sample_from_schema(prop, rng, defs, name)
+            for name, prop in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        count = max(schema.get("minItems", 1), 1)
+        count = min(count, schema.get("maxItems", count))
+        return [sample_from_schema(schema.get("items", {}), rng, defs, field) for _ in range(count)]
+    if kind in ("integer", "number"):
+        low = schema.get("minimum", schema.get("exclusiveMinimum", 0))
+        high = schema.get("maximum", schema.get("exclusiveMaximum", max(low, 10)))
+        value = rng.uniform(low, high) if low < high else low
+        if kind == "integer":
+            return max(math.ceil(low), min(math.floor(high), round(value)))
+        return round(value, 3)
+    if kind == "boolean":
+        return field.startswith(("is_", "passed", "ready"))
+    if kind == "null":
+        return None
+
+    text = _TEXT_BY_FIELD.get(field, f"{field or 'text'}（stub）")
+    min_length = schema.get("minLength", 0)
+    if len(text) < min_length:
+        text = (text * (min_length // max(len(text), 1) + 1))[:max(min_length, len(text))]
+    if "maxLength" in schema:
+        text = text[:schema["maxLength"]]
+    return text
+
+
+# ============================================================
+# 桩服务
+# ============================================================
+
+class LLMStub:
+    """OpenAI 兼容桩：单 event loop 上的最小 HTTP/1.1 服务（keep-alive + chunked SSE）"""
+
+    def __init__(
+        self,
+        latency: LatencySampler,
+        embedding_latency: LatencySampler,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.embedding_latency = embedding_latency
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.requests: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.connections = 0
+        self._prefixes: set = set()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> Tuple[asyncio.AbstractServer, str]:
+        server = await asyncio.start_server(self._handle, host, port)
+        bound_port = server.sockets[0].getsockname()[1]
+        return server, f"http://{host}:{bound_port}/v1"
+
+    # ------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers: Dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length") or 0)
+                body = json.loads(await reader.readexactly(length)) if length else {}
+                await self._dispatch(method, target.split("?", 1)[0], body, writer)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _send_json(writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: keep-alive\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+
+    async def _dispatch(self, method: str, path: str, body: Dict[str, Any], writer) -> None:
+        if method == "GET" and path.endswith("/stats"):
+            await self._send_json(writer, 200, {
+                "requests": dict(self.requests), "errors": dict(self.errors), "connections": self.connections,
+            })
+            return
+        route = path.rstrip("/").rsplit("/", 1)[-1]
+        if route == "completions":
+            route = "chat"
+        self.requests[route] += 1
+        if route not in ("chat", "embeddings", "moderations"):
+            await self._send_json(writer, 404, {"error": {"message": f"unknown route {path}"}})
+            return
+
+        sampler = self.embedding_latency if route != "chat" else self.latency
+        delay = sampler(self.rng)
+        if self.rng.random() < self.error_rate:
+            self.errors[route] += 1
+            await asyncio.sleep(delay * self.rng.random())
+            await self._send_json(writer, 500, {"error": {"message": "stub injected error", "type": "server_error"}})
+            return
+
+        if route == "embeddings":
+            await asyncio.sleep(delay)
+            await self._send_json(writer, 200, self._embeddings(body))
+        elif route == "moderations":
+            await asyncio.sleep(delay)
+            await self._send_json(writer, 200, self._moderation(body))
+        elif body.get("stream"):
+            await self._stream_chat(body, delay, writer)
+        else:
+            await asyncio.sleep(delay)
+            await self._send_json(writer, 200, self._chat(body))
+
+    # ------------------------------------------------------------
+    # 端点
+    # ------------------------------------------------------------
+
+    def _reply(self, body: Dict[str, Any]) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """返回 (content, tool_call)"""
+        tool_choice = body.get("tool_choice")
+        if isinstance(tool_choice, dict) and tool_choice.get("type") == "function":
+            name = tool_choice["function"]["name"]
+            tool = next(t for t in body.get("tools", []) if t["function"]["name"] == name)
+            args = sample_from_schema(tool["function"].get("parameters", {}), self.rng)
+            return None, {
+                "id": f"call_{uuid.uuid4().hex[:12]}", "type": "function",
+                "function": {"name": name, "arguments": json.dumps(args, ensure_ascii=False)},
+            }
+        response_format = body.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            schema = response_format["json_schema"].get("schema", {})
+            return json.dumps(sample_from_schema(schema, self.rng), ensure_ascii=False), None
+        if response_format.get("type") == "json_object":
+            return "{}", None
+        return "好的。", None
+
+    def _cached_tokens(self, model: str, prompt: str) -> int:
+        """与此前请求逐块一致的前缀 token 数（并记录本次 prompt 的全部前缀块）"""
+        block = _CACHE_BLOCK_TOKENS * _CHARS_PER_TOKEN
+        digest = hashlib.sha1(model.encode("utf-8"))
+        cached, matching = 0, True
+        for start in range(0, len(prompt) - block + 1, block):
+            digest.update(prompt[start:start + block].encode("utf-8"))
+            key = digest.hexdigest()
+            if matching and key in self._prefixes:
+                cached += _CACHE_BLOCK_TOKENS
+            else:
+                matching = False
+                self._prefixes.add(key)
+        return cached if cached >= _CACHE_MIN_TOKENS else 0
+
+    def _usage(self, body: Dict[str, Any], completion: str) -> Dict[str, Any]:
+        prompt = json.dumps(body.get("messages", []), ensure_ascii=False)
+        prompt_tokens = len(prompt) // _CHARS_PER_TOKEN
+        completion_tokens = max(len(completion) // _CHARS_PER_TOKEN, 1)
+        usage: Dict[str, Any] = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                                 "total_tokens": prompt_tokens + completion_tokens}
+        if prompt_tokens >= _CACHE_MIN_TOKENS:
+            usage["prompt_tokens_details"] = {"cached_tokens": self._cached_tokens(body.get("model", "stub"), prompt)}
+        return usage
+
+    def _chat(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        content, tool_call = self._reply(body)
+        message: Dict[str, Any] = {"role": "assistant", "content": content}
+        if tool_call:
+            message["tool_calls"] = [tool_call]
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}", "object": "chat.completion",
+            "created": int(time.time()), "model": body.get("model", "stub"),
+            "choices": [{"index": 0, "message": message,
+                         "finish_reason": "tool_calls" if tool_call else "stop"}],
+            "usage": self._usage(body, content or json.dumps(tool_call)),
+        }
+
+    async def _stream_chat(self, body: Dict[str, Any], delay: float, writer) -> None:
+        content, tool_call = self._reply(body)
+        chunk_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+
+        def chunk(delta: Dict[str, Any], finish: Optional[str] = None, usage=None) -> bytes:
+            payload = {
+                "id": chunk_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [] if usage else [{"index": 0, "delta": delta, "finish_reason": finish}],
+            }
+            if usage:
+                payload["usage"] = usage
+            data = f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode("utf-8")
+            return f"{len(data):x}\r\n".encode("latin-1") + data + b"\r\n"
+
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+            b"Transfer-Encoding: chunked\r\nConnection: keep-alive\r\n\r\n"
+        )
+        # 首 token 约占总延迟 40%，其余均匀分布在各分块之间
+        await asyncio.sleep(delay * 0.4)
+        writer.write(chunk({"role": "assistant", "content": ""}))
+        if tool_call:
+            writer.write(chunk({"tool_calls": [{"index": 0, **tool_call}]}))
+        else:
+            pieces = [content[i:i + 12] for i in range(0, len(content), 12)] or [""]
+            for piece in pieces:
+                await asyncio.sleep(delay * 0.6 / len(pieces))
+                writer.write(chunk({"content": piece}))
+                await writer.drain()
+        writer.write(chunk({}, "tool_calls" if tool_call else "stop"))
+        if (body.get("stream_options") or {}).get("include_usage"):
+            writer.write(chunk({}, usage=self._usage(body, content or "")))
+        done = b"data: [DONE]\n\n"
+        writer.write(f"{len(done):x}\r\n".encode("latin-1") + done + b"\r\n0\r\n\r\n")
+        await writer.drain()
+
+    def _embeddings(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        inputs = body.get("input", "")
+        inputs = inputs if isinstance(inputs, list) else [inputs]
+        dim = int(body.get("dimensions") or 1024)
+        data = []
+        for index, _ in enumerate(inputs):
+            vector = [self.rng.gauss(0, 1) for _ in range(dim)]
+            norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+            data.append({"object": "embedding", "index": index, "embedding": [v / norm for v in vector]})
+        tokens = sum(len(str(text)) // 3 for text in inputs)
+        return {"object": "list", "data": data, "model": body.get("model", "stub"),
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens}}
+
+    @staticmethod
+    def _moderation(body: Dict[str, Any]) -> Dict[str, Any]:
+        categories = (
+            "harassment", "harassment/threatening", "hate", "hate/threatening", "illicit",
+            "illicit/violent", "self-harm", "self-harm/instructions", "self-harm/intent",
+            "sexual", "sexual/minors", "violence", "violence/graphic",
+        )
+        return {
+            "id": f"modr-{uuid.uuid4().hex[:12]}", "model": body.get("model", "stub"),
+            "results": [{
+                "flagged": False,
+                "categories": {c: False for c in categories},
+                "category_scores": {c: 0.001 for c in categories},
+            }],
+        }
+
+
+def spawn_stub(
+    latency: str = "lognormal:900,0.4",
+    embedding_latency: str = "fixed:30",
+    error_rate: float = 0.0,
+    seed: int = 0,
+) -> Tuple[subprocess.Popen, str]:
+    """在子进程中启动桩服务（与被测进程隔离 CPU / 内存），返回 (进程, base_url)"""
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "interview.benchmarks.llm_stub",
+            "--latency", latency, "--embedding-latency", embedding_latency,
+            "--error-rate", str(error_rate), "--seed", str(seed),
+        ],
+        stdout=subprocess.PIPE, text=True,
+    )
+    base_url = (proc.stdout.readline() or "").strip()
+    if not base_url.startswith("http"):
+        proc.kill()
+        raise RuntimeError("LLM 桩服务启动失败")
+    return proc, base_url
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    stub = LLMStub(
+        parse_latency(args.latency), parse_latency(args.embedding_latency),
+        error_rate=args.error_rate, seed=args.seed,
+    )
+    server, base_url = await stub.start(args.host, args.port)
+    print(base_url, flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0, help="0 表示随机端口")
+    parser.add_argument("--latency", default="lognormal:900,0.4", help="chat 延迟分布")
+    parser.add_argument("--embedding-latency", default="fixed:30", help="embeddings / moderations 延迟分布")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+评分前置分流离线评估：在录制会话上统计退化回答规则 / 回答级缓存的命中率
+
+按录制顺序逐轮把 (题目, 回答, 本场此前问答) 送入 detect_degenerate_answer 与 AnswerScoreCache
+（与 ScoringAgent._aprescore 相同的分流顺序），未命中的轮次把录制的评分结果写入缓存，供之后的会话复用。
+命中轮次与录制分数对比，衡量规则 / 缓存与 LLM ensemble 的偏差。不访问 LLM。
+
+会话来源与 replay.py 相同（--source mongo | export | synthetic）。synthetic 会话的回答由同一句话重复生成，
+重复粘贴判定的命中率没有参考意义，仅用于冒烟。
+
+运行：
+  uv run python -m interview.benchmarks.prescoring --source export --export session_a.json session_b.json
+  uv run python -m interview.benchmarks.prescoring --source mongo --limit 200 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from typing import Any, Dict, List
+
+from interview.benchmarks.replay import _BENCH_ENV, RecordedSession, load_from_exports, load_from_mongo, synthesize
+
+_PROMPT_VERSION = "replay"
+
+
+async def evaluate(sessions: List[RecordedSession]) -> Dict[str, Any]:
+    from interview.agents.prescoring import (
+        PRESCORE_CACHE_HIT,
+        PRESCORE_MISS,
+        AnswerScoreCache,
+        PrescoreStats,
+        detect_degenerate_answer,
+    )
+    from interview.agents.response_cache import InMemoryResponseCache
+
+    stats = PrescoreStats()
+    cache = AnswerScoreCache(InMemoryResponseCache(max_entries=1_000_000))
+    # 分流结果 → 命中轮次的 (分流分数, 录制分数)
+    pairs: Dict[str, List[tuple]] = {}
+
+    for recorded in sessions:
+        history: List[Dict[str, Any]] = []
+        for turn in recorded.turns:
+            question = (turn.get("question_data") or {}).get("question", "")
+            answer = turn.get("answer", "")
+            reward = turn.get("reward") or {}
+
+            degenerate = detect_degenerate_answer(question, answer, history)
+            if degenerate is not None:
+                result, score = degenerate.kind, degenerate.score
+            else:
+                cached = await cache.aget(question, answer, _PROMPT_VERSION)
+                if cached is not None:
+                    result, score = PRESCORE_CACHE_HIT, cached["score"]
+                else:
+                    result, score = PRESCORE_MISS, None
+                    if "score" in reward:
+                        await cache.aput(question, answer, _PROMPT_VERSION, reward)
+            stats.record(result)
+            if score is not None and isinstance(reward.get("score"), (int, float)):
+                pairs.setdefault(result, []).append((score, reward["score"]))
+            history.append({"question": question, "answer": answer})
+
+    snapshot = stats.snapshot()
+    snapshot["vs_recorded"] = {
+        result: {
+            "n": len(items),
+            "mean_abs_delta": round(sum(abs(a - b) for a, b in items) / len(items), 3),
+            "recorded_le_1": round(sum(1 for _, b in items if b <= 1) / len(items), 4),
+        }
+        for result, items in sorted(pairs.items())
+    }
+    return snapshot
+
+
+def _print_report(report: Dict[str, Any], meta: str) -> None:
+    print(meta)
+    print(f"hit rate (no LLM call): {report['hit_rate']:.1%}  "
+          f"degenerate: {report['degenerate_rate']:.1%}  cache: {report['cache_hit_rate']:.1%}")
+    print()
+    print(f"{'result':<12}{'turns':>8}{'share':>9}{'|Δ| vs recorded':>18}{'recorded ≤1':>14}")
+    total = report["total"] or 1
+    for result, count in report["counts"].items():
+        cmp = report["vs_recorded"].get(result)
+        delta = f"{cmp['mean_abs_delta']:.2f}" if cmp else "-"
+        low = f"{cmp['recorded_le_1']:.1%}" if cmp else "-"
+        print(f"{result:<12}{count:>8}{count / total:>9.1%}{delta:>18}{low:>14}")
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--source", choices=("mongo", "export", "synthetic"), default="synthetic")
+    parser.add_argument("--session-id", action="append", default=[], help="--source mongo 时只评估指定会话（可多次）")
+    parser.add_argument("--limit", type=int, default=200, help="--source mongo 时最多读取的会话数")
+    parser.add_argument("--export", nargs="*", default=[], help="--source export 的 JSON 文件")
+    parser.add_argument("--sessions", type=int, default=20, help="--source synthetic 的会话数")
+    parser.add_argument("--turns", type=int, default=6, help="--source synthetic 的每场轮数")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出")
+    args = parser.parse_args(argv)
+
+    for key, value in _BENCH_ENV.items():
+        os.environ.setdefault(key, value)
+
+    if args.source == "mongo":
+        sessions = load_from_mongo(args.session_id, args.limit)
+    elif args.source == "export":
+        sessions = load_from_exports(args.export)
+    else:
+        sessions = synthesize(args.sessions, args.turns, args.seed)
+    if not sessions:
+        print("没有可评估的会话", file=sys.stderr)
+        return 1
+
+    report = asyncio.run(evaluate(sessions))
+    meta = f"evaluated {len(sessions)} sessions / {report['total']} turns, source={args.source}"
+    if args.json:
+        print(json.dumps({"meta": meta, **report}, ensure_ascii=False, indent=2))
+    else:
+        _print_report(report, meta)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,529 @@
+"""
+离线回放基准：用 conversation_memories 中录制的面试重放 LangGraph 单轮链路
+
+由 session_meta（简历 / parsed_profile）+ turn 文档（state, action, reward）重建历史会话，
+按录制顺序把候选人回答逐轮送入 coordinator.aprocess_answer（即 build_interview_graph 编译的图），
+输出每轮的节点耗时、MongoDB 操作次数与 embedding 次数。用于在真实面试形态上衡量 graph / 持久化改动，
+无需真实 LLM provider。
+
+LLM 响应（--llm）：
+- recorded：security / scoring / 出题直接返回录制结果（可叠加 --llm-latency 模拟耗时），
+            embedding 用文本哈希向量；录制的题目已经过校验，CoVe verifier 不参与
+- stub    ：真实 agent 走本地 OpenAI 兼容桩（interview.benchmarks.llm_stub），--llm-latency 为桩的 chat 延迟
+            结束时附带各 agent 的 provider 前缀缓存命中率（桩模拟 cached_tokens，见 metrics.prompt_cache_report）
+
+会话来源（--source）：
+- mongo     ：MONGODB_URI / MONGODB_DB 中的 conversation_memories（只读）
+- export    ：coordinator.export_memory_to_file 导出的 JSON 文件（--export 指定）
+- synthetic ：生成 --sessions 场 --turns 轮的合成会话
+
+回放写入（--target）：
+- mock ：mongomock + MemorySaver；Mongo 次数为 RetrievalSystem 埋点的操作数（metrics.mongo_op）
+- mongo：真实 MongoDB 上的临时库 --target-db（结束后删除）；额外统计 pymongo 命令数（真实往返）
+
+embedding 列为每轮向量化的文本条数（get_embedding + get_embeddings，含 write-behind worker 的批量补算）。
+单轮共享向量（memory/embedding.py）下每轮为 1；recorded 模式评分结果直接返回录制值、
+不检索 RAG anchors，因此对比旧链路（anchors / 检索 / 持久化各一次）需使用 --llm stub。
+
+运行：
+  uv run python -m interview.benchmarks.replay --source synthetic --sessions 5 --turns 6
+  uv run python -m interview.benchmarks.replay --source mongo --limit 20 --target mongo --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import os
+import random
+import sys
+import time
+import warnings
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+_BENCH_ENV = {
+    "MONGODB_URI": "mongodb://127.0.0.1:27017",
+    "MONGODB_DB": "interview_bench",
+    "GPT_API_KEY": "bench",
+    "ALIYUN_API_KEY": "bench",
+    "DOUBAO_API_KEY": "bench",
+    "KIMI_API_KEY": "bench",
+}
+
+_STUB_URL_ENV = ("GPT_BASE_URL", "DOUBAO_BASE_URL", "ALIYUN_BASE_URL")
+
+_SAFE_CHECK = {
+    "is_safe": True, "risk_level": "low", "detected_issues": [],
+    "reasoning": "回放：无录制的安全检测结果", "suggested_action": "continue",
+}
+_REPLAY_SUMMARY = {
+    "final_grade": "C", "final_decision": "conditional", "overall_score": 6.0,
+    "summary": "回放会话总结", "overall_analysis": "回放", "decision_evidence": [],
+    "boundary_case": False, "decision_confidence": "medium", "requires_human_review": False,
+}
+
+
+@dataclass
+class RecordedSession:
+    session_id: str
+    candidate_name: str
+    resume_data: Dict[str, Any]
+    parsed_profile: Optional[Dict[str, Any]]
+    # 每项：question_data / answer / reward / security_check
+    turns: List[Dict[str, Any]] = field(default_factory=list)
+
+
+# ============================================================
+# 会话来源
+# ============================================================
+
+def _recorded_from_documents(meta: Dict[str, Any], turn_docs: List[Dict[str, Any]]) -> RecordedSession:
+    context = meta.get("context") or {}
+    turns = []
+    for doc in sorted(turn_docs, key=lambda d: d.get("turn_index", 0)):
+        action = doc.get("action") or {}
+        question_data = action.get("question_data")
+        if not isinstance(question_data, dict):
+            question_data = {"question": action.get("question_text", ""), "type": "general", "difficulty": "medium"}
+        turns.append({
+            "question_data": question_data,
+            "answer": action.get("answer_text", ""),
+            "reward": doc.get("reward") or {},
+            "security_check": action.get("security_check"),
+        })
+    return RecordedSession(
+        session_id=meta["session_id"],
+        candidate_name=meta.get("candidate_name", "unknown"),
+        resume_data=context.get("resume_data") or {},
+        parsed_profile=context.get("parsed_profile"),
+        turns=turns,
+    )
+
+
+def load_from_mongo(session_ids: List[str], limit: int) -> List[RecordedSession]:
+    """只读地从 conversation_memories 取出会话（默认最近 limit 场有 turn 的会话）"""
+    import pymongo
+
+    client = pymongo.MongoClient(os.environ["MONGODB_URI"])
+    try:
+        collection = client[os.environ["MONGODB_DB"]]["conversation_memories"]
+        query: Dict[str, Any] = {"doc_type": "session_meta", "stats.total_turns": {"$gt": 0}}
+        if session_ids:
+            query["session_id"] = {"$in": session_ids}
+        metas = list(
+            collection.find(query, {"snapshot": 0}).sort("created_at", pymongo.DESCENDING).limit(limit)
+        )
+        return [
+            _recorded_from_documents(meta, list(collection.find(
+                {"doc_type": "turn", "session_id": meta["session_id"]}, {"embedding": 0},
+            )))
+            for meta in metas
+        ]
+    finally:
+        client.close()
+
+
+def load_from_exports(paths: List[str]) -> List[RecordedSession]:
+    sessions = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        sessions.append(_recorded_from_documents(data["session_meta"], data.get("turns", [])))
+    return sessions
+
+
+def synthesize(sessions: int, turns: int, seed: int) -> List[RecordedSession]:
+    """合成会话：长短回答混合、分数分布接近真实新生面试"""
+    rng = random.Random(seed)
+    question_types = ("math_logic", "technical", "behavioral", "experience")
+    recorded = []
+    for s in range(sessions):
+        session = RecordedSession(
+            session_id=f"synthetic-{s:04d}",
+            candidate_name=f"replay-candidate-{s:04d}",
+            resume_data={"name": f"replay-candidate-{s:04d}", "education": "某大学 数学系",
+                         "skills": ["Python", "算法", "统计"] * 3},
+            parsed_profile={"items": [{"id": f"p{i}", "summary": "竞赛与项目经历" * 4} for i in range(8)]},
+        )
+        for t in range(turns):
+            score = rng.choice((1, 3, 5, 6, 7, 8, 9))
+            session.turns.append({
+                "question_data": {
+                    "question": f"第 {t + 1} 题：请证明任意 {t + 3} 个整数中必有两数之差被 {t + 2} 整除。",
+                    "type": question_types[t % len(question_types)], "difficulty": "medium",
+                },
+                "answer": "我的思路是先归纳再反证。" * rng.randint(1, 30),
+                "reward": {
+                    "score": score, "reasoning": "论证基本完整" * 5, "evidence_quote": "归纳",
+                    "question_focus": "推理", "confidence_level": "high", "agreement": 1.0,
+                    "requires_human_review": False, "fallback_used": False,
+                },
+                "security_check": None,
+            })
+        recorded.append(session)
+    return recorded
+
+
+# ============================================================
+# 回放环境
+# ============================================================
+
+class _CommandCounter:
+    """pymongo 命令监听：统计真实 MongoDB 往返次数"""
+
+    def __init__(self):
+        from pymongo import monitoring
+
+        self.count = 0
+        counter = self
+
+        class _Listener(monitoring.CommandListener):
+            def started(self, event):
+                counter.count += 1
+
+            def succeeded(self, event):
+                pass
+
+            def failed(self, event):
+                pass
+
+        self.listener = _Listener()
+
+
+class _EmbeddingCounter:
+    """包装 RetrievalSystem.get_embedding / get_embeddings：统计向量化的文本条数"""
+
+    def __init__(self):
+        self.count = 0
+
+    def install(self, rs_class) -> None:
+        get_embedding, get_embeddings = rs_class.get_embedding, rs_class.get_embeddings
+        counter = self
+
+        def counted_embedding(rs, text):
+            counter.count += 1
+            return get_embedding(rs, text)
+
+        def counted_embeddings(rs, texts, chunk_size=10):
+            counter.count += len(texts)
+            return get_embeddings(rs, texts, chunk_size)
+
+        rs_class.get_embedding = counted_embedding
+        rs_class.get_embeddings = counted_embeddings
+
+
+def _configure_target(target: str, target_db: str) -> Optional[_CommandCounter]:
+    from langgraph.checkpoint.memory import MemorySaver
+
+    from interview.agents import coordinator as coordinator_module
+    from interview.agents import graph as graph_module
+    from interview.tools import db
+
+    os.environ["MONGODB_DB"] = target_db
+    if target == "mock":
+        import mongomock
+
+        db._client = mongomock.MongoClient()
+        coordinator_module.create_mongo_checkpointer = MemorySaver
+        return None
+
+    import pymongo
+
+    counter = _CommandCounter()
+    db._client = pymongo.MongoClient(os.environ["MONGODB_URI"], event_listeners=[counter.listener])
+    # checkpoint 也写入临时库，避免污染线上 checkpoint 集合
+    coordinator_module.create_mongo_checkpointer = functools.partial(
+        graph_module.create_mongo_checkpointer, db_name=target_db
+    )
+    return counter
+
+
+def _hash_embedding(text: str, dim: int = 1024) -> List[float]:
+    """文本哈希 → 确定性向量（recorded 模式不访问 embedding 服务）"""
+    rng = random.Random(hashlib.sha256((text or "").encode("utf-8")).digest())
+    return [rng.uniform(-1, 1) for _ in range(dim)]
+
+
+class _RecordedResponses:
+    """recorded 模式：agent 按当前回放位置返回录制结果"""
+
+    def __init__(self, latency, seed: int):
+        self.latency = latency
+        self.rng = random.Random(seed)
+        self.session: Optional[RecordedSession] = None
+        self.turn = 0
+
+    async def _delay(self) -> None:
+        seconds = self.latency(self.rng)
+        if seconds > 0:
+            await asyncio.sleep(seconds)
+
+    async def security(self, input_data):
+        await self._delay()
+        return dict(self.session.turns[self.turn].get("security_check") or _SAFE_CHECK)
+
+    async def scoring(self, input_data):
+        await self._delay()
+        return dict(self.session.turns[self.turn]["reward"])
+
+    async def question(self, input_data):
+        await self._delay()
+        turns = self.session.turns
+        if self.turn + 1 < len(turns):
+            return dict(turns[self.turn + 1]["question_data"])
+        return {"question": "回放结束后的占位题目", "type": "general", "difficulty": "medium",
+                "reasoning": "回放"}
+
+    async def summary(self, input_data):
+        await self._delay()
+        return dict(_REPLAY_SUMMARY)
+
+    def install(self, coordinator) -> None:
+        coordinator.security_agent.aprocess = self.security
+        coordinator.scoring_agent.aprocess = self.scoring
+        coordinator.question_generator.aprocess = self.question
+        coordinator.summary_agent.aprocess = self.summary
+        coordinator.question_verifier = None
+        rs_class = type(coordinator.retrieval_system)
+        rs_class.get_embedding = lambda self, text: _hash_embedding(text)
+        rs_class.get_embeddings = lambda self, texts, chunk_size=10: [_hash_embedding(t) for t in texts]
+
+
+# ============================================================
+# 指标快照（interview.metrics 注册表）
+# ============================================================
+
+def _metric_snapshot() -> Dict[str, Any]:
+    from interview import metrics
+
+    nodes: Dict[str, float] = {}
+    mongo_ops = 0.0
+    for family in metrics.REGISTRY.collect():
+        for sample in family.samples:
+            if sample.name == "interview_graph_node_seconds_sum":
+                nodes[sample.labels["node"]] = sample.value
+            elif sample.name == "interview_mongo_op_seconds_count":
+                mongo_ops += sample.value
+    return {"nodes": nodes, "mongo_ops": mongo_ops}
+
+
+def _diff(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    nodes = {
+        node: round((value - before["nodes"].get(node, 0.0)) * 1000, 3)
+        for node, value in after["nodes"].items()
+        if value - before["nodes"].get(node, 0.0) > 0
+    }
+    return {"nodes_ms": nodes, "mongo_ops": int(after["mongo_ops"] - before["mongo_ops"])}
+
+
+# ============================================================
+# 回放
+# ============================================================
+
+async def _replay_session(
+    coordinator, recorded: RecordedSession, responses, counter, embeddings: _EmbeddingCounter
+) -> List[Dict[str, Any]]:
+    from interview.agents.session import InterviewSession
+
+    if not recorded.turns:
+        return []
+    session_id = f"replay-{recorded.session_id}-{int(time.time() * 1000)}"
+    coordinator.memory_store.create_session(
+        session_id, recorded.candidate_name, recorded.resume_data, recorded.parsed_profile
+    )
+    session = InterviewSession(session_id, recorded.candidate_name, recorded.resume_data, coordinator=coordinator)
+    session.parsed_profile = recorded.parsed_profile
+    session.current_question = dict(recorded.turns[0]["question_data"])
+    session.question_data = session.current_question
+    coordinator.active_sessions[session_id] = session
+    coordinator.session_store.save(session, include_static=True)
+    if responses is not None:
+        responses.session = recorded
+
+    records = []
+    for index, turn in enumerate(recorded.turns):
+        if responses is not None:
+            responses.turn = index
+        before, commands = _metric_snapshot(), counter.count if counter else 0
+        embedded = embeddings.count
+        started = time.perf_counter()
+        output = await coordinator.aprocess_answer(session_id, turn["answer"])
+        wall_ms = (time.perf_counter() - started) * 1000
+        record = {
+            "session_id": recorded.session_id, "turn": index + 1, "wall_ms": round(wall_ms, 3),
+            **_diff(before, _metric_snapshot()),
+            "round_trips": counter.count - commands if counter else None,
+            "embeddings": embeddings.count - embedded,
+            "success": bool(output.get("success")),
+            "complete": bool(output.get("interview_complete")),
+        }
+        records.append(record)
+        if record["complete"] or not record["success"]:
+            break
+    if not records[-1]["complete"]:
+        coordinator.cleanup_session(session_id)
+    return records
+
+
+async def _replay(sessions: List[RecordedSession], args: argparse.Namespace, counter) -> List[Dict[str, Any]]:
+    from interview.agents.coordinator import MultiAgentCoordinator
+    from interview.consumers import COORDINATOR_GRAPH_OPTIONS
+    from interview.llm import COORDINATOR_MODELS
+
+    from interview.benchmarks.llm_stub import parse_latency
+
+    graph_options = {**COORDINATOR_GRAPH_OPTIONS, **json.loads(args.graph_options)}
+    coordinator = MultiAgentCoordinator(COORDINATOR_MODELS, graph_options=graph_options)
+    responses = None
+    if args.llm == "recorded":
+        responses = _RecordedResponses(parse_latency(args.llm_latency), args.seed)
+        responses.install(coordinator)
+    embeddings = _EmbeddingCounter()
+    embeddings.install(type(coordinator.retrieval_system))
+    coordinator._ensure_graph()
+
+    records = []
+    for recorded in sessions:
+        records.extend(await _replay_session(coordinator, recorded, responses, counter, embeddings))
+    return records
+
+
+def _summarize(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """按轮次聚合：wall p50、各节点 p50、平均 Mongo / embedding 次数；最后一行为全部轮次"""
+    from interview.agents.utils import percentile
+
+    groups: Dict[Any, List[Dict[str, Any]]] = {}
+    for record in records:
+        groups.setdefault(record["turn"], []).append(record)
+    groups["all"] = records
+
+    rows = []
+    for turn, group in groups.items():
+        nodes = sorted({node for r in group for node in r["nodes_ms"]})
+        round_trips = [r["round_trips"] for r in group if r["round_trips"] is not None]
+        rows.append({
+            "turn": turn,
+            "n": len(group),
+            "wall_p50_ms": percentile([r["wall_ms"] for r in group], 50),
+            "wall_p95_ms": percentile([r["wall_ms"] for r in group], 95),
+            "nodes_p50_ms": {
+                node: percentile([r["nodes_ms"].get(node, 0.0) for r in group], 50) for node in nodes
+            },
+            "mongo_ops": sum(r["mongo_ops"] for r in group) / len(group),
+            "round_trips": sum(round_trips) / len(round_trips) if round_trips else None,
+            "embeddings": sum(r["embeddings"] for r in group) / len(group),
+        })
+    return rows
+
+
+def _print_table(rows: List[Dict[str, Any]], meta: str) -> None:
+    nodes = sorted({node for row in rows for node in row["nodes_p50_ms"]})
+    header = f"{'turn':<6}{'n':>4}{'wall p50':>10}{'wall p95':>10}" + "".join(
+        f"{node:>18}" for node in nodes
+    ) + f"{'mongo ops':>11}{'round trips':>13}{'embeddings':>12}"
+    print(meta)
+    print("node columns: p50 ms")
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        trips = "-" if row["round_trips"] is None else f"{row['round_trips']:.1f}"
+        print(
+            f"{row['turn']!s:<6}{row['n']:>4}{row['wall_p50_ms']:>10.2f}{row['wall_p95_ms']:>10.2f}"
+            + "".join(f"{row['nodes_p50_ms'].get(node, 0.0):>18.2f}" for node in nodes)
+            + f"{row['mongo_ops']:>11.1f}{trips:>13}{row['embeddings']:>12.1f}"
+        )
+
+
+def _print_prompt_cache(report: Dict[str, Dict[str, float]]) -> None:
+    if not report:
+        return
+    print()
+    print(f"{'prompt cache':<22}{'input tokens':>14}{'cached':>12}{'hit ratio':>11}")
+    for agent, entry in sorted(report.items()):
+        print(f"{agent:<22}{entry['input_tokens']:>14.0f}{entry['cached_tokens']:>12.0f}{entry['hit_ratio']:>11.1%}")
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--source", choices=("mongo", "export", "synthetic"), default="synthetic")
+    parser.add_argument("--session-id", action="append", default=[], help="--source mongo 时只回放指定会话（可多次）")
+    parser.add_argument("--limit", type=int, default=20, help="--source mongo 时最多回放的会话数")
+    parser.add_argument("--export", nargs="*", default=[], help="--source export 的 JSON 文件")
+    parser.add_argument("--sessions", type=int, default=5, help="--source synthetic 的会话数")
+    parser.add_argument("--turns", type=int, default=6, help="--source synthetic 的每场轮数")
+    parser.add_argument("--llm", choices=("recorded", "stub"), default="recorded")
+    parser.add_argument("--llm-latency", default="fixed:0", help="recorded 响应 / 桩服务 chat 的延迟分布")
+    parser.add_argument("--target", choices=("mock", "mongo"), default="mock")
+    parser.add_argument("--target-db", default="interview_replay", help="--target mongo 时的临时库（结束后删除）")
+    parser.add_argument("--graph-options", default="{}",
+                        help='覆盖 COORDINATOR_GRAPH_OPTIONS 的 JSON，如 \'{"parallel_security": false}\'')
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出逐轮记录与汇总")
+    parser.add_argument("--log-level", default="CRITICAL", help="interview.* 日志级别")
+    args = parser.parse_args(argv)
+    logging.getLogger("interview").setLevel(args.log_level.upper())
+    warnings.filterwarnings("ignore", category=UserWarning, module="pydantic")
+
+    for key, value in _BENCH_ENV.items():
+        os.environ.setdefault(key, value)
+
+    from interview import metrics
+
+    if not metrics.set_metrics_enabled(True):
+        print("需要 prometheus-client 才能统计节点耗时 / Mongo 操作数", file=sys.stderr)
+        return 1
+
+    if args.source == "mongo":
+        sessions = load_from_mongo(args.session_id, args.limit)
+    elif args.source == "export":
+        sessions = load_from_exports(args.export)
+    else:
+        sessions = synthesize(args.sessions, args.turns, args.seed)
+    if not sessions:
+        print("没有可回放的会话", file=sys.stderr)
+        return 1
+
+    stub = None
+    if args.llm == "stub":
+        from interview.benchmarks.llm_stub import spawn_stub
+
+        stub, stub_url = spawn_stub(args.llm_latency, seed=args.seed)
+        for key in _STUB_URL_ENV:
+            os.environ[key] = stub_url
+
+    counter = _configure_target(args.target, args.target_db)
+    try:
+        records = asyncio.run(_replay(sessions, args, counter))
+    finally:
+        if stub is not None:
+            stub.terminate()
+            stub.wait(timeout=10)
+        if args.target == "mongo":
+            from interview.tools.db import get_mongo_client
+
+            get_mongo_client().drop_database(args.target_db)
+
+    rows = _summarize(records)
+    outcomes = Counter(
+        "complete" if r["complete"] else ("failed" if not r["success"] else "ongoing") for r in records
+    )
+    meta = (f"replayed {len(sessions)} sessions / {len(records)} turns, source={args.source}, "
+            f"llm={args.llm}, target={args.target}, outcomes={dict(outcomes)}")
+    prompt_cache = metrics.prompt_cache_report()
+    if args.json:
+        print(json.dumps({"meta": meta, "summary": rows, "turns": records, "prompt_cache": prompt_cache},
+                         ensure_ascii=False, indent=2, default=str))
+    else:
+        _print_table(rows, meta)
+        _print_prompt_cache(prompt_cache)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
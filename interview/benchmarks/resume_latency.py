@@ -0,0 +1,172 @@
+"""
+断线 / 崩溃恢复耗时基准（6 轮面试）
+
+对同一场已进行 N 轮的面试，比较三条恢复路径：
+- replay_full ：旧实现 — 读 session_meta + 全部 turn 文档（含 1024 维 embedding）并回放为 QATurn
+- replay      ：回放路径，turn 查询排除 embedding
+- snapshot    ：session_meta.snapshot 单次读取重建（进程重启后的重连）
+- reattach    ：宽限期内重连，直接接回进程内存活会话
+
+默认用 mongomock 作为 MongoDB 替身（只体现读取量 / 解码开销，没有网络往返；
+真实部署中 replay 路径的多次往返与 ~8KB/turn 的 embedding 传输只会更慢）。
+--mongo real 时使用环境变量 MONGODB_URI / MONGODB_DB 指向的真实库。
+
+运行：
+  uv run python -m interview.benchmarks.resume_latency --turns 6 --iterations 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+from unittest.mock import patch
+
+import bson
+
+_BENCH_ENV = {
+    "MONGODB_URI": "mongodb://127.0.0.1:27017",
+    "MONGODB_DB": "interview_bench",
+    "GPT_API_KEY": "bench",
+    "ALIYUN_API_KEY": "bench",
+    "DOUBAO_API_KEY": "bench",
+    "KIMI_API_KEY": "bench",
+}
+
+MODES = ("replay_full", "replay", "snapshot", "reattach")
+
+
+def _seed(coordinator, session_id: str, turns: int) -> None:
+    """写入 session_meta + N 轮 turn（带 embedding）+ 会话快照"""
+    from interview.agents.qa_models import QATurn
+    from interview.agents.session import InterviewSession
+
+    resume = {"name": "alice", "education": "某大学 数学系", "skills": ["Python", "算法", "统计"] * 4}
+    profile = {"items": [{"id": f"p{i}", "summary": "竞赛与项目经历" * 6} for i in range(10)]}
+    store = coordinator.memory_store
+    store.create_session(session_id, "alice", resume, profile)
+
+    session = InterviewSession(session_id, "alice", resume, coordinator=coordinator)
+    session.parsed_profile = profile
+    for i in range(turns):
+        question = {"question": f"第 {i + 1} 题：请证明……" * 4, "type": "math_logic", "difficulty": "medium"}
+        answer = "我的思路是先归纳再反证。" * 20
+        reward = {"score": 6 + i % 3, "reasoning": "论证完整" * 10}
+        store.save_turn(
+            session_id, "alice", i,
+            state={"average_score": session.get_average_score()},
+            action={"question_text": question["question"], "answer_text": answer, "question_data": question},
+            reward=reward,
+        )
+        session.qa_history.append(QATurn(
+            question=question["question"], answer=answer, question_type="math_logic",
+            difficulty="medium", question_data=question, score_details=reward,
+            timestamp=datetime.now(),
+        ).to_dict())
+        session.add_score(reward["score"])
+    session.current_question = {"question": "下一题", "type": "behavioral", "difficulty": "medium"}
+    session.question_data = session.current_question
+    coordinator._save_snapshot(session)
+
+
+def _bytes_read(coordinator, session_id: str, mode: str) -> int:
+    rs = coordinator.retrieval_system
+    meta = rs.find_session_meta(session_id)
+    total = len(bson.encode(meta))
+    if mode.startswith("replay"):
+        projection = None if mode == "replay_full" else {"embedding": 0}
+        total += sum(len(bson.encode(t)) for t in rs.find_turns_by_session(session_id, projection=projection))
+    return total
+
+
+def _run(turns: int, iterations: int, mongo: str) -> List[Dict[str, Any]]:
+    for key, value in _BENCH_ENV.items():
+        os.environ.setdefault(key, value)
+
+    patches = [patch(
+        "interview.tools.rag_tools.RetrievalSystem.get_embedding",
+        lambda self, text: [random.random() for _ in range(1024)],
+    )]
+    if mongo == "mock":
+        import mongomock
+
+        db = mongomock.MongoClient()["interview_bench"]
+        patches.append(patch("interview.tools.rag_tools.get_mongo_db", return_value=db))
+    for p in patches:
+        p.start()
+
+    from interview.agents.coordinator import MultiAgentCoordinator
+    from interview.agents.utils import percentile
+    from interview.llm import COORDINATOR_MODELS
+
+    coordinator = MultiAgentCoordinator(COORDINATOR_MODELS)
+    session_id = f"bench-resume-{int(time.time())}"
+    _seed(coordinator, session_id, turns)
+
+    def resume(mode: str) -> Dict[str, Any]:
+        coordinator.session_store.delete(session_id)
+        coordinator.active_sessions.pop(session_id, None)
+        if mode == "snapshot":
+            return coordinator.resume_interview(session_id)
+        meta = coordinator.memory_store.get_session_meta(session_id)
+        if mode == "replay_full":
+            with patch.object(
+                coordinator.memory_store, "get_session_turns",
+                lambda sid, limit=None, projection=None: coordinator.retrieval_system.find_turns_by_session(sid),
+            ):
+                return coordinator._resume_from_conversation_memories(session_id, meta)
+        return coordinator._resume_from_conversation_memories(session_id, meta)
+
+    results = []
+    try:
+        for mode in MODES:
+            if mode == "reattach":
+                coordinator.resume_interview(session_id)
+            samples = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                if mode == "reattach":
+                    coordinator.detach_session(session_id)
+                    start = time.perf_counter()
+                    result = coordinator.reattach_session(session_id, "alice")
+                else:
+                    result = resume(mode)
+                samples.append((time.perf_counter() - start) * 1000)
+                assert result["success"] and result["total_questions"] == turns, result
+            results.append({
+                "mode": mode,
+                "p50_ms": percentile(samples, 50),
+                "p95_ms": percentile(samples, 95),
+                "bytes_read": 0 if mode == "reattach" else _bytes_read(coordinator, session_id, mode),
+            })
+    finally:
+        coordinator.cleanup_session(session_id)
+        coordinator.memory_store.delete_session(session_id)
+        for p in patches:
+            p.stop()
+    return results
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--turns", type=int, default=6)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--mongo", choices=("mock", "real"), default="mock")
+    args = parser.parse_args(argv)
+
+    results = _run(args.turns, args.iterations, args.mongo)
+    header = f"{'mode':<13}{'p50 ms':>10}{'p95 ms':>10}{'bytes read':>12}"
+    print(f"{args.turns} turns, {args.iterations} iterations, mongo={args.mongo}")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['mode']:<13}{r['p50_ms']:>10.3f}{r['p95_ms']:>10.3f}{r['bytes_read']:>12}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
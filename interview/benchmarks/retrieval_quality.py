@@ -0,0 +1,202 @@
+"""
+跨会话检索质量离线评估：turn 向量含 / 不含评分理由的对比
+
+单轮共享向量（memory/embedding.py）之后，turn 文档的 embedding 由 question + answer 生成，
+不再包含评分理由（旧 combined_text）。本脚本在录制会话上对比两种索引的 top-k 检索结果：
+
+- old：文档 = 问题 + 回答 + 评分理由，查询 = 问题 + 回答（旧 anchors / 检索的查询形式）
+- new：文档与查询同为 turn_embedding_text(问题, 回答)
+
+对每个 turn 以「排除本会话」的方式检索其他会话的 top-k（与 exclude_session_id 相同），报告：
+- same_type@k   ：检索结果与查询题型相同的比例（出题参考案例的相关性）
+- score_gap@k   ：检索结果录制分数与查询录制分数的平均差（评分 anchors 的一致性，越小越好）
+- overlap@k     ：两种索引 top-k 的平均 Jaccard 重合度
+只比较向量相似度，不含 MemoryRetriever 的 importance 重排（两种索引相同）。
+
+向量来源（--embedder）：
+- service：RetrievalSystem.get_embeddings（真实 embedding 服务，需 ALIYUN_API_KEY / ALIYUN_BASE_URL）
+- ngram  ：字符 bigram 哈希词袋（离线近似，只反映字面重合，结论以 service 为准）
+
+会话来源与 replay.py 相同（--source mongo | export | synthetic）；synthetic 会话的回答与评分理由
+由固定句子重复生成，仅用于冒烟。
+
+运行：
+  uv run python -m interview.benchmarks.retrieval_quality --source mongo --limit 200 --embedder service
+  uv run python -m interview.benchmarks.retrieval_quality --source export --export a.json b.json --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import sys
+from typing import Any, Callable, Dict, List, Optional
+
+from interview.benchmarks.replay import _BENCH_ENV, RecordedSession, load_from_exports, load_from_mongo, synthesize
+
+_NGRAM_DIM = 1024
+
+
+def _ngram_embeddings(texts: List[str]) -> List[Optional[List[float]]]:
+    """字符 bigram 哈希词袋 → 单位向量"""
+    vectors = []
+    for text in texts:
+        vector = [0.0] * _NGRAM_DIM
+        for i in range(len(text) - 1):
+            digest = hashlib.md5(text[i:i + 2].encode("utf-8")).digest()
+            vector[int.from_bytes(digest[:4], "little") % _NGRAM_DIM] += 1.0
+        vectors.append(vector)
+    return vectors
+
+
+def _service_embeddings() -> Callable[[List[str]], List[Optional[List[float]]]]:
+    from interview.tools.rag_tools import RetrievalSystem
+
+    return RetrievalSystem().get_embeddings
+
+
+def _normalize(vector: Optional[List[float]]) -> Optional[List[float]]:
+    if not vector:
+        return None
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+def _top_k(query: List[float], index: List[Dict[str, Any]], session_id: str, k: int) -> List[int]:
+    scored = [
+        (sum(a * b for a, b in zip(query, item["vector"])), i)
+        for i, item in enumerate(index)
+        if item["session_id"] != session_id and item["vector"] is not None
+    ]
+    scored.sort(reverse=True)
+    return [i for _, i in scored[:k]]
+
+
+def evaluate(
+    sessions: List[RecordedSession],
+    embed: Callable[[List[str]], List[Optional[List[float]]]],
+    k: int = 4,
+) -> Dict[str, Any]:
+    from interview.agents.memory.embedding import turn_embedding_text
+
+    turns = []
+    for recorded in sessions:
+        for turn in recorded.turns:
+            question_data = turn.get("question_data") or {}
+            question = question_data.get("question", "")
+            answer = turn.get("answer", "")
+            reward = turn.get("reward") or {}
+            text = turn_embedding_text(question, answer)
+            reasoning = reward.get("reasoning", "")
+            turns.append({
+                "session_id": recorded.session_id,
+                "type": question_data.get("type", "general"),
+                "score": reward.get("score") if isinstance(reward.get("score"), (int, float)) else None,
+                "new_text": text,
+                "old_text": "\n".join(p for p in (text, f"评分理由: {reasoning}" if reasoning else "") if p),
+                "old_query": f"{question}\n{answer}"[:1000],
+            })
+
+    new_vectors = [_normalize(v) for v in embed([t["new_text"] for t in turns])]
+    old_vectors = [_normalize(v) for v in embed([t["old_text"] for t in turns])]
+    old_queries = [_normalize(v) for v in embed([t["old_query"] for t in turns])]
+    indexes = {
+        "old": [{"session_id": t["session_id"], "vector": v} for t, v in zip(turns, old_vectors)],
+        "new": [{"session_id": t["session_id"], "vector": v} for t, v in zip(turns, new_vectors)],
+    }
+    queries = {"old": old_queries, "new": new_vectors}
+
+    totals = {name: {"queries": 0, "same_type": [], "score_gap": []} for name in indexes}
+    overlaps = []
+    for i, turn in enumerate(turns):
+        results = {}
+        for name, index in indexes.items():
+            if queries[name][i] is None:
+                continue
+            hits = _top_k(queries[name][i], index, turn["session_id"], k)
+            if not hits:
+                continue
+            results[name] = set(hits)
+            stats = totals[name]
+            stats["queries"] += 1
+            stats["same_type"].append(sum(turns[h]["type"] == turn["type"] for h in hits) / len(hits))
+            if turn["score"] is not None:
+                gaps = [abs(turns[h]["score"] - turn["score"]) for h in hits if turns[h]["score"] is not None]
+                if gaps:
+                    stats["score_gap"].append(sum(gaps) / len(gaps))
+        if len(results) == 2:
+            overlaps.append(len(results["old"] & results["new"]) / len(results["old"] | results["new"]))
+
+    def _mean(values: List[float]) -> Optional[float]:
+        return round(sum(values) / len(values), 4) if values else None
+
+    return {
+        "k": k,
+        "turns": len(turns),
+        "indexes": {
+            name: {
+                "queries": stats["queries"],
+                "same_type_at_k": _mean(stats["same_type"]),
+                "score_gap_at_k": _mean(stats["score_gap"]),
+            }
+            for name, stats in totals.items()
+        },
+        "overlap_at_k": _mean(overlaps),
+    }
+
+
+def _print_report(report: Dict[str, Any], meta: str) -> None:
+    k = report["k"]
+    print(meta)
+    print(f"{'index':<8}{'queries':>9}{f'same_type@{k}':>14}{f'score_gap@{k}':>14}")
+    for name, stats in report["indexes"].items():
+        same_type = "-" if stats["same_type_at_k"] is None else f"{stats['same_type_at_k']:.1%}"
+        gap = "-" if stats["score_gap_at_k"] is None else f"{stats['score_gap_at_k']:.2f}"
+        print(f"{name:<8}{stats['queries']:>9}{same_type:>14}{gap:>14}")
+    overlap = "-" if report["overlap_at_k"] is None else f"{report['overlap_at_k']:.1%}"
+    print(f"top-{k} overlap (Jaccard, old vs new): {overlap}")
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--source", choices=("mongo", "export", "synthetic"), default="synthetic")
+    parser.add_argument("--session-id", action="append", default=[], help="--source mongo 时只评估指定会话（可多次）")
+    parser.add_argument("--limit", type=int, default=200, help="--source mongo 时最多读取的会话数")
+    parser.add_argument("--export", nargs="*", default=[], help="--source export 的 JSON 文件")
+    parser.add_argument("--sessions", type=int, default=20, help="--source synthetic 的会话数")
+    parser.add_argument("--turns", type=int, default=6, help="--source synthetic 的每场轮数")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--embedder", choices=("service", "ngram"), default="ngram")
+    parser.add_argument("--k", type=int, default=4, help="top-k（retrieval_node 为 4，评分 anchors 为 2）")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出")
+    args = parser.parse_args(argv)
+
+    for key, value in _BENCH_ENV.items():
+        os.environ.setdefault(key, value)
+
+    if args.source == "mongo":
+        sessions = load_from_mongo(args.session_id, args.limit)
+    elif args.source == "export":
+        sessions = load_from_exports(args.export)
+    else:
+        sessions = synthesize(args.sessions, args.turns, args.seed)
+    if len(sessions) < 2:
+        print("至少需要两场会话才能做跨会话检索", file=sys.stderr)
+        return 1
+
+    embed = _service_embeddings() if args.embedder == "service" else _ngram_embeddings
+    report = evaluate(sessions, embed, args.k)
+    meta = (f"evaluated {len(sessions)} sessions / {report['turns']} turns, source={args.source}, "
+            f"embedder={args.embedder}, k={args.k}")
+    if args.json:
+        print(json.dumps({"meta": meta, **report}, ensure_ascii=False, indent=2))
+    else:
+        _print_report(report, meta)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
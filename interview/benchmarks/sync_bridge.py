@@ -0,0 +1,180 @@
+"""
+同步 process_answer 桥接开销基准：每次调用新建 loop（before） vs 常驻 LoopPortal（after）
+
+coordinator.process_answer 是同步兼容入口，内部把 aprocess_answer 交给 _run_async：
+- per_call：旧实现 — asyncio.run 新建 loop；调用方自身在 loop 中时再套一个 ThreadPoolExecutor
+- portal  ：提交到进程共享的常驻后台 loop（interview.agents.portal）
+
+调用方（--caller）：
+- thread：普通同步线程（Django 同步视图 / 脚本）
+- loop  ：运行中的 event loop 内部直接同步调用（旧实现需要额外线程池）
+
+每次调用使用新会话跑一轮完整 graph；agent 走本地 OpenAI 兼容桩（默认 0 延迟，只剩桥接 + 框架开销），
+MongoDB 用 mongomock，checkpointer 用 MemorySaver。输出单次调用 p50/p95 与桩服务累计 TCP 连接数
+（per_call 模式下 loop 绑定的连接池随 loop 关闭丢弃，每次调用重新建连）。
+每种组合在独立子进程中运行。
+
+运行：
+  uv run python -m interview.benchmarks.sync_bridge --iterations 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+import warnings
+from typing import Any, Dict, List
+
+_BENCH_ENV = {
+    "MONGODB_URI": "mongodb://127.0.0.1:27017",
+    "MONGODB_DB": "interview_bench",
+    "GPT_API_KEY": "bench",
+    "ALIYUN_API_KEY": "bench",
+    "DOUBAO_API_KEY": "bench",
+    "KIMI_API_KEY": "bench",
+}
+
+_STUB_URL_ENV = ("GPT_BASE_URL", "DOUBAO_BASE_URL", "ALIYUN_BASE_URL")
+
+MODES = ("per_call", "portal")
+CALLERS = ("thread", "loop")
+
+
+def _legacy_run_async(coro):
+    """旧 coordinator._run_async（对照组）"""
+    try:
+        loop = asyncio.get_event_loop()
+        if loop.is_running():
+            import concurrent.futures
+            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+                return pool.submit(asyncio.run, coro).result()
+    except RuntimeError:
+        pass
+    return asyncio.run(coro)
+
+
+def _new_session(coordinator, index: int) -> str:
+    from interview.agents.session import InterviewSession
+
+    session_id = f"bench-bridge-{index}"
+    session = InterviewSession(session_id, "alice", {"name": "alice", "skills": ["Python"]}, coordinator=coordinator)
+    session.parsed_profile = {"items": []}
+    session.current_question = {"question": "请证明√2 是无理数。", "type": "math_logic", "difficulty": "easy"}
+    session.question_data = session.current_question
+    coordinator.memory_store.create_session(session_id, "alice", session.resume_data, session.parsed_profile)
+    coordinator.active_sessions[session_id] = session
+    coordinator.session_store.save(session, include_static=True)
+    return session_id
+
+
+def _run_mode(mode: str, caller: str, iterations: int, latency: str) -> Dict[str, Any]:
+    for key, value in _BENCH_ENV.items():
+        os.environ.setdefault(key, value)
+
+    from interview.benchmarks.llm_stub import spawn_stub
+
+    stub, stub_url = spawn_stub(latency)
+    for key in _STUB_URL_ENV:
+        os.environ[key] = stub_url
+
+    import httpx
+    import mongomock
+    from langgraph.checkpoint.memory import MemorySaver
+
+    from interview.agents import coordinator as coordinator_module
+    from interview.agents.coordinator import MultiAgentCoordinator
+    from interview.agents.utils import percentile
+    from interview.consumers import COORDINATOR_GRAPH_OPTIONS
+    from interview.llm import COORDINATOR_MODELS
+    from interview.tools import db
+
+    db._client = mongomock.MongoClient()
+    coordinator_module.create_mongo_checkpointer = MemorySaver
+    if mode == "per_call":
+        coordinator_module._run_async = _legacy_run_async
+
+    try:
+        coordinator = MultiAgentCoordinator(COORDINATOR_MODELS, graph_options=COORDINATOR_GRAPH_OPTIONS)
+        coordinator._ensure_graph()
+        session_ids = [_new_session(coordinator, i) for i in range(iterations + 1)]
+
+        def call(session_id: str) -> float:
+            start = time.perf_counter()
+            result = coordinator.process_answer(session_id, "因为假设 √2=p/q 既约，则 p²=2q²，p、q 均为偶数，矛盾。")
+            elapsed = (time.perf_counter() - start) * 1000
+            if not result.get("success"):
+                raise RuntimeError(result.get("error"))
+            return elapsed
+
+        def run_all() -> List[float]:
+            return [call(session_id) for session_id in session_ids]
+
+        if caller == "loop":
+            async def in_loop():
+                return run_all()
+            samples = asyncio.run(in_loop())
+        else:
+            samples = run_all()
+        stats = httpx.get(f"{stub_url}/stats", timeout=5).json()
+    finally:
+        stub.terminate()
+        stub.wait(timeout=10)
+
+    steady = samples[1:]  # 首次调用含客户端初始化
+    return {
+        "mode": mode,
+        "caller": caller,
+        "iterations": len(steady),
+        "first_ms": round(samples[0], 2),
+        "p50_ms": round(percentile(steady, 50), 2),
+        "p95_ms": round(percentile(steady, 95), 2),
+        "requests": sum(stats["requests"].values()),
+        "connections": stats["connections"],
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--latency", default="fixed:0", help="桩服务 chat 延迟分布")
+    parser.add_argument("--mode", choices=MODES, help="仅运行单一模式（子进程内部使用）")
+    parser.add_argument("--caller", choices=CALLERS, default="thread")
+    args = parser.parse_args(argv)
+
+    if args.mode:
+        logging.getLogger("interview").setLevel(logging.CRITICAL)
+        warnings.filterwarnings("ignore", category=UserWarning, module="pydantic")
+        print(json.dumps(_run_mode(args.mode, args.caller, args.iterations, args.latency)))
+        return 0
+
+    results = []
+    for caller in CALLERS:
+        for mode in MODES:
+            proc = subprocess.run(
+                [sys.executable, "-m", "interview.benchmarks.sync_bridge",
+                 "--mode", mode, "--caller", caller,
+                 "--iterations", str(args.iterations), "--latency", args.latency],
+                capture_output=True, text=True, check=True,
+            )
+            results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    header = f"{'caller':<8}{'mode':<10}{'first ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'requests':>10}{'connections':>13}"
+    print(f"{args.iterations} sync process_answer calls, stub latency={args.latency}")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['caller']:<8}{r['mode']:<10}{r['first_ms']:>10.1f}{r['p50_ms']:>10.2f}"
+            f"{r['p95_ms']:>10.2f}{r['requests']:>10}{r['connections']:>13}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
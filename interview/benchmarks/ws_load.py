@@ -0,0 +1,346 @@
+"""
+WebSocket 面试压测：N 个脚本化候选人并发走完整 InterviewConsumer 链路
+
+每个候选人：连接 ws/interview/<chat_id>/ → 发送 {"username"} → 收到首题后按
+think-time 间隔逐题作答，直到 --turns 轮或面试结束。
+- LLM / embedding / moderation：本地 OpenAI 兼容桩（interview.benchmarks.llm_stub，子进程），
+  延迟分布与错误率可配置
+- MongoDB：mongomock 替身（预先写入 N 个候选人的 users / resumes）
+- checkpointer：LangGraph MemorySaver；channel layer：InMemoryChannelLayer
+
+报告：time-to-first-question p50/p95、每轮延迟 p50/p95/p99、错误率、RSS 起点 / 峰值 / 终点。
+--max-* 门限任一超出时退出码为 1，可直接作为 CI 回归门禁：
+  uv run python -m interview.benchmarks.ws_load --candidates 8 --turns 3 --think-time 0.2 \\
+      --latency fixed:50 --max-turn-p99-ms 3000 --max-error-rate 0
+
+运行：
+  uv run python -m interview.benchmarks.ws_load --candidates 50 --turns 6 --latency lognormal:900,0.4
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import random
+import resource
+import sys
+import time
+import warnings
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+_BENCH_ENV = {
+    "MONGODB_URI": "mongodb://127.0.0.1:27017",
+    "MONGODB_DB": "interview_bench",
+    "GPT_API_KEY": "bench",
+    "ALIYUN_API_KEY": "bench",
+    "DOUBAO_API_KEY": "bench",
+    "KIMI_API_KEY": "bench",
+}
+
+# 模型 base_url 在 interview.llm 导入时读取，必须在导入前指向桩服务
+_STUB_URL_ENV = ("GPT_BASE_URL", "DOUBAO_BASE_URL", "ALIYUN_BASE_URL")
+
+# 长短混合：< 200 字走 security 短路，更长的回答触发 LLM 安全检测
+_ANSWERS = (
+    "我会先用抽屉原理：考虑前缀和模 n 的余数，共有 n 个前缀和，若某个余数为 0 即得证，"
+    "否则 n 个前缀和落在 n-1 个非零余数中，必有两个相同，其差对应的连续段之和被 n 整除。",
+    "这个问题可以用动态规划，状态定义为前 i 个元素能否凑出余数 j，转移时考虑选或不选第 i 个。",
+    "我在项目里负责数据清洗和特征工程，主要用 pandas 做缺失值处理，再用 sklearn 训练基线模型。"
+    "遇到的难点是样本不均衡，后来通过分层抽样和调整类别权重把召回率提高了十几个百分点。" * 2,
+    "不太确定，我猜是 O(n log n)，因为需要排序之后再做一次线性扫描。",
+)
+
+
+@dataclass
+class CandidateResult:
+    ttfq_ms: Optional[float] = None
+    turn_ms: List[float] = field(default_factory=list)
+    requests: int = 0
+    errors: List[str] = field(default_factory=list)
+
+
+def _rss_kb() -> int:
+    """当前进程常驻内存（KB）；非 Linux 退化为峰值 RSS"""
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+# ============================================================
+# 后端（桩服务 + mongomock + Django/Channels 配置）
+# ============================================================
+
+def _configure_backend(stub_url: str, candidates: int) -> List[str]:
+    """指向桩服务、配置 Django/Channels、装入 mongomock 并写入候选人，返回候选人姓名"""
+    for key, value in _BENCH_ENV.items():
+        os.environ.setdefault(key, value)
+    for key in _STUB_URL_ENV:
+        os.environ[key] = stub_url
+
+    import django
+    from django.conf import settings
+
+    if not settings.configured:
+        settings.configure(
+            INSTALLED_APPS=["channels"],
+            ALLOWED_HOSTS=["*"],
+            CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+        )
+    django.setup()
+
+    import mongomock
+    from langgraph.checkpoint.memory import MemorySaver
+
+    from interview.agents import coordinator as coordinator_module
+    from interview.tools import db
+
+    db._client = mongomock.MongoClient()
+    coordinator_module.create_mongo_checkpointer = MemorySaver
+
+    database = db.get_mongo_db()
+    names = []
+    for i in range(candidates):
+        name = f"bench-candidate-{i:04d}"
+        user_id = database["users"].insert_one({"name": name}).inserted_id
+        database["resumes"].insert_one({"_id": user_id, "content": {
+            "name": name,
+            "education": "某大学 数学与应用数学",
+            "skills": ["Python", "算法", "概率统计", "机器学习"],
+            "projects": [{"name": "竞赛数据分析", "description": "特征工程 + 基线模型"}],
+            "awards": ["全国大学生数学建模竞赛省一等奖"],
+        }})
+        names.append(name)
+    return names
+
+
+# ============================================================
+# 候选人脚本
+# ============================================================
+
+async def _receive_reply(communicator, timeout: float) -> Dict[str, Any]:
+    """跳过流式进度事件，返回本轮的最终消息"""
+    while True:
+        reply = json.loads(await communicator.receive_from(timeout=timeout))
+        if reply.get("type") not in ("progress", "question_delta", "question_reset"):
+            return reply
+
+
+async def _run_candidate(
+    index: int, name: str, args: argparse.Namespace, rng: random.Random
+) -> CandidateResult:
+    from channels.routing import URLRouter
+    from channels.testing import WebsocketCommunicator
+
+    from interview.routing import websocket_urlpatterns
+
+    result = CandidateResult()
+    await asyncio.sleep(args.ramp_up * index / max(args.candidates, 1))
+    communicator = WebsocketCommunicator(
+        URLRouter(websocket_urlpatterns), f"/ws/interview/bench-{index:04d}-{os.getpid()}/"
+    )
+    try:
+        started = time.perf_counter()
+        connected, _ = await communicator.connect(timeout=args.timeout)
+        if not connected:
+            result.errors.append("connect_rejected")
+            return result
+
+        result.requests += 1
+        await communicator.send_json_to({"username": name})
+        reply = await _receive_reply(communicator, args.timeout)
+        if reply.get("type") != "message":
+            result.errors.append(f"start:{reply.get('type')}")
+            return result
+        result.ttfq_ms = (time.perf_counter() - started) * 1000
+
+        for turn in range(args.turns):
+            await asyncio.sleep(rng.uniform(0.5, 1.5) * args.think_time)
+            result.requests += 1
+            started = time.perf_counter()
+            await communicator.send_json_to({
+                "message": _ANSWERS[(index + turn) % len(_ANSWERS)], "stream": args.stream,
+            })
+            reply = await _receive_reply(communicator, args.timeout)
+            if reply.get("type") not in ("message", "security_termination"):
+                result.errors.append(f"turn:{reply.get('type')}")
+                continue
+            result.turn_ms.append((time.perf_counter() - started) * 1000)
+            if reply.get("status") != "ongoing":
+                break
+    except asyncio.TimeoutError:
+        result.errors.append("timeout")
+    except Exception as e:
+        result.errors.append(f"exception:{type(e).__name__}")
+    finally:
+        try:
+            await communicator.disconnect(timeout=args.timeout)
+        except Exception:
+            pass
+    return result
+
+
+async def _sample_rss(peak: List[int], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        peak[0] = max(peak[0], _rss_kb())
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=0.2)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def _load(names: List[str], args: argparse.Namespace) -> Dict[str, Any]:
+    from interview.agents.registry import get_shared_coordinator
+    from interview.consumers import COORDINATOR_GRAPH_OPTIONS
+    from interview.llm import COORDINATOR_MODELS
+
+    # 预热：共享 coordinator 构建与 graph 编译不计入首个连接的 TTFQ
+    get_shared_coordinator(COORDINATOR_MODELS, COORDINATOR_GRAPH_OPTIONS)._ensure_graph()
+    gc.collect()
+    rss_start = _rss_kb()
+    peak = [rss_start]
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(_sample_rss(peak, stop))
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(
+        _run_candidate(i, name, args, random.Random(args.seed + i)) for i, name in enumerate(names)
+    ))
+    wall_s = time.perf_counter() - started
+
+    stop.set()
+    await sampler
+    gc.collect()
+    rss_end = _rss_kb()
+    return {
+        "results": results, "wall_s": wall_s,
+        "rss_start_kb": rss_start, "rss_peak_kb": peak[0], "rss_end_kb": rss_end,
+    }
+
+
+def _stub_stats(stub_url: str) -> Dict[str, Any]:
+    import httpx
+
+    try:
+        return httpx.get(f"{stub_url}/stats", timeout=5).json()
+    except Exception:
+        return {}
+
+
+def _summarize(run: Dict[str, Any], stats: Dict[str, Any]) -> Dict[str, Any]:
+    from interview.agents.utils import percentile
+
+    results: List[CandidateResult] = run["results"]
+    ttfq = [r.ttfq_ms for r in results if r.ttfq_ms is not None]
+    turns = [ms for r in results for ms in r.turn_ms]
+    requests = sum(r.requests for r in results)
+    errors = [e for r in results for e in r.errors]
+
+    def pct(samples: List[float], q: float) -> Optional[float]:
+        return round(percentile(samples, q), 1) if samples else None
+
+    return {
+        "candidates": len(results),
+        "completed_turns": len(turns),
+        "wall_s": round(run["wall_s"], 2),
+        "ttfq_p50_ms": pct(ttfq, 50),
+        "ttfq_p95_ms": pct(ttfq, 95),
+        "turn_p50_ms": pct(turns, 50),
+        "turn_p95_ms": pct(turns, 95),
+        "turn_p99_ms": pct(turns, 99),
+        "requests": requests,
+        "errors": len(errors),
+        "error_rate": round(len(errors) / requests, 4) if requests else 0.0,
+        "error_kinds": {kind: errors.count(kind) for kind in sorted(set(errors))},
+        "rss_start_mb": round(run["rss_start_kb"] / 1024, 1),
+        "rss_peak_mb": round(run["rss_peak_kb"] / 1024, 1),
+        "rss_end_mb": round(run["rss_end_kb"] / 1024, 1),
+        "rss_growth_mb": round((run["rss_end_kb"] - run["rss_start_kb"]) / 1024, 1),
+        "stub": stats,
+    }
+
+
+def _gate_violations(summary: Dict[str, Any], args: argparse.Namespace) -> List[str]:
+    gates = (
+        ("turn_p99_ms", args.max_turn_p99_ms),
+        ("ttfq_p95_ms", args.max_ttfq_p95_ms),
+        ("error_rate", args.max_error_rate),
+        ("rss_growth_mb", args.max_rss_growth_mb),
+    )
+    violations = []
+    for key, limit in gates:
+        if limit is None:
+            continue
+        value = summary[key]
+        if value is None or value > limit:
+            violations.append(f"{key}={value} > {limit}")
+    return violations
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=6, help="每个候选人最多作答轮数")
+    parser.add_argument("--think-time", type=float, default=2.0, help="平均作答思考时间（秒，±50%% 均匀抖动）")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="全部候选人在该秒数内均匀接入")
+    parser.add_argument("--timeout", type=float, default=120.0, help="单条回复等待上限（秒）")
+    parser.add_argument("--stream", action="store_true", help="作答时请求流式进度事件")
+    parser.add_argument("--latency", default="lognormal:900,0.4", help="桩服务 chat 延迟分布")
+    parser.add_argument("--embedding-latency", default="fixed:30")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="桩服务注入 500 的比例")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-turn-p99-ms", type=float)
+    parser.add_argument("--max-ttfq-p95-ms", type=float)
+    parser.add_argument("--max-error-rate", type=float)
+    parser.add_argument("--max-rss-growth-mb", type=float)
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出汇总")
+    parser.add_argument("--log-level", default="CRITICAL",
+                        help="interview.* 日志级别（mongomock 不支持 $vectorSearch，默认静默其降级日志）")
+    args = parser.parse_args(argv)
+    logging.getLogger("interview").setLevel(args.log_level.upper())
+    # langchain 结构化输出的 parsed 字段序列化告警，与压测无关
+    warnings.filterwarnings("ignore", category=UserWarning, module="pydantic")
+
+    from interview.benchmarks.llm_stub import spawn_stub
+
+    stub, stub_url = spawn_stub(args.latency, args.embedding_latency, args.error_rate, args.seed)
+    try:
+        names = _configure_backend(stub_url, args.candidates)
+        run = asyncio.run(_load(names, args))
+        summary = _summarize(run, _stub_stats(stub_url))
+    finally:
+        stub.terminate()
+        stub.wait(timeout=10)
+
+    violations = _gate_violations(summary, args)
+    if args.json:
+        print(json.dumps({**summary, "violations": violations}, ensure_ascii=False, indent=2))
+    else:
+        print(f"{summary['candidates']} candidates, {args.turns} turns, latency={args.latency}, "
+              f"error_rate={args.error_rate}, wall={summary['wall_s']}s")
+        print(f"{'metric':<16}{'p50':>10}{'p95':>10}{'p99':>10}")
+        print("-" * 46)
+        print(f"{'ttfq ms':<16}{summary['ttfq_p50_ms']!s:>10}{summary['ttfq_p95_ms']!s:>10}{'':>10}")
+        print(f"{'turn ms':<16}{summary['turn_p50_ms']!s:>10}{summary['turn_p95_ms']!s:>10}"
+              f"{summary['turn_p99_ms']!s:>10}")
+        print(f"turns={summary['completed_turns']} errors={summary['errors']}/{summary['requests']} "
+              f"({summary['error_rate']:.2%}) {summary['error_kinds']}")
+        print(f"rss MB start={summary['rss_start_mb']} peak={summary['rss_peak_mb']} "
+              f"end={summary['rss_end_mb']} growth={summary['rss_growth_mb']}")
+        print(f"stub requests={summary['stub'].get('requests')} injected_errors={summary['stub'].get('errors')}")
+        for violation in violations:
+            print(f"GATE FAILED: {violation}")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,29 @@
 import json
 import asyncio
-import httpx
 import base64
 import logging
 from channels.generic.websocket import AsyncWebsocketConsumer
-from .agents import MultiAgentCoordinator
-from .llm import chatgpt_model, gemini_model, kimi_model, qwen_model, doubao_model
+from .agents import get_shared_coordinator
+from .agents.deadline import TurnBudget
+from .metrics import consumer_task_finished, consumer_task_started
+from .llm import COORDINATOR_MODELS, UPSTREAM_BASE_URLS
+from .transport import awarm_up, get_async_client, warm_up, warmup_enabled
 
 # 初始化logger
 logger = logging.getLogger("interview.consumers")
 
+TTS_URL = "http://101.76.216.150:9880/"
+
+# 角色 → 模型配置见 llm.COORDINATOR_MODELS（简历预解析视图共用）
+# parallel_security：security 与 scoring 并行启动，block 时取消在途评分（输出与顺序拓扑一致）
+# checkpoint_mode="slim"：checkpoint 只保存节点增量并做 zstd 压缩（旧 checkpoint 仍可读取）
+# turn_budget：单轮延迟预算，剩余预算不足时按固定顺序降级（记录于 output["degradations"]）
+COORDINATOR_GRAPH_OPTIONS = {
+    "parallel_security": True,
+    "checkpoint_mode": "slim",
+    "turn_budget": TurnBudget(),
+}
+
 class InterviewConsumer(AsyncWebsocketConsumer):
     """
     处理面试 WebSocket 连接的 Consumer。
@@ -27,25 +41,27 @@ class InterviewConsumer(AsyncWebsocketConsumer):
         # 必须串行化以保证 coordinator 内部状态机一致）
         self._answer_lock = asyncio.Lock()
 
-        # 初始化多智能体协调器
-        # W2.1：scoring_models 用 [doubao, gemini] 双模型 ensemble（不同 API 来源）
-        # - doubao 走豆包独立 API（thinking 已禁用）
-        # - gemini 走 GPT 通道代理
-        # 真正不同来源避免单点 rate limit；同时支持 CISC confidence-weighted 聚合
-        models = {
-            "question_model": chatgpt_model,
-            "scoring_models": [doubao_model, gemini_model],
-            "security_model": gemini_model,
-            "summary_model": gemini_model,
-        }
-        self.coordinator = MultiAgentCoordinator(models)
+        # 进程共享的多智能体协调器：agent / RetrievalSystem / LangGraph 只构建一次，
+        # 会话状态按 chat_id 存于 coordinator.active_sessions
+        # 首次构建会初始化 checkpointer（阻塞 I/O）→ 放入 thread
+        self.coordinator = await asyncio.to_thread(
+            get_shared_coordinator, COORDINATOR_MODELS, COORDINATOR_GRAPH_OPTIONS
+        )
 
         # 加入 Channel Layer 组
         await self.channel_layer.group_add(self.group_name, self.channel_name)
         await self.accept()
 
+        # 连接预热（INTERVIEW_HTTP_WARMUP=1）：每个上游只预热一次，TLS 握手不落在首轮回答上
+        if warmup_enabled():
+            self._spawn_task(self._warm_up_upstreams())
+
         logger.info(f"WebSocket连接已建立: {self.chat_id}")
 
+    async def _warm_up_upstreams(self) -> None:
+        await awarm_up(UPSTREAM_BASE_URLS)
+        await asyncio.to_thread(warm_up, UPSTREAM_BASE_URLS)
+
     async def disconnect(self, close_code):
         # 取消尚未完成的后台任务
         if hasattr(self, "_pending_tasks"):
@@ -53,9 +69,10 @@ class InterviewConsumer(AsyncWebsocketConsumer):
                 if not task.done():
                     task.cancel()
 
-        # 清理面试会话
+        # 释放面试会话（coordinator 为进程共享实例，只处理本连接的 chat_id）：
+        # 会话在宽限期内保留，同一 chat_id 重连时接回；共享 session store 下由其他 worker 继续
         if hasattr(self, 'coordinator'):
-            self.coordinator.cleanup_session(self.chat_id)
+            self.coordinator.detach_session(self.chat_id)
 
         # 离开 Channel Layer 组
         await self.channel_layer.group_discard(self.group_name, self.channel_name)
@@ -71,9 +88,11 @@ class InterviewConsumer(AsyncWebsocketConsumer):
         """
         task = asyncio.create_task(coro)
         self._pending_tasks.add(task)
+        consumer_task_started()
 
         def _on_done(t: asyncio.Task) -> None:
             self._pending_tasks.discard(t)
+            consumer_task_finished()
             if t.cancelled():
                 return
             exc = t.exception()
@@ -96,6 +115,8 @@ class InterviewConsumer(AsyncWebsocketConsumer):
             data = json.loads(text_data)
             user_input = data.get('message', '')
             username = data.get('username')
+            # 可选：stream=true 时推送节点进度与逐 token 的下一题（最终消息不变）
+            stream = bool(data.get('stream', False))
 
             # 如果面试还未开始且提供了用户名，启动面试
             if not self.interview_started and username:
@@ -104,7 +125,7 @@ class InterviewConsumer(AsyncWebsocketConsumer):
                 self._spawn_task(self._run_start_interview(username))
             elif user_input and self.interview_started:
                 # 处理用户回答
-                self._spawn_task(self._run_process_answer(user_input))
+                self._spawn_task(self._run_process_answer(user_input, stream))
             else:
                 await self.send_error("无效的输入格式")
 
@@ -127,15 +148,39 @@ class InterviewConsumer(AsyncWebsocketConsumer):
         """
         async with self._answer_lock:
             try:
-                await self.start_interview(username)
+                if not await self.resume_interview(username):
+                    await self.start_interview(username)
             except Exception:
                 self.interview_started = False
                 raise
 
-    async def _run_process_answer(self, user_answer: str) -> None:
+    async def _run_process_answer(self, user_answer: str, stream: bool = False) -> None:
         """串行化包装：单一会话内保证 process_answer 顺序执行。"""
         async with self._answer_lock:
-            await self.process_user_answer(user_answer)
+            await self.process_user_answer(user_answer, stream=stream)
+
+    async def resume_interview(self, candidate_name: str) -> bool:
+        """重连：接回同一 chat_id 的存活会话（或从快照恢复），重发当前题目；无可恢复会话返回 False"""
+        try:
+            result = await asyncio.to_thread(
+                self.coordinator.reattach_session, self.chat_id, candidate_name
+            )
+        except Exception as e:
+            logger.error(f"恢复面试会话时发生错误: {e}")
+            return False
+        if not result["success"]:
+            return False
+
+        await self.send(text_data=json.dumps({
+            'type': 'message',
+            'response': str(result["current_question"]),
+            'question_type': result.get("question_type", "general"),
+            'status': 'ongoing',
+            'resumed': True,
+            'total_questions': result["total_questions"],
+        }))
+        logger.info(f"WebSocket 重连，会话已接回: {self.chat_id}（{result['resumed_from']}）")
+        return True
 
     async def start_interview(self, candidate_name: str):
         """
@@ -167,13 +212,21 @@ class InterviewConsumer(AsyncWebsocketConsumer):
             logger.error(f"启动面试时发生错误: {e}")
             await self.send_error("启动面试时发生系统错误")
     
-    async def process_user_answer(self, user_answer: str):
+    async def process_user_answer(self, user_answer: str, stream: bool = False):
         """
         处理用户回答
+
+        stream=True 时在最终消息之前推送：
+        - {'type': 'progress', 'stage': 'security_checked' | 'scored' | 'generating_next_question' | 'finalizing'}
+        - {'type': 'question_delta', 'delta': '...'}（下一题逐段文本）
+        - {'type': 'question_reset'}（题目被 CoVe 打回重写，前端清空已显示的增量）
         """
         try:
             # 走 LangGraph async 入口（内部 security/scoring 并行）
-            result = await self.coordinator.aprocess_answer(self.chat_id, user_answer)
+            result = await self.coordinator.aprocess_answer(
+                self.chat_id, user_answer,
+                on_event=self.send_stream_event if stream else None,
+            )
             
             if result["success"]:
                 if result.get("interview_complete"):
@@ -225,7 +278,9 @@ class InterviewConsumer(AsyncWebsocketConsumer):
                             'overall_score': result["overall_score"],
                             'summary': str(summary_text),
                             'total_questions': result["total_questions"],
-                            'average_score': result["average_score"]
+                            'average_score': result["average_score"],
+                            # pending：评估报告由后台 finalize 任务生成，结果页轮询获取
+                            'result_status': result.get("result_status", "completed"),
                         }
                         
                         # 添加TTS音频（暂时禁用）
@@ -276,17 +331,17 @@ class InterviewConsumer(AsyncWebsocketConsumer):
         生成TTS音频并返回base64编码
         """
         try:
-            tts_url = "http://101.76.216.150:9880/"
             params = {"text": text, "text_language": "zh"}
-            
-            async with httpx.AsyncClient() as client:
-                tts_response = await client.get(tts_url, params=params, timeout=30.0)
-                if tts_response.status_code == 200:
-                    audio_content = tts_response.content
-                    return base64.b64encode(audio_content).decode('utf-8')
-                else:
-                    logger.error(f"TTS API错误: Status {tts_response.status_code}")
-                    return None
+
+            # 共享连接池（transport.py），不再每次调用新建客户端
+            client = get_async_client(TTS_URL)
+            tts_response = await client.get(TTS_URL, params=params, timeout=30.0)
+            if tts_response.status_code == 200:
+                audio_content = tts_response.content
+                return base64.b64encode(audio_content).decode('utf-8')
+            else:
+                logger.error(f"TTS API错误: Status {tts_response.status_code}")
+                return None
         except Exception as e:
             logger.error(f"TTS生成异常: {e}")
             return None
@@ -301,6 +356,12 @@ class InterviewConsumer(AsyncWebsocketConsumer):
         }
         await self.send(text_data=json.dumps(message))
     
+    async def send_stream_event(self, event: dict):
+        """
+        推送流式进度 / 题目增量事件
+        """
+        await self.send(text_data=json.dumps(event))
+
     async def send_security_warning(self, warning_message: str):
         """
         发送安全警告
@@ -2,6 +2,8 @@ from langchain_openai import ChatOpenAI
 import os
 from dotenv import load_dotenv
 
+from interview.transport import get_async_client, get_sync_client
+
 load_dotenv()
 
 
@@ -13,26 +15,42 @@ def _env_first(*keys: str) -> str | None:
             return v
     return None
 
+
+def _http_clients(base_url: str | None) -> dict:
+    """同一上游主机的模型共享连接池（见 transport.py）"""
+    return {"http_client": get_sync_client(base_url), "http_async_client": get_async_client(base_url)}
+
+
+GPT_BASE_URL = os.getenv("GPT_BASE_URL")
+QWEN_BASE_URL = "https://dashscope.aliyuncs.com/compatible-mode/v1"
+DOUBAO_BASE_URL = _env_first("DOUBAO_BASE_URL", "DOUBA_BASE_URL")
+EMBEDDING_BASE_URL = os.getenv("ALIYUN_BASE_URL")
+# 面试链路用到的全部上游（连接预热用）
+UPSTREAM_BASE_URLS = (GPT_BASE_URL, DOUBAO_BASE_URL, EMBEDDING_BASE_URL)
+
 chatgpt_model = ChatOpenAI(
     model="gpt-5-mini",
     api_key=os.getenv("GPT_API_KEY"),
-    base_url=os.getenv("GPT_BASE_URL"),
+    base_url=GPT_BASE_URL,
     timeout=30,
+    **_http_clients(GPT_BASE_URL),
 )
 
 
 qwen_model = ChatOpenAI(
     model="qwen-plus",
     api_key=os.getenv("ALIYUN_API_KEY"),
-    base_url="https://dashscope.aliyuncs.com/compatible-mode/v1",
+    base_url=QWEN_BASE_URL,
     timeout=30,
+    **_http_clients(QWEN_BASE_URL),
 )
 
 gemini_model = ChatOpenAI(
     model="gemini-2.5-flash",
     api_key=os.getenv("GPT_API_KEY"),
-    base_url=os.getenv("GPT_BASE_URL"),
+    base_url=GPT_BASE_URL,
     timeout=30,
+    **_http_clients(GPT_BASE_URL),
 )
 llm_kwargs={
    "extra_body": {
@@ -42,14 +60,30 @@ llm_kwargs={
 doubao_model = ChatOpenAI(
     model="doubao-seed-1-6-250615",
     api_key=os.getenv("DOUBAO_API_KEY"),
-    base_url=_env_first("DOUBAO_BASE_URL", "DOUBA_BASE_URL"),
+    base_url=DOUBAO_BASE_URL,
     timeout=30,
+    **_http_clients(DOUBAO_BASE_URL),
     **llm_kwargs
 )
 
 kimi_model = ChatOpenAI(
     model="kimi-k2-0711-preview",
     api_key=os.getenv("GPT_API_KEY"),
-    base_url=os.getenv("GPT_BASE_URL"),
+    base_url=GPT_BASE_URL,
     timeout=30,
-)
\ No newline at end of file
+    **_http_clients(GPT_BASE_URL),
+)
+
+# 面试各角色使用的模型：consumers（面试）与 users（简历预解析）共用此配置
+# W2.1：scoring_models 用 [doubao, gemini] 双模型 ensemble（不同 API 来源）
+# - doubao 走豆包独立 API（thinking 已禁用）
+# - gemini 走 GPT 通道代理
+# 真正不同来源避免单点 rate limit；同时支持 CISC confidence-weighted 聚合
+COORDINATOR_MODELS = {
+    "question_model": chatgpt_model,
+    "scoring_models": [doubao_model, gemini_model],
+    "security_model": gemini_model,
+    "summary_model": gemini_model,
+    # 可选：评分 / 出题对冲请求的备用模型，如 "hedge_model": qwen_model（见 agents/hedging.py）
+    # 可选：按角色的故障转移链，如 "failover": {"security_model": [doubao_model]}（见 agents/breaker.py）
+}
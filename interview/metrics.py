@@ -0,0 +1,435 @@
+"""
+运行时指标（Prometheus 文本格式）— 定位单轮耗时花在哪里
+
+埋点：
+- graph 节点：interview_graph_node_seconds{node}
+  （build_interview_graph 编译时包装每个节点）
+- LLM 调用：interview_llm_call_seconds{agent,model}
+            interview_llm_tokens_total{agent,model,kind=input|cached_input|output}
+            （cached_input = provider 前缀缓存命中的输入 token，见 agents/cache.py；
+             prompt_cache_report() 按 agent 汇总命中率）
+            interview_llm_errors_total{agent,model}
+  （BaseAgent.ainvoke_structured / ScoringAgent._score_with_model / QuestionVerifier._verify_with_llm）
+- MongoDB：interview_mongo_op_seconds{collection,operation}
+           interview_mongo_errors_total{collection,operation}（RetrievalSystem 各集合操作）
+- gauge：interview_active_sessions / interview_consumer_pending_tasks
+- HTTP 连接池：interview_http_pool_connections{host,client,state=active|idle|queued}
+              interview_http_connect_seconds{host,phase=tcp|tls}（新建连接 / TLS 握手耗时，见 transport.py）
+- 上游限流：interview_provider_queue_depth{provider,priority} / interview_provider_in_flight{provider}
+           interview_provider_wait_seconds{provider,priority}
+           interview_provider_throttled_total{provider}（429 / 503 次数，见 ratelimit.py）
+- LLM 响应缓存：interview_llm_cache_total{agent,result=hit|miss}（见 agents/response_cache.py）
+- prompt 上下文：interview_context_tokens_total{agent,kind=sent|saved}（见 agents/context_budget.py）
+- 评分前置分流：interview_scoring_prescore_total{result=empty|refusal|duplicate|cache_hit|miss}
+  （见 agents/prescoring.py）
+- 评分提前结束：interview_scoring_early_exit_total{question_type,outcome=accepted|audited|shadow}（见 agents/early_exit.py）
+- speculative 出题：interview_speculation_outcome_total{outcome=committed|band_mismatch|finalized|failed}
+                  interview_speculation_win_rate / interview_speculation_turn_ms{mode,quantile}
+                  interview_speculation_saved_ms{quantile}（抓取时由滑动窗口计算，见 agents/speculation.py）
+- 熔断器：interview_breaker_state{model}（0=closed 1=half_open 2=open）
+         interview_breaker_transitions_total{model,state}（见 agents/breaker.py）
+
+INTERVIEW_METRICS=1 启用（需要 prometheus-client）。未启用时 graph 节点不包装，
+其余埋点只做一次布尔判断并返回共享的 nullcontext。
+
+暴露在 GET /api/metrics/；INTERVIEW_METRICS_TOKEN 非空时要求 Authorization: Bearer <token>。
+"""
+
+from __future__ import annotations
+
+import contextlib
+import functools
+import hmac
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple
+
+from django.http import HttpResponse
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        CollectorRegistry,
+        Counter,
+        Gauge,
+        Histogram,
+        generate_latest,
+    )
+    from prometheus_client.core import GaugeMetricFamily
+except ImportError:  # pragma: no cover - prometheus-client 缺失时指标恒为关闭
+    CollectorRegistry = None
+
+logger = logging.getLogger("interview.metrics")
+
+METRICS_ENV = "INTERVIEW_METRICS"
+METRICS_TOKEN_ENV = "INTERVIEW_METRICS_TOKEN"
+
+# 覆盖 Mongo 单次操作（毫秒级）到一次完整出题（数十秒）
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0)
+
+_NOOP = contextlib.nullcontext()
+
+# 滑动窗口分位数（snapshot 键）→ quantile 标签
+_QUANTILE_LABELS = (("p50", "0.5"), ("p95", "0.95"))
+
+REGISTRY = None
+if CollectorRegistry is not None:
+    REGISTRY = CollectorRegistry()
+    NODE_SECONDS = Histogram(
+        "interview_graph_node_seconds", "LangGraph 节点耗时",
+        ["node"], buckets=_LATENCY_BUCKETS, registry=REGISTRY,
+    )
+    LLM_SECONDS = Histogram(
+        "interview_llm_call_seconds", "LLM 调用耗时",
+        ["agent", "model"], buckets=_LATENCY_BUCKETS, registry=REGISTRY,
+    )
+    LLM_TOKENS = Counter(
+        "interview_llm_tokens", "LLM token 用量",
+        ["agent", "model", "kind"], registry=REGISTRY,
+    )
+    LLM_ERRORS = Counter(
+        "interview_llm_errors", "LLM 调用异常次数",
+        ["agent", "model"], registry=REGISTRY,
+    )
+    MONGO_SECONDS = Histogram(
+        "interview_mongo_op_seconds", "MongoDB 操作耗时（含游标读取）",
+        ["collection", "operation"], buckets=_LATENCY_BUCKETS, registry=REGISTRY,
+    )
+    MONGO_ERRORS = Counter(
+        "interview_mongo_errors", "MongoDB 操作异常次数",
+        ["collection", "operation"], registry=REGISTRY,
+    )
+    ACTIVE_SESSIONS = Gauge(
+        "interview_active_sessions", "本进程正在处理的面试会话数", registry=REGISTRY,
+    )
+    PENDING_TASKS = Gauge(
+        "interview_consumer_pending_tasks", "WebSocket consumer 在途任务数", registry=REGISTRY,
+    )
+    HTTP_CONNECT_SECONDS = Histogram(
+        "interview_http_connect_seconds", "上游 HTTP 新建连接耗时（tcp 建连 / tls 握手）",
+        ["host", "phase"], buckets=_LATENCY_BUCKETS, registry=REGISTRY,
+    )
+
+    class _HttpPoolCollector:
+        """抓取时读取共享 HTTP 连接池状态（取值函数由 transport 注册）"""
+
+        source: Optional[Callable[[], Dict[Tuple[str, str], Dict[str, int]]]] = None
+
+        def collect(self):
+            family = GaugeMetricFamily(
+                "interview_http_pool_connections", "共享 HTTP 连接池连接数",
+                labels=["host", "client", "state"],
+            )
+            for (host, client), states in (self.source() if self.source else {}).items():
+                for state, count in states.items():
+                    family.add_metric([host, client, state], count)
+            yield family
+
+    _HTTP_POOLS = _HttpPoolCollector()
+    REGISTRY.register(_HTTP_POOLS)
+
+    PROVIDER_WAIT_SECONDS = Histogram(
+        "interview_provider_wait_seconds", "上游请求在 provider 限流队列中的等待耗时",
+        ["provider", "priority"], buckets=_LATENCY_BUCKETS, registry=REGISTRY,
+    )
+    PROVIDER_THROTTLED = Counter(
+        "interview_provider_throttled", "上游返回 429 / 503 的次数",
+        ["provider"], registry=REGISTRY,
+    )
+
+    class _ProviderLimitCollector:
+        """抓取时读取各 provider 限流器的排队数 / 在途数（取值函数由 ratelimit 注册）"""
+
+        source: Optional[Callable[[], Dict[str, Dict[str, Any]]]] = None
+
+        def collect(self):
+            queued = GaugeMetricFamily(
+                "interview_provider_queue_depth", "provider 限流队列中等待放行的请求数",
+                labels=["provider", "priority"],
+            )
+            in_flight = GaugeMetricFamily(
+                "interview_provider_in_flight", "provider 在途请求数", labels=["provider"],
+            )
+            for provider, stats in (self.source() if self.source else {}).items():
+                in_flight.add_metric([provider], stats["in_flight"])
+                for level, count in stats["queued"].items():
+                    queued.add_metric([provider, level], count)
+            yield queued
+            yield in_flight
+
+    _PROVIDER_LIMITS = _ProviderLimitCollector()
+    REGISTRY.register(_PROVIDER_LIMITS)
+
+    LLM_CACHE = Counter(
+        "interview_llm_cache", "LLM 响应缓存查询次数",
+        ["agent", "result"], registry=REGISTRY,
+    )
+    CONTEXT_TOKENS = Counter(
+        "interview_context_tokens", "按 token 预算组装的 prompt 上下文（实际发送 / 相对原始序列化节省）",
+        ["agent", "kind"], registry=REGISTRY,
+    )
+    SCORING_EARLY_EXIT = Counter(
+        "interview_scoring_early_exit", "评分 ensemble 首个候选满足提前结束条件的轮次",
+        ["question_type", "outcome"], registry=REGISTRY,
+    )
+    SCORING_PRESCORE = Counter(
+        "interview_scoring_prescore", "评分前置分流结果（退化回答规则评分 / 回答级缓存命中 / 交给 LLM）",
+        ["result"], registry=REGISTRY,
+    )
+    SPECULATION_OUTCOMES = Counter(
+        "interview_speculation_outcome", "speculative 下题草稿结局",
+        ["outcome"], registry=REGISTRY,
+    )
+
+    class _SpeculationCollector:
+        """抓取时读取 speculative 出题的胜率与单轮 / 节省耗时分位数（取值函数由 speculation 注册）"""
+
+        source: Optional[Callable[[], Dict[str, Any]]] = None
+
+        def collect(self):
+            win_rate = GaugeMetricFamily(
+                "interview_speculation_win_rate", "草稿提交率（committed / 非 finalized 的草稿，滑动窗口）",
+            )
+            turn_ms = GaugeMetricFamily(
+                "interview_speculation_turn_ms", "单轮端到端耗时分位数（毫秒，滑动窗口）",
+                labels=["mode", "quantile"],
+            )
+            saved_ms = GaugeMetricFamily(
+                "interview_speculation_saved_ms", "提交草稿省下的下题生成耗时分位数（毫秒，滑动窗口）",
+                labels=["quantile"],
+            )
+            report = self.source() if self.source else None
+            if report:
+                win_rate.add_metric([], report["win_rate"])
+                for mode, stats in report["turn_ms"].items():
+                    for key, quantile in _QUANTILE_LABELS:
+                        turn_ms.add_metric([mode, quantile], stats[key])
+                for key, quantile in _QUANTILE_LABELS:
+                    saved_ms.add_metric([quantile], report["saved_ms"][key])
+            yield win_rate
+            yield turn_ms
+            yield saved_ms
+
+    _SPECULATION = _SpeculationCollector()
+    REGISTRY.register(_SPECULATION)
+
+    BREAKER_STATE = Gauge(
+        "interview_breaker_state", "模型熔断器状态（0=closed 1=half_open 2=open）",
+        ["model"], registry=REGISTRY,
+    )
+    BREAKER_TRANSITIONS = Counter(
+        "interview_breaker_transitions", "模型熔断器状态迁移次数",
+        ["model", "state"], registry=REGISTRY,
+    )
+
+_BREAKER_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+_enabled = CollectorRegistry is not None and os.getenv(METRICS_ENV, "").strip().lower() in ("1", "true", "yes")
+
+
+def metrics_enabled() -> bool:
+    return _enabled
+
+
+def set_metrics_enabled(enabled: bool) -> bool:
+    """运行时开关（测试用）；prometheus-client 未安装时始终关闭。
+
+    graph 节点在编译时包装，切换后需重新 build_interview_graph 才会生效。
+    """
+    global _enabled
+    _enabled = bool(enabled) and CollectorRegistry is not None
+    return _enabled
+
+
+# ============================================================
+# 埋点
+# ============================================================
+
+def instrument_node(name: str, node: Callable[[Any], Awaitable[Dict[str, Any]]]):
+    """包装 graph 节点统计耗时；未启用时原样返回（零开销）"""
+    if not _enabled:
+        return node
+    histogram = NODE_SECONDS.labels(node=name)
+
+    @functools.wraps(node)
+    async def _timed_node(state):
+        started = time.perf_counter()
+        try:
+            return await node(state)
+        finally:
+            histogram.observe(time.perf_counter() - started)
+
+    return _timed_node
+
+
+@contextlib.contextmanager
+def _timed_llm_call(agent: str, model: str, runnable):
+    from langchain_core.callbacks import UsageMetadataCallbackHandler
+
+    usage = UsageMetadataCallbackHandler()
+    started = time.perf_counter()
+    try:
+        yield runnable.with_config(callbacks=[usage])
+    except Exception:
+        LLM_ERRORS.labels(agent=agent, model=model).inc()
+        raise
+    finally:
+        LLM_SECONDS.labels(agent=agent, model=model).observe(time.perf_counter() - started)
+        input_tokens = sum(u.get("input_tokens", 0) for u in usage.usage_metadata.values())
+        output_tokens = sum(u.get("output_tokens", 0) for u in usage.usage_metadata.values())
+        cached_tokens = sum(
+            (u.get("input_token_details") or {}).get("cache_read", 0) for u in usage.usage_metadata.values()
+        )
+        if input_tokens:
+            LLM_TOKENS.labels(agent=agent, model=model, kind="input").inc(input_tokens)
+        if cached_tokens:
+            LLM_TOKENS.labels(agent=agent, model=model, kind="cached_input").inc(cached_tokens)
+        if output_tokens:
+            LLM_TOKENS.labels(agent=agent, model=model, kind="output").inc(output_tokens)
+
+
+def llm_call(agent: str, model: str, runnable):
+    """LLM 调用计时 + token / 异常计数。
+
+    用法：with llm_call(name, model, runnable) as bound: await bound.ainvoke(messages)
+    启用时 bound 绑定了收集 usage_metadata 的 callback；未启用时就是 runnable 本身。
+    """
+    if not _enabled:
+        return contextlib.nullcontext(runnable)
+    return _timed_llm_call(agent, model, runnable)
+
+
+def prompt_cache_report() -> Dict[str, Dict[str, float]]:
+    """按 agent 汇总 provider 前缀缓存命中：{agent: {input_tokens, cached_tokens, hit_ratio}}"""
+    report: Dict[str, Dict[str, float]] = {}
+    if REGISTRY is None:
+        return report
+    for sample in LLM_TOKENS.collect()[0].samples:
+        kind = sample.labels["kind"]
+        if not sample.name.endswith("_total") or kind not in ("input", "cached_input"):
+            continue
+        entry = report.setdefault(sample.labels["agent"], {"input_tokens": 0.0, "cached_tokens": 0.0})
+        entry["input_tokens" if kind == "input" else "cached_tokens"] += sample.value
+    for entry in report.values():
+        entry["hit_ratio"] = round(entry["cached_tokens"] / entry["input_tokens"], 4) if entry["input_tokens"] else 0.0
+    return report
+
+
+@contextlib.contextmanager
+def _timed_mongo_op(collection: str, operation: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        MONGO_ERRORS.labels(collection=collection, operation=operation).inc()
+        raise
+    finally:
+        MONGO_SECONDS.labels(collection=collection, operation=operation).observe(
+            time.perf_counter() - started
+        )
+
+
+def mongo_op(collection: str, operation: str):
+    """MongoDB 操作计时；find / aggregate 应把游标读取包含在 with 块内"""
+    if not _enabled:
+        return _NOOP
+    return _timed_mongo_op(collection, operation)
+
+
+def track_active_sessions(count: Callable[[], int]) -> None:
+    """注册活跃会话数的取值函数（抓取时才调用）"""
+    if REGISTRY is not None:
+        ACTIVE_SESSIONS.set_function(count)
+
+
+def track_http_pools(stats: Callable[[], Dict[Tuple[str, str], Dict[str, int]]]) -> None:
+    """注册共享 HTTP 连接池状态的取值函数：{(host, "sync"|"async"): {state: count}}"""
+    if REGISTRY is not None:
+        _HTTP_POOLS.source = stats
+
+
+def observe_http_connect(host: str, phase: str, seconds: float) -> None:
+    if _enabled:
+        HTTP_CONNECT_SECONDS.labels(host=host, phase=phase).observe(seconds)
+
+
+def track_provider_limits(stats: Callable[[], Dict[str, Dict[str, Any]]]) -> None:
+    """注册 provider 限流器状态的取值函数：{provider: {"in_flight": n, "queued": {priority: n}}}"""
+    if REGISTRY is not None:
+        _PROVIDER_LIMITS.source = stats
+
+
+def observe_provider_wait(provider: str, priority: str, seconds: float) -> None:
+    if _enabled:
+        PROVIDER_WAIT_SECONDS.labels(provider=provider, priority=priority).observe(seconds)
+
+
+def provider_throttled(provider: str) -> None:
+    if _enabled:
+        PROVIDER_THROTTLED.labels(provider=provider).inc()
+
+
+def llm_cache_result(agent: str, *, hit: bool) -> None:
+    if _enabled:
+        LLM_CACHE.labels(agent=agent, result="hit" if hit else "miss").inc()
+
+
+def context_tokens(agent: str, *, sent: int, saved: int) -> None:
+    if _enabled:
+        CONTEXT_TOKENS.labels(agent=agent, kind="sent").inc(sent)
+        if saved:
+            CONTEXT_TOKENS.labels(agent=agent, kind="saved").inc(saved)
+
+
+def scoring_early_exit(question_type: str, outcome: str) -> None:
+    if _enabled:
+        SCORING_EARLY_EXIT.labels(question_type=question_type, outcome=outcome).inc()
+
+
+def scoring_prescore(result: str) -> None:
+    if _enabled:
+        SCORING_PRESCORE.labels(result=result).inc()
+
+
+def speculation_outcome(outcome: str) -> None:
+    if _enabled:
+        SPECULATION_OUTCOMES.labels(outcome=outcome).inc()
+
+
+def track_speculation(report: Callable[[], Dict[str, Any]]) -> None:
+    """注册 speculative 出题统计的取值函数：返回 SpeculationStats.snapshot() 形式的 dict"""
+    if REGISTRY is not None:
+        _SPECULATION.source = report
+
+
+def breaker_state_changed(model: str, state: str) -> None:
+    if _enabled:
+        BREAKER_STATE.labels(model=model).set(_BREAKER_STATE_VALUES[state])
+        BREAKER_TRANSITIONS.labels(model=model, state=state).inc()
+
+
+def consumer_task_started() -> None:
+    if _enabled:
+        PENDING_TASKS.inc()
+
+
+def consumer_task_finished() -> None:
+    if _enabled:
+        PENDING_TASKS.dec()
+
+
+# ============================================================
+# HTTP 出口
+# ============================================================
+
+def metrics_view(request):
+    """GET /api/metrics/ — Prometheus 抓取端点；未启用时 404"""
+    if not _enabled:
+        return HttpResponse(status=404)
+    token: Optional[str] = os.getenv(METRICS_TOKEN_ENV)
+    if token and not hmac.compare_digest(
+        request.headers.get("Authorization", ""), f"Bearer {token}"
+    ):
+        return HttpResponse(status=401)
+    return HttpResponse(generate_latest(REGISTRY), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,380 @@
+"""
+上游限流 — 按 provider（上游主机）协调所有模型 / embedding / moderation 请求
+
+考试高峰时所有会话同时打向同一批上游（GPT 代理：gemini / gpt-5-mini / moderation；
+doubao；阿里云 embedding），彼此没有协调：一旦触发 429，各会话的 SDK 各自重试，
+429 成片出现，评分最终落到 _fallback_scoring（score=5 + requires_human_review）。
+
+现在 transport.py 的共享 httpx 客户端在每个请求发出前向所属 provider 的 ProviderLimiter 申请许可：
+- RPM / TPM 令牌桶 + 最大在途请求数（按 provider 配置；未配置的维度不限）
+- 优先级：INTERACTIVE（轮次关键路径）先于 BACKGROUND（后台总结 / 持久化 embedding），
+  同优先级 FIFO；优先级由调用方用 `with priority(BACKGROUND):` 标记（contextvar，随 task / to_thread 传播）
+- 任一请求收到 429 / 503：按 Retry-After（缺省时按连续失败次数指数退避）抖动后暂停整个 provider 的放行，
+  SDK 自身的重试会在队列中等待而不是立即再撞一次
+- 排队超过 max_wait 抛 httpx.PoolTimeout（SDK 按超时处理，与连接池耗尽语义一致）
+
+TPM 按请求体字节数估算（len(body) / 3，中文 UTF-8 约 3 字节一个 token），在放行时扣减。
+
+指标（INTERVIEW_METRICS=1）：
+  interview_provider_queue_depth{provider,priority}   排队中的请求数
+  interview_provider_in_flight{provider}              在途请求数
+  interview_provider_wait_seconds{provider,priority}  排队等待耗时
+  interview_provider_throttled_total{provider}        收到的 429 / 503 次数
+
+环境变量：
+  INTERVIEW_PROVIDER_LIMITS  JSON，键为上游主机（"scheme://host:port" 或 hostname）或 "*"（默认），例如
+      {"dashscope.aliyuncs.com": {"rpm": 1200, "tpm": 600000, "max_in_flight": 16},
+       "*": {"max_in_flight": 64, "max_wait": 30}}
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+from interview import metrics
+
+logger = logging.getLogger("interview.ratelimit")
+
+PROVIDER_LIMITS_ENV = "INTERVIEW_PROVIDER_LIMITS"
+
+INTERACTIVE = 0
+BACKGROUND = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+# 无 Retry-After 时的 provider 级退避：base * 2^(连续失败-1)，上限 cap；Retry-After 同样截断到 cap
+_BACKOFF_BASE = 0.5
+_BACKOFF_CAP = 30.0
+# Retry-After 之上追加的抖动比例（错开同时恢复的请求）
+_RETRY_AFTER_JITTER = 0.2
+_THROTTLE_STATUSES = (429, 503)
+
+_priority: contextvars.ContextVar[int] = contextvars.ContextVar("interview_request_priority", default=INTERACTIVE)
+
+
+class LimiterTimeout(Exception):
+    """排队超过 max_wait 仍未放行"""
+
+
+@dataclass(frozen=True)
+class ProviderLimit:
+    rpm: Optional[float] = None
+    tpm: Optional[float] = None
+    max_in_flight: Optional[int] = None
+    max_wait: float = 60.0
+
+
+# ============================================================
+# 优先级
+# ============================================================
+
+@contextlib.contextmanager
+def priority(level: int) -> Iterator[None]:
+    """标记块内发出的上游请求的优先级（INTERACTIVE / BACKGROUND）"""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+# ============================================================
+# 令牌桶 / 等待者
+# ============================================================
+
+class _TokenBucket:
+    """每分钟 per_minute 个令牌，容量一分钟；超过容量的单次申请按容量计"""
+
+    def __init__(self, per_minute: float, clock: Callable[[], float]):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = clock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self._refill(now)
+        need = min(amount, self.capacity)
+        return 0.0 if self.tokens >= need else (need - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.tokens -= min(amount, self.capacity)
+
+
+class _Waiter:
+    """排队中的一次申请；notify 可跨线程 / 跨 loop 调用"""
+
+    __slots__ = ("priority", "seq", "tokens", "_event", "_loop")
+
+    def __init__(self, priority_level: int, seq: int, tokens: int, loop: Optional[asyncio.AbstractEventLoop]):
+        self.priority = priority_level
+        self.seq = seq
+        self.tokens = tokens
+        self._loop = loop
+        self._event = asyncio.Event() if loop is not None else threading.Event()
+
+    @property
+    def order(self) -> Tuple[int, int]:
+        return (self.priority, self.seq)
+
+    def notify(self) -> None:
+        if self._loop is None:
+            self._event.set()
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._event.set)
+        except RuntimeError:  # loop 已关闭：等待方已不存在
+            pass
+
+    def clear(self) -> None:
+        self._event.clear()
+
+    def wait_sync(self, timeout: float) -> None:
+        self._event.wait(timeout)
+
+    async def wait_async(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+# ============================================================
+# ProviderLimiter
+# ============================================================
+
+class ProviderLimiter:
+    """单个 provider 的许可发放：优先级队列 + 令牌桶 + 在途上限 + 429 暂停"""
+
+    def __init__(self, provider: str, limit: ProviderLimit, clock: Callable[[], float] = time.monotonic):
+        self.provider = provider
+        self.limit = limit
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._waiters: List[_Waiter] = []
+        self._seq = 0
+        self._rpm = _TokenBucket(limit.rpm, clock) if limit.rpm else None
+        self._tpm = _TokenBucket(limit.tpm, clock) if limit.tpm else None
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self._strikes = 0
+
+    # ---------------- 放行判定（持锁调用） ----------------
+
+    def _enqueue_locked(self, tokens: int, loop: Optional[asyncio.AbstractEventLoop]) -> _Waiter:
+        self._seq += 1
+        waiter = _Waiter(current_priority(), self._seq, tokens, loop)
+        index = len(self._waiters)
+        while index > 0 and self._waiters[index - 1].order > waiter.order:
+            index -= 1
+        self._waiters.insert(index, waiter)
+        return waiter
+
+    def _try_admit_locked(self, waiter: _Waiter) -> Optional[float]:
+        """0.0 = 已放行；正数 = 需按时间等待（令牌 / 退避）；None = 等待通知（非队首 / 在途已满）"""
+        if self._waiters[0] is not waiter:
+            return None
+        if self.limit.max_in_flight and self.in_flight >= self.limit.max_in_flight:
+            return None
+        now = self._clock()
+        delay = max(
+            self.blocked_until - now,
+            self._rpm.wait_time(1, now) if self._rpm else 0.0,
+            self._tpm.wait_time(waiter.tokens, now) if self._tpm else 0.0,
+        )
+        if delay > 0:
+            return delay
+        if self._rpm:
+            self._rpm.take(1)
+        if self._tpm:
+            self._tpm.take(waiter.tokens)
+        self.in_flight += 1
+        self._waiters.pop(0)
+        self._notify_head_locked()
+        return 0.0
+
+    def _remove_locked(self, waiter: _Waiter) -> None:
+        if waiter in self._waiters:
+            was_head = self._waiters[0] is waiter
+            self._waiters.remove(waiter)
+            if was_head:
+                self._notify_head_locked()
+
+    def _notify_head_locked(self) -> None:
+        if self._waiters:
+            self._waiters[0].notify()
+
+    def _step(self, waiter: _Waiter, deadline: float) -> Optional[float]:
+        """一次判定：None = 已放行；否则返回本次应等待的秒数"""
+        waiter.clear()
+        with self._lock:
+            delay = self._try_admit_locked(waiter)
+        if delay == 0.0:
+            return None
+        remaining = deadline - self._clock()
+        if remaining <= 0:
+            raise LimiterTimeout(f"{self.provider} 排队超过 {self.limit.max_wait}s")
+        return remaining if delay is None else min(delay, remaining)
+
+    # ---------------- 申请 / 释放 ----------------
+
+    async def acquire(self, tokens: int = 0) -> None:
+        started = self._clock()
+        with self._lock:
+            waiter = self._enqueue_locked(tokens, asyncio.get_running_loop())
+        try:
+            while (wait := self._step(waiter, started + self.limit.max_wait)) is not None:
+                await waiter.wait_async(wait)
+        except BaseException:
+            with self._lock:
+                self._remove_locked(waiter)
+            raise
+        metrics.observe_provider_wait(self.provider, PRIORITY_NAMES[waiter.priority], self._clock() - started)
+
+    def acquire_sync(self, tokens: int = 0) -> None:
+        started = self._clock()
+        with self._lock:
+            waiter = self._enqueue_locked(tokens, None)
+        try:
+            while (wait := self._step(waiter, started + self.limit.max_wait)) is not None:
+                waiter.wait_sync(wait)
+        except BaseException:
+            with self._lock:
+                self._remove_locked(waiter)
+            raise
+        metrics.observe_provider_wait(self.provider, PRIORITY_NAMES[waiter.priority], self._clock() - started)
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            self._notify_head_locked()
+
+    def record_response(self, status_code: int, headers: Mapping[str, str]) -> None:
+        """根据响应状态更新 provider 级退避：429 / 503 暂停放行，其余状态清零连续失败计数"""
+        if status_code not in _THROTTLE_STATUSES:
+            if self._strikes:
+                with self._lock:
+                    self._strikes = 0
+            return
+        retry_after = parse_retry_after(headers)
+        with self._lock:
+            self._strikes += 1
+            if retry_after is not None:
+                pause = min(retry_after, _BACKOFF_CAP) * (1 + random.uniform(0, _RETRY_AFTER_JITTER))
+            else:
+                pause = random.uniform(0, min(_BACKOFF_CAP, _BACKOFF_BASE * 2 ** (self._strikes - 1)))
+            self.blocked_until = max(self.blocked_until, self._clock() + pause)
+        metrics.provider_throttled(self.provider)
+        logger.warning(
+            f"上游限流 {self.provider}: HTTP {status_code}, retry-after={retry_after}, 暂停放行 {pause:.2f}s"
+        )
+
+    def queue_depths(self) -> Dict[str, int]:
+        with self._lock:
+            depths = {name: 0 for name in PRIORITY_NAMES.values()}
+            for waiter in self._waiters:
+                depths[PRIORITY_NAMES[waiter.priority]] += 1
+        return depths
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Retry-After（秒数或 HTTP 日期）/ retry-after-ms → 秒；缺失或无法解析返回 None"""
+    retry_ms = headers.get("retry-after-ms")
+    if retry_ms:
+        try:
+            return max(0.0, float(retry_ms) / 1000)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def estimate_tokens(body_bytes: int) -> int:
+    """按请求体字节数粗估 token 数（TPM 扣减用）"""
+    return body_bytes // 3 + 1
+
+
+# ============================================================
+# 注册表
+# ============================================================
+
+_lock = threading.Lock()
+_limiters: Dict[str, ProviderLimiter] = {}
+_config: Optional[Dict[str, ProviderLimit]] = None
+
+
+def _load_config() -> Dict[str, ProviderLimit]:
+    raw = os.getenv(PROVIDER_LIMITS_ENV, "").strip()
+    if not raw:
+        return {}
+    try:
+        return {key: ProviderLimit(**spec) for key, spec in json.loads(raw).items()}
+    except (TypeError, ValueError) as e:
+        logger.error(f"{PROVIDER_LIMITS_ENV} 解析失败，上游不限流: {e}")
+        return {}
+
+
+def limit_for(provider: str) -> ProviderLimit:
+    """按 "scheme://host:port" → hostname → "*" 的顺序匹配配置"""
+    global _config
+    if _config is None:
+        _config = _load_config()
+    hostname = urlsplit(provider).hostname or provider
+    return _config.get(provider) or _config.get(hostname) or _config.get("*") or ProviderLimit()
+
+
+def get_limiter(provider: str) -> ProviderLimiter:
+    limiter = _limiters.get(provider)
+    if limiter is None:
+        with _lock:
+            limiter = _limiters.get(provider)
+            if limiter is None:
+                limiter = ProviderLimiter(provider, limit_for(provider))
+                _limiters[provider] = limiter
+    return limiter
+
+
+def limiter_stats() -> Dict[str, Dict[str, object]]:
+    """各 provider 的在途数与分优先级排队数（指标抓取用）"""
+    return {
+        provider: {"in_flight": limiter.in_flight, "queued": limiter.queue_depths()}
+        for provider, limiter in list(_limiters.items())
+    }
+
+
+def reset_limiters() -> None:
+    """丢弃全部 limiter 并重新读取配置（测试用）"""
+    global _config
+    with _lock:
+        _limiters.clear()
+        _config = None
+
+
+metrics.track_provider_limits(limiter_stats)
@@ -0,0 +1,163 @@
+"""
+熔断器 + 故障转移链单测（breaker.py）
+
+关键不变量：
+- 连续失败达到阈值 → open；open 期间直接拒绝，不调用模型
+- open_seconds 后 half_open 只放行一个探测；探测成功 → closed，失败 → 再次 open
+- 窗口内失败 / 慢调用占比超过阈值 → open
+- call_with_failover 跳过熔断中的模型转到备用模型；全部熔断时立即抛 BreakerOpen
+- ScoringAgent 主模型熔断时候选由故障转移链上的模型产出
+
+运行：
+  uv run python -m unittest interview.tests.test_breaker -v
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from interview import metrics
+from interview.agents import breaker
+from interview.agents.breaker import BreakerOpen, CircuitBreaker, call_with_failover
+from interview.agents.schemas import SingleScoreCandidate
+from interview.agents.scoring_agent import ScoringAgent
+
+
+class FakeModel:
+    def __init__(self, name):
+        self.model_name = name
+
+    def with_structured_output(self, schema, include_raw=False):
+        m = MagicMock()
+        m.ainvoke = AsyncMock()
+        return m
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CircuitBreakerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = _Clock()
+        self.breaker = CircuitBreaker("m", consecutive_failures=3, open_seconds=10, clock=self.clock)
+
+    def _fail(self, times):
+        for _ in range(times):
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record_failure(RuntimeError("down"))
+
+    def test_consecutive_failures_open_then_half_open_probe(self):
+        self._fail(3)
+        self.assertEqual(self.breaker.state, breaker.STATE_OPEN)
+        self.assertFalse(self.breaker.allow())
+
+        self.clock.now = 10
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.state, breaker.STATE_HALF_OPEN)
+        self.assertFalse(self.breaker.allow())  # 同时只放行一个探测
+
+        self.breaker.record_failure(RuntimeError("still down"))
+        self.assertEqual(self.breaker.state, breaker.STATE_OPEN)
+
+        self.clock.now = 20
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_success(0.5)
+        self.assertEqual(self.breaker.state, breaker.STATE_CLOSED)
+        self.assertTrue(self.breaker.allow())
+
+    def test_success_resets_streak(self):
+        self._fail(2)
+        self.breaker.record_success(0.1)
+        self._fail(2)
+        self.assertEqual(self.breaker.state, breaker.STATE_CLOSED)
+
+    def test_slow_calls_trip_by_rate(self):
+        slow = CircuitBreaker("slow", min_calls=4, failure_rate=0.5, slow_call_seconds=1.0, clock=self.clock)
+        for seconds in (0.1, 2.0, 0.1, 2.0):
+            slow.record_success(seconds)
+        self.assertEqual(slow.state, breaker.STATE_OPEN)
+
+    @unittest.skipUnless(metrics.REGISTRY is not None, "prometheus-client 未安装")
+    def test_transitions_exported(self):
+        was_enabled = metrics.metrics_enabled()
+        metrics.set_metrics_enabled(True)
+        try:
+            probe = CircuitBreaker("metrics-probe", consecutive_failures=1, clock=self.clock)
+            probe.record_failure(RuntimeError("down"))
+            self.assertEqual(metrics.REGISTRY.get_sample_value(
+                "interview_breaker_state", {"model": "metrics-probe"}), 2.0)
+            self.assertEqual(metrics.REGISTRY.get_sample_value(
+                "interview_breaker_transitions_total", {"model": "metrics-probe", "state": "open"}), 1.0)
+        finally:
+            metrics.set_metrics_enabled(was_enabled)
+
+
+class FailoverTests(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        breaker.reset_breakers()
+
+    def tearDown(self):
+        breaker.reset_breakers()
+
+    async def test_open_breaker_skips_to_alternate(self):
+        primary, alternate = FakeModel("primary"), FakeModel("alternate")
+        calls = []
+
+        async def call(model):
+            calls.append(model.model_name)
+            if model is primary:
+                raise RuntimeError("timeout")
+            return model.model_name
+
+        for _ in range(3):
+            self.assertEqual(await call_with_failover([primary, alternate], call), "alternate")
+        self.assertEqual(breaker.get_breaker(primary).state, breaker.STATE_OPEN)
+
+        calls.clear()
+        self.assertEqual(await call_with_failover([primary, alternate], call), "alternate")
+        self.assertEqual(calls, ["alternate"])
+
+    async def test_all_open_fails_fast(self):
+        model = FakeModel("down")
+        for _ in range(3):
+            breaker.get_breaker(model).record_failure(RuntimeError("down"))
+
+        async def never(model):
+            await asyncio.sleep(30)
+
+        started = time.perf_counter()
+        with self.assertRaises(BreakerOpen):
+            await call_with_failover([model], never)
+        self.assertLess(time.perf_counter() - started, 0.01)
+
+    async def test_scoring_uses_failover_chain(self):
+        doubao, gemini, qwen = FakeModel("doubao"), FakeModel("gemini"), FakeModel("qwen-plus")
+        agent = ScoringAgent([doubao, gemini])
+        agent.failover_models = [qwen]
+        candidate = SingleScoreCandidate(
+            score=7, evidence_quote="正确解法", question_focus="算法", confidence="high", reasoning="ok",
+        )
+        agent._structured_models[0].ainvoke = AsyncMock(return_value=candidate)
+        agent._structured_models[1].ainvoke = AsyncMock(side_effect=AssertionError("breaker should skip"))
+        agent._structured_for(qwen, SingleScoreCandidate).ainvoke = AsyncMock(return_value=candidate)
+        for _ in range(3):
+            breaker.get_breaker(gemini).record_failure(RuntimeError("down"))
+
+        result = await agent.aprocess({"question": "q", "answer": "正确解法：先排序再双指针扫描", "skip_rag_anchors": True})
+        self.assertFalse(result["fallback_used"])
+        agent._structured_models[1].ainvoke.assert_not_called()
+        self.assertEqual(result["model_name"], "ensemble(2)")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+checkpoint 瘦身单测：压缩序列化 / slim state / 字节计量
+
+关键不变量：
+- CompressedCheckpointSerializer 往返保真；大 payload 被压缩，小 payload 原样保留
+- 旧（未压缩）checkpoint 数据仍可读取
+- slim 模式 initial state 不携带 qa_history / current_question / parsed_profile，
+  finalize 不写 final_summary，但返回给前端的 output 与 full 模式完全一致
+- checkpoint_turn_meter 统计到当前轮次写入的字节；slim 明显小于 full
+
+运行：
+  uv run python -m unittest interview.tests.test_checkpoint -v
+"""
+
+from __future__ import annotations
+
+import unittest
+
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from interview.agents.checkpoint import (
+    CheckpointStats,
+    CompressedCheckpointSerializer,
+    checkpoint_turn_meter,
+    create_checkpoint_serializer,
+)
+from interview.agents.graph import initial_graph_state
+from interview.tests.test_graph_pure import FakeSession, _build_graph
+
+
+class CompressedSerializer(unittest.TestCase):
+
+    def test_roundtrip_and_compresses_large_payload(self):
+        serde = CompressedCheckpointSerializer()
+        obj = {"qa_history": [{"question": "证明题" * 50, "answer": "回答" * 200}] * 5}
+        type_, data = serde.dumps_typed(obj)
+        self.assertTrue(type_.endswith(("+zstd", "+zlib")))
+        self.assertLess(len(data), len(JsonPlusSerializer().dumps_typed(obj)[1]) / 4)
+        self.assertEqual(serde.loads_typed((type_, data)), obj)
+
+    def test_small_payload_kept_plain(self):
+        serde = CompressedCheckpointSerializer()
+        type_, data = serde.dumps_typed({"persisted": True})
+        self.assertEqual(type_, "msgpack")
+        self.assertEqual(serde.loads_typed((type_, data)), {"persisted": True})
+
+    def test_reads_legacy_uncompressed_checkpoint(self):
+        legacy = JsonPlusSerializer().dumps_typed({"score": 7, "text": "x" * 1000})
+        self.assertEqual(CompressedCheckpointSerializer().loads_typed(legacy), {"score": 7, "text": "x" * 1000})
+
+
+class SlimGraphState(unittest.IsolatedAsyncioTestCase):
+
+    def test_slim_initial_state_drops_session_copies(self):
+        session = FakeSession()
+        full = initial_graph_state(session, "答案")
+        slim = initial_graph_state(session, "答案", "slim")
+        self.assertIn("qa_history", full)
+        self.assertEqual(
+            set(slim),
+            {"session_id", "candidate_name", "user_answer", "turn_deadline", "degradations",
+             "speculative_draft", "stream_question", "turn_started_at"},
+        )
+
+    async def _run(self, mode, *, ready):
+        session = FakeSession()
+        serde = create_checkpoint_serializer(mode)
+        graph, mocks = _build_graph(
+            session, checkpointer=MemorySaver(serde=serde), checkpoint_mode=mode
+        )
+        mocks["scoring_agent"].evaluate_interview_readiness.return_value = {
+            "ready": ready, "reason": "...", "recommendation": "end" if ready else "continue",
+        }
+        config = {"configurable": {"thread_id": "s1"}}
+        with checkpoint_turn_meter() as meter:
+            state = await graph.ainvoke(initial_graph_state(session, "我的答案" * 50, mode), config=config)
+        return state, meter
+
+    async def test_slim_output_matches_full(self):
+        for ready in (False, True):
+            full_state, full_meter = await self._run("full", ready=ready)
+            slim_state, slim_meter = await self._run("slim", ready=ready)
+            self.assertEqual(slim_state["output"], full_state["output"])
+            self.assertGreater(full_meter[0], 0)
+            self.assertLess(slim_meter[0], full_meter[0])
+            if ready:
+                self.assertIn("final_summary", full_state)
+                self.assertNotIn("final_summary", slim_state)
+
+
+class Stats(unittest.TestCase):
+
+    def test_snapshot_reports_bytes_and_latency(self):
+        stats = CheckpointStats()
+        for size, ms in ((100, 10.0), (300, 30.0)):
+            stats.record_turn(size, 4, ms)
+        snap = stats.snapshot()
+        self.assertEqual(snap["turns"], 2)
+        self.assertEqual(snap["bytes_per_turn"]["mean"], 200.0)
+        self.assertEqual(snap["writes_per_turn"], 4.0)
+        self.assertGreaterEqual(snap["turn_ms"]["p95"], snap["turn_ms"]["p50"])
+
+
+if __name__ == "__main__":
+    unittest.main()
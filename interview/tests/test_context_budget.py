@@ -0,0 +1,130 @@
+"""
+token 预算上下文构造单测（context_budget.py + SummaryAgent / QuestionGenerator 接入）
+
+关键不变量：
+- fit_json 收缩后仍是合法 JSON，且不超过上限
+- 低优先级段落中与高优先级段落重复的行被去掉；超预算时先裁最低优先级段落
+- 6 轮面试（长回答 + 大简历）的 summary human message 不超过 SummaryAgent.context_budget_tokens，
+  且 turn_history 保留全部轮次
+- 出题 prompt 超预算时先裁相似案例，verifier 反馈始终保留
+
+运行：
+  uv run python -m unittest interview.tests.test_context_budget -v
+"""
+
+from __future__ import annotations
+
+import json
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from interview.agents.context_budget import ContextBuilder, count_tokens, fit_json
+from interview.agents.question_generator import QuestionGeneratorAgent
+from interview.agents.summary_agent import SummaryAgent
+
+
+class FakeModel:
+    model_name = "fake"
+
+    def with_structured_output(self, schema, include_raw=False):
+        return MagicMock()
+
+
+def _six_turn_history():
+    history = []
+    for i in range(6):
+        answer = f"第{i}题的回答：" + "我先把问题抽象成图，然后对每个顶点做归纳，证明每一步都保持不变量。" * 30
+        history.append({
+            "question": f"第{i}题：请证明一个关于图的性质，并分析算法复杂度。",
+            "answer": answer,
+            "question_data": {"type": "math_logic", "difficulty": "medium", "reasoning": "考察归纳推理"},
+            "score_details": {
+                "score": 6 + i % 3,
+                "question_focus": "归纳证明与复杂度分析",
+                "evidence_quote": answer[10:60],
+                "reasoning": "论证结构完整，但边界情况说明不足。" * 5,
+                "agreement": 0.9,
+                "confidence_level": "high",
+            },
+        })
+    return history
+
+
+class ContextBuilderTests(unittest.TestCase):
+
+    def test_fit_json_stays_valid_under_limit(self):
+        obj = {"summary": "很长的项目描述" * 400, "items": [{"id": i, "text": "x" * 200} for i in range(50)]}
+        text = fit_json(obj, 300)
+        self.assertLessEqual(count_tokens(text), 300)
+        self.assertEqual(json.loads(text)["items"][0]["id"], 0)
+
+    def test_dedupes_lines_already_kept(self):
+        built = (
+            ContextBuilder("T", 10_000)
+            .add("history", "A: 候选人用归纳法证明了结论并分析了复杂度", priority=1)
+            .add("notes", ["回答: 候选人用归纳法证明了结论并分析了复杂度", "评分理由: 论证完整"], priority=2)
+            .build()
+        )
+        self.assertEqual(built.get("notes"), "评分理由: 论证完整")
+        self.assertGreater(built.saved_tokens, 0)
+
+    def test_lowest_priority_dropped_first(self):
+        built = (
+            ContextBuilder("T", 60)
+            .add("core", "必须保留的说明", priority=0)
+            .add("extra", "次要内容 " * 200, priority=3)
+            .add("mid", "中等优先级内容", priority=1)
+            .build()
+        )
+        self.assertEqual(built.get("core"), "必须保留的说明")
+        self.assertEqual(built.get("mid"), "中等优先级内容")
+        self.assertLessEqual(built.tokens, 60)
+        self.assertIn("extra", built.truncated + built.dropped)
+
+    def test_json_baseline_counts_indented_serialization(self):
+        resume = {"projects": [{"name": "编译器", "detail": "实现了词法分析与语法分析"}] * 5}
+        built = ContextBuilder("T", 10_000).add_json("resume", resume, priority=0).build()
+        self.assertEqual(json.loads(built.get("resume")), resume)
+        self.assertGreater(built.saved_tokens, 0)
+
+
+class SummaryBudgetTests(unittest.IsolatedAsyncioTestCase):
+
+    async def test_six_turn_summary_prompt_under_budget(self):
+        agent = SummaryAgent(FakeModel())
+        agent.ainvoke_structured = AsyncMock(side_effect=RuntimeError("stop after prompt"))
+        resume = {"content": {"projects": [{"name": f"项目{i}", "detail": "负责核心算法设计与实现" * 40} for i in range(10)]}}
+
+        await agent.aprocess({
+            "candidate_name": "alice",
+            "resume_data": resume,
+            "qa_history": _six_turn_history(),
+            "average_score": 7.0,
+            "security_summary": {"overall_risk": "low", "total_alerts": 0},
+        })
+
+        human_text = agent.ainvoke_structured.await_args.args[0]
+        self.assertLessEqual(count_tokens(human_text), SummaryAgent.context_budget_tokens)
+        for i in range(6):
+            self.assertIn(f"--- Turn {i} ", human_text)
+        self.assertIn("Run summarize_interview", human_text)
+
+
+class QuestionGeneratorBudgetTests(unittest.TestCase):
+
+    def test_similar_cases_trimmed_before_feedback(self):
+        agent = QuestionGeneratorAgent(FakeModel(), retrieval_system=MagicMock())
+        prompt = agent._build_human_prompt({
+            "interview_stage": "technical",
+            "previous_qa": [{"question": "介绍一下你的项目", "answer": "我做了最短路"}],
+            "current_score": 6,
+            "similar_cases_context": "历史案例：" + "某候选人回答了动态规划题目。" * 2000,
+            "verifier_feedback": ["no_repeat: 与上一题知识点重复"],
+        })
+        self.assertLessEqual(count_tokens(prompt), QuestionGeneratorAgent.context_budget_tokens)
+        self.assertIn("REVISION REQUIRED", prompt)
+        self.assertIn("Previous Q&A record", prompt)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+进程级 coordinator 注册表单测：同配置复用 / 配置区分 / 并发首建只构造一次
+
+运行：
+  uv run python -m unittest interview.tests.test_coordinator_registry -v
+"""
+
+from __future__ import annotations
+
+import threading
+import unittest
+from unittest.mock import patch
+
+from interview.agents.registry import get_shared_coordinator, reset_shared_coordinators
+from interview.tests.test_scoring_ensemble import FakeModel
+
+
+def _models():
+    return {
+        "question_model": FakeModel("q"),
+        "scoring_models": [FakeModel("doubao"), FakeModel("gemini")],
+        "security_model": FakeModel("sec"),
+        "summary_model": FakeModel("sum"),
+    }
+
+
+class SharedCoordinatorRegistry(unittest.TestCase):
+
+    def setUp(self):
+        patchers = [
+            patch("interview.agents.coordinator.RetrievalSystem"),
+            patch("interview.agents.coordinator.MemoryStore"),
+            patch("interview.agents.coordinator.MemoryRetriever"),
+            patch("interview.agents.coordinator.get_turn_write_behind", return_value=None),
+            patch("interview.agents.coordinator.create_mongo_checkpointer", return_value=None),
+            patch("interview.agents.coordinator.FinalizeJobQueue"),
+        ]
+        for p in patchers:
+            p.start()
+            self.addCleanup(p.stop)
+        reset_shared_coordinators()
+        self.addCleanup(reset_shared_coordinators)
+
+    def test_same_models_share_one_coordinator_with_compiled_graph(self):
+        models = _models()
+        first = get_shared_coordinator(models, {"parallel_security": True})
+        second = get_shared_coordinator(models, {"parallel_security": True})
+        self.assertIs(first, second)
+        self.assertIsNotNone(first._graph)
+
+    def test_graph_options_distinguish_coordinators(self):
+        models = _models()
+        sequential = get_shared_coordinator(models)
+        parallel = get_shared_coordinator(models, {"parallel_security": True})
+        self.assertIsNot(sequential, parallel)
+
+    def test_sessions_keyed_by_chat_id(self):
+        coordinator = get_shared_coordinator(_models())
+        coordinator.active_sessions["chat-a"] = object()
+        coordinator.active_sessions["chat-b"] = object()
+        coordinator.cleanup_session("chat-a")
+        self.assertEqual(list(coordinator.active_sessions), ["chat-b"])
+
+    def test_concurrent_first_connect_builds_once(self):
+        models = _models()
+        results = []
+        barrier = threading.Barrier(8)
+
+        def connect():
+            barrier.wait()
+            results.append(get_shared_coordinator(models))
+
+        with patch("interview.agents.coordinator.build_interview_graph") as build:
+            threads = [threading.Thread(target=connect) for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        self.assertEqual(len({id(c) for c in results}), 1)
+        build.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
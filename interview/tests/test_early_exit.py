@@ -0,0 +1,140 @@
+"""
+评分 ensemble 提前结束单测（early_exit.py + ScoringAgent 接入）
+
+关键不变量：
+- 区域样本不足 / 平均 agreement 不够 / confidence 非 high 时不提前结束
+- 启用后首个候选落在一致区域 → 接受它并取消其余调用，不写入 agreement 统计
+- 观察模式照常等待全部模型，记录假设提前结束的分差（agreement 损失）与尾部等待时间
+
+运行：
+  uv run python -m unittest interview.tests.test_early_exit -v
+"""
+
+from __future__ import annotations
+
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from interview.agents.early_exit import EXIT_ACCEPTED, EXIT_AUDITED, EXIT_SHADOW, EarlyExitPolicy
+from interview.agents.schemas import SingleScoreCandidate
+from interview.agents.scoring_agent import ScoringAgent
+
+_ANSWER = "任取 n+1 个数按余数分组，由抽屉原理必有两数同余"
+
+
+class FakeModel:
+    def __init__(self, name):
+        self.model_name = name
+
+    def with_structured_output(self, schema, include_raw=False):
+        m = MagicMock()
+        m.ainvoke = AsyncMock()
+        return m
+
+
+def _cand(score, conf="high"):
+    return SingleScoreCandidate(
+        score=score, evidence_quote="抽屉原理", question_focus="算法", confidence=conf, reasoning="ok"
+    )
+
+
+def _delayed(candidate, seconds, cancelled=None):
+    async def call(messages):
+        try:
+            await asyncio.sleep(seconds)
+        except asyncio.CancelledError:
+            if cancelled is not None:
+                cancelled.append(True)
+            raise
+        return candidate
+    return call
+
+
+def _warm(policy, question_type="algorithm", score=1, agreement=1.0, n=20):
+    for _ in range(n):
+        policy.record_ensemble(question_type, [score, score], agreement, tail_ms=400.0)
+
+
+class EarlyExitPolicyTests(unittest.TestCase):
+
+    def test_requires_samples_agreement_and_high_confidence(self):
+        policy = EarlyExitPolicy(enabled=True, audit_rate=0.0)
+        self.assertIsNone(policy.decide("algorithm", _cand(1)))
+
+        _warm(policy)
+        self.assertEqual(policy.decide("algorithm", _cand(1)), EXIT_ACCEPTED)
+        self.assertIsNone(policy.decide("algorithm", _cand(1, conf="medium")))
+        self.assertIsNone(policy.decide("math_logic", _cand(1)))
+
+        _warm(policy, score=5, agreement=0.6)
+        self.assertIsNone(policy.decide("algorithm", _cand(5)))
+
+    def test_audit_sampling_and_shadow_mode(self):
+        policy = EarlyExitPolicy(enabled=True, audit_rate=0.5, rng=lambda: 0.1)
+        _warm(policy)
+        self.assertEqual(policy.decide("algorithm", _cand(1)), EXIT_AUDITED)
+
+        shadow = EarlyExitPolicy(enabled=False)
+        _warm(shadow)
+        self.assertEqual(shadow.decide("algorithm", _cand(1)), EXIT_SHADOW)
+
+
+class ScoringAgentEarlyExitTests(unittest.IsolatedAsyncioTestCase):
+
+    def _agent(self, policy, second_score=1):
+        self.cancelled = []
+        agent = ScoringAgent([FakeModel("doubao"), FakeModel("gemini")], early_exit=policy)
+        agent._structured_models[0].ainvoke = AsyncMock(side_effect=_delayed(_cand(1), 0.0))
+        agent._structured_models[1].ainvoke = AsyncMock(
+            side_effect=_delayed(_cand(second_score), 0.3, self.cancelled)
+        )
+        return agent
+
+    async def _score(self, agent):
+        return await agent.aprocess({"question": "q", "answer": _ANSWER, "question_type": "algorithm"})
+
+    async def test_accepts_first_candidate_and_cancels_rest(self):
+        policy = EarlyExitPolicy(enabled=True, audit_rate=0.0)
+        _warm(policy)
+        agent = self._agent(policy)
+
+        result = await self._score(agent)
+
+        self.assertEqual(result["score"], 1)
+        self.assertEqual(result["model_name"], "doubao")
+        await asyncio.sleep(0)  # 让被取消的调用处理 CancelledError
+        self.assertEqual(self.cancelled, [True])
+        snap = policy.snapshot()
+        self.assertEqual(snap["outcomes"][EXIT_ACCEPTED], 1)
+        self.assertEqual(snap["ensembles"], 20)
+        self.assertAlmostEqual(snap["saved_ms"]["total"], 400.0)
+
+    async def test_shadow_mode_waits_and_measures_loss(self):
+        policy = EarlyExitPolicy(enabled=False)
+        _warm(policy)
+        agent = self._agent(policy, second_score=4)
+
+        result = await self._score(agent)
+
+        self.assertEqual(result["model_name"], "ensemble(2)")
+        self.assertEqual(self.cancelled, [])
+        snap = policy.snapshot()
+        self.assertEqual(snap["outcomes"][EXIT_SHADOW], 1)
+        self.assertEqual(snap["agreement_lost"]["count"], 1)
+        self.assertGreater(snap["agreement_lost"]["mean_abs_delta"], 0)
+        self.assertGreater(snap["tail_ms"]["p50"], 0)
+        self.assertEqual(snap["regions"]["algorithm:4"]["count"], 1)
+
+    async def test_cold_region_waits_for_all_models(self):
+        policy = EarlyExitPolicy(enabled=True, audit_rate=0.0)
+        agent = self._agent(policy)
+
+        result = await self._score(agent)
+
+        self.assertEqual(result["model_name"], "ensemble(2)")
+        self.assertEqual(policy.snapshot()["regions"]["algorithm:1"]["count"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+"""
+后台 finalize 任务单测
+
+关键不变量：
+- 注入 finalize_queue 时 finalize_normal_node 不等待 SummaryAgent，立即返回 result_status="pending"
+- 提交失败时退回同步 finalize（输出与旧实现一致）
+- 任务分步落库：重试不会重复调用 SummaryAgent；超过重试次数标记 failed
+- 重启后 start() 接管 pending 任务
+- 任务在进程共享的 LoopPortal 常驻 loop 上执行（不另起私有 loop）
+
+finalize_jobs 集合用 mongomock 作为本地替身，未安装时跳过。
+
+运行：
+  uv run python -m unittest interview.tests.test_finalize_jobs -v
+"""
+
+from __future__ import annotations
+
+import asyncio
+import unittest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+from interview.agents.finalize_jobs import (
+    JOB_DONE,
+    JOB_FAILED,
+    FinalizeJobQueue,
+    build_finalize_payload,
+)
+from interview.tests.test_graph_pure import FakeSession, _build_graph
+
+try:
+    import mongomock
+except ImportError:  # pragma: no cover - 依赖可选
+    mongomock = None
+
+_SUMMARY = {"final_grade": "B", "final_decision": "accept", "overall_score": 7.0, "summary": "ok"}
+
+
+def _ready(mocks):
+    mocks["scoring_agent"].evaluate_interview_readiness.return_value = {
+        "ready": True, "reason": "...", "recommendation": "end",
+    }
+
+
+def _state():
+    return {"session_id": "s1", "candidate_name": "alice", "user_answer": "答案"}
+
+
+class GraphFinalizeNode(unittest.IsolatedAsyncioTestCase):
+
+    async def test_background_finalize_acknowledges_immediately(self):
+        session = FakeSession()
+        queue = MagicMock()
+        graph, mocks = _build_graph(session, finalize_queue=queue)
+        _ready(mocks)
+
+        output = (await graph.ainvoke(_state()))["output"]
+
+        self.assertTrue(output["interview_complete"])
+        self.assertEqual(output["result_status"], "pending")
+        mocks["summary_agent"].aprocess.assert_not_called()
+        mocks["retrieval_system"].save_interview_result.assert_not_called()
+        payload = queue.submit.call_args.args[0]
+        self.assertEqual(payload["session_id"], "s1")
+        self.assertEqual(len(payload["qa_history"]), 1)
+
+    async def test_submit_failure_falls_back_to_inline_finalize(self):
+        session = FakeSession()
+        queue = MagicMock()
+        queue.submit.side_effect = RuntimeError("mongo down")
+        graph, mocks = _build_graph(session, finalize_queue=queue)
+        _ready(mocks)
+
+        output = (await graph.ainvoke(_state()))["output"]
+
+        self.assertEqual(output["result_status"], "completed")
+        self.assertEqual(output["final_grade"], "C")
+        mocks["summary_agent"].aprocess.assert_awaited_once()
+        mocks["retrieval_system"].save_interview_result.assert_called_once()
+
+
+@unittest.skipUnless(mongomock is not None, "mongomock 未安装")
+class JobQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.collection = mongomock.MongoClient().db.finalize_jobs
+        self.summary_agent = MagicMock()
+        self.summary_agent.aprocess = AsyncMock(return_value=_SUMMARY)
+        self.retrieval_system = MagicMock()
+        self.retrieval_system.save_interview_result = MagicMock(return_value=True)
+        self.memory_store = MagicMock()
+        self.memory_store.update_session_status = MagicMock(return_value=True)
+        self.queue = self._queue()
+
+    def tearDown(self):
+        self.queue.stop()
+
+    def _queue(self, **kwargs):
+        return FinalizeJobQueue(
+            self.summary_agent, self.retrieval_system, self.memory_store,
+            collection=self.collection, retry_backoff=0.01, **kwargs,
+        )
+
+    def _payload(self):
+        session = FakeSession()
+        session.qa_history.append({"question": "Q1", "answer": "a", "score_details": {"score": 7},
+                                   "timestamp": datetime.now()})
+        return build_finalize_payload(session, {"security_alerts": []})
+
+    def test_job_runs_all_steps(self):
+        job_id = self.queue.submit(self._payload())
+        self.assertEqual(self.queue.wait(job_id, 5), JOB_DONE)
+        self.assertEqual(self.queue.get_status(job_id), JOB_DONE)
+
+        name, record = self.retrieval_system.save_interview_result.call_args.args
+        self.assertEqual(name, "alice")
+        self.assertEqual(record["final_grade"], "B")
+        self.assertEqual(record["scores"], [7])
+        sid, status, final_data = self.memory_store.update_session_status.call_args.args
+        self.assertEqual((sid, status), ("s1", "completed"))
+        self.assertEqual(final_data["final_summary"], _SUMMARY)
+
+    def test_retry_resumes_without_regenerating_summary(self):
+        self.retrieval_system.save_interview_result.side_effect = [False, True]
+        job_id = self.queue.submit(self._payload())
+        self.assertEqual(self.queue.wait(job_id, 5), JOB_DONE)
+        self.summary_agent.aprocess.assert_awaited_once()
+        self.assertEqual(self.collection.find_one({"_id": job_id})["attempts"], 1)
+
+    def test_exhausted_retries_mark_failed(self):
+        self.queue.stop()
+        self.queue = self._queue(max_retries=2)
+        self.memory_store.update_session_status.return_value = False
+        job_id = self.queue.submit(self._payload())
+        self.assertEqual(self.queue.wait(job_id, 5), JOB_FAILED)
+        job = self.collection.find_one({"_id": job_id})
+        self.assertEqual(job["attempts"], 2)
+        self.assertIn("update_session_status", job["last_error"])
+        # 结果只写入一次
+        self.retrieval_system.save_interview_result.assert_called_once()
+
+    def test_start_recovers_pending_jobs(self):
+        self.collection.insert_one({
+            "_id": "s1", "candidate_name": "alice", "status": "pending", "attempts": 0,
+            "payload": self._payload(), "summary_result": None, "result_saved": False,
+            "lease_until": None, "created_at": datetime.now(),
+        })
+        self.assertEqual(self.queue.start(), 1)
+        self.assertEqual(self.queue.wait("s1", 5), JOB_DONE)
+        self.assertEqual(self.queue.start(), 0)
+
+    def test_job_runs_on_portal_loop(self):
+        from interview.agents.portal import LoopPortal
+
+        portal = LoopPortal("finalize-test-portal")
+        self.addCleanup(portal.stop)
+        loops = []
+
+        async def summarize(_input):
+            loops.append(asyncio.get_running_loop())
+            return _SUMMARY
+
+        self.summary_agent.aprocess = summarize
+        self.queue.stop()
+        self.queue = self._queue(portal=portal)
+        job_id = self.queue.submit(self._payload())
+        self.assertEqual(self.queue.wait(job_id, 5), JOB_DONE)
+        self.assertEqual(loops, [portal.loop])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+"""
+对冲请求单测（hedging.py + ScoringAgent 接入）
+
+关键不变量：
+- 样本不足 min_samples 时不对冲
+- 主请求超过观测 p90 后发出对冲，先返回者胜出，另一方被取消
+- 对冲次数不超过 主请求次数 × max_extra_ratio
+- ScoringAgent 每轮至多 1 个候选改由备用模型产出，model_name 记录实际来源
+
+运行：
+  uv run python -m unittest interview.tests.test_hedging -v
+"""
+
+from __future__ import annotations
+
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from interview.agents.hedging import HedgePolicy
+from interview.agents.schemas import SingleScoreCandidate
+from interview.agents.scoring_agent import ScoringAgent
+
+
+class FakeModel:
+    def __init__(self, name):
+        self.model_name = name
+
+    def with_structured_output(self, schema, include_raw=False):
+        m = MagicMock()
+        m.ainvoke = AsyncMock()
+        return m
+
+
+def _delayed(value, seconds, cancelled=None):
+    async def call():
+        try:
+            await asyncio.sleep(seconds)
+        except asyncio.CancelledError:
+            if cancelled is not None:
+                cancelled.append(value)
+            raise
+        return value
+    return call
+
+
+def _candidate(score):
+    return SingleScoreCandidate(
+        score=score, evidence_quote="正确解法", question_focus="算法", confidence="high", reasoning="ok",
+    )
+
+
+class HedgePolicyTests(unittest.IsolatedAsyncioTestCase):
+
+    async def _warm(self, policy, key, count=5, seconds=0.01):
+        for _ in range(count):
+            await policy.run(key, _delayed("fast", seconds), lambda: None)
+
+    async def test_no_hedge_without_samples(self):
+        policy = HedgePolicy(FakeModel("qwen"), min_samples=5, max_extra_ratio=1.0)
+        hedges = []
+        result = await policy.run("k", _delayed("primary", 0.05), lambda: hedges.append(1))
+        self.assertEqual(result, "primary")
+        self.assertEqual(hedges, [])
+        self.assertIsNone(policy.hedge_delay("other"))
+
+    async def test_slow_primary_hedged_and_cancelled(self):
+        policy = HedgePolicy(FakeModel("qwen"), min_samples=5, max_extra_ratio=1.0, min_delay=0.01)
+        await self._warm(policy, "k")
+        cancelled = []
+
+        result = await policy.run("k", _delayed("primary", 1.0, cancelled), lambda: _delayed("hedge", 0.01)())
+        await asyncio.sleep(0)
+        self.assertEqual(result, "hedge")
+        self.assertEqual(cancelled, ["primary"])
+        self.assertEqual(policy.snapshot()["hedge_wins"], 1)
+
+    async def test_primary_wins_race(self):
+        policy = HedgePolicy(FakeModel("qwen"), min_samples=5, max_extra_ratio=1.0, min_delay=0.01)
+        await self._warm(policy, "k")
+        cancelled = []
+
+        result = await policy.run(
+            "k", _delayed("primary", 0.05), lambda: _delayed("hedge", 1.0, cancelled)()
+        )
+        await asyncio.sleep(0)
+        self.assertEqual(result, "primary")
+        self.assertEqual(cancelled, ["hedge"])
+        self.assertEqual(policy.snapshot()["hedged"], 1)
+
+    async def test_extra_spend_capped(self):
+        policy = HedgePolicy(FakeModel("qwen"), min_samples=5, max_extra_ratio=0.1, min_delay=0.01)
+        await self._warm(policy, "k", count=5)
+        fired = []
+
+        def alternate():
+            fired.append(1)
+            return _delayed("hedge", 0.0)()
+
+        for _ in range(10):
+            await policy.run("k", _delayed("slow", 0.03), alternate)
+        snapshot = policy.snapshot()
+        self.assertEqual(len(fired), snapshot["hedged"])
+        self.assertLessEqual(snapshot["hedged"], 0.1 * snapshot["calls"])
+        self.assertGreaterEqual(snapshot["hedged"], 1)
+
+
+class ScoringHedgeTests(unittest.IsolatedAsyncioTestCase):
+
+    async def test_only_one_candidate_replaced_per_turn(self):
+        policy = HedgePolicy(FakeModel("qwen-plus"), min_samples=1, max_extra_ratio=1.0, min_delay=0.01)
+        agent = ScoringAgent([FakeModel("doubao"), FakeModel("gemini")], hedge_policy=policy)
+        policy._record("ScoringAgent:doubao", 0.01)
+        policy._record("ScoringAgent:gemini", 0.01)
+
+        async def slow(messages):
+            await asyncio.sleep(0.5)
+            return _candidate(6)
+
+        for sm in agent._structured_models:
+            sm.ainvoke = AsyncMock(side_effect=slow)
+        policy.structured(SingleScoreCandidate).ainvoke = AsyncMock(return_value=_candidate(8))
+
+        result = await agent.aprocess({"question": "q", "answer": "正确解法：先排序再双指针扫描", "skip_rag_anchors": True})
+        self.assertFalse(result["fallback_used"])
+        self.assertEqual(policy.snapshot()["hedge_wins"], 1)
+        self.assertEqual(result["model_name"], "ensemble(2)")
+        self.assertEqual(result["score"], 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+"""
+Prometheus 指标单测
+
+关键不变量：
+- 未启用时埋点零包装：节点函数原样返回、llm_call 直接给出原 runnable、端点 404
+- 启用后 graph 每个节点、LLM 调用（耗时 / token / 前缀缓存命中 / 异常）、Mongo 操作都有样本
+- speculative 出题结局计数与胜率 / 耗时分位数可被抓取
+- /api/metrics/ 在配置 token 时校验 Bearer
+
+prometheus-client 未安装时跳过。
+
+运行：
+  uv run python -m unittest interview.tests.test_metrics -v
+"""
+
+from __future__ import annotations
+
+import os
+import unittest
+from unittest.mock import patch
+
+from django.conf import settings
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+from interview import metrics
+from interview.agents.speculation import OUTCOME_COMMITTED, SpeculationStats
+from interview.tests.test_graph_pure import FakeSession, _build_graph
+
+
+def setUpModule():
+    if not settings.configured:
+        settings.configure()
+
+
+def _sample(name, **labels):
+    return metrics.REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class _Request:
+    def __init__(self, authorization=None):
+        self.headers = {"Authorization": authorization} if authorization else {}
+
+
+class MetricsDisabled(unittest.TestCase):
+
+    def setUp(self):
+        self._was_enabled = metrics.metrics_enabled()
+        metrics.set_metrics_enabled(False)
+
+    def tearDown(self):
+        metrics.set_metrics_enabled(self._was_enabled)
+
+    def test_instrumentation_is_passthrough(self):
+        async def node(state):
+            return {}
+
+        runnable = RunnableLambda(lambda x: x)
+        self.assertIs(metrics.instrument_node("persist", node), node)
+        with metrics.llm_call("ScoringAgent", "m", runnable) as bound:
+            self.assertIs(bound, runnable)
+        self.assertIs(metrics.mongo_op("result", "find"), metrics.mongo_op("users", "find_one"))
+
+    def test_endpoint_hidden(self):
+        self.assertEqual(metrics.metrics_view(_Request()).status_code, 404)
+
+
+@unittest.skipUnless(metrics.REGISTRY is not None, "prometheus-client 未安装")
+class MetricsEnabled(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self._was_enabled = metrics.metrics_enabled()
+        metrics.set_metrics_enabled(True)
+
+    def tearDown(self):
+        metrics.set_metrics_enabled(self._was_enabled)
+
+    async def test_every_node_is_timed(self):
+        before = {
+            node: _sample("interview_graph_node_seconds_count", node=node)
+            for node in ("security", "scoring", "persist", "readiness", "retrieval", "next_question")
+        }
+        session = FakeSession()
+        graph, _ = _build_graph(session)
+        await graph.ainvoke({"session_id": "s1", "candidate_name": "alice", "user_answer": "答案"})
+
+        for node, count in before.items():
+            self.assertEqual(_sample("interview_graph_node_seconds_count", node=node), count + 1, node)
+
+    async def test_llm_call_records_latency_tokens_and_errors(self):
+        model = GenericFakeChatModel(messages=iter([AIMessage(
+            content="ok",
+            usage_metadata={"input_tokens": 30, "output_tokens": 7, "total_tokens": 37},
+            response_metadata={"model_name": "fake"},
+        )]))
+        labels = {"agent": "TestAgent", "model": "fake"}
+        calls = _sample("interview_llm_call_seconds_count", **labels)
+        tokens_in = _sample("interview_llm_tokens_total", kind="input", **labels)
+        errors = _sample("interview_llm_errors_total", **labels)
+
+        with metrics.llm_call("TestAgent", "fake", model) as bound:
+            await bound.ainvoke("hi")
+
+        def boom(_):
+            raise RuntimeError("provider down")
+
+        with self.assertRaises(RuntimeError):
+            with metrics.llm_call("TestAgent", "fake", RunnableLambda(boom)) as bound:
+                await bound.ainvoke("hi")
+
+        self.assertEqual(_sample("interview_llm_call_seconds_count", **labels), calls + 2)
+        self.assertEqual(_sample("interview_llm_tokens_total", kind="input", **labels), tokens_in + 30)
+        self.assertEqual(_sample("interview_llm_errors_total", **labels), errors + 1)
+
+    async def test_llm_call_records_prompt_cache_hits(self):
+        model = GenericFakeChatModel(messages=iter([AIMessage(
+            content="ok",
+            usage_metadata={"input_tokens": 2000, "output_tokens": 5, "total_tokens": 2005,
+                            "input_token_details": {"cache_read": 1536}},
+            response_metadata={"model_name": "fake"},
+        )]))
+        before = metrics.prompt_cache_report().get("CacheAgent", {"input_tokens": 0.0, "cached_tokens": 0.0})
+
+        with metrics.llm_call("CacheAgent", "fake", model) as bound:
+            await bound.ainvoke("hi")
+
+        report = metrics.prompt_cache_report()["CacheAgent"]
+        self.assertEqual(report["input_tokens"] - before["input_tokens"], 2000)
+        self.assertEqual(report["cached_tokens"] - before["cached_tokens"], 1536)
+        self.assertGreater(report["hit_ratio"], 0)
+
+    def test_mongo_op_timed_per_collection(self):
+        labels = {"collection": "conversation_memories", "operation": "find"}
+        before = _sample("interview_mongo_op_seconds_count", **labels)
+        with metrics.mongo_op("conversation_memories", "find"):
+            pass
+        self.assertEqual(_sample("interview_mongo_op_seconds_count", **labels), before + 1)
+
+    def test_speculation_outcomes_and_window_quantiles_exported(self):
+        stats = SpeculationStats()
+        before = _sample("interview_speculation_outcome_total", outcome=OUTCOME_COMMITTED)
+        stats.record_outcome(OUTCOME_COMMITTED, saved_ms=400.0)
+        stats.record_turn(1200.0, speculative=True)
+
+        self.assertEqual(_sample("interview_speculation_outcome_total", outcome=OUTCOME_COMMITTED), before + 1)
+        self.assertGreater(_sample("interview_speculation_win_rate"), 0.0)
+        self.assertGreaterEqual(_sample("interview_speculation_turn_ms", mode="speculative", quantile="0.95"), 1200.0)
+        self.assertIsNotNone(metrics.REGISTRY.get_sample_value("interview_speculation_saved_ms", {"quantile": "0.5"}))
+
+    def test_endpoint_exposes_registry_behind_token(self):
+        metrics.track_active_sessions(lambda: 3)
+        with patch.dict(os.environ, {metrics.METRICS_TOKEN_ENV: "secret"}):
+            self.assertEqual(metrics.metrics_view(_Request()).status_code, 401)
+            response = metrics.metrics_view(_Request("Bearer secret"))
+
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn("interview_active_sessions 3.0", body)
+        self.assertIn("interview_consumer_pending_tasks", body)
+
+
+if __name__ == "__main__":
+    unittest.main()
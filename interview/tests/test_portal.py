@@ -0,0 +1,71 @@
+"""
+LoopPortal 单测（同步入口共用的常驻 event loop）
+
+关键不变量：
+- 多次同步调用复用同一个 loop（loop 绑定的客户端不再随调用丢弃）
+- 在运行中的 event loop 里同步调用仍能拿到结果
+- 在 portal 自身的 loop 中同步等待直接报错而不是死锁
+- 超时取消在途任务
+
+运行：
+  uv run python -m unittest interview.tests.test_portal -v
+"""
+
+from __future__ import annotations
+
+import asyncio
+import unittest
+
+from interview.agents.portal import LoopPortal
+
+
+async def _current_loop():
+    return asyncio.get_running_loop()
+
+
+class LoopPortalTests(unittest.TestCase):
+
+    def setUp(self):
+        self.portal = LoopPortal(name="test-portal")
+
+    def tearDown(self):
+        self.portal.stop()
+
+    def test_calls_share_one_loop(self):
+        first = self.portal.call(_current_loop())
+        second = self.portal.call(_current_loop())
+        self.assertIs(first, second)
+        self.assertTrue(first.is_running())
+
+    def test_call_from_running_loop(self):
+        async def caller():
+            return self.portal.call(_current_loop()), asyncio.get_running_loop()
+
+        portal_loop, caller_loop = asyncio.run(caller())
+        self.assertIsNot(portal_loop, caller_loop)
+
+    def test_reentrant_call_raises(self):
+        async def reenter():
+            return self.portal.call(_current_loop())
+
+        with self.assertRaises(RuntimeError):
+            self.portal.call(reenter())
+
+    def test_timeout_cancels_task(self):
+        cancelled = []
+
+        async def slow():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        with self.assertRaises(TimeoutError):
+            self.portal.call(slow(), timeout=0.05)
+        self.portal.call(asyncio.sleep(0.05))
+        self.assertEqual(cancelled, [True])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+"""
+评分前置分流单测（prescoring.py + ScoringAgent 接入）
+
+关键不变量：
+- 空答 / 拒答 / 重复粘贴 → 0 分；evidence_quote 走 _NO_SOLUTION_MARKERS 约定，校验恒通过
+- 以拒答字样开头的结论（「不会相交」）与短答案（「2」「x=2」「120种」）不被规则评分，交给 ensemble
+- 是非题的否定回答（「不会」「不会的」「根本不会」）不被判为拒答
+- 退化回答与缓存命中都不调用 LLM；回答级缓存对标点 / 空白差异不敏感，只缓存多模型聚合结果
+
+运行：
+  uv run python -m unittest interview.tests.test_prescoring -v
+"""
+
+from __future__ import annotations
+
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from interview.agents.prescoring import (
+    PRESCORE_CACHE_HIT,
+    PRESCORE_DUPLICATE,
+    PRESCORE_EMPTY,
+    PRESCORE_MISS,
+    PRESCORE_REFUSAL,
+    AnswerScoreCache,
+    detect_degenerate_answer,
+)
+from interview.agents.response_cache import InMemoryResponseCache
+from interview.agents.schemas import SingleScoreCandidate
+from interview.agents.scoring_agent import ScoringAgent
+from interview.agents.utils import validate_quote_in_answer
+
+_QUESTION = "请证明任意 5 个整数中必有两数之差被 4 整除。"
+_ANSWER = "按模 4 的余数分成 4 组，5 个数放进 4 组，由抽屉原理必有两数同组，差被 4 整除。"
+
+
+class FakeModel:
+    def __init__(self, name):
+        self.model_name = name
+
+    def with_structured_output(self, schema, include_raw=False):
+        m = MagicMock()
+        m.ainvoke = AsyncMock(return_value=SingleScoreCandidate(
+            score=8, evidence_quote="抽屉原理", question_focus="抽屉原理", confidence="high", reasoning="ok",
+        ))
+        return m
+
+
+class DetectorTests(unittest.TestCase):
+
+    def _kind(self, answer, previous_qa=()):
+        result = detect_degenerate_answer(_QUESTION, answer, previous_qa)
+        if result is not None:
+            self.assertTrue(validate_quote_in_answer(result.evidence_quote, answer))
+        return result and result.kind
+
+    def test_degenerate_kinds(self):
+        self.assertEqual(self._kind("  \n"), PRESCORE_EMPTY)
+        self.assertEqual(self._kind("不知道。"), PRESCORE_REFUSAL)
+        self.assertEqual(self._kind("抱歉老师，这道题我真的不会"), PRESCORE_REFUSAL)
+        self.assertEqual(self._kind("I don't know"), PRESCORE_REFUSAL)
+        self.assertEqual(self._kind("忘了，跳过吧"), PRESCORE_REFUSAL)
+        self.assertEqual(self._kind("我不会做"), PRESCORE_REFUSAL)
+        self.assertEqual(self._kind("我也不会"), PRESCORE_REFUSAL)
+        self.assertEqual(detect_degenerate_answer(_QUESTION, "不会写").score, 0)
+
+    def test_reasoned_answers_pass_through(self):
+        self.assertIsNone(self._kind(_ANSWER))
+        self.assertIsNone(self._kind("不会，因为 5 个数按余数分组后必有一组两个数"))
+
+    def test_short_conclusions_pass_through(self):
+        for answer in ("不会相交", "不会死锁", "2", "e", "x=2", "不存在", "120种", "是的", "对"):
+            with self.subTest(answer=answer):
+                self.assertIsNone(self._kind(answer))
+
+    def test_yes_no_negative_answers_pass_through(self):
+        question = "这两条直线会相交吗？"
+        for answer in ("不会", "不会。", "不会的", "也不会", "根本不会", "完全不会", "不太会", "都不会"):
+            with self.subTest(answer=answer):
+                self.assertIsNone(detect_degenerate_answer(question, answer))
+
+    def test_duplicate_of_previous_answer(self):
+        previous = [{"question": "介绍一下你的项目", "answer": _ANSWER}]
+        self.assertEqual(self._kind(_ANSWER + "。", previous), PRESCORE_DUPLICATE)
+        # 同一道题重问时重复作答不算粘贴
+        self.assertIsNone(self._kind(_ANSWER, [{"question": _QUESTION, "answer": _ANSWER}]))
+
+
+class ScoringAgentPrescoreTests(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.agent = ScoringAgent(
+            [FakeModel("doubao"), FakeModel("gemini")],
+            answer_cache=AnswerScoreCache(InMemoryResponseCache()),
+        )
+
+    def _llm_calls(self):
+        return sum(m.ainvoke.await_count for m in self.agent._structured_models)
+
+    async def _score(self, answer, question=_QUESTION):
+        return await self.agent.aprocess({"question": question, "answer": answer, "skip_rag_anchors": True})
+
+    async def test_degenerate_answer_skips_llm(self):
+        result = await self._score("我不会")
+        self.assertEqual(result["score"], 0)
+        self.assertEqual(result["model_name"], "rules:refusal")
+        self.assertEqual(self._llm_calls(), 0)
+
+    async def test_cache_reuses_ensemble_result(self):
+        first = await self._score(_ANSWER)
+        second = await self._score(_ANSWER.replace("，", ", "), question=_QUESTION + "  ")
+
+        self.assertEqual(first, second)
+        self.assertEqual(self._llm_calls(), 2)
+        counts = self.agent.prescore_stats.snapshot()["counts"]
+        self.assertEqual((counts[PRESCORE_MISS], counts[PRESCORE_CACHE_HIT]), (1, 1))
+
+    async def test_single_model_result_not_cached(self):
+        await self.agent.aprocess({"question": _QUESTION, "answer": _ANSWER, "skip_rag_anchors": True, "max_models": 1})
+        await self._score(_ANSWER)
+        self.assertEqual(self._llm_calls(), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+简历解析结果持久化缓存单测（profile_cache.py + ResumeParser 接入）
+
+关键不变量：
+- 简历内容相同（_id / 键顺序不同）即命中，不再调用 LLM
+- prompt 版本 / 解析模型 / rubric 文本变化后不命中；LLM 失败时的降级 profile 不写入
+- prefetch_profile 在后台解析并写入，随后的解析直接命中
+
+parsed_profiles 集合用 mongomock 作为本地替身，未安装时跳过。
+
+运行：
+  uv run python -m unittest interview.tests.test_profile_cache -v
+"""
+
+from __future__ import annotations
+
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from interview.agents.profile_cache import ParsedProfileStore, prefetch_profile, resume_fingerprint
+from interview.agents.resume_parser import ResumeParser
+from interview.agents.schemas import ResumeProfile
+
+try:
+    import mongomock
+except ImportError:  # pragma: no cover - 依赖可选
+    mongomock = None
+
+_RESUME = {"content": {"name": "alice", "projects": ["编译器", "数学建模"]}}
+
+
+class FakeModel:
+    model_name = "fake-parser"
+
+    def with_structured_output(self, schema, include_raw=False):
+        m = MagicMock()
+        m.ainvoke = AsyncMock(return_value=ResumeProfile(suggested_probe_items=["p1"]))
+        return m
+
+
+class FingerprintTests(unittest.TestCase):
+
+    def test_ignores_document_id_and_key_order(self):
+        a = {"_id": {"$oid": "1"}, "content": {"name": "alice", "age": 20}}
+        b = {"content": {"age": 20, "name": "alice"}}
+        self.assertEqual(resume_fingerprint(a), resume_fingerprint(b))
+        self.assertNotEqual(resume_fingerprint(b), resume_fingerprint({"content": {"name": "bob", "age": 20}}))
+
+
+@unittest.skipUnless(mongomock is not None, "mongomock 未安装")
+class ResumeParserProfileStoreTests(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.collection = mongomock.MongoClient().db.parsed_profiles
+        self.parser = ResumeParser(FakeModel())
+        self.parser.response_cache = None
+        self.parser.profile_store = ParsedProfileStore(self.collection)
+
+    async def test_same_resume_parsed_once(self):
+        first = await self.parser.aparse(_RESUME)
+        second = await self.parser.aparse({"_id": {"$oid": "abc"}, **_RESUME})
+
+        self.assertEqual(first, second)
+        self.assertEqual(first["suggested_probe_items"], ["p1"])
+        self.parser._structured_model.ainvoke.assert_awaited_once()
+        self.assertEqual(self.collection.count_documents({}), 1)
+
+    async def test_prompt_version_change_misses(self):
+        await self.parser.aparse(_RESUME)
+        self.parser.prompt.version = f"{self.parser.prompt.version}-next"
+        await self.parser.aparse(_RESUME)
+        self.assertEqual(self.parser._structured_model.ainvoke.await_count, 2)
+
+    async def test_rubric_change_misses(self):
+        await self.parser.aparse(_RESUME)
+        with patch("interview.agents.resume_parser.format_rubric_for_prompt", return_value="edited rubric"):
+            await self.parser.aparse(_RESUME)
+        self.assertEqual(self.parser._structured_model.ainvoke.await_count, 2)
+
+    async def test_parser_model_change_misses(self):
+        await self.parser.aparse(_RESUME)
+        self.parser.model.model_name = "another-parser"
+        await self.parser.aparse(_RESUME)
+        self.assertEqual(self.parser._structured_model.ainvoke.await_count, 2)
+
+    async def test_fallback_profile_not_stored(self):
+        self.parser._structured_model.ainvoke = AsyncMock(side_effect=RuntimeError("upstream down"))
+        profile = await self.parser.aparse(_RESUME)
+        self.assertEqual(profile["items"], [])
+        self.assertEqual(self.collection.count_documents({}), 0)
+
+    async def test_store_errors_fall_back_to_llm(self):
+        broken = MagicMock()
+        broken.find_one.side_effect = RuntimeError("mongo down")
+        broken.replace_one.side_effect = RuntimeError("mongo down")
+        self.parser.profile_store = ParsedProfileStore(broken)
+        profile = await self.parser.aparse(_RESUME)
+        self.assertEqual(profile["suggested_probe_items"], ["p1"])
+
+
+@unittest.skipUnless(mongomock is not None, "mongomock 未安装")
+class PrefetchTests(unittest.TestCase):
+
+    def test_prefetch_populates_store(self):
+        collection = mongomock.MongoClient().db.parsed_profiles
+        parser = ResumeParser(FakeModel())
+        parser.response_cache = None
+        parser.profile_store = ParsedProfileStore(collection)
+
+        prefetch_profile(parser, _RESUME).result(timeout=5)
+
+        cached = parser.profile_store.get({"_id": {"$oid": "abc"}, **_RESUME}, parser.profile_version)
+        self.assertEqual(cached["suggested_probe_items"], ["p1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
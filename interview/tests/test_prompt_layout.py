@@ -0,0 +1,96 @@
+"""
+稳定前缀 prompt 布局单测（cache.PromptLayout + QuestionGenerator / QuestionVerifier 接入）
+
+关键不变量：
+- 段落按稳定性层级排列，同层保持添加顺序，空段落忽略
+- 同一场面试的两次出题：相似案例 / verifier 反馈不同，profile + 历史问答仍是共同前缀
+- verifier 各轴校验的 human message 只有结尾（check_name）不同
+
+运行：
+  uv run python -m unittest interview.tests.test_prompt_layout -v
+"""
+
+from __future__ import annotations
+
+import os
+import unittest
+from unittest.mock import MagicMock
+
+from interview.agents.cache import SEGMENT_HISTORY, SEGMENT_PROFILE, SEGMENT_VOLATILE, PromptLayout
+from interview.agents.prompts import load_prompt
+from interview.agents.question_generator import QuestionGeneratorAgent
+
+_PROFILE = {
+    "items": [{"id": "p1", "category": "project", "summary": "图算法课程项目", "knowledge_gaps": ["复杂度"]}],
+    "weakest_dimensions": ["math_logic"],
+    "suggested_probe_items": ["p1"],
+}
+_PREVIOUS_QA = [{"question": "介绍一下你的项目", "answer": "我做了最短路", "type": "opening"}]
+
+
+class FakeModel:
+    model_name = "fake-generator"
+
+    def with_structured_output(self, schema, include_raw=False):
+        return MagicMock()
+
+
+def _common_prefix(a: str, b: str) -> str:
+    return os.path.commonprefix([a, b])
+
+
+class PromptLayoutTests(unittest.TestCase):
+
+    def test_orders_by_tier_then_insertion(self):
+        layout = PromptLayout()
+        layout.add(SEGMENT_VOLATILE, "cases").add(SEGMENT_PROFILE, "profile")
+        layout.add(SEGMENT_HISTORY, "").add(SEGMENT_VOLATILE, "feedback").add(SEGMENT_HISTORY, "qa")
+        self.assertEqual(layout.render(), "profile\n\nqa\n\ncases\n\nfeedback")
+        self.assertFalse(PromptLayout().add(SEGMENT_PROFILE, ""))
+
+
+class QuestionGeneratorLayoutTests(unittest.TestCase):
+
+    def setUp(self):
+        self.agent = QuestionGeneratorAgent(FakeModel(), retrieval_system=MagicMock())
+
+    def _prompt(self, **overrides):
+        return self.agent._build_human_prompt({
+            "interview_stage": "technical",
+            "previous_qa": _PREVIOUS_QA,
+            "current_score": 6,
+            "target_type": "math_logic",
+            "parsed_profile": _PROFILE,
+            **overrides,
+        })
+
+    def test_volatile_content_after_profile_and_history(self):
+        first = self._prompt(similar_cases_context="案例 A")
+        revised = self._prompt(
+            similar_cases_context="案例 B", verifier_feedback=["no_repeat: 与上一题知识点重复"]
+        )
+
+        prefix = _common_prefix(first, revised)
+        self.assertIn("图算法课程项目", prefix)
+        self.assertIn("Previous Q&A record", prefix)
+        self.assertLess(first.index("Previous Q&A record"), first.index("案例 A"))
+        self.assertTrue(revised.rstrip().endswith("adjust difficulty up or down accordingly."))
+
+
+class VerifierLayoutTests(unittest.TestCase):
+
+    def test_axes_differ_only_in_suffix(self):
+        prompt = load_prompt("question_verifier")
+        kwargs = dict(
+            candidate_question_json='{"question": "q"}', parsed_profile_json='{"items": []}',
+            recent_qa="Q: a\nA: b", current_score="6.0",
+        )
+        a = prompt.format_human(check_name="resume_anchor", **kwargs)
+        b = prompt.format_human(check_name="difficulty_match", **kwargs)
+        prefix = _common_prefix(a, b)
+        self.assertTrue(prefix.startswith("parsed_profile:"))
+        self.assertIn('{"question": "q"}', prefix)
+
+
+if __name__ == "__main__":
+    unittest.main()
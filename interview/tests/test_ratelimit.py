@@ -0,0 +1,160 @@
+"""
+provider 限流单测（ratelimit.py + transport.py 包装）
+
+关键不变量：
+- 在途已满时，INTERACTIVE 请求先于更早排队的 BACKGROUND 请求放行
+- TPM 令牌耗尽时排队等待，超过 max_wait 抛 LimiterTimeout
+- 429 + Retry-After 暂停整个 provider 的放行（带抖动），成功响应清零连续失败计数
+- 共享 httpx 客户端的每个请求都经过限流器，响应关闭后归还在途名额
+
+运行：
+  uv run python -m unittest interview.tests.test_ratelimit -v
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import unittest
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from interview import metrics, ratelimit, transport
+from interview.ratelimit import BACKGROUND, INTERACTIVE, LimiterTimeout, ProviderLimit, ProviderLimiter
+
+
+class _ThrottlingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    throttle_next = 0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        cls = type(self)
+        if cls.throttle_next:
+            cls.throttle_next -= 1
+            self.send_response(429)
+            self.send_header("Retry-After", "0.2")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+class ProviderLimiterTests(unittest.TestCase):
+
+    def test_interactive_admitted_before_background(self):
+        limiter = ProviderLimiter("p", ProviderLimit(max_in_flight=1))
+        limiter.acquire_sync()
+        admitted = []
+
+        def worker(level, label):
+            with ratelimit.priority(level):
+                limiter.acquire_sync()
+            admitted.append(label)
+            limiter.release()
+
+        background = threading.Thread(target=worker, args=(BACKGROUND, "background"))
+        background.start()
+        while limiter.queue_depths()["background"] == 0:
+            time.sleep(0.001)
+        interactive = threading.Thread(target=worker, args=(INTERACTIVE, "interactive"))
+        interactive.start()
+        while limiter.queue_depths()["interactive"] == 0:
+            time.sleep(0.001)
+
+        limiter.release()
+        background.join(2)
+        interactive.join(2)
+        self.assertEqual(admitted, ["interactive", "background"])
+        self.assertEqual(limiter.in_flight, 0)
+
+    def test_token_bucket_waits_then_times_out(self):
+        limiter = ProviderLimiter("p", ProviderLimit(tpm=60, max_wait=0.05))
+        limiter.acquire_sync(tokens=60)
+        started = time.monotonic()
+        with self.assertRaises(LimiterTimeout):
+            asyncio.run(limiter.acquire(tokens=30))
+        self.assertGreaterEqual(time.monotonic() - started, 0.05)
+        self.assertEqual(limiter.queue_depths(), {"interactive": 0, "background": 0})
+
+    def test_retry_after_pauses_provider(self):
+        now = [100.0]
+        limiter = ProviderLimiter("p", ProviderLimit(), clock=lambda: now[0])
+        limiter.record_response(429, {"retry-after": "2"})
+        self.assertGreaterEqual(limiter.blocked_until, 102.0)
+        self.assertLessEqual(limiter.blocked_until, 102.0 * 1.2)
+
+        limiter.record_response(429, {})
+        self.assertEqual(limiter._strikes, 2)
+        limiter.record_response(200, {})
+        self.assertEqual(limiter._strikes, 0)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(ratelimit.parse_retry_after({"retry-after-ms": "1500"}), 1.5)
+        self.assertEqual(ratelimit.parse_retry_after({"retry-after": "3"}), 3.0)
+        self.assertAlmostEqual(
+            ratelimit.parse_retry_after({"retry-after": formatdate(time.time() + 10, usegmt=True)}), 10, delta=1.5
+        )
+        self.assertIsNone(ratelimit.parse_retry_after({"retry-after": "soon"}))
+
+
+class LimitedTransportTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _ThrottlingHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}/v1"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        transport.close_http_clients()
+        ratelimit.reset_limiters()
+        self._was_enabled = metrics.metrics_enabled()
+
+    def tearDown(self):
+        transport.close_http_clients()
+        ratelimit.reset_limiters()
+        metrics.set_metrics_enabled(self._was_enabled)
+
+    def test_throttled_response_delays_next_request(self):
+        client = transport.get_sync_client(self.base_url)
+        limiter = ratelimit.get_limiter(transport.host_key(self.base_url))
+
+        _ThrottlingHandler.throttle_next = 1
+        self.assertEqual(client.post(f"{self.base_url}/embeddings", json={}).status_code, 429)
+        self.assertEqual(limiter.in_flight, 0)
+
+        started = time.monotonic()
+        self.assertEqual(client.post(f"{self.base_url}/embeddings", json={}).status_code, 200)
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+
+    @unittest.skipUnless(metrics.REGISTRY is not None, "prometheus-client 未安装")
+    def test_async_requests_share_limiter_and_export_metrics(self):
+        metrics.set_metrics_enabled(True)
+        key = transport.host_key(self.base_url)
+        labels = {"provider": key, "priority": "interactive"}
+        before = metrics.REGISTRY.get_sample_value("interview_provider_wait_seconds_count", labels) or 0.0
+
+        async def burst():
+            client = transport.get_async_client(self.base_url)
+            responses = await asyncio.gather(*(client.post(f"{self.base_url}/chat", json={}) for _ in range(3)))
+            return [r.status_code for r in responses]
+
+        self.assertEqual(asyncio.run(burst()), [200, 200, 200])
+        self.assertEqual(metrics.REGISTRY.get_sample_value("interview_provider_wait_seconds_count", labels), before + 3)
+        self.assertEqual(metrics.REGISTRY.get_sample_value("interview_provider_in_flight", {"provider": key}), 0.0)
+        self.assertEqual(metrics.REGISTRY.get_sample_value("interview_provider_queue_depth", labels), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
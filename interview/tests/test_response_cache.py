@@ -0,0 +1,205 @@
+"""
+LLM 响应缓存单测（response_cache.py + BaseAgent 接入）
+
+关键不变量：
+- 缓存键随模型名 / prompt 版本 / 消息 / schema 任一变化而变化
+- 内存 / SQLite 后端按 LRU 淘汰、按 TTL 过期（SQLite 定期清理未再读到的过期行）；Redis 后端读写一致
+- opt-in 的 agent 对同一输入只调用一次模型，命中 / 未命中计入指标；未 opt-in 的 agent 不读缓存
+
+运行：
+  uv run python -m unittest interview.tests.test_response_cache -v
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from typing import Any, Dict
+from unittest.mock import AsyncMock, MagicMock
+
+from langchain_core.messages import HumanMessage, SystemMessage
+from pydantic import BaseModel
+
+from interview import metrics
+from interview.agents.base_agent import BaseAgent
+from interview.agents.response_cache import (
+    InMemoryResponseCache,
+    RedisResponseCache,
+    SQLiteResponseCache,
+    cache_key,
+    create_response_cache,
+)
+
+try:
+    import fakeredis
+except ImportError:  # pragma: no cover
+    fakeredis = None
+
+
+class Verdict(BaseModel):
+    ok: bool
+    note: str = ""
+
+
+class OtherVerdict(BaseModel):
+    ok: bool
+
+
+class FakeModel:
+    model_name = "fake-model"
+
+    def with_structured_output(self, schema, include_raw=False):
+        m = MagicMock()
+        m.ainvoke = AsyncMock(return_value=Verdict(ok=True, note="llm"))
+        m.with_config.return_value = m  # 启用指标时 llm_call 会绑定 callbacks
+        return m
+
+
+class CachedAgent(BaseAgent):
+    output_schema = Verdict
+    response_cache_ttl = 60.0
+
+    async def aprocess(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        return (await self.ainvoke_structured(input_data["text"])).model_dump()
+
+
+class UncachedAgent(CachedAgent):
+    response_cache_ttl = None
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CacheKeyTests(unittest.TestCase):
+
+    def test_key_covers_all_inputs(self):
+        messages = [SystemMessage(content="sys"), HumanMessage(content="q")]
+        base = cache_key("m", "p", "1", Verdict, messages)
+        self.assertEqual(base, cache_key("m", "p", "1", Verdict, list(messages)))
+        variants = {
+            cache_key("m2", "p", "1", Verdict, messages),
+            cache_key("m", "p", "2", Verdict, messages),
+            cache_key("m", "p", "1", OtherVerdict, messages),
+            cache_key("m", "p", "1", Verdict, [SystemMessage(content="sys"), HumanMessage(content="q2")]),
+        }
+        self.assertNotIn(base, variants)
+        self.assertEqual(len(variants), 4)
+
+
+class BackendTests(unittest.TestCase):
+
+    def test_memory_lru_and_ttl(self):
+        clock = _Clock()
+        cache = InMemoryResponseCache(max_entries=2, clock=clock)
+        cache.set("a", "1", ttl=10)
+        cache.set("b", "2", ttl=10)
+        self.assertEqual(cache.get("a"), "1")  # a 变为最近使用
+        cache.set("c", "3", ttl=10)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "1")
+        clock.now = 11
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 1)
+
+    def test_sqlite_roundtrip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.db")
+            cache = create_response_cache(f"sqlite://{path}")
+            self.assertIsInstance(cache, SQLiteResponseCache)
+            cache.set("k", '{"ok": true}', ttl=60)
+            cache.set("expired", "{}", ttl=-1)
+            self.assertEqual(SQLiteResponseCache(path).get("k"), '{"ok": true}')
+            self.assertIsNone(cache.get("expired"))
+            self.assertEqual(cache.purge_expired(), 0)
+
+    def test_sqlite_lru_bound_and_periodic_purge(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            clock = _Clock()
+            cache = SQLiteResponseCache(
+                os.path.join(tmp, "cache.db"), max_entries=2, maintenance_interval=1, clock=clock,
+            )
+            cache.set("a", "1", ttl=10)
+            clock.now = 1
+            cache.set("b", "2", ttl=10)
+            clock.now = 2
+            self.assertEqual(cache.get("a"), "1")  # a 变为最近使用
+            clock.now = 3
+            cache.set("c", "3", ttl=10)
+            self.assertEqual(len(cache), 2)
+            self.assertIsNone(cache.get("b"))
+            self.assertEqual(cache.get("a"), "1")
+
+            # 过期行不再被读到也会在下一次维护时删除
+            clock.now = 12
+            cache.set("d", "4", ttl=10)
+            self.assertEqual(len(cache), 2, "a 过期被清理，只剩 c / d")
+            self.assertEqual(cache.get("c"), "3")
+
+    def test_sqlite_url_options(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.db")
+            cache = create_response_cache(f"sqlite://{path}?max_entries=5&maintenance_interval=2")
+            self.assertEqual((cache.path, cache.max_entries, cache.maintenance_interval), (path, 5, 2))
+
+    @unittest.skipUnless(fakeredis is not None, "fakeredis 未安装")
+    def test_redis_roundtrip(self):
+        cache = RedisResponseCache(fakeredis.FakeRedis())
+        cache.set("k", "v", ttl=60)
+        self.assertEqual(cache.get("k"), "v")
+        self.assertIsNone(cache.get("missing"))
+
+    def test_disabled_without_url(self):
+        self.assertIsNone(create_response_cache(""))
+
+
+class AgentCacheTests(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self._was_enabled = metrics.metrics_enabled()
+
+    def tearDown(self):
+        metrics.set_metrics_enabled(self._was_enabled)
+
+    def _agent(self, cls):
+        agent = cls(FakeModel(), "CachedAgent")
+        agent.response_cache = InMemoryResponseCache()
+        return agent
+
+    async def test_identical_input_hits_cache(self):
+        metrics.set_metrics_enabled(True)
+        agent = self._agent(CachedAgent)
+
+        first = await agent.aprocess({"text": "same"})
+        second = await agent.aprocess({"text": "same"})
+        await agent.aprocess({"text": "different"})
+
+        self.assertEqual(first, second)
+        self.assertEqual(agent._structured_model.ainvoke.await_count, 2)
+        if metrics.REGISTRY is not None:
+            hits = metrics.REGISTRY.get_sample_value(
+                "interview_llm_cache_total", {"agent": "CachedAgent", "result": "hit"})
+            self.assertGreaterEqual(hits, 1.0)
+
+    async def test_failed_call_not_cached(self):
+        agent = self._agent(CachedAgent)
+        agent._structured_model.ainvoke = AsyncMock(side_effect=[RuntimeError("boom"), Verdict(ok=False)])
+        with self.assertRaises(RuntimeError):
+            await agent.aprocess({"text": "q"})
+        self.assertEqual(await agent.aprocess({"text": "q"}), {"ok": False, "note": ""})
+
+    async def test_agent_without_ttl_skips_cache(self):
+        agent = UncachedAgent(FakeModel(), "UncachedAgent")
+        self.assertIsNone(agent.response_cache)
+        await agent.aprocess({"text": "same"})
+        await agent.aprocess({"text": "same"})
+        self.assertEqual(agent._structured_model.ainvoke.await_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
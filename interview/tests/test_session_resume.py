@@ -0,0 +1,121 @@
+"""
+断线重连 / 崩溃恢复单测
+
+关键不变量：
+- 每轮写回后 session_meta 快照可单次读取重建完整会话（不回放 turn）
+- 快照落后于已落库的 turn（写快照前崩溃）时退回 turn 回放，且回放排除 embedding
+- 宽限期内 detach 不释放会话，reattach 直接接回；宽限期过后会话与快照被清理
+- 候选人不匹配 / 面试已结束时不恢复
+
+运行：
+  uv run python -m unittest interview.tests.test_session_resume -v
+"""
+
+from __future__ import annotations
+
+import time
+import unittest
+from datetime import datetime
+
+from interview.tests.test_session_store import _new_session, _play_turn
+from interview.tests.test_streaming import _coordinator_for
+
+
+def _meta_with_snapshot(coordinator, session, **overrides):
+    """用 coordinator 实际写出的快照构造 session_meta"""
+    coordinator._save_snapshot(session)
+    sid, snapshot, turns = coordinator.memory_store.save_session_snapshot.call_args.args
+    meta = {
+        "session_id": sid,
+        "candidate_name": session.candidate_name,
+        "status": "active",
+        "context": {"resume_data": session.resume_data, "parsed_profile": session.parsed_profile},
+        "stats": {"total_turns": turns},
+        "snapshot": snapshot,
+        "snapshot_turns": turns,
+        "snapshot_at": datetime.now(),
+    }
+    meta.update(overrides)
+    return meta
+
+
+class SnapshotResume(unittest.TestCase):
+
+    def setUp(self):
+        self.coordinator = _coordinator_for(None, graph=None)
+        self.session = _new_session()
+        for score in (6, 8):
+            _play_turn(self.session, score)
+
+    def test_resume_from_snapshot_in_single_read(self):
+        meta = _meta_with_snapshot(self.coordinator, self.session)
+        self.coordinator.memory_store.get_session_meta.return_value = meta
+
+        result = self.coordinator.resume_interview("s1")
+
+        self.assertTrue(result["success"])
+        self.assertEqual(result["total_questions"], 2)
+        self.coordinator.memory_store.get_session_turns.assert_not_called()
+        restored = self.coordinator.session_store.load("s1")
+        self.assertEqual(restored.score_list, [6, 8])
+        self.assertEqual(restored.current_question, {"question": "Q3"})
+        self.assertEqual(restored.resume_data, self.session.resume_data)
+        self.assertIsInstance(restored.qa_history[0]["timestamp"], datetime)
+
+    def test_stale_snapshot_falls_back_to_replay_without_embeddings(self):
+        meta = _meta_with_snapshot(self.coordinator, self.session, stats={"total_turns": 3})
+        self.coordinator.memory_store.get_session_meta.return_value = meta
+        self.coordinator.memory_store.get_session_turns.return_value = []
+
+        self.coordinator.resume_interview("s1")
+
+        self.coordinator.memory_store.get_session_turns.assert_called_once_with(
+            "s1", projection={"embedding": 0}
+        )
+
+    def test_reattach_after_crash_uses_snapshot(self):
+        self.coordinator.memory_store.get_session_meta.return_value = _meta_with_snapshot(
+            self.coordinator, self.session
+        )
+        result = self.coordinator.reattach_session("s1", "alice")
+        self.assertTrue(result["success"])
+        self.assertEqual(result["resumed_from"], "snapshot")
+        self.assertEqual(result["current_question"], "Q3")
+
+    def test_no_resume_for_other_candidate_or_finished_interview(self):
+        self.coordinator.memory_store.get_session_meta.return_value = _meta_with_snapshot(
+            self.coordinator, self.session
+        )
+        self.assertFalse(self.coordinator.reattach_session("s1", "mallory")["success"])
+
+        self.coordinator.session_store.delete("s1")
+        self.coordinator.memory_store.get_session_meta.return_value = _meta_with_snapshot(
+            self.coordinator, self.session, status="completed"
+        )
+        self.assertFalse(self.coordinator.reattach_session("s1", "alice")["success"])
+
+
+class GraceWindow(unittest.TestCase):
+
+    def setUp(self):
+        self.session = _new_session()
+        self.coordinator = _coordinator_for(self.session, graph=None)
+        self.coordinator.memory_store.get_session_meta.return_value = None
+
+    def test_reconnect_within_grace_reattaches_live_session(self):
+        self.coordinator.detach_session("s1", grace_seconds=5)
+        result = self.coordinator.reattach_session("s1", "alice")
+        self.assertEqual(result["resumed_from"], "live")
+        self.assertIs(self.coordinator.session_store.load("s1"), self.session)
+        self.assertEqual(self.coordinator._detach_timers, {})
+
+    def test_grace_expiry_releases_session_and_snapshot(self):
+        self.coordinator.detach_session("s1", grace_seconds=0.05)
+        time.sleep(0.3)
+        self.assertIsNone(self.coordinator.session_store.load("s1"))
+        self.coordinator.memory_store.clear_session_snapshot.assert_called_with("s1")
+        self.assertFalse(self.coordinator.reattach_session("s1", "alice")["success"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,200 @@
+"""
+SessionStore 单测：进程内 / Redis 会话存储
+
+关键不变量：
+- InMemorySessionStore 保存活对象，save 推进版本号
+- RedisSessionStore 序列化往返保真（qa_history / score_list / 时间字段）
+- 过期版本写回抛 SessionVersionConflict；锁互斥
+- 多进程（模拟多个 daphne worker）轮流处理同一会话，不丢轮次
+
+Redis 用 fakeredis 作为本地替身（TcpFakeServer 供多进程共享），未安装时跳过。
+
+运行：
+  uv run python -m unittest interview.tests.test_session_store -v
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import threading
+import unittest
+from datetime import datetime
+
+from interview.agents.session import InterviewSession
+from interview.agents.session_store import (
+    InMemorySessionStore,
+    RedisSessionStore,
+    SessionVersionConflict,
+)
+from interview.tests.test_streaming import _coordinator_for
+
+try:
+    import fakeredis
+except ImportError:  # pragma: no cover - 依赖可选
+    fakeredis = None
+
+
+def _new_session(sid="s1") -> InterviewSession:
+    session = InterviewSession(sid, "alice", {"name": "alice", "skills": ["数学"]}, coordinator=None)
+    session.parsed_profile = {"items": [{"id": "p1", "summary": "竞赛"}]}
+    session.current_question = {"question": "Q1", "type": "math_logic", "difficulty": "medium"}
+    session.question_data = session.current_question
+    return session
+
+
+def _play_turn(session: InterviewSession, score: int) -> None:
+    session.qa_history.append({
+        "question": session.current_question["question"],
+        "answer": f"answer-{score}",
+        "question_type": "math_logic",
+        "score_details": {"score": score},
+        "timestamp": datetime.now(),
+    })
+    session.add_score(score)
+    session.current_question = {"question": f"Q{len(session.qa_history) + 1}"}
+
+
+def _worker_turns(url: str, session_id: str, worker: int, turns: int) -> None:
+    """子进程：每轮 加锁 → 加载 → 作答 → 写回 → 解锁（模拟独立 worker 接手某一轮）"""
+    store = RedisSessionStore.from_url(url, lock_wait_timeout=30.0)
+    for i in range(turns):
+        lock = store.lock(session_id)
+        assert lock.acquire()
+        try:
+            session = store.load(session_id)
+            _play_turn(session, worker * 100 + i)
+            store.save(session)
+        finally:
+            lock.release()
+
+
+class InMemoryStore(unittest.TestCase):
+
+    def test_save_load_returns_live_object_and_bumps_version(self):
+        store = InMemorySessionStore()
+        session = _new_session()
+        self.assertEqual(store.save(session), 1)
+        self.assertIs(store.load("s1"), session)
+        _play_turn(session, 7)
+        self.assertEqual(store.save(session), 2)
+        store.delete("s1")
+        self.assertIsNone(store.load("s1"))
+
+    def test_lock_is_exclusive_with_timeout(self):
+        store = InMemorySessionStore(lock_timeout=0.05)
+        first = store.lock("s1")
+        self.assertTrue(first.acquire())
+        self.assertFalse(store.lock("s1").acquire())
+        first.release()
+        self.assertTrue(store.lock("s1").acquire())
+
+
+class CoordinatorSessionLock(unittest.IsolatedAsyncioTestCase):
+
+    async def test_locked_session_reports_busy(self):
+        coordinator = _coordinator_for(
+            _new_session(), graph=None, session_store=InMemorySessionStore(lock_timeout=0.05)
+        )
+
+        held = coordinator.session_store.lock("s1")
+        self.assertTrue(held.acquire())
+        result = await coordinator.aprocess_answer("s1", "答案")
+        self.assertFalse(result["success"])
+        self.assertEqual(result["error"], "Session busy")
+        held.release()
+
+
+@unittest.skipUnless(fakeredis is not None, "fakeredis 未安装")
+class RedisStore(unittest.TestCase):
+
+    def setUp(self):
+        self.store = RedisSessionStore(fakeredis.FakeRedis(), lock_wait_timeout=0.05)
+
+    def test_roundtrip_preserves_session(self):
+        session = _new_session()
+        _play_turn(session, 8)
+        self.store.save(session)
+
+        loaded = self.store.load("s1", coordinator="coord")
+        self.assertIsNot(loaded, session)
+        self.assertEqual(loaded.store_version, 1)
+        self.assertEqual(loaded.coordinator, "coord")
+        self.assertEqual(loaded.resume_data, session.resume_data)
+        self.assertEqual(loaded.parsed_profile, session.parsed_profile)
+        self.assertEqual(loaded.score_list, [8])
+        self.assertEqual(loaded.current_question, {"question": "Q2"})
+        self.assertEqual(loaded.qa_history[0]["answer"], "answer-8")
+        self.assertIsInstance(loaded.qa_history[0]["timestamp"], datetime)
+        self.assertEqual(loaded.start_time, session.start_time)
+
+    def test_stale_version_rejected(self):
+        self.store.save(_new_session())
+        worker_a = self.store.load("s1")
+        worker_b = self.store.load("s1")
+        _play_turn(worker_a, 5)
+        self.store.save(worker_a)
+        _play_turn(worker_b, 9)
+        with self.assertRaises(SessionVersionConflict):
+            self.store.save(worker_b)
+        self.assertEqual(self.store.load("s1").score_list, [5])
+
+    def test_per_turn_write_skips_static_part(self):
+        session = _new_session()
+        self.store.save(session)
+        static_before = self.store._client.hget("interview:session:s1", "static")
+        session.resume_data = {"mutated": True}
+        self.store.save(session)
+        self.assertEqual(self.store._client.hget("interview:session:s1", "static"), static_before)
+
+    def test_lock_exclusive_and_token_checked(self):
+        holder = self.store.lock("s1")
+        self.assertTrue(holder.acquire())
+        other = self.store.lock("s1")
+        self.assertFalse(other.acquire())
+        other.release()  # 非持有者释放不生效
+        self.assertFalse(self.store.lock("s1").acquire())
+        holder.release()
+        self.assertTrue(self.store.lock("s1").acquire())
+
+
+@unittest.skipUnless(fakeredis is not None, "fakeredis 未安装")
+class MultiProcessWorkers(unittest.TestCase):
+
+    def setUp(self):
+        self.server = fakeredis.TcpFakeServer(("127.0.0.1", 0), server_type="redis")
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        host, port = self.server.server_address
+        self.url = f"redis://{host}:{port}/0"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_workers_take_turns_without_losing_any(self):
+        store = RedisSessionStore.from_url(self.url)
+        store.save(_new_session("shared"))
+
+        workers, turns = 3, 4
+        ctx = multiprocessing.get_context("spawn")
+        procs = [
+            ctx.Process(target=_worker_turns, args=(self.url, "shared", w, turns))
+            for w in range(workers)
+        ]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join(120)
+            self.assertEqual(p.exitcode, 0)
+
+        final = store.load("shared")
+        self.assertEqual(len(final.qa_history), workers * turns)
+        self.assertEqual(len(final.score_list), workers * turns)
+        self.assertEqual(final.store_version, 1 + workers * turns)
+        # 每个 worker 的轮次按顺序出现
+        for w in range(workers):
+            own = [s for s in final.score_list if s // 100 == w]
+            self.assertEqual(own, [w * 100 + i for i in range(turns)])
+
+
+if __name__ == "__main__":
+    unittest.main()
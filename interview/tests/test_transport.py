@@ -0,0 +1,125 @@
+"""
+共享 HTTP 传输层单测（transport.py）
+
+关键不变量：
+- 同一上游主机（不同路径）复用同一个 httpx 客户端，不同主机互不共享
+- 连续请求复用 keep-alive 连接：只有首个请求记录 tcp 建连耗时
+- 连接池状态（idle / active）可被指标抓取
+- 预热对每个上游只执行一次
+- 同一 AsyncClient 可在多个常驻 event loop 之间交替使用（连接池按 loop 隔离）
+
+运行：
+  uv run python -m unittest interview.tests.test_transport -v
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from interview import metrics, transport
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    hits = 0
+
+    def do_GET(self):
+        type(self).hits += 1
+        body = b"{}"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class SharedTransportTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}/v1"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        transport.close_http_clients()
+        self._was_enabled = metrics.metrics_enabled()
+
+    def tearDown(self):
+        transport.close_http_clients()
+        metrics.set_metrics_enabled(self._was_enabled)
+
+    def test_clients_shared_per_host(self):
+        a = transport.get_sync_client("https://api.example.com/v1")
+        b = transport.get_sync_client("https://api.example.com/compatible-mode/v1")
+        c = transport.get_sync_client("https://other.example.com/v1")
+        self.assertIs(a, b)
+        self.assertIsNot(a, c)
+        self.assertIs(transport.get_async_client("https://api.example.com"), transport.get_async_client(
+            "https://api.example.com:443/v2"
+        ))
+        self.assertEqual(transport.host_key(None), "https://api.openai.com:443")
+
+    @unittest.skipUnless(metrics.REGISTRY is not None, "prometheus-client 未安装")
+    def test_keepalive_connection_reused(self):
+        metrics.set_metrics_enabled(True)
+        key = transport.host_key(self.base_url)
+        labels = {"host": key, "phase": "tcp"}
+        before = metrics.REGISTRY.get_sample_value("interview_http_connect_seconds_count", labels) or 0.0
+
+        client = transport.get_sync_client(self.base_url)
+        for _ in range(3):
+            self.assertEqual(client.get(f"{self.base_url}/models").status_code, 200)
+
+        after = metrics.REGISTRY.get_sample_value("interview_http_connect_seconds_count", labels)
+        self.assertEqual(after, before + 1)
+        self.assertEqual(transport.pool_stats()[(key, "sync")], {"active": 0, "idle": 1, "queued": 0})
+        self.assertEqual(metrics.REGISTRY.get_sample_value(
+            "interview_http_pool_connections", {"host": key, "client": "sync", "state": "idle"}
+        ), 1.0)
+
+    def test_warm_up_runs_once_per_upstream(self):
+        hits = _Handler.hits
+        transport.warm_up([self.base_url, self.base_url])
+        transport.warm_up([self.base_url])
+        self.assertEqual(_Handler.hits, hits + 1)
+        self.assertEqual(transport.pool_stats()[(transport.host_key(self.base_url), "sync")]["idle"], 1)
+
+    def test_async_client_alternates_between_long_lived_loops(self):
+        loops = [asyncio.new_event_loop() for _ in range(2)]
+        threads = [threading.Thread(target=loop.run_forever, daemon=True) for loop in loops]
+        for thread in threads:
+            thread.start()
+        client = transport.get_async_client(self.base_url)
+
+        async def fetch():
+            return (await client.get(f"{self.base_url}/models")).status_code
+
+        try:
+            for loop in loops * 2:
+                self.assertEqual(asyncio.run_coroutine_threadsafe(fetch(), loop).result(timeout=10), 200)
+            self.assertEqual(transport.pool_stats()[(transport.host_key(self.base_url), "async")]["idle"], 2)
+        finally:
+            for loop in loops:
+                asyncio.run_coroutine_threadsafe(client._transport.aclose(), loop).result(timeout=10)
+                loop.call_soon_threadsafe(loop.stop)
+            for thread in threads:
+                thread.join(timeout=10)
+            for loop in loops:
+                loop.close()
+
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+"""
+单轮延迟预算单测（turn_budget）
+
+关键不变量：
+- 未注入 turn_budget 时各 agent 输入与 output 与旧实现一致
+- 剩余预算低于阈值时按固定顺序降级，且每次降级都出现在 output["degradations"]
+- 步骤超时走兜底结果（fallback 评分 / 兜底题），不会让整轮失败
+- 同一 thread 上的多轮调用（checkpointer）之间降级记录与 deadline 不串轮
+- parallel_security 下 security 拦截时，被放弃的评分产生的降级不计入本轮
+
+运行：
+  uv run python -m unittest interview.tests.test_turn_budget -v
+"""
+
+from __future__ import annotations
+
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from langgraph.checkpoint.memory import InMemorySaver
+
+from interview.agents.deadline import (
+    QUESTION_FALLBACK,
+    QUESTION_TOOL_SKIPPED,
+    RETRIEVAL_SKIPPED,
+    SCORING_RAG_SKIPPED,
+    SCORING_SINGLE_MODEL,
+    SCORING_TIMEOUT,
+    SECURITY_LLM_SKIPPED,
+    VERIFIER_SKIPPED,
+    TurnBudget,
+)
+from interview.agents.graph import initial_graph_state
+from interview.tests.test_graph_pure import FakeSession, _build_graph
+
+_FALLBACK_SCORE = {"score": 5, "fallback_used": True, "requires_human_review": True}
+_FALLBACK_QUESTION = {"question": "兜底题", "type": "general", "difficulty": "easy"}
+
+
+def _budget_graph(session, budget, **graph_options):
+    graph, mocks = _build_graph(session, turn_budget=budget, **graph_options)
+    mocks["scoring_agent"].fallback_scoring = MagicMock(return_value=_FALLBACK_SCORE)
+    mocks["question_generator"].fallback_question = MagicMock(return_value=_FALLBACK_QUESTION)
+    return graph, mocks
+
+
+def _state(session):
+    return initial_graph_state(session, "答案", "slim")
+
+
+class TurnBudgetDegradation(unittest.IsolatedAsyncioTestCase):
+
+    async def test_without_budget_output_is_unchanged(self):
+        session = FakeSession()
+        graph, mocks = _build_graph(session)
+
+        output = (await graph.ainvoke(_state(session)))["output"]
+
+        self.assertNotIn("degradations", output)
+        self.assertNotIn("skip_llm", mocks["security_agent"].aprocess.call_args.args[0])
+        self.assertNotIn("max_models", mocks["scoring_agent"].aprocess.call_args.args[0])
+
+    async def test_ample_budget_records_no_degradation(self):
+        session = FakeSession()
+        graph, mocks = _budget_graph(session, TurnBudget())
+
+        output = (await graph.ainvoke(_state(session)))["output"]
+
+        self.assertEqual(output["degradations"], [])
+        self.assertGreater(output["budget_remaining_ms"], 20000)
+        self.assertNotIn("allow_rag_tool", mocks["question_generator"].aprocess.call_args.args[0])
+
+    async def test_tight_budget_degrades_in_fixed_order(self):
+        session = FakeSession()
+        verifier = MagicMock()
+        verifier.averify = AsyncMock()
+        graph, mocks = _budget_graph(session, TurnBudget(total_seconds=5), question_verifier=verifier)
+
+        output = (await graph.ainvoke(_state(session)))["output"]
+
+        self.assertEqual(output["degradations"], [
+            SECURITY_LLM_SKIPPED, SCORING_RAG_SKIPPED, SCORING_SINGLE_MODEL,
+            RETRIEVAL_SKIPPED, QUESTION_TOOL_SKIPPED, VERIFIER_SKIPPED,
+        ])
+        self.assertTrue(mocks["security_agent"].aprocess.call_args.args[0]["skip_llm"])
+        scoring_input = mocks["scoring_agent"].aprocess.call_args.args[0]
+        self.assertTrue(scoring_input["skip_rag_anchors"])
+        self.assertEqual(scoring_input["max_models"], 1)
+        mocks["memory_retriever"].retrieve_similar_cases.assert_not_called()
+        self.assertFalse(mocks["question_generator"].aprocess.call_args.args[0]["allow_rag_tool"])
+        verifier.averify.assert_not_called()
+        self.assertEqual(output["next_question"], "Q2")
+
+    async def test_blocked_parallel_turn_drops_abandoned_scoring_degradations(self):
+        session = FakeSession()
+        graph, mocks = _budget_graph(
+            session, TurnBudget(total_seconds=5), parallel_security=True, security_block=True
+        )
+        sec_check = mocks["security_agent"].aprocess.return_value
+
+        async def late_security(_input):
+            await asyncio.sleep(0.05)  # 评分已开始并记录了降级
+            return sec_check
+
+        mocks["security_agent"].aprocess.side_effect = late_security
+
+        result = await graph.ainvoke(_state(session))
+
+        self.assertTrue(result["output"]["security_termination"])
+        self.assertEqual(result["degradations"], [SECURITY_LLM_SKIPPED])
+
+    async def test_passing_parallel_turn_keeps_scoring_degradations(self):
+        session = FakeSession()
+        graph, _ = _budget_graph(session, TurnBudget(total_seconds=5), parallel_security=True)
+
+        output = (await graph.ainvoke(_state(session)))["output"]
+
+        self.assertEqual(output["degradations"][:3], [SECURITY_LLM_SKIPPED, SCORING_RAG_SKIPPED, SCORING_SINGLE_MODEL])
+
+    async def test_exhausted_budget_uses_fallback_question(self):
+        session = FakeSession()
+        graph, mocks = _budget_graph(session, TurnBudget(total_seconds=1), parallel_security=True)
+
+        output = (await graph.ainvoke(_state(session)))["output"]
+
+        self.assertIn(QUESTION_FALLBACK, output["degradations"])
+        mocks["question_generator"].aprocess.assert_not_called()
+        self.assertEqual(output["next_question"], "兜底题")
+        self.assertEqual(session.current_question, _FALLBACK_QUESTION)
+
+    async def test_step_timeout_falls_back_to_default_score(self):
+        session = FakeSession()
+        budget = TurnBudget(
+            total_seconds=0.2, security_llm_min=0, scoring_rag_min=0, scoring_ensemble_min=0,
+            retrieval_min=0, question_tool_min=0, verifier_min=0, revise_min=0, question_min=0,
+            min_step_seconds=0.05,
+        )
+        graph, mocks = _budget_graph(session, budget)
+
+        async def slow_scoring(_input):
+            await asyncio.sleep(1)
+
+        mocks["scoring_agent"].aprocess.side_effect = slow_scoring
+
+        output = (await graph.ainvoke(_state(session)))["output"]
+
+        self.assertIn(SCORING_TIMEOUT, output["degradations"])
+        self.assertEqual(output["score"], 5)
+        self.assertTrue(output["requires_human_review"])
+        self.assertEqual(session.qa_history[-1]["score_details"], _FALLBACK_SCORE)
+
+    async def test_degradations_do_not_leak_across_turns(self):
+        session = FakeSession()
+        graph, mocks = _budget_graph(session, TurnBudget(total_seconds=5), checkpointer=InMemorySaver())
+        config = {"configurable": {"thread_id": "s1"}}
+
+        first = (await graph.ainvoke(_state(session), config))["output"]
+        second = (await graph.ainvoke(_state(session), config))["output"]
+
+        self.assertEqual(first["degradations"], second["degradations"])
+        self.assertEqual(len(second["degradations"]), len(set(second["degradations"])))
+        self.assertGreater(second["budget_remaining_ms"], 4000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+"""
+单轮共享向量单测（memory/embedding.py + graph / ScoringAgent / MemoryStore 接入）
+
+关键不变量：
+- 一轮（security 放行 → 评分 anchors → persist → retrieval）只调用一次 get_embedding
+- anchors 与下题检索复用同一查询向量，turn 文档写入同一向量（不再包含评分理由）
+- 同一会话问答文本变化即生成新向量；未传入向量的 save_turn / 批量写入仍自行生成
+
+运行：
+  uv run python -m unittest interview.tests.test_turn_embedding -v
+"""
+
+from __future__ import annotations
+
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from interview.agents.graph import build_interview_graph
+from interview.agents.memory import MemoryRetriever, MemoryStore, TurnEmbeddings, turn_embedding_text
+from interview.agents.schemas import SingleScoreCandidate
+from interview.agents.scoring_agent import ScoringAgent
+from interview.tests.test_graph_pure import FakeSession, _build_graph
+
+_QUESTION = "请证明任意 5 个整数中必有两数之差被 4 整除。"
+_ANSWER = "按模 4 的余数分成 4 组，5 个数放进 4 组，由抽屉原理必有两数同组，差被 4 整除。"
+_VECTOR = [0.1, 0.2, 0.3]
+
+
+class FakeModel:
+    def __init__(self, name):
+        self.model_name = name
+
+    def with_structured_output(self, schema, include_raw=False):
+        m = MagicMock()
+        m.ainvoke = AsyncMock(return_value=SingleScoreCandidate(
+            score=8, evidence_quote="抽屉原理", question_focus="抽屉原理", confidence="high", reasoning="ok",
+        ))
+        return m
+
+
+def _retrieval_system():
+    rs = MagicMock()
+    rs.get_embedding = MagicMock(return_value=_VECTOR)
+    rs.get_embeddings = MagicMock(side_effect=lambda texts, chunk_size=10: [_VECTOR for _ in texts])
+    rs.vector_search_memories = MagicMock(return_value=[])
+    rs.save_turn_document = MagicMock(return_value=True)
+    rs.find_session_meta = MagicMock(return_value=None)
+    return rs
+
+
+class SharedTurnEmbeddingGraphTests(unittest.IsolatedAsyncioTestCase):
+
+    async def _run_turn(self, **graph_options):
+        session = FakeSession()
+        session.current_question = {"question": _QUESTION, "type": "math_logic", "difficulty": "medium"}
+        session.question_data = session.current_question
+        rs = _retrieval_system()
+        retriever = MemoryRetriever(rs)
+        retriever.retrieve_similar_cases = MagicMock(wraps=retriever.retrieve_similar_cases)
+        scoring_agent = ScoringAgent([FakeModel("doubao"), FakeModel("gemini")], memory_retriever=retriever)
+
+        _, mocks = _build_graph(session)  # 复用其 security / 出题 / 总结 mock
+        graph = build_interview_graph(
+            security_agent=mocks["security_agent"],
+            scoring_agent=scoring_agent,
+            question_generator=mocks["question_generator"],
+            summary_agent=mocks["summary_agent"],
+            memory_store=MemoryStore(rs),
+            memory_retriever=retriever,
+            retrieval_system=rs,
+            interview_session_provider=lambda sid: session,
+            question_verifier=None,
+            **graph_options,
+        )
+        result = await graph.ainvoke(
+            {"session_id": "s1", "candidate_name": "alice", "user_answer": _ANSWER},
+            config={"configurable": {"thread_id": "s1"}},
+        )
+        self.assertTrue(result["output"]["success"])
+        return rs, retriever
+
+    async def _assert_single_embedding(self, **graph_options):
+        rs, retriever = await self._run_turn(**graph_options)
+
+        rs.get_embedding.assert_called_once_with(turn_embedding_text(_QUESTION, _ANSWER))
+        rs.get_embeddings.assert_not_called()
+        # anchors（top_k=2）与下题检索（top_k=4）复用同一查询向量
+        calls = retriever.retrieve_similar_cases.call_args_list
+        self.assertEqual(sorted(c.args[1] for c in calls), [2, 4])
+        self.assertTrue(all(c.kwargs["query_embedding"] == _VECTOR for c in calls))
+        saved = rs.save_turn_document.call_args.args[0]
+        self.assertEqual(saved["embedding"], _VECTOR)
+
+    async def test_sequential_turn_embeds_once(self):
+        await self._assert_single_embedding()
+
+    async def test_parallel_security_turn_embeds_once(self):
+        await self._assert_single_embedding(parallel_security=True)
+
+
+class TurnEmbeddingsTests(unittest.IsolatedAsyncioTestCase):
+
+    async def test_reuse_within_turn_and_refresh_on_new_answer(self):
+        rs = _retrieval_system()
+        embeddings = TurnEmbeddings(rs)
+
+        first = embeddings.for_turn("s1", _QUESTION, _ANSWER)
+        first.start()
+        self.assertIs(embeddings.for_turn("s1", _QUESTION, _ANSWER), first)
+        self.assertEqual(await first.aget(), _VECTOR)
+        self.assertEqual(await embeddings.for_turn("s1", _QUESTION, _ANSWER).aget(), _VECTOR)
+        self.assertEqual(rs.get_embedding.call_count, 1)
+
+        self.assertIsNot(embeddings.for_turn("s1", _QUESTION, "另一个回答"), first)
+        embeddings.discard("s1")
+        self.assertIsNot(embeddings.for_turn("s1", _QUESTION, _ANSWER), first)
+
+    async def test_failed_embedding_returns_none(self):
+        rs = _retrieval_system()
+        rs.get_embedding.side_effect = RuntimeError("embedding service down")
+        self.assertIsNone(await TurnEmbeddings(rs).for_turn("s1", _QUESTION, _ANSWER).aget())
+
+
+class MemoryStoreEmbeddingTests(unittest.TestCase):
+
+    def _turn(self, index, **extra):
+        return {
+            "session_id": "s1", "candidate_name": "alice", "turn_index": index,
+            "state": {}, "action": {"question_text": _QUESTION, "answer_text": f"{_ANSWER}{index}"},
+            "reward": {"score": 8, "reasoning": "论证完整"}, **extra,
+        }
+
+    def test_save_turn_without_vector_embeds_question_and_answer(self):
+        rs = _retrieval_system()
+        turn = self._turn(0)
+        MemoryStore(rs).save_turn(
+            turn["session_id"], turn["candidate_name"], 0, turn["state"], turn["action"], turn["reward"],
+        )
+        rs.get_embedding.assert_called_once_with(turn_embedding_text(_QUESTION, f"{_ANSWER}0"))
+        self.assertIn("评分理由", rs.save_turn_document.call_args.args[0]["combined_text"])
+
+    def test_batch_embeds_only_missing_vectors(self):
+        rs = _retrieval_system()
+        rs.upsert_turn_documents = MagicMock(return_value=True)
+        self.assertTrue(MemoryStore(rs).save_turns_batch([self._turn(0, embedding=[1.0]), self._turn(1)]))
+        rs.get_embeddings.assert_called_once_with([turn_embedding_text(_QUESTION, f"{_ANSWER}1")])
+        docs = rs.upsert_turn_documents.call_args.args[0]
+        self.assertEqual([d["embedding"] for d in docs], [[1.0], _VECTOR])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,215 @@
+"""
+turn write-behind 队列单测：journal 回放 / 批量落库 / 重试失败保留与重新入队 / 多 worker journal 隔离与接管 / persist_node 接入
+
+运行：
+  uv run python -m unittest interview.tests.test_turn_write_behind -v
+"""
+
+from __future__ import annotations
+
+import asyncio
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from interview.agents.memory.write_behind import TurnWriteBehindQueue
+from interview.tests.test_graph_pure import FakeSession, _answer_state, _build_graph
+
+
+class FakeBatchStore:
+    """记录 save_turns_batch 调用；fail_times 次之前返回 False"""
+
+    def __init__(self, fail_times: int = 0):
+        self.fail_times = fail_times
+        self.calls = []
+        self.saved = []
+        self._lock = threading.Lock()
+
+    def save_turns_batch(self, turns):
+        with self._lock:
+            self.calls.append(list(turns))
+            if len(self.calls) <= self.fail_times:
+                return False
+            self.saved.extend(turns)
+            return True
+
+
+def _submit(writer, turn_index, session_id="s1"):
+    return writer.submit(
+        session_id, "alice", turn_index,
+        {"turn_number": turn_index + 1}, {"question_text": "Q", "answer_text": "A"},
+        {"score": 7}, None, 5.0,
+    )
+
+
+class WriteBehindQueue(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.journal = Path(self._tmp.name) / "turns.jsonl"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_batches_and_truncates_journal(self):
+        store = FakeBatchStore()
+        writer = TurnWriteBehindQueue(store, self.journal, batch_size=8, flush_interval=0.2)
+        writer.start()
+        for i in range(5):
+            _submit(writer, i)
+        self.assertTrue(writer.flush(timeout=5))
+        writer.stop()
+
+        self.assertEqual([t["turn_index"] for t in store.saved], [0, 1, 2, 3, 4])
+        self.assertLess(len(store.calls), 5, "应合并为批次写入")
+        self.assertEqual(writer.pending_count, 0)
+        self.assertEqual(self.journal.read_text(encoding="utf-8"), "")
+
+    def test_unacked_turns_replayed_on_start(self):
+        # 模拟进程崩溃：提交后 worker 从未启动
+        crashed = TurnWriteBehindQueue(FakeBatchStore(), self.journal)
+        _submit(crashed, 0)
+        _submit(crashed, 1)
+
+        store = FakeBatchStore()
+        writer = TurnWriteBehindQueue(store, self.journal, flush_interval=0.05)
+        self.assertEqual(writer.start(), 2)
+        self.assertTrue(writer.flush(timeout=5))
+        writer.stop()
+        self.assertEqual([t["turn_index"] for t in store.saved], [0, 1])
+
+    def test_retries_then_keeps_failed_batch_in_journal(self):
+        store = FakeBatchStore(fail_times=100)
+        writer = TurnWriteBehindQueue(
+            store, self.journal, flush_interval=0.05, max_retries=3, retry_backoff=0.01
+        )
+        writer.start()
+        _submit(writer, 0)
+        # 重试耗尽后批次仍未确认：flush 必须如实报告
+        self.assertFalse(writer.flush(timeout=5))
+        writer.stop()
+
+        self.assertGreaterEqual(len(store.calls), 3)
+        self.assertEqual(writer.pending_count, 1)
+        # 下次启动仍能回放
+        replay = TurnWriteBehindQueue(FakeBatchStore(), self.journal)
+        self.assertEqual(len(replay._read_unacked()), 1)
+
+    def test_exhausted_batch_is_requeued_without_restart(self):
+        store = FakeBatchStore(fail_times=2)
+        writer = TurnWriteBehindQueue(
+            store, self.journal, flush_interval=0.05, max_retries=2,
+            retry_backoff=0.05, max_requeue_backoff=0.2,
+        )
+        writer.start()
+        _submit(writer, 0)
+        self.assertFalse(writer.flush(timeout=5))
+
+        deadline = time.monotonic() + 5
+        while writer.pending_count and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertTrue(writer.flush(timeout=5))
+        writer.stop()
+
+        self.assertEqual(len(store.calls), 3)
+        self.assertEqual([t["turn_index"] for t in store.saved], [0])
+        self.assertEqual(self.journal.read_text(encoding="utf-8"), "")
+
+    def test_orphaned_sibling_journal_is_adopted(self):
+        stalled = TurnWriteBehindQueue(FakeBatchStore(fail_times=100), self.journal, worker_id="a")
+        _submit(stalled, 0)  # worker a 未启动：turn 一直未 ack
+
+        store = FakeBatchStore()
+        writer = TurnWriteBehindQueue(store, self.journal, worker_id="b", flush_interval=0.05)
+        writer.start()  # worker a 未持锁 → 视为孤儿接管
+        _submit(writer, 1)
+        self.assertTrue(writer.flush(timeout=5))
+        writer.stop()
+        self.assertEqual(sorted(t["turn_index"] for t in store.saved), [0, 1])
+        self.assertFalse(stalled.journal_path.exists())
+
+    def test_live_sibling_journal_is_not_adopted(self):
+        live = TurnWriteBehindQueue(
+            FakeBatchStore(fail_times=100), self.journal, worker_id="a",
+            flush_interval=0.05, max_retries=1, max_requeue_backoff=60,
+        )
+        live.start()
+        _submit(live, 0)
+        self.assertFalse(live.flush(timeout=5))
+
+        store = FakeBatchStore()
+        writer = TurnWriteBehindQueue(store, self.journal, worker_id="b", flush_interval=0.05)
+        self.assertEqual(writer.start(), 0)
+        _submit(writer, 1)
+        self.assertTrue(writer.flush(timeout=5))  # b 截断自己的 journal
+        writer.stop()
+        live.stop(timeout=1)
+
+        self.assertEqual([t["turn_index"] for t in store.saved], [1])
+        self.assertEqual(len(live._read_unacked()), 1, "worker a 的未 ack turn 不能被 b 截断")
+        # a 退出后由下一个 worker 接管
+        restarted = TurnWriteBehindQueue(FakeBatchStore(), self.journal, worker_id="c")
+        self.assertEqual(restarted.start(), 1)
+        restarted.stop()
+
+    def test_partial_trailing_line_is_skipped(self):
+        writer = TurnWriteBehindQueue(FakeBatchStore(), self.journal)
+        _submit(writer, 0)
+        with open(self.journal, "a", encoding="utf-8") as f:
+            f.write('{"op": "turn", "id": "trunc')
+        self.assertEqual(len(writer._read_unacked()), 1)
+
+
+class PersistNodeWriteBehind(unittest.IsolatedAsyncioTestCase):
+
+    async def test_persist_submits_to_writer_instead_of_save_turn(self):
+        session = FakeSession()
+        turn_writer = MagicMock()
+        graph, mocks = _build_graph(session, turn_writer=turn_writer)
+
+        await graph.ainvoke(
+            _answer_state(session),
+            config={"configurable": {"thread_id": "s_wb"}},
+        )
+
+        mocks["memory_store"].save_turn.assert_not_called()
+        turn_writer.submit.assert_called_once()
+        call = turn_writer.submit.call_args
+        self.assertEqual(len(call.args), 8)
+        self.assertEqual(call.args[0], "s1")
+        self.assertEqual(call.args[7], 5.0)
+
+    async def test_persist_does_not_wait_for_pending_embedding(self):
+        session = FakeSession()
+        turn_writer = MagicMock()
+        turn_writer.submit.return_value = "entry-1"
+        graph, mocks = _build_graph(session, turn_writer=turn_writer)
+        released = threading.Event()
+        mocks["retrieval_system"].get_embedding.side_effect = lambda text: released.wait(5) and [0.5]
+        # submit 时向量仍在计算：persist 不等待，提交后才放行 embedding
+        turn_writer.submit.side_effect = lambda *args, **kwargs: released.set() or "entry-1"
+
+        await graph.ainvoke(
+            _answer_state(session),
+            config={"configurable": {"thread_id": "s_wb_pending"}},
+        )
+        await asyncio.sleep(0)
+
+        self.assertIsNone(turn_writer.submit.call_args.kwargs["embedding"])
+        turn_writer.attach_embedding.assert_called_once_with("entry-1", [0.5])
+
+    def test_attach_embedding_only_to_unwritten_turns(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = TurnWriteBehindQueue(FakeBatchStore(), Path(tmp) / "turns.jsonl")
+            entry_id = _submit(writer, 0)
+            self.assertTrue(writer.attach_embedding(entry_id, [0.1]))
+            self.assertFalse(writer.attach_embedding(entry_id, [0.2]), "已有向量不覆盖")
+            self.assertFalse(writer.attach_embedding("missing", [0.1]))
+            self.assertEqual(writer._unacked[entry_id]["embedding"], [0.1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,6 +4,7 @@ RAG 向量检索与数据库工具
 
 改造要点：所有 MongoDB 访问统一通过 interview.tools.db 中的共享连接池，
 不再在每次调用中创建/关闭客户端。
+RetrievalSystem 的集合操作经 interview.metrics.mongo_op 按集合 / 操作计时（INTERVIEW_METRICS 启用时）。
 """
 
 import os
@@ -18,7 +19,9 @@ from openai import OpenAI
 
 from langchain.tools import tool
 
+from interview.metrics import mongo_op
 from interview.tools.db import get_mongo_db
+from interview.transport import get_sync_client
 
 logger = logging.getLogger("interview.tools.rag")
 
@@ -69,7 +72,8 @@ def rag_search(query: str) -> str:
 
     try:
         problem_collection = get_mongo_db()["problem"]
-        results = list(problem_collection.aggregate(pipeline))
+        with mongo_op("problem", "aggregate"):
+            results = list(problem_collection.aggregate(pipeline))
         if not results:
             return "在知识库中没有找到相关信息。"
 
@@ -102,9 +106,12 @@ class RetrievalSystem:
         self.conversation_memory_collection = self.db["conversation_memories"]
 
         # 阿里云 embedding 调用（OpenAI 兼容接口）
+        # 复用进程共享的 httpx 连接池（transport.py），避免每个实例各自握手
+        embedding_base_url = os.getenv("ALIYUN_BASE_URL")
         self.embedding_client = OpenAI(
             api_key=os.getenv("ALIYUN_API_KEY"),
-            base_url=os.getenv("ALIYUN_BASE_URL"),
+            base_url=embedding_base_url,
+            http_client=get_sync_client(embedding_base_url),
         )
 
     def get_embedding(self, text: str) -> Optional[List[float]]:
@@ -125,13 +132,34 @@ class RetrievalSystem:
             self.logger.error(f"Error generating embedding with OpenAI SDK: {e}")
             return None
 
+    def get_embeddings(self, texts: List[str], chunk_size: int = 10) -> List[Optional[List[float]]]:
+        """批量生成文本向量（text-embedding-v4 单次最多 10 条），失败的分片对应位置为 None"""
+        vectors: List[Optional[List[float]]] = []
+        for start in range(0, len(texts), chunk_size):
+            chunk = texts[start:start + chunk_size]
+            try:
+                completion = self.embedding_client.embeddings.create(
+                    model="text-embedding-v4",
+                    input=chunk,
+                    dimensions=1024,
+                    encoding_format="float"
+                )
+                by_index = {d.index: d.embedding for d in (completion.data or [])}
+                vectors.extend(by_index.get(i) for i in range(len(chunk)))
+            except Exception as e:
+                self.logger.error(f"Error generating batch embeddings with OpenAI SDK: {e}")
+                vectors.extend([None] * len(chunk))
+        return vectors
+
     def get_resume_by_name(self, name: str) -> Dict[str, Any]:
         """根据姓名获取简历信息"""
         try:
-            user = self.users_collection.find_one({"name": name})
+            with mongo_op("users", "find_one"):
+                user = self.users_collection.find_one({"name": name})
             if user and "_id" in user:
                 resume_id = str(user["_id"])
-                resume = self.resumes_collection.find_one({"_id": ObjectId(resume_id)})
+                with mongo_op("resumes", "find_one"):
+                    resume = self.resumes_collection.find_one({"_id": ObjectId(resume_id)})
                 if resume:
                     return json.loads(json_util.dumps(resume))
                 else:
@@ -209,7 +237,8 @@ class RetrievalSystem:
                 "processed_by": "MultiAgentCoordinator"
             }
 
-            result = self.result_collection.insert_one(interview_record)
+            with mongo_op("result", "insert_one"):
+                result = self.result_collection.insert_one(interview_record)
             self.logger.info(f"面试结果已保存，ID: {result.inserted_id}")
             return True
 
@@ -229,7 +258,8 @@ class RetrievalSystem:
     def get_candidate_history(self, candidate_name: str) -> List[Dict[str, Any]]:
         """获取候选人的历史面试记录"""
         try:
-            results = list(self.result_collection.find({"name": candidate_name}))
+            with mongo_op("result", "find"):
+                results = list(self.result_collection.find({"name": candidate_name}))
             return json.loads(json_util.dumps(results))
         except Exception as e:
             self.logger.error(f"获取候选人历史记录时发生错误: {e}")
@@ -253,11 +283,12 @@ class RetrievalSystem:
             }
 
             # 使用upsert，如果session_id已存在则更新，否则插入
-            result = self.memory_collection.replace_one(
-                {"session_id": memory_data["session_id"]},
-                memory_record,
-                upsert=True
-            )
+            with mongo_op("interview_memories", "replace_one"):
+                result = self.memory_collection.replace_one(
+                    {"session_id": memory_data["session_id"]},
+                    memory_record,
+                    upsert=True
+                )
 
             success = result.acknowledged
             if success:
@@ -271,7 +302,8 @@ class RetrievalSystem:
     def load_memory(self, session_id: str) -> Optional[Dict[str, Any]]:
         """从数据库加载面试记忆"""
         try:
-            memory_record = self.memory_collection.find_one({"session_id": session_id})
+            with mongo_op("interview_memories", "find_one"):
+                memory_record = self.memory_collection.find_one({"session_id": session_id})
             if memory_record:
                 # 移除MongoDB特定的字段
                 memory_record.pop("_id", None)
@@ -284,7 +316,8 @@ class RetrievalSystem:
     def get_candidate_memories(self, candidate_name: str) -> List[Dict[str, Any]]:
         """获取候选人的所有记忆记录"""
         try:
-            results = list(self.memory_collection.find({"candidate_name": candidate_name}))
+            with mongo_op("interview_memories", "find"):
+                results = list(self.memory_collection.find({"candidate_name": candidate_name}))
             # 移除MongoDB特定的_id字段并序列化
             for result in results:
                 result.pop("_id", None)
@@ -296,7 +329,8 @@ class RetrievalSystem:
     def delete_memory(self, session_id: str) -> bool:
         """删除指定的记忆记录"""
         try:
-            result = self.memory_collection.delete_one({"session_id": session_id})
+            with mongo_op("interview_memories", "delete_one"):
+                result = self.memory_collection.delete_one({"session_id": session_id})
             success = result.deleted_count > 0
             if success:
                 self.logger.info(f"记忆记录已删除: {session_id}")
@@ -310,9 +344,10 @@ class RetrievalSystem:
         try:
             cutoff_date = datetime.now() - timedelta(days=days_old)
 
-            result = self.memory_collection.delete_many({
-                "saved_at": {"$lt": cutoff_date.isoformat()}
-            })
+            with mongo_op("interview_memories", "delete_many"):
+                result = self.memory_collection.delete_many({
+                    "saved_at": {"$lt": cutoff_date.isoformat()}
+                })
 
             deleted_count = result.deleted_count
             self.logger.info(f"已清理 {deleted_count} 条过期记忆记录")
@@ -326,21 +361,48 @@ class RetrievalSystem:
     def save_turn_document(self, turn_doc: Dict[str, Any]) -> bool:
         """插入一条 turn 文档到 conversation_memories"""
         try:
-            result = self.conversation_memory_collection.insert_one(turn_doc)
+            with mongo_op("conversation_memories", "insert_one"):
+                result = self.conversation_memory_collection.insert_one(turn_doc)
             self.logger.debug(f"Turn 文档已保存: session={turn_doc.get('session_id')}, turn={turn_doc.get('turn_index')}")
             return result.acknowledged
         except Exception as e:
             self.logger.error(f"保存 turn 文档失败: {e}")
             return False
 
+    def upsert_turn_documents(self, turn_docs: List[Dict[str, Any]]) -> bool:
+        """批量 upsert turn 文档（按 session_id + turn_index 幂等，供 write-behind 重试使用）"""
+        if not turn_docs:
+            return True
+        try:
+            ops = [
+                pymongo.ReplaceOne(
+                    {
+                        "session_id": doc["session_id"],
+                        "doc_type": "turn",
+                        "turn_index": doc["turn_index"],
+                    },
+                    doc,
+                    upsert=True,
+                )
+                for doc in turn_docs
+            ]
+            with mongo_op("conversation_memories", "bulk_write"):
+                result = self.conversation_memory_collection.bulk_write(ops, ordered=False)
+            self.logger.debug(f"批量 upsert turn 文档: {len(turn_docs)} 条")
+            return result.acknowledged
+        except Exception as e:
+            self.logger.error(f"批量保存 turn 文档失败: {e}")
+            return False
+
     def save_session_meta(self, meta_doc: Dict[str, Any]) -> bool:
         """Upsert session_meta 文档到 conversation_memories"""
         try:
-            result = self.conversation_memory_collection.replace_one(
-                {"session_id": meta_doc["session_id"], "doc_type": "session_meta"},
-                meta_doc,
-                upsert=True
-            )
+            with mongo_op("conversation_memories", "replace_one"):
+                result = self.conversation_memory_collection.replace_one(
+                    {"session_id": meta_doc["session_id"], "doc_type": "session_meta"},
+                    meta_doc,
+                    upsert=True
+                )
             self.logger.debug(f"Session meta 已保存: {meta_doc.get('session_id')}")
             return result.acknowledged
         except Exception as e:
@@ -350,10 +412,11 @@ class RetrievalSystem:
     def update_session_meta(self, session_id: str, update_ops: Dict[str, Any]) -> bool:
         """使用 $set/$inc/$push 增量更新 session_meta"""
         try:
-            result = self.conversation_memory_collection.update_one(
-                {"session_id": session_id, "doc_type": "session_meta"},
-                update_ops
-            )
+            with mongo_op("conversation_memories", "update_one"):
+                result = self.conversation_memory_collection.update_one(
+                    {"session_id": session_id, "doc_type": "session_meta"},
+                    update_ops
+                )
             return result.acknowledged
         except Exception as e:
             self.logger.error(f"更新 session meta 失败: {e}")
@@ -362,9 +425,10 @@ class RetrievalSystem:
     def find_session_meta(self, session_id: str) -> Optional[Dict[str, Any]]:
         """查询 session_meta 文档"""
         try:
-            doc = self.conversation_memory_collection.find_one(
-                {"session_id": session_id, "doc_type": "session_meta"}
-            )
+            with mongo_op("conversation_memories", "find_one"):
+                doc = self.conversation_memory_collection.find_one(
+                    {"session_id": session_id, "doc_type": "session_meta"}
+                )
             if doc:
                 doc.pop("_id", None)
             return doc
@@ -372,20 +436,26 @@ class RetrievalSystem:
             self.logger.error(f"查询 session meta 失败: {e}")
             return None
 
-    def find_turns_by_session(self, session_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-        """按 turn_index 升序查询某会话的 turn 文档"""
+    def find_turns_by_session(
+        self,
+        session_id: str,
+        limit: Optional[int] = None,
+        projection: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """按 turn_index 升序查询某会话的 turn 文档（projection 可排除 embedding 等大字段）"""
         try:
-            cursor = self.conversation_memory_collection.find(
-                {"session_id": session_id, "doc_type": "turn"}
-            ).sort("turn_index", pymongo.ASCENDING)
-
-            if limit is not None:
-                cursor = cursor.limit(limit)
-
-            results = []
-            for doc in cursor:
-                doc.pop("_id", None)
-                results.append(doc)
+            with mongo_op("conversation_memories", "find"):
+                cursor = self.conversation_memory_collection.find(
+                    {"session_id": session_id, "doc_type": "turn"}, projection
+                ).sort("turn_index", pymongo.ASCENDING)
+
+                if limit is not None:
+                    cursor = cursor.limit(limit)
+
+                results = []
+                for doc in cursor:
+                    doc.pop("_id", None)
+                    results.append(doc)
             return results
         except Exception as e:
             self.logger.error(f"查询 turn 文档失败: {e}")
@@ -432,7 +502,8 @@ class RetrievalSystem:
                 },
             ]
 
-            results = list(self.conversation_memory_collection.aggregate(pipeline))
+            with mongo_op("conversation_memories", "vector_search"):
+                results = list(self.conversation_memory_collection.aggregate(pipeline))
             return results
         except Exception as e:
             self.logger.error(f"向量检索 memories 失败: {e}")
@@ -441,7 +512,8 @@ class RetrievalSystem:
     def delete_conversation_memories(self, session_id: str) -> int:
         """删除某会话的全部文档（turn + session_meta）"""
         try:
-            result = self.conversation_memory_collection.delete_many({"session_id": session_id})
+            with mongo_op("conversation_memories", "delete_many"):
+                result = self.conversation_memory_collection.delete_many({"session_id": session_id})
             deleted = result.deleted_count
             self.logger.info(f"已删除会话 {session_id} 的 {deleted} 条文档")
             return deleted
@@ -0,0 +1,383 @@
+"""
+共享 HTTP 传输层 — 所有 LLM / embedding / moderation / TTS 客户端复用的 httpx 连接池
+
+旧实现各自建连：llm.py 的 5 个 ChatOpenAI、RetrievalSystem 的 embedding 客户端、
+guardrails 的 AsyncOpenAI、init.py 的脚本客户端各持一套连接池，generate_tts_audio
+每次调用新建 AsyncClient —— 同一上游主机被多次 TLS 握手，冷连接落在单轮关键路径上。
+
+现在按上游主机（scheme://host:port）各维护一个 httpx.Client / httpx.AsyncClient：
+- keep-alive 上限与过期时间可配置；安装 h2 时启用 HTTP/2（同一连接多路复用）
+- INTERVIEW_HTTP_WARMUP=1 时首个 WebSocket 连接建立后在后台预先建连（每个上游只预热一次）
+- 每个请求先经所属 provider 的限流器放行（RPM / TPM / 在途上限 / 429 退避，见 ratelimit.py）
+- 指标（INTERVIEW_METRICS=1）：连接池 active / idle / queued 连接数，新建连接 tcp / tls 耗时
+
+AsyncClient 按主机进程级共享同一个对象（ChatOpenAI / AsyncOpenAI 在构造时持有它），但连接池按 event loop 区分：
+httpcore 的连接池原语绑定首个使用它的 loop，而进程内有多个常驻 loop（Daphne 主 loop、FinalizeJobQueue、
+portal）交替发起请求，共用一个池会在切换 loop 后抛 "bound to a different event loop"。
+_LoopLocalTransport 为每个 running loop 惰性建一套连接池（loop 关闭后丢弃）；限流器仍按主机共享。
+
+环境变量：
+  INTERVIEW_HTTP_MAX_CONNECTIONS   每主机最大连接数（默认 100）
+  INTERVIEW_HTTP_MAX_KEEPALIVE     每主机最大空闲 keep-alive 连接数（默认 20）
+  INTERVIEW_HTTP_KEEPALIVE_EXPIRY  空闲连接保留秒数（默认 120）
+  INTERVIEW_HTTP2                  0 时强制 HTTP/1.1（默认：安装 h2 即启用）
+  INTERVIEW_HTTP_WARMUP            1 时启用连接预热
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from interview import metrics, ratelimit
+
+logger = logging.getLogger("interview.transport")
+
+MAX_CONNECTIONS_ENV = "INTERVIEW_HTTP_MAX_CONNECTIONS"
+MAX_KEEPALIVE_ENV = "INTERVIEW_HTTP_MAX_KEEPALIVE"
+KEEPALIVE_EXPIRY_ENV = "INTERVIEW_HTTP_KEEPALIVE_EXPIRY"
+HTTP2_ENV = "INTERVIEW_HTTP2"
+WARMUP_ENV = "INTERVIEW_HTTP_WARMUP"
+
+# base_url 未配置时 openai SDK 的默认上游
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+
+try:
+    import h2  # noqa: F401
+    _H2_AVAILABLE = True
+except ImportError:  # pragma: no cover - 未安装 h2 时退回 HTTP/1.1
+    _H2_AVAILABLE = False
+
+_lock = threading.Lock()
+_sync_clients: Dict[str, httpx.Client] = {}
+_async_clients: Dict[str, httpx.AsyncClient] = {}
+_warmed: set = set()
+
+
+def host_key(base_url: Optional[str]) -> str:
+    """上游主机键：scheme://host:port（同一主机的不同路径共享连接池）"""
+    parts = urlsplit(base_url or DEFAULT_BASE_URL)
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    return f"{parts.scheme}://{parts.hostname}:{port}"
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=int(os.getenv(MAX_CONNECTIONS_ENV, "100")),
+        max_keepalive_connections=int(os.getenv(MAX_KEEPALIVE_ENV, "20")),
+        keepalive_expiry=float(os.getenv(KEEPALIVE_EXPIRY_ENV, "120")),
+    )
+
+
+def http2_enabled() -> bool:
+    return _H2_AVAILABLE and os.getenv(HTTP2_ENV, "1").strip().lower() not in ("0", "false", "no")
+
+
+# ============================================================
+# 连接耗时埋点（httpcore trace 扩展；指标未启用时不挂载）
+# ============================================================
+
+_TRACE_PHASES = {"connection.connect_tcp": "tcp", "connection.start_tls": "tls"}
+
+
+def _trace_recorder(host: str):
+    """单个请求的 trace 记录函数：按事件前缀配对 started / complete 计时"""
+    started_at: Dict[str, float] = {}
+
+    def record(event_name: str) -> None:
+        prefix, _, stage = event_name.rpartition(".")
+        phase = _TRACE_PHASES.get(prefix)
+        if phase is None:
+            return
+        if stage == "started":
+            started_at[prefix] = time.perf_counter()
+        elif stage == "complete" and prefix in started_at:
+            metrics.observe_http_connect(host, phase, time.perf_counter() - started_at.pop(prefix))
+
+    return record
+
+
+def _sync_request_hook(host: str):
+    def hook(request: httpx.Request) -> None:
+        if metrics.metrics_enabled():
+            record = _trace_recorder(host)
+            request.extensions["trace"] = lambda event_name, info: record(event_name)
+    return hook
+
+
+def _async_request_hook(host: str):
+    async def hook(request: httpx.Request) -> None:
+        if metrics.metrics_enabled():
+            record = _trace_recorder(host)
+
+            async def trace(event_name, info):
+                record(event_name)
+
+            request.extensions["trace"] = trace
+    return hook
+
+
+# ============================================================
+# provider 限流（包装 httpx 传输层：放行 → 发送 → 响应体关闭时归还在途名额）
+# ============================================================
+
+def _request_tokens(request: httpx.Request) -> int:
+    return ratelimit.estimate_tokens(int(request.headers.get("content-length") or 0))
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    def __init__(self, stream: httpx.SyncByteStream, release):
+        self._stream = stream
+        self._release = release
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            release, self._release = self._release, None
+            if release is not None:
+                release()
+
+
+class _AsyncReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, release):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            release, self._release = self._release, None
+            if release is not None:
+                release()
+
+
+class _LimitedTransport(httpx.BaseTransport):
+    def __init__(self, inner: httpx.BaseTransport, limiter: ratelimit.ProviderLimiter):
+        self.inner = inner
+        self.limiter = limiter
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        try:
+            self.limiter.acquire_sync(_request_tokens(request))
+        except ratelimit.LimiterTimeout as e:
+            raise httpx.PoolTimeout(str(e), request=request) from e
+        try:
+            response = self.inner.handle_request(request)
+        except BaseException:
+            self.limiter.release()
+            raise
+        self.limiter.record_response(response.status_code, response.headers)
+        response.stream = _ReleasingStream(response.stream, self.limiter.release)
+        return response
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+class _AsyncLimitedTransport(httpx.AsyncBaseTransport):
+    def __init__(self, inner: httpx.AsyncBaseTransport, limiter: ratelimit.ProviderLimiter):
+        self.inner = inner
+        self.limiter = limiter
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        try:
+            await self.limiter.acquire(_request_tokens(request))
+        except ratelimit.LimiterTimeout as e:
+            raise httpx.PoolTimeout(str(e), request=request) from e
+        try:
+            response = await self.inner.handle_async_request(request)
+        except BaseException:
+            self.limiter.release()
+            raise
+        self.limiter.record_response(response.status_code, response.headers)
+        response.stream = _AsyncReleasingStream(response.stream, self.limiter.release)
+        return response
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class _LoopLocalTransport(httpx.AsyncBaseTransport):
+    """按 running loop 分派到各自的 httpx.AsyncClient（含代理 mounts 与限流包装），连接池不跨 loop 共享"""
+
+    def __init__(self, factory: Callable[[], httpx.AsyncClient]):
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None:
+                for closed in [other for other in self._clients if other.is_closed()]:
+                    del self._clients[closed]
+                client = self._clients[loop] = self._factory()
+            return client
+
+    def clients(self) -> List[httpx.AsyncClient]:
+        with self._lock:
+            return list(self._clients.values())
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        client = self._client()
+        return await client._transport_for_url(request.url).handle_async_request(request)
+
+    async def aclose(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.pop(loop, None)
+        if client is not None:
+            await client.aclose()
+
+
+def _limit_transports(client, key: str, wrapper) -> None:
+    """包装客户端的默认传输层与代理 mounts（保留 httpx 按环境变量配置代理的行为）"""
+    limiter = ratelimit.get_limiter(key)
+    client._transport = wrapper(client._transport, limiter)
+    client._mounts = {
+        pattern: wrapper(transport, limiter) if transport is not None else None
+        for pattern, transport in client._mounts.items()
+    }
+
+
+# ============================================================
+# 共享客户端
+# ============================================================
+
+def get_sync_client(base_url: Optional[str] = None) -> httpx.Client:
+    """按上游主机返回共享 httpx.Client（传给 OpenAI(http_client=...) / ChatOpenAI(http_client=...)）"""
+    key = host_key(base_url)
+    client = _sync_clients.get(key)
+    if client is None:
+        with _lock:
+            client = _sync_clients.get(key)
+            if client is None:
+                client = httpx.Client(
+                    limits=_limits(), http2=http2_enabled(),
+                    event_hooks={"request": [_sync_request_hook(key)]},
+                )
+                _limit_transports(client, key, _LimitedTransport)
+                _sync_clients[key] = client
+    return client
+
+
+def get_async_client(base_url: Optional[str] = None) -> httpx.AsyncClient:
+    """按上游主机返回共享 httpx.AsyncClient（AsyncOpenAI / ChatOpenAI(http_async_client=...) / TTS）
+
+    同一对象可在任意 event loop 上使用：实际连接池按 running loop 分别建立（见 _LoopLocalTransport）。
+    """
+    key = host_key(base_url)
+    client = _async_clients.get(key)
+    if client is None:
+        with _lock:
+            client = _async_clients.get(key)
+            if client is None:
+                def loop_client() -> httpx.AsyncClient:
+                    inner = httpx.AsyncClient(limits=_limits(), http2=http2_enabled())
+                    _limit_transports(inner, key, _AsyncLimitedTransport)
+                    return inner
+
+                # 代理 / 证书等环境配置由各 loop 的内层客户端处理，外层只负责 hooks 与分派
+                client = httpx.AsyncClient(
+                    transport=_LoopLocalTransport(loop_client), trust_env=False,
+                    event_hooks={"request": [_async_request_hook(key)]},
+                )
+                _async_clients[key] = client
+    return client
+
+
+def pool_stats() -> Dict[Tuple[str, str], Dict[str, int]]:
+    """各共享连接池的 active / idle / queued 连接数（读取 httpcore 连接池状态）"""
+    stats: Dict[Tuple[str, str], Dict[str, int]] = {}
+    pooled = [("sync", key, [client]) for key, client in list(_sync_clients.items())]
+    pooled += [
+        ("async", key, client._transport.clients()) for key, client in list(_async_clients.items())
+    ]
+    for kind, key, clients in pooled:
+        pools = [
+            getattr(getattr(c._transport, "inner", c._transport), "_pool", None) for c in clients
+        ]
+        pools = [pool for pool in pools if pool is not None]
+        if not pools:
+            continue
+        connections = [c for pool in pools for c in list(pool.connections) if not c.is_closed()]
+        idle = sum(1 for c in connections if c.is_idle())
+        stats[(key, kind)] = {
+            "active": len(connections) - idle,
+            "idle": idle,
+            "queued": sum(len(getattr(pool, "_requests", ())) for pool in pools),
+        }
+    return stats
+
+
+metrics.track_http_pools(pool_stats)
+
+
+# ============================================================
+# 预热 / 关闭
+# ============================================================
+
+def warmup_enabled() -> bool:
+    return os.getenv(WARMUP_ENV, "").strip().lower() in ("1", "true", "yes")
+
+
+def _claim_warmup(base_urls: Iterable[Optional[str]], kind: str) -> Dict[str, str]:
+    """挑出尚未预热的上游并先行标记（并发连接不会重复预热同一主机）"""
+    targets: Dict[str, str] = {}
+    with _lock:
+        for base_url in base_urls:
+            marker = f"{kind}:{host_key(base_url)}"
+            if marker not in _warmed:
+                _warmed.add(marker)
+                targets[marker] = (base_url or DEFAULT_BASE_URL).rstrip("/")
+    return targets
+
+
+def warm_up(base_urls: Iterable[Optional[str]], timeout: float = 5.0) -> None:
+    """同步客户端预热：对每个上游发一次轻量请求，建立 TCP + TLS 连接放回连接池（响应状态忽略）"""
+    for marker, base_url in _claim_warmup(base_urls, "sync").items():
+        try:
+            get_sync_client(base_url).get(f"{base_url}/models", timeout=timeout)
+        except httpx.HTTPError as e:
+            _warmed.discard(marker)
+            logger.warning(f"HTTP 连接预热失败 {marker}: {e}")
+
+
+async def awarm_up(base_urls: Iterable[Optional[str]], timeout: float = 5.0) -> None:
+    """异步客户端预热（在服务请求的 event loop 上执行）"""
+    for marker, base_url in _claim_warmup(base_urls, "async").items():
+        try:
+            await get_async_client(base_url).get(f"{base_url}/models", timeout=timeout)
+        except httpx.HTTPError as e:
+            _warmed.discard(marker)
+            logger.warning(f"HTTP 连接预热失败 {marker}: {e}")
+
+
+def close_http_clients() -> None:
+    """关闭全部共享同步客户端（进程退出 / 测试清理）；异步客户端随进程退出释放"""
+    with _lock:
+        for client in _sync_clients.values():
+            client.close()
+        _sync_clients.clear()
+        _async_clients.clear()
+        _warmed.clear()
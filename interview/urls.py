@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import users
+from . import metrics, users
 
 app_name = 'api'
 
@@ -13,4 +13,6 @@ urlpatterns = [
     path('resume/', users.get_user_resume, name='get_user_resume'),
     path('resume/update/', users.update_user_resume, name='update_user_resume'),
     path('result/', users.get_interview_result, name='get_interview_result'),
+    # Prometheus 抓取端点（INTERVIEW_METRICS=1 时启用，见 interview/metrics.py）
+    path('metrics/', metrics.metrics_view, name='metrics'),
 ]
@@ -10,6 +10,7 @@ from __future__ import annotations
 
 import json
 import logging
+import threading
 
 import pymongo
 from bson.objectid import ObjectId
@@ -17,11 +18,31 @@ from django.contrib.auth.hashers import check_password, make_password
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 
+from interview.agents.finalize_jobs import JOB_FAILED, JOB_PENDING, JOB_RUNNING, JOBS_COLLECTION
+from interview.agents.profile_cache import ParsedProfileStore, prefetch_profile
 from interview.auth_utils import generate_token, jwt_required
 from interview.tools.db import get_mongo_db
 
 logger = logging.getLogger("interview.users")
 
+_profile_parser = None
+_profile_parser_lock = threading.Lock()
+
+
+def _get_profile_parser():
+    """简历预解析用的 ResumeParser（与面试出题同一模型，写入同一 parsed_profiles 集合）"""
+    global _profile_parser
+    if _profile_parser is None:
+        with _profile_parser_lock:
+            if _profile_parser is None:
+                from interview.agents.resume_parser import ResumeParser
+                from interview.llm import COORDINATOR_MODELS
+
+                parser = ResumeParser(COORDINATOR_MODELS["question_model"])
+                parser.profile_store = ParsedProfileStore()
+                _profile_parser = parser
+    return _profile_parser
+
 
 @csrf_exempt
 def new_user(request):
@@ -128,7 +149,10 @@ def get_user_resume(request):
 @csrf_exempt
 @jwt_required
 def update_user_resume(request):
-    """更新当前用户的简历。"""
+    """更新当前用户的简历。
+
+    保存成功后在后台预解析简历（写入 parsed_profiles），候选人开始面试时直接复用解析结果。
+    """
     if request.method != "POST":
         return JsonResponse({"error": "Only POST method is allowed"}, status=405)
 
@@ -147,6 +171,12 @@ def update_user_resume(request):
         if result.matched_count == 0:
             return JsonResponse({"error": "Resume not found for the user"}, status=404)
 
+        if new_content:
+            try:
+                prefetch_profile(_get_profile_parser(), {"content": new_content})
+            except Exception:
+                logger.exception("简历预解析提交失败")
+
         return JsonResponse({"message": "Resume updated successfully"}, status=200)
 
     except json.JSONDecodeError:
@@ -159,13 +189,36 @@ def update_user_resume(request):
 @csrf_exempt
 @jwt_required
 def get_interview_result(request):
-    """获取当前用户最近一次的面试结果。"""
+    """获取当前用户最近一次的面试结果。
+
+    最近一场面试的后台 finalize 任务尚未完成时返回 202 + {"status": "pending"}，前端轮询；
+    任务已失败且结果未落库时返回 500 + {"status": "failed"}（不回退到更早一场面试的结果）。
+    """
     if request.method != "GET":
         return JsonResponse({"error": "Only GET method is allowed"}, status=405)
 
     try:
         username = request.jwt_payload["name"]
-        result_collection = get_mongo_db()["result"]
+        db = get_mongo_db()
+
+        latest_job = db[JOBS_COLLECTION].find_one(
+            {"candidate_name": username},
+            {"status": 1, "result_saved": 1, "created_at": 1},
+            sort=[("created_at", pymongo.DESCENDING)],
+        )
+        if (
+            latest_job
+            and latest_job.get("status") in (JOB_PENDING, JOB_RUNNING)
+            and not latest_job.get("result_saved")
+        ):
+            return JsonResponse({"status": "pending", "session_id": latest_job["_id"]}, status=202)
+        if latest_job and latest_job.get("status") == JOB_FAILED and not latest_job.get("result_saved"):
+            return JsonResponse(
+                {"status": "failed", "session_id": latest_job["_id"], "error": "Interview result generation failed"},
+                status=500,
+            )
+
+        result_collection = db["result"]
 
         latest_result = result_collection.find_one(
             {"$or": [{"candidate_name": username}, {"name": username}]},